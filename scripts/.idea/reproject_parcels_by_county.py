@@ -1,16 +1,18 @@
 import arcpy
 import os
+import sys
+
+SCRIPTS_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_FOLDER not in sys.path:
+    sys.path.append(SCRIPTS_FOLDER)
+
+from cesspool_analysis.coordinate_transform import COUNTY_WKIDS
 
 # Path to your geodatabase
 gdb_path = r"C:\Users\rober\OneDrive\Documents\GIS_Projects\ParcelAnalysis\ParcelAnalysis.gdb"
 
-# Mapping of county names to WKIDs
-county_proj = {
-    "Hawaii": 102661,
-    "Maui": 102642,
-    "Honolulu": 102662,
-    "Kauai": 102643
-}
+# Mapping of county names to WKIDs (State Plane zones 1-4)
+county_proj = COUNTY_WKIDS
 
 # Set the workspace
 arcpy.env.workspace = gdb_path
@@ -4,6 +4,7 @@
 
 import arcpy
 import os
+import sys
 from datetime import datetime
 
 print("MPAT Step 1: Joining Well Distance Data")
@@ -30,6 +31,13 @@ domestic_wells_shp = os.path.join(data_folder, "CPs_Distance_to_Domestic_Wells.s
 # Output table name for the joined data
 output_mpat = "MPAT_Wells_Joined"
 
+# In-memory TMK join engine (scripts/cesspool_analysis)
+sys.path.append(os.path.join(project_root, "scripts"))
+from cesspool_analysis.tmk_codec import tmk_issues
+from cesspool_analysis.tmk_join import (
+    TMK_FIELD_CANDIDATES, null_value_map, multi_join, pick_tmk_field, to_extend_array
+)
+
 print(f"Working in geodatabase: {gdb_path}")
 print(f"Municipal wells shapefile: {municipal_wells_shp}")
 print(f"Domestic wells shapefile: {domestic_wells_shp}")
@@ -89,27 +97,16 @@ def verify_data_structure(muni_fc, domestic_fc):
         for field in domestic_fields:
             print(f"  {field}")
         
-        # Find TMK field (could be TMK, TMK9, TMK_txt)
-        tmk_candidates = ['TMK', 'TMK9', 'TMK_txt', 'tmk', 'tmk9']
-        muni_tmk = None
-        domestic_tmk = None
-        
-        for candidate in tmk_candidates:
-            if candidate in muni_fields:
-                muni_tmk = candidate
-                break
-        
-        for candidate in tmk_candidates:
-            if candidate in domestic_fields:
-                domestic_tmk = candidate
-                break
+        # Pick the TMK field (TMK, TMK9, TMK_txt ...) by content, not by name
+        muni_tmk, muni_issues = read_tmk_field(muni_fc)
+        domestic_tmk, domestic_issues = read_tmk_field(domestic_fc)
         
         if not muni_tmk or not domestic_tmk:
             print("ERROR: Could not find TMK field in both datasets")
             return False, None, None
         
-        print(f"✓ Municipal TMK field: {muni_tmk}")
-        print(f"✓ Domestic TMK field: {domestic_tmk}")
+        print(f"✓ Municipal TMK field: {muni_tmk} ({muni_issues['valid']:,}/{muni_issues['records']:,} valid)")
+        print(f"✓ Domestic TMK field: {domestic_tmk} ({domestic_issues['valid']:,}/{domestic_issues['records']:,} valid)")
         
         # Find distance fields
         muni_distance_fields = [f for f in muni_fields if 'dist' in f.lower() or 'near' in f.lower()]
@@ -124,6 +121,22 @@ def verify_data_structure(muni_fc, domestic_fc):
         print(f"ERROR verifying data: {str(e)}")
         return False, None, None
 
+def read_tmk_field(dataset):
+    """
+    TMK candidate field holding the most valid TMKs, with its quality counts
+
+    Returns:
+        tuple: (field name or None, tmk_codec.tmk_issues dict)
+    """
+    field_types = {f.name: f.type for f in arcpy.ListFields(dataset)}
+    present = [name for name in TMK_FIELD_CANDIDATES if name in field_types]
+    if not present:
+        return None, {'valid': 0, 'records': 0}
+    table = arcpy.da.TableToNumPyArray(dataset, present,
+                                       null_value=null_value_map([(name, field_types[name]) for name in present]))
+    field = pick_tmk_field(table, present)
+    return field, tmk_issues(table[field] if field else [])
+
 # =============================================================================
 # STEP 3: PERFORM THE JOIN
 # =============================================================================
@@ -134,20 +147,35 @@ def join_wells_data(muni_fc, domestic_fc, muni_tmk, domestic_tmk):
     print("\nStep 3: Joining wells data...")
     
     try:
-        # Create the join using JoinField (more reliable for attribute joins)
+        # Join in memory: read both tables once, sort-merge on normalized
+        # TMKs and write the domestic fields back with one ExtendTable call
         print("Performing join operation...")
         
         # Start with municipal wells as base
         arcpy.management.CopyRows(muni_fc, output_mpat)
         
-        # Join domestic wells data
-        arcpy.management.JoinField(
-            in_data=output_mpat,
-            in_field=muni_tmk,
-            join_table=domestic_fc,
-            join_field=domestic_tmk,
-            fields=None  # Join all fields
+        base_fields = [f.name for f in arcpy.ListFields(output_mpat)]
+        base_oid = arcpy.Describe(output_mpat).OIDFieldName
+        tmk_type = arcpy.ListFields(output_mpat, muni_tmk)[0].type
+        base_keys = arcpy.da.TableToNumPyArray(output_mpat, [base_oid, muni_tmk],
+                                               null_value=null_value_map([(muni_tmk, tmk_type)]))
+        
+        # Join all domestic attribute fields (clashing names get _1 like JoinField)
+        domestic_fields = [(f.name, f.type) for f in arcpy.ListFields(domestic_fc)
+                           if f.type not in ("OID", "Geometry", "Blob", "Raster")
+                           and not f.name.startswith("Shape_")]
+        domestic_table = arcpy.da.TableToNumPyArray(domestic_fc, [name for name, _ in domestic_fields],
+                                                    null_value=null_value_map(domestic_fields))
+        
+        joined_columns, join_stats = multi_join(
+            base_keys[muni_tmk],
+            [("Domestic wells", domestic_table, domestic_tmk, None)],
+            existing_fields=base_fields
         )
+        join_stats[0].report()
+        
+        arcpy.da.ExtendTable(output_mpat, base_oid,
+                             to_extend_array(base_keys[base_oid], joined_columns), "JOIN_OID")
         
         # Verify the result
         result_count = arcpy.management.GetCount(output_mpat)[0]
@@ -181,7 +209,9 @@ def cleanup_field_names():
         # Get current fields
         fields = [f.name for f in arcpy.ListFields(output_mpat)]
         
-        # Field renaming mapping (adjust based on actual field names found)
+        # Field renaming mapping (adjust based on actual field names found).
+        # 02c_Well_Distance_Calculation computes these distances from the well
+        # inventory and writes the standardized names directly.
         rename_mapping = {
             # Look for distance fields and standardize names
             'NEAR_DIST': 'Dist_Municipal_Wells_ft',
@@ -0,0 +1,174 @@
+# MPAT Step 2: Assign Cesspool Points to TMK Parcel Polygons
+# Master Parcel Attribute Table (MPAT) Development
+# Run this script in ArcGIS Python window
+
+import arcpy
+import hashlib
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+
+print("MPAT Step 2: Assigning Cesspool Points to TMK Parcels")
+print("=" * 50)
+print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+# =============================================================================
+# CONFIGURATION - PATHS CONFIGURED FOR ROBERT'S PROJECT STRUCTURE
+# =============================================================================
+
+project_root = r"C:\Users\rober\OneDrive\Documents\GIS_Projects\ParcelAnalysis"
+gdb_path = os.path.join(project_root, "ParcelAnalysis.gdb")
+foundation_dir = os.path.join(project_root, "Outputs", "foundation")
+
+# Inputs: statewide parcels and the cesspool points from the MPAT notebook
+tmk_parcels = os.path.join(gdb_path, "tmk_state")
+cesspool_points = os.path.join(foundation_dir, "TMK_Master_Attributes.shp")
+
+# Outputs
+output_points = "Cesspool_Points_Parcel_Assigned"
+index_cache = os.path.join(project_root, "Outputs", "cache", "tmk_state_parcel_index.npz")
+
+arcpy.env.workspace = gdb_path
+arcpy.env.overwriteOutput = True
+
+# Packed STR-tree point-in-polygon engine (scripts/cesspool_analysis)
+sys.path.append(os.path.join(project_root, "scripts"))
+from cesspool_analysis.parcel_index import ParcelIndex
+from cesspool_analysis.tmk_join import find_tmk_field, normalize_tmk, null_value_map
+
+print(f"Parcel polygons: {tmk_parcels}")
+print(f"Cesspool points: {cesspool_points}")
+
+# =============================================================================
+# STEP 1: LOAD OR BUILD THE PARCEL INDEX
+# =============================================================================
+
+def parcel_signature(parcel_tmk):
+    """
+    Fingerprint of the parcel layer used to validate the index cache
+
+    Hashes every parcel's ObjectID, TMK, area, perimeter and centroid, so
+    edited or moved parcels rebuild the index even when the record count
+    and extent are unchanged.
+    """
+    desc = arcpy.Describe(tmk_parcels)
+    tmk_type = arcpy.ListFields(tmk_parcels, parcel_tmk)[0].type
+    parcels = arcpy.da.FeatureClassToNumPyArray(
+        tmk_parcels, ["OID@", parcel_tmk, "SHAPE@AREA", "SHAPE@LENGTH", "SHAPE@XY"],
+        null_value=null_value_map([(parcel_tmk, tmk_type)])
+    )
+    content = hashlib.sha256(parcels.tobytes()).hexdigest()
+    return f"{tmk_parcels}|{parcel_tmk}|{desc.spatialReference.factoryCode}|{content}"
+
+def load_parcel_index(parcel_tmk):
+    """Load the cached STR tree, or read every parcel polygon once and build it"""
+
+    print("\nStep 1: Loading parcel index...")
+
+    def read_parcels():
+        print("Reading parcel polygons (first run only)...")
+        geometries, tmks = [], []
+        with arcpy.da.SearchCursor(tmk_parcels, [parcel_tmk, "SHAPE@"]) as cursor:
+            for tmk, shape in cursor:
+                geometries.append(shape.__geo_interface__ if shape else None)
+                tmks.append(tmk)
+        return geometries, normalize_tmk(tmks)
+
+    index, from_cache = ParcelIndex.load_or_build(index_cache, parcel_signature(parcel_tmk), read_parcels)
+    source = "cache" if from_cache else "built and cached"
+    print(f"✓ Parcel index ({source}): {index.n_polygons:,} parcels, {len(index.level_boxes)} tree levels")
+    return index
+
+# =============================================================================
+# STEP 2: ASSIGN POINTS
+# =============================================================================
+
+def assign_points(index, point_tmk):
+    """Query every cesspool point against the parcel index"""
+
+    print("\nStep 2: Assigning cesspool points to parcels...")
+
+    # Read point coordinates in the parcel coordinate system
+    parcel_sr = arcpy.Describe(tmk_parcels).spatialReference
+    tmk_type = arcpy.ListFields(cesspool_points, point_tmk)[0].type
+    points = arcpy.da.FeatureClassToNumPyArray(
+        cesspool_points, ["OID@", "SHAPE@X", "SHAPE@Y", point_tmk],
+        spatial_reference=parcel_sr, null_value=null_value_map([(point_tmk, tmk_type)])
+    )
+    print(f"✓ Read {len(points):,} cesspool points")
+
+    assignment = index.query_points(points["SHAPE@X"], points["SHAPE@Y"])
+    assignment.report()
+    return points, assignment
+
+# =============================================================================
+# STEP 3: WRITE RESULTS
+# =============================================================================
+
+def write_assignment(points, assignment, point_tmk):
+    """Copy the points and add the parcel TMK, hit count and TMK match flag"""
+
+    print("\nStep 3: Writing parcel assignment...")
+
+    arcpy.management.CopyFeatures(cesspool_points, output_points)
+    oid_field = arcpy.Describe(output_points).OIDFieldName
+
+    # The copy is renumbered (shapefile FIDs start at 0, geodatabase ObjectIDs
+    # at 1), so join on the copy's own OIDs; CopyFeatures keeps the row order
+    output_oids = arcpy.da.TableToNumPyArray(output_points, ["OID@"])["OID@"]
+    if len(output_oids) != len(points):
+        raise RuntimeError(f"{output_points} has {len(output_oids):,} rows, "
+                           f"expected {len(points):,}")
+
+    parcel_tmk = assignment.assigned_ids(missing=-1).astype(np.int64)
+    point_keys = normalize_tmk(points[point_tmk])
+
+    results = np.empty(len(points), dtype=[("POINT_OID", "<i4"),
+                                           ("PARCEL_TMK", "<i8"),
+                                           ("PARCEL_HITS", "<i2"),
+                                           ("TMK_MATCH", "<i2")])
+    results["POINT_OID"] = output_oids
+    results["PARCEL_TMK"] = parcel_tmk
+    results["PARCEL_HITS"] = assignment.hit_count
+    results["TMK_MATCH"] = (parcel_tmk == point_keys) & (parcel_tmk > 0)
+    arcpy.da.ExtendTable(output_points, oid_field, results, "POINT_OID")
+
+    located = assignment.polygon_index >= 0
+    mismatched = int((located & ~results["TMK_MATCH"].astype(bool)).sum())
+    print(f"✓ Created {output_points}")
+    print(f"✓ Point TMK differs from containing parcel TMK: {mismatched:,}")
+
+    if len(assignment.no_hit):
+        print(f"  Sample points outside parcels (OID): {points['OID@'][assignment.no_hit[:10]].tolist()}")
+    if len(assignment.multi_hit):
+        print(f"  Sample points in overlapping parcels (OID): {points['OID@'][assignment.multi_hit[:10]].tolist()}")
+
+# =============================================================================
+# MAIN EXECUTION
+# =============================================================================
+
+def main():
+    """Main execution function"""
+
+    try:
+        parcel_tmk = find_tmk_field([f.name for f in arcpy.ListFields(tmk_parcels)])
+        point_tmk = find_tmk_field([f.name for f in arcpy.ListFields(cesspool_points)])
+        if not parcel_tmk or not point_tmk:
+            print("ERROR: Could not find a TMK field in the parcels or cesspool points")
+            return
+
+        index = load_parcel_index(parcel_tmk)
+        points, assignment = assign_points(index, point_tmk)
+        write_assignment(points, assignment, point_tmk)
+
+        print(f"\nCompleted: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    except Exception as e:
+        print(f"ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# 02b SOIL PARCEL OVERLAY
+# Area-weighted soil attributes per parcel from the classified NRCS soil polygons
+# Run this script in ArcGIS Python window
+
+import arcpy
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+
+SCRIPTS_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_FOLDER not in sys.path:
+    sys.path.append(SCRIPTS_FOLDER)
+
+from configs.paths_config import GDB_PATH, MASTER_TABLE, CLASSIFIED_SOILS
+from cesspool_analysis.backends import get_backend
+from cesspool_analysis.disposal_area import geometries_from_geo_interface
+from cesspool_analysis.mpat_store import island_from_tmk
+from cesspool_analysis.partitioned import use_python_for_workers
+from cesspool_analysis.soil_overlay import overlay_soils
+from cesspool_analysis.tmk_join import find_tmk_field, normalize_tmk, to_extend_array
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Parcel polygons to update (BUILDABLE_AREAS for buildable-area attribution)
+target_features = MASTER_TABLE
+
+# Soil polygons classified by 99b process_soil_har_classifications
+soil_features = CLASSIFIED_SOILS
+perc_rate_field = "PERC_RATE_EST"
+mukey_candidates = ["mukey", "MUKEY"]
+
+# Parallel chunks (None = one worker per CPU)
+max_workers = None
+
+arcpy.env.workspace = GDB_PATH
+arcpy.env.overwriteOutput = True
+
+# =============================================================================
+# PROCESSING FUNCTIONS
+# =============================================================================
+
+def read_shapes(features, fields, spatial_reference):
+    """Read shapely geometries plus attribute columns with one cursor pass"""
+    geometries, rows = [], []
+    with arcpy.da.SearchCursor(features, ["SHAPE@"] + fields, spatial_reference=spatial_reference) as cursor:
+        for row in cursor:
+            geometries.append(row[0].__geo_interface__ if row[0] else None)
+            rows.append(row[1:])
+    columns = [np.array(values, dtype=object) for values in zip(*rows)] if rows else [np.array([])] * len(fields)
+    return geometries_from_geo_interface(geometries), columns
+
+def calculate_soil_overlay(target=None, workers=None):
+    """
+    Overlay parcels with soil polygons and write area-weighted soil fields
+
+    Parcels are chunked by island (first TMK digit), intersected with the
+    soil polygons found through an STR-tree, and SOIL_PERC_RATE,
+    SOIL_HAR_CLASS, SOIL_MUKEY, SOIL_COVERAGE and the SOIL_PCT_* class
+    shares are written back with a single ExtendTable call.
+
+    Args:
+        target (str): Feature class to update (default: target_features)
+        workers (int): Worker processes (default: max_workers)
+
+    Returns:
+        dict: Output field -> values
+    """
+    target = target or target_features
+
+    print("SOIL PARCEL OVERLAY")
+    print("=" * 50)
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Target: {target}")
+    print(f"Soils: {soil_features}")
+
+    target_sr = arcpy.Describe(target).spatialReference
+    soil_field_names = [f.name for f in arcpy.ListFields(soil_features)]
+    if perc_rate_field not in soil_field_names:
+        print(f"❌ {perc_rate_field} not found - run 99b process_soil_har_classifications first")
+        return {}
+    mukey_field = next((name for name in mukey_candidates if name in soil_field_names), None)
+
+    soil_fields = [perc_rate_field] + ([mukey_field] if mukey_field else [])
+    soils, soil_columns = read_shapes(soil_features, soil_fields, target_sr)
+    perc_rate = np.array([np.nan if v is None else v for v in soil_columns[0]], dtype=float)
+    mukeys = soil_columns[1] if mukey_field else None
+    print(f"✅ Soil polygons: {len(soils):,}")
+
+    target_tmk = find_tmk_field([f.name for f in arcpy.ListFields(target)])
+    parcels, (oids, tmks) = read_shapes(target, ["OID@", target_tmk], target_sr)
+    islands = island_from_tmk(normalize_tmk(tmks))
+    print(f"Overlaying {len(oids):,} parcels on {len(set(islands))} island(s)...")
+
+    use_python_for_workers()
+    columns = overlay_soils(parcels, soils, perc_rate, groups=islands, mukeys=mukeys,
+                            max_workers=workers or max_workers)
+
+    # Fields from earlier runs are replaced (ExtendTable only adds new fields)
+    get_backend('arcpy').extend_table(target, to_extend_array(oids.astype(np.int64), columns, "TARGET_OID"),
+                                      "TARGET_OID")
+
+    labels, counts = np.unique(columns["SOIL_HAR_CLASS"], return_counts=True)
+    print("✅ Soil overlay written")
+    for label, count in zip(labels, counts):
+        print(f"  {label}: {count:,} parcels")
+    print(f"  Mean soil coverage: {np.nanmean(columns['SOIL_COVERAGE']):.1%}")
+    print(f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    return columns
+
+if __name__ == "__main__":
+    calculate_soil_overlay()
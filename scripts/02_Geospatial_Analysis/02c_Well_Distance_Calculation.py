@@ -0,0 +1,119 @@
+# 02c WELL DISTANCE CALCULATION
+# Nearest-well distances and HAR 11-62 well setback flags from the well inventory
+# Run this script in ArcGIS Python window
+
+import arcpy
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+
+SCRIPTS_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_FOLDER not in sys.path:
+    sys.path.append(SCRIPTS_FOLDER)
+
+from configs.paths_config import GDB_PATH, MASTER_TABLE, MUNICIPAL_WELLS, DOMESTIC_WELLS
+from cesspool_analysis.backends import get_backend
+from cesspool_analysis.well_distance import (
+    FEET_PER_METER, WellIndex, compute_well_distances, setback_summary
+)
+from cesspool_analysis.shapefile_reader import ShapefileReader
+from cesspool_analysis.coordinate_transform import transform_xy
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Parcels (or cesspool points) to measure from; polygons use their centroid
+target_features = MASTER_TABLE
+
+# Wells reported per layer (2nd..kth nearest are written as *_k2_ft ...)
+nearest_k = 1
+
+arcpy.env.workspace = GDB_PATH
+arcpy.env.overwriteOutput = True
+
+# =============================================================================
+# PROCESSING FUNCTIONS
+# =============================================================================
+
+def read_xy(features, spatial_reference):
+    """Read feature coordinates (centroids for polygons) in one bulk call"""
+    # Downloaded well shapefiles are read from the memory-mapped files
+    if str(features).lower().endswith(".shp") and os.path.isfile(features):
+        reader = ShapefileReader(features)
+        if reader.crs is not None:
+            x, y = reader.centroids()
+            target = spatial_reference.factoryCode or spatial_reference.exportToString()
+            x, y = transform_xy(x, y, reader.crs, target)
+            return reader.record_ids(), x, y
+    array = arcpy.da.FeatureClassToNumPyArray(
+        features, ["OID@", "SHAPE@XY"], spatial_reference=spatial_reference
+    )
+    return array["OID@"], array["SHAPE@XY"][:, 0], array["SHAPE@XY"][:, 1]
+
+def calculate_well_distances(target=None, k=None):
+    """
+    Compute nearest-well distances and setback flags for every target feature
+
+    Builds one KD-tree per well layer (MUNICIPAL_WELLS, DOMESTIC_WELLS from
+    paths_config), queries all features in bulk and writes the distance and
+    flag fields back with a single ExtendTable call.
+
+    Args:
+        target (str): Feature class to update (default: MASTER_TABLE)
+        k (int): Nearest wells per layer (default: nearest_k)
+
+    Returns:
+        dict: Setback flag counts
+    """
+    target = target or target_features
+    k = k or nearest_k
+
+    print("WELL DISTANCE CALCULATION")
+    print("=" * 50)
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Target: {target}")
+
+    # Measure in the target's coordinate system, reported in feet
+    target_sr = arcpy.Describe(target).spatialReference
+    feet_per_unit = target_sr.metersPerUnit * FEET_PER_METER
+
+    wells = {}
+    for layer, well_fc in [("municipal", MUNICIPAL_WELLS), ("domestic", DOMESTIC_WELLS)]:
+        if not arcpy.Exists(well_fc):
+            print(f"⚠️ {layer.title()} wells not found: {well_fc}")
+            continue
+        well_oids, well_x, well_y = read_xy(well_fc, target_sr)
+        wells[layer] = WellIndex(well_x, well_y, well_oids)
+        print(f"✅ {layer.title()} wells indexed: {len(wells[layer]):,}")
+
+    if not wells:
+        print("❌ No well layers available")
+        return {}
+
+    oids, x, y = read_xy(target, target_sr)
+    print(f"Querying {len(oids):,} features for nearest {k} well(s)...")
+    columns = compute_well_distances(x, y, wells, k=k, feet_per_unit=feet_per_unit)
+
+    dtype = [("TARGET_OID", "<i4")]
+    dtype += [(field, "<f8") if values.dtype.kind == "f" else (field, "<U1")
+              for field, values in columns.items()]
+    results = np.empty(len(oids), dtype=dtype)
+    results["TARGET_OID"] = oids
+    for field, values in columns.items():
+        results[field] = values
+
+    # Fields from earlier runs are replaced (ExtendTable only adds new fields)
+    get_backend('arcpy').extend_table(target, results, "TARGET_OID")
+
+    summary = setback_summary(columns)
+    print("✅ Well distances written")
+    for flag_field, count in summary.items():
+        print(f"  {flag_field}: {count:,} features within setback")
+    print(f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    return summary
+
+if __name__ == "__main__":
+    calculate_well_distances()
@@ -0,0 +1,164 @@
+# 02d FLOOD ZONE REFRESH
+# Dominant FEMA flood zone per parcel in the columnar MPAT store, refreshed
+# incrementally from the lineage manifest
+# Run this script in ArcGIS Python window
+
+import arcpy
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import shapely
+
+SCRIPTS_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_FOLDER not in sys.path:
+    sys.path.append(SCRIPTS_FOLDER)
+
+from configs.paths_config import GDB_PATH, MASTER_TABLE, MPAT_STORE_DIR, FLOOD_ZONES
+from cesspool_analysis.lineage import (
+    LINK_FEATURE_FIELD, LINK_PARCEL_FIELD, Derivation, LineageManifest, Source
+)
+from cesspool_analysis.mpat_store import MPATStore
+from cesspool_analysis.soil_overlay import dominant_keys
+from cesspool_analysis.tmk_join import find_tmk_field, normalize_tmk
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Parcel polygons (geometry source) and the MPAT store to update
+parcel_features = MASTER_TABLE
+mpat_store_folder = MPAT_STORE_DIR
+
+# FEMA NFHL flood hazard areas (S_FLD_HAZ_AR)
+flood_features = FLOOD_ZONES
+flood_id_candidates = ["FLD_AR_ID", "OBJECTID"]
+flood_zone_field = "FLD_ZONE"
+
+arcpy.env.workspace = GDB_PATH
+arcpy.env.overwriteOutput = True
+
+# =============================================================================
+# SOURCES
+# =============================================================================
+
+def read_wkb(features, fields, spatial_reference):
+    """Attribute columns plus SHAPE_WKB bytes with one cursor pass"""
+    rows = []
+    with arcpy.da.SearchCursor(features, fields + ["SHAPE@WKB"], spatial_reference=spatial_reference) as cursor:
+        for row in cursor:
+            rows.append(row[:-1] + (bytes(row[-1]) if row[-1] else b"",))
+    return pd.DataFrame.from_records(rows, columns=fields + ["SHAPE_WKB"])
+
+def load_parcels():
+    """Parcel geometries keyed by normalized TMK"""
+    tmk_field = find_tmk_field([f.name for f in arcpy.ListFields(parcel_features)])
+    parcels = read_wkb(parcel_features, [tmk_field], arcpy.Describe(parcel_features).spatialReference)
+    parcels["TMK"] = normalize_tmk(parcels.pop(tmk_field))
+    return parcels.drop_duplicates("TMK")[["TMK", "SHAPE_WKB"]]
+
+def load_flood_zones():
+    """Flood hazard polygons keyed by FLD_AR_ID, in the parcel coordinate system"""
+    field_names = [f.name for f in arcpy.ListFields(flood_features)]
+    id_field = next(name for name in flood_id_candidates if name in field_names)
+    zones = read_wkb(flood_features, [id_field, flood_zone_field],
+                     arcpy.Describe(parcel_features).spatialReference)
+    return zones.rename(columns={id_field: "FLOOD_ID"})
+
+# =============================================================================
+# DERIVATION
+# =============================================================================
+
+def derive_flood_zones(frames, parcels):
+    """
+    FLOOD_ZONE = zone covering the largest share of each parcel
+
+    Args:
+        frames (dict): 'parcels' and 'flood_zones' DataFrames
+        parcels (numpy.ndarray): TMKs to compute (None = all)
+
+    Returns:
+        pandas.DataFrame: TMK, FLOOD_ZONE ('' outside mapped flood areas)
+    """
+    parcel_frame = frames["parcels"]
+    if parcels is not None:
+        parcel_frame = parcel_frame[parcel_frame["TMK"].isin(parcels)]
+    zones = frames["flood_zones"]
+
+    parcel_shapes = shapely.make_valid(shapely.from_wkb(parcel_frame["SHAPE_WKB"].to_numpy()))
+    zone_shapes = shapely.make_valid(shapely.from_wkb(zones["SHAPE_WKB"].to_numpy()))
+    pair_parcel, pair_zone = shapely.STRtree(zone_shapes).query(parcel_shapes, predicate="intersects")
+    zone_labels = zones[flood_zone_field].fillna("").astype(str).to_numpy()
+
+    # Sort pieces by zone so equal-area ties always resolve the same way
+    order = np.lexsort((zone_labels[pair_zone], pair_parcel))
+    pair_parcel, pair_zone = pair_parcel[order], pair_zone[order]
+    piece_area = shapely.area(shapely.intersection(parcel_shapes[pair_parcel], zone_shapes[pair_zone]))
+
+    return pd.DataFrame({
+        "TMK": parcel_frame["TMK"].to_numpy(),
+        "FLOOD_ZONE": dominant_keys(pair_parcel, pair_zone, piece_area, len(parcel_frame), zone_labels),
+    })
+
+def link_flood_zones(source_name, features, frames):
+    """Parcels intersecting each flood polygon (parcels are keyed by TMK)"""
+    if source_name != "flood_zones":
+        return None
+    parcel_frame = frames["parcels"]
+    parcel_shapes = shapely.from_wkb(parcel_frame["SHAPE_WKB"].to_numpy())
+    zone_shapes = shapely.make_valid(shapely.from_wkb(features["SHAPE_WKB"].to_numpy()))
+    pair_zone, pair_parcel = shapely.STRtree(parcel_shapes).query(zone_shapes, predicate="intersects")
+    return pd.DataFrame({
+        LINK_PARCEL_FIELD: parcel_frame["TMK"].to_numpy()[pair_parcel],
+        LINK_FEATURE_FIELD: features["FLOOD_ID"].to_numpy()[pair_zone],
+    })
+
+# =============================================================================
+# REFRESH
+# =============================================================================
+
+def refresh_flood_zones(full=False):
+    """
+    Bring FLOOD_ZONE in the MPAT store up to date with the flood delivery
+
+    Only parcels touching added, edited or removed flood polygons (or whose
+    own geometry changed) are re-derived; pass full=True to recompute all.
+
+    Returns:
+        dict: Step name -> refresh mode and parcels written
+    """
+    print("FLOOD ZONE REFRESH")
+    print("=" * 50)
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Flood zones: {flood_features}")
+    print(f"MPAT store: {mpat_store_folder}")
+
+    if not arcpy.Exists(flood_features):
+        print(f"❌ Flood zones not found: {flood_features}")
+        return {}
+
+    store = MPATStore(mpat_store_folder)
+    lineage = LineageManifest.for_store(store)
+    sources = [
+        Source("parcels", load_parcels, "TMK"),
+        Source("flood_zones", load_flood_zones, "FLOOD_ID"),
+    ]
+    derivations = [
+        Derivation("flood_zone", derive_flood_zones, ["FLOOD_ZONE"], ["parcels", "flood_zones"],
+                   link=link_flood_zones, params={"zone_field": flood_zone_field}),
+    ]
+    results = lineage.refresh(store, sources, derivations, full=full)
+
+    for step, result in results.items():
+        if result["mode"] == "current":
+            print(f"✅ {step}: inputs unchanged, nothing to do")
+        else:
+            print(f"✅ {step}: {result['mode']} refresh, {result['parcels']:,} parcels written")
+    lineage.describe()
+    print(f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    return results
+
+if __name__ == "__main__":
+    refresh_flood_zones()
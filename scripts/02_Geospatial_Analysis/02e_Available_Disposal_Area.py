@@ -0,0 +1,132 @@
+# 02e AVAILABLE DISPOSAL AREA
+# Lot area left for a wastewater system after HAR 11-62-32 setbacks, plus the
+# largest contiguous usable rectangle per parcel
+# Run this script in ArcGIS Python window
+
+import arcpy
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+
+SCRIPTS_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_FOLDER not in sys.path:
+    sys.path.append(SCRIPTS_FOLDER)
+
+from configs.paths_config import (
+    GDB_PATH, MASTER_TABLE, ALL_BUILDING_FOOTPRINTS, COUNTY_BUILDING_FOOTPRINTS,
+    MUNICIPAL_WELLS, DOMESTIC_WELLS, SHORELINE, SURFACE_WATER
+)
+from cesspool_analysis.backends import get_backend
+from cesspool_analysis.disposal_area import (
+    FEET_PER_METER, SETBACK_LAYERS, compute_available_area, geometries_from_geo_interface
+)
+from cesspool_analysis.partitioned import use_python_for_workers
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Parcel polygons to update
+target_features = MASTER_TABLE
+
+# Constraint layer -> feature classes (setbacks from SETBACK_LAYERS); the
+# county footprint layers are used when the statewide layer is missing
+constraint_sources = {
+    "buildings": [ALL_BUILDING_FOOTPRINTS],
+    "public_wells": [MUNICIPAL_WELLS],
+    "private_wells": [DOMESTIC_WELLS],
+    "shoreline": [SHORELINE],
+    "surface_water": [SURFACE_WATER],
+}
+
+# Parallel chunks (None = one worker per CPU)
+max_workers = None
+
+arcpy.env.workspace = GDB_PATH
+arcpy.env.overwriteOutput = True
+
+# =============================================================================
+# PROCESSING FUNCTIONS
+# =============================================================================
+
+def read_shapes(features, spatial_reference):
+    """Read OIDs and shapely geometries with one cursor pass"""
+    oids, geometries = [], []
+    with arcpy.da.SearchCursor(features, ["OID@", "SHAPE@"], spatial_reference=spatial_reference) as cursor:
+        for oid, shape in cursor:
+            oids.append(oid)
+            geometries.append(shape.__geo_interface__ if shape else None)
+    return np.array(oids), geometries_from_geo_interface(geometries)
+
+def resolve_sources(layer, sources):
+    """Existing feature classes for a constraint layer"""
+    existing = [fc for fc in sources if arcpy.Exists(fc)]
+    if layer == "buildings" and not existing:
+        existing = [fc for fc in COUNTY_BUILDING_FOOTPRINTS if arcpy.Exists(fc)]
+        if existing:
+            print(f"  Using {len(existing)} county building footprint layer(s)")
+    return existing
+
+def calculate_available_area(target=None, workers=None):
+    """
+    Compute available disposal area and usable rectangle for every parcel
+
+    Reads every constraint layer once, runs the batch geometry engine and
+    writes AVAILABLE_AREA, RECT_LENGTH_FT, RECT_WIDTH_FT and RECT_AREA_SF
+    back with a single ExtendTable call.
+
+    Args:
+        target (str): Feature class to update (default: MASTER_TABLE)
+        workers (int): Worker processes (default: max_workers)
+
+    Returns:
+        dict: Output field -> values
+    """
+    target = target or target_features
+
+    print("AVAILABLE DISPOSAL AREA")
+    print("=" * 50)
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Target: {target}")
+
+    # Measure in the target's coordinate system, reported in feet
+    target_sr = arcpy.Describe(target).spatialReference
+    feet_per_unit = target_sr.metersPerUnit * FEET_PER_METER
+
+    constraints = {}
+    for layer, sources in constraint_sources.items():
+        sources = resolve_sources(layer, sources)
+        if not sources:
+            print(f"⚠️ {layer.replace('_', ' ').title()} not found - setback skipped")
+            continue
+        geometries = np.concatenate([read_shapes(fc, target_sr)[1] for fc in sources])
+        constraints[layer] = (geometries, SETBACK_LAYERS[layer])
+        print(f"✅ {layer.replace('_', ' ').title()}: {len(geometries):,} features, "
+              f"{SETBACK_LAYERS[layer]} ft setback")
+
+    oids, parcels = read_shapes(target, target_sr)
+    print(f"Processing {len(oids):,} parcels...")
+
+    use_python_for_workers()
+    columns = compute_available_area(parcels, constraints, feet_per_unit=feet_per_unit,
+                                     max_workers=workers or max_workers)
+
+    results = np.empty(len(oids), dtype=[("TARGET_OID", "<i4")] + [(field, "<f8") for field in columns])
+    results["TARGET_OID"] = oids
+    for field, values in columns.items():
+        results[field] = values
+
+    # Fields from earlier runs are replaced (ExtendTable only adds new fields)
+    get_backend('arcpy').extend_table(target, results, "TARGET_OID")
+
+    area = columns["AVAILABLE_AREA"]
+    print("✅ Available area written")
+    print(f"  Parcels with no usable area: {int((area <= 0).sum()):,}")
+    print(f"  Median available area: {np.median(area):,.0f} sq ft")
+    print(f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    return columns
+
+if __name__ == "__main__":
+    calculate_available_area()
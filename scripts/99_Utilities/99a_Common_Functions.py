@@ -1,10 +1,23 @@
 # COMMON FUNCTIONS - Kitchen Utilities
 # Reusable functions for Hawaii Cesspool Matrix Analysis
 
-import arcpy
 import os
+import sys
 from datetime import datetime
 
+import numpy as np
+
+SCRIPTS_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_FOLDER not in sys.path:
+    sys.path.append(SCRIPTS_FOLDER)
+
+from cesspool_analysis.streaming_export import export_rows
+from cesspool_analysis.backends import get_backend, lazy_import
+
+# ArcGIS loads on first use only (map/layer helpers); table helpers go
+# through the data backend and also run without ArcGIS
+arcpy = lazy_import("arcpy", "run inside ArcGIS Pro or set CESSPOOL_BACKEND=numpy")
+
 def log_workflow_step(step_name, details=""):
     """Log workflow steps with timestamp"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -48,11 +61,18 @@ def get_field_info(layer_path):
 
 def count_records_by_field(layer_path, field_name):
     """Count unique values in a field"""
-    value_counts = {}
-    with arcpy.da.SearchCursor(layer_path, [field_name]) as cursor:
-        for row in cursor:
-            value = row[0] if row[0] is not None else "NULL"
-            value_counts[value] = value_counts.get(value, 0) + 1
+    values = get_backend().read_table(layer_path, [field_name])[field_name]
+    # Backends read nulls as '' (text), NaN (floating point) or -1 (integer)
+    if values.dtype.kind in 'U':
+        null = values == ''
+    elif values.dtype.kind == 'f':
+        null = values != values
+    else:
+        null = values == -1
+    unique, counts = np.unique(values[~null], return_counts=True)
+    value_counts = dict(zip(unique.tolist(), counts.tolist()))
+    if null.any():
+        value_counts["NULL"] = int(null.sum())
     return value_counts
 
 def create_folder_if_not_exists(folder_path):
@@ -75,7 +95,7 @@ def backup_layer(source_layer, backup_folder):
 
 def validate_required_fields(layer_path, required_fields):
     """Check if all required fields exist in layer"""
-    existing_fields = [f.name for f in arcpy.ListFields(layer_path)]
+    existing_fields = get_backend().field_names(layer_path)
     missing_fields = [f for f in required_fields if f not in existing_fields]
     
     if missing_fields:
@@ -86,15 +106,19 @@ def validate_required_fields(layer_path, required_fields):
 
 def calculate_completeness_stats(layer_path, fields_to_check):
     """Calculate data completeness statistics for specified fields"""
-    total_records = int(arcpy.management.GetCount(layer_path)[0])
+    table = get_backend().read_table(layer_path, list(fields_to_check))
+    total_records = len(table)
     completeness_stats = {}
     
     for field in fields_to_check:
-        non_null_count = 0
-        with arcpy.da.SearchCursor(layer_path, [field]) as cursor:
-            for row in cursor:
-                if row[0] is not None and str(row[0]).strip() != "":
-                    non_null_count += 1
+        values = table[field]
+        if values.dtype.kind == 'U':
+            populated = np.char.strip(values) != ''
+        elif values.dtype.kind == 'f':
+            populated = values == values
+        else:
+            populated = values != -1
+        non_null_count = int(populated.sum())
         
         completeness_pct = (non_null_count / total_records) * 100 if total_records > 0 else 0
         completeness_stats[field] = {
@@ -122,23 +146,25 @@ def add_tracking_field(layer_path, field_name="PROCESS_LOG", initial_value=""):
         log_workflow_step("Error", f"Could not add tracking field: {e}")
         return False
 
-def export_summary_csv(layer_path, output_csv, fields_to_export):
-    """Export specified fields to CSV for analysis"""
-    import csv
+def export_summary_csv(layer_path, output_csv, fields_to_export, batch_size=50000,
+                       file_format=None, compression=None):
+    """
+    Stream specified fields to CSV (or Parquet/GeoPackage) for analysis
     
+    Rows are written in fixed-size batches; the format and gzip/zstd
+    compression follow the output extension (e.g. .csv.gz, .parquet).
+    """
     # Validate fields exist
-    existing_fields = [f.name for f in arcpy.ListFields(layer_path)]
-    export_fields = [f for f in fields_to_export if f in existing_fields]
+    field_types = {f.name: f.type for f in arcpy.ListFields(layer_path)}
+    export_fields = [f for f in fields_to_export if f in field_types]
     
-    with open(output_csv, 'w', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(export_fields)  # Header
-        
-        with arcpy.da.SearchCursor(layer_path, export_fields) as cursor:
-            for row in cursor:
-                writer.writerow(row)
+    with arcpy.da.SearchCursor(layer_path, export_fields) as cursor:
+        stats = export_rows(cursor, output_csv, export_fields, batch_size=batch_size,
+                            file_format=file_format, compression=compression,
+                            field_types=field_types)
     
-    log_workflow_step("Export", f"CSV created: {output_csv}")
+    log_workflow_step("Export", f"{stats.format.upper()} created: {output_csv} "
+                                f"({stats.rows:,} rows, {stats.rows_per_second:,.0f} rows/s)")
     return output_csv
 
 def print_layer_summary(layer_path, layer_name="Layer"):
@@ -179,20 +205,17 @@ def validate_har_classifications(layer_path):
     }
     
     validation_results = {}
+    backend = get_backend()
+    existing_fields = backend.field_names(layer_path)
     
     for field in har_fields:
-        if field not in [f.name for f in arcpy.ListFields(layer_path)]:
+        if field not in existing_fields:
             validation_results[field] = "MISSING"
             continue
         
-        invalid_count = 0
-        total_count = 0
-        
-        with arcpy.da.SearchCursor(layer_path, [field]) as cursor:
-            for row in cursor:
-                total_count += 1
-                if row[0] not in valid_values[field]:
-                    invalid_count += 1
+        values = backend.read_table(layer_path, [field])[field]
+        total_count = len(values)
+        invalid_count = int((~np.isin(values, valid_values[field])).sum())
         
         validation_results[field] = {
             'invalid_count': invalid_count,
@@ -4,6 +4,7 @@
 
 import arcpy
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
 
@@ -34,6 +35,12 @@ arcpy.env.workspace = str(gdb_path)
 arcpy.env.overwriteOutput = True
 arcpy.env.outputCoordinateSystem = "PROJCS['NAD_1983_UTM_Zone_4N']"
 
+sys.path.append(str(project_root / "scripts"))
+from cesspool_analysis.lineage import LineageManifest
+from cesspool_analysis.tmk_join import (
+    TMK_FIELD_CANDIDATES, null_value_map, multi_join, pick_tmk_field, to_extend_array
+)
+
 print("Project: " + project_root.name)
 print("Geodatabase: " + gdb_path.name)
 print("Map: Parcel_Analysis_Statewide")
@@ -137,7 +144,6 @@ print("-" * 40)
 # Academic MPAT field structure
 mpat_fields = [
     # Processing tracking
-    ("JOIN_LOG", "TEXT", 255, "Processing sequence log"),
     ("DATA_STATUS", "TEXT", 50, "Data completeness status"), 
     ("CONFIDENCE", "TEXT", 20, "Analysis confidence level"),
     ("LAST_UPDATED", "DATE", None, "Last processing date"),
@@ -199,33 +205,42 @@ print()
 print("STEP 4: JOINING DOMESTIC WELLS DISTANCE")
 print("-" * 40)
 
-# Find TMK fields for joining
-foundation_fields = [f.name for f in arcpy.ListFields(str(foundation_shp))]
-domestic_fields = [f.name for f in arcpy.ListFields(domestic_fc)]
-
-# Find matching TMK field
-tmk_candidates = ['TMK', 'TMK9', 'TMK_txt']
-foundation_tmk = None
-domestic_tmk = None
-
-for candidate in tmk_candidates:
-    if candidate in foundation_fields and not foundation_tmk:
-        foundation_tmk = candidate
-    if candidate in domestic_fields and not domestic_tmk:
-        domestic_tmk = candidate
-
+# Read both tables once; the TMK field is picked by content (most valid
+# TMKs), so integer vs text TMK columns no longer break the join
+foundation_fields = {f.name: f.type for f in arcpy.ListFields(str(foundation_shp))}
+domestic_fields = {f.name: f.type for f in arcpy.ListFields(domestic_fc)
+                   if f.type not in ("OID", "Geometry", "Blob", "Raster")
+                   and not f.name.startswith("Shape_")}
+
+foundation_oid = arcpy.Describe(str(foundation_shp)).OIDFieldName
+foundation_candidates = [f for f in TMK_FIELD_CANDIDATES if f in foundation_fields]
+foundation_table = arcpy.da.TableToNumPyArray(
+    str(foundation_shp), [foundation_oid] + foundation_candidates,
+    null_value=null_value_map([(f, foundation_fields[f]) for f in foundation_candidates])
+)
+domestic_table = arcpy.da.TableToNumPyArray(
+    domestic_fc, list(domestic_fields), null_value=null_value_map(list(domestic_fields.items()))
+)
+foundation_tmk = pick_tmk_field(foundation_table)
+domestic_tmk = pick_tmk_field(domestic_table)
+
+domestic_columns = []
 if foundation_tmk and domestic_tmk:
     print("Joining on TMK fields: " + foundation_tmk + " and " + domestic_tmk)
     
     try:
-        arcpy.management.JoinField(
-            in_data=str(foundation_shp),
-            in_field=foundation_tmk,
-            join_table=domestic_fc,
-            join_field=domestic_tmk
+        # In-memory join on canonical int64 TMKs, one ExtendTable write
+        joined_columns, join_stats = multi_join(
+            foundation_table[foundation_tmk],
+            [("Domestic wells", domestic_table, domestic_tmk, None)],
+            existing_fields=list(foundation_fields)
         )
+        join_stats[0].report()
+        arcpy.da.ExtendTable(str(foundation_shp), foundation_oid,
+                             to_extend_array(foundation_table[foundation_oid], joined_columns), "JOIN_OID")
         print("Domestic wells data joined successfully")
         wells_status = "Both wells joined"
+        domestic_columns = list(joined_columns)
         
     except Exception as e:
         print("Join issue: " + str(e))
@@ -245,21 +260,27 @@ print("-" * 40)
 
 # Initialize processing tracking
 timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
-init_log = "Academic Foundation: " + timestamp + "; Wells: " + wells_status
-
-update_count = 0
-with arcpy.da.UpdateCursor(str(foundation_shp), 
-                          ["JOIN_LOG", "DATA_STATUS", "CONFIDENCE", "LAST_UPDATED"]) as cursor:
-    for row in cursor:
-        row[0] = init_log
-        row[1] = wells_status  
-        row[2] = "High"  # Wells data is high confidence
-        row[3] = datetime.now()
-        cursor.updateRow(row)
-        update_count += 1
+arcpy.management.CalculateField(str(foundation_shp), "DATA_STATUS", "'" + wells_status + "'", "PYTHON3")
+arcpy.management.CalculateField(str(foundation_shp), "CONFIDENCE", "'High'", "PYTHON3")  # Wells data is high confidence
+arcpy.management.CalculateField(str(foundation_shp), "LAST_UPDATED", "datetime.datetime.now()", "PYTHON3",
+                                code_block="import datetime")
+update_count = int(arcpy.management.GetCount(str(foundation_shp))[0])
+
+# Provenance per column (source, version hash, step) instead of a per-row JOIN_LOG
+lineage = LineageManifest(foundation_folder / (foundation_name + "_lineage.json"))
+lineage.record_source("municipal_wells", available_data["Municipal Wells"], key_field=foundation_tmk,
+                      features=muni_count)
+store_columns = [f.name for f in arcpy.ListFields(str(foundation_shp)) if f.type not in ("OID", "Geometry")]
+lineage.record_columns([c for c in store_columns if c not in domestic_columns], "foundation",
+                       ["municipal_wells"], parcels=update_count)
+if domestic_columns:
+    lineage.record_source("domestic_wells", available_data["Domestic Wells"], key_field=domestic_tmk,
+                          features=domestic_count)
+    lineage.record_columns(domestic_columns, "domestic_wells_join", ["domestic_wells"], parcels=update_count)
+lineage.save()
 
 print("Initialized tracking for " + str(update_count) + " records")
-print("Join log: " + init_log)
+print("Lineage manifest: " + lineage.manifest_path)
 print()
 
 # =============================================================================
@@ -316,7 +337,7 @@ print("FOUNDATION CONTENTS:")
 print("  TMK identifiers for all Hawaii parcels")
 print("  Municipal wells distances (HAR 11-62: 1000ft setback)")
 print("  Domestic wells distances (HAR 11-62: 1000ft setback)")
-print("  Academic tracking fields (JOIN_LOG, confidence, etc.)")
+print("  Academic tracking fields (confidence, lineage manifest)")
 print("  Matrix analysis fields (SSPSCRT, limiting factors)")
 print("  Soil, slope, regulatory data (Phase 2)")
 print()
@@ -4,6 +4,7 @@
 
 import arcpy
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
 
@@ -23,6 +24,7 @@ project_root = Path(r"C:\Users\rober\OneDrive\Documents\GIS_Projects\ParcelAnaly
 gdb_path = project_root / "ParcelAnalysis.gdb"
 outputs_folder = project_root / "Outputs"
 foundation_folder = outputs_folder / "Foundation_Academic"
+mpat_store_folder = outputs_folder / "MPAT_Store"
 
 # Data sources available
 wells_folder = project_root / "data" / "gis_downloads" / "wells" / "statewide"
@@ -138,7 +140,6 @@ print("-" * 40)
 # Academic MPAT field structure
 mpat_fields = [
     # Processing tracking
-    ("JOIN_LOG", "TEXT", 255, "Processing sequence log"),
     ("DATA_STATUS", "TEXT", 50, "Data completeness status"), 
     ("CONFIDENCE", "TEXT", 20, "Analysis confidence level"),
     ("LAST_UPDATED", "DATE", None, "Last processing date"),
@@ -205,28 +206,47 @@ foundation_fields = [f.name for f in arcpy.ListFields(str(foundation_shp))]
 domestic_fields = [f.name for f in arcpy.ListFields(domestic_fc)]
 
 # Find matching TMK field
-tmk_candidates = ['TMK', 'TMK9', 'TMK_txt']
-foundation_tmk = None
-domestic_tmk = None
+sys.path.append(str(project_root / "scripts"))
+from cesspool_analysis.tmk_join import find_tmk_field, null_value_map, multi_join, to_extend_array
 
-for candidate in tmk_candidates:
-    if candidate in foundation_fields and not foundation_tmk:
-        foundation_tmk = candidate
-    if candidate in domestic_fields and not domestic_tmk:
-        domestic_tmk = candidate
+domestic_columns = []
+
+foundation_tmk = find_tmk_field(foundation_fields)
+domestic_tmk = find_tmk_field(domestic_fields)
 
 if foundation_tmk and domestic_tmk:
     print(f"Joining on TMK fields: {foundation_tmk} ←→ {domestic_tmk}")
     
     try:
-        arcpy.management.JoinField(
-            in_data=str(foundation_shp),
-            in_field=foundation_tmk,
-            join_table=domestic_fc,
-            join_field=domestic_tmk
+        # In-memory sort-merge join on normalized TMKs, written back with one
+        # ExtendTable call instead of a JoinField round-trip on the shapefile
+        foundation_oid = arcpy.Describe(str(foundation_shp)).OIDFieldName
+        tmk_type = arcpy.ListFields(str(foundation_shp), foundation_tmk)[0].type
+        foundation_keys = arcpy.da.TableToNumPyArray(
+            str(foundation_shp), [foundation_oid, foundation_tmk],
+            null_value=null_value_map([(foundation_tmk, tmk_type)])
+        )
+        
+        domestic_value_fields = [(f.name, f.type) for f in arcpy.ListFields(domestic_fc)
+                                 if f.type not in ("OID", "Geometry", "Blob", "Raster")
+                                 and not f.name.startswith("Shape_")]
+        domestic_table = arcpy.da.TableToNumPyArray(
+            domestic_fc, [name for name, _ in domestic_value_fields],
+            null_value=null_value_map(domestic_value_fields)
+        )
+        
+        joined_columns, join_stats = multi_join(
+            foundation_keys[foundation_tmk],
+            [("Domestic wells", domestic_table, domestic_tmk, None)],
+            existing_fields=foundation_fields
         )
+        join_stats[0].report()
+        
+        arcpy.da.ExtendTable(str(foundation_shp), foundation_oid,
+                             to_extend_array(foundation_keys[foundation_oid], joined_columns), "JOIN_OID")
         print("✅ Domestic wells data joined successfully")
         wells_status = "Both wells joined"
+        domestic_columns = list(joined_columns)
         
     except Exception as e:
         print(f"⚠️ Join issue: {e}")
@@ -246,23 +266,17 @@ print()
 print("STEP 5: INITIALIZING ACADEMIC TRACKING")
 print("-" * 40)
 
-# Initialize processing tracking
+# Initialize processing tracking (per-column provenance goes to the lineage
+# manifest written with the MPAT store in Step 7)
 timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
-init_log = f"Academic Foundation: {timestamp}; Wells: {wells_status}"
-
-update_count = 0
-with arcpy.da.UpdateCursor(str(foundation_shp), 
-                          ["JOIN_LOG", "DATA_STATUS", "CONFIDENCE", "LAST_UPDATED"]) as cursor:
-    for row in cursor:
-        row[0] = init_log
-        row[1] = wells_status  
-        row[2] = "High"  # Wells data is high confidence
-        row[3] = datetime.now()
-        cursor.updateRow(row)
-        update_count += 1
+arcpy.management.CalculateField(str(foundation_shp), "DATA_STATUS", f"'{wells_status}'", "PYTHON3")
+arcpy.management.CalculateField(str(foundation_shp), "CONFIDENCE", "'High'", "PYTHON3")  # Wells data is high confidence
+arcpy.management.CalculateField(str(foundation_shp), "LAST_UPDATED", "datetime.datetime.now()", "PYTHON3",
+                                code_block="import datetime")
 
+update_count = int(arcpy.management.GetCount(str(foundation_shp))[0])
 print(f"✅ Initialized tracking for {update_count:,} records")
-print(f"✅ Join log: {init_log}")
+print(f"✅ Wells: {wells_status}")
 print()
 
 # =============================================================================
@@ -303,6 +317,52 @@ for temp_fc in [municipal_fc, domestic_fc]:
     if arcpy.Exists(temp_fc):
         arcpy.management.Delete(temp_fc)
 
+# =============================================================================
+# STEP 7: WRITE COLUMNAR MPAT STORE
+# =============================================================================
+
+print("STEP 7: WRITING COLUMNAR MPAT STORE (PARQUET)")
+print("-" * 40)
+
+# TMK-keyed Parquet copy of the foundation: no dBASE width limits, and the
+# Matrix can read only the columns it needs for one island at a time
+if foundation_tmk:
+    try:
+        import pandas as pd
+        from cesspool_analysis.lineage import LineageManifest
+        from cesspool_analysis.mpat_store import MPATStore
+
+        store_fields = [f.name for f in arcpy.ListFields(str(foundation_shp))
+                        if f.type not in ("OID", "Geometry")]
+        mpat_df = pd.DataFrame(arcpy.da.TableToNumPyArray(str(foundation_shp), store_fields))
+        mpat_df = mpat_df.rename(columns={foundation_tmk: "TMK"})
+
+        mpat_store = MPATStore.create(mpat_store_folder, mpat_df, key_field="TMK", overwrite=True)
+        print(f"✅ MPAT store: {mpat_store_folder}")
+        print(f"✅ {mpat_store.row_count:,} records, {len(mpat_store.columns)} columns")
+
+        # Source dataset, version hash and step for every column
+        lineage = LineageManifest.for_store(mpat_store)
+        lineage.record_source("municipal_wells", available_data["Municipal Wells"], key_field=foundation_tmk,
+                              features=muni_count)
+        wells_columns = [c for c in mpat_store.columns if c in domestic_columns]
+        lineage.record_columns([c for c in mpat_store.columns if c not in wells_columns], "foundation",
+                               ["municipal_wells"], group="foundation", parcels=mpat_store.row_count)
+        if wells_columns:
+            lineage.record_source("domestic_wells", available_data["Domestic Wells"], key_field=domestic_tmk,
+                                  features=domestic_count)
+            lineage.record_columns(wells_columns, "domestic_wells_join", ["domestic_wells"],
+                                   group="foundation", parcels=mpat_store.row_count)
+        lineage.save()
+        print(f"✅ Lineage manifest: {lineage.manifest_path}")
+    except Exception as e:
+        print(f"⚠️ Could not write MPAT store: {e}")
+        print(f"   Shapefile foundation is still available: {foundation_shp}")
+else:
+    print("⚠️ No TMK field found - skipping MPAT store")
+
+print()
+
 # =============================================================================
 # ACADEMIC FOUNDATION COMPLETE
 # =============================================================================
@@ -317,6 +377,7 @@ print(f"📈 Records: {final_count:,} TMK parcels statewide")
 print(f"🏗️ Structure: {len(final_fields)} fields (academic framework)")
 print(f"⏰ Created: {timestamp}")
 print(f"💾 Location: {foundation_shp}")
+print(f"🗄️ Columnar store: {mpat_store_folder}")
 print()
 print("🎯 READY FOR PHASE 2: GEOSPATIAL ANALYSIS")
 print("   Next steps:")
@@ -329,7 +390,7 @@ print("📋 FOUNDATION CONTENTS:")
 print(f"   ✅ TMK identifiers for all Hawaii parcels")
 print(f"   ✅ Municipal wells distances (HAR 11-62: 1000ft setback)")
 print(f"   ✅ Domestic wells distances (HAR 11-62: 1000ft setback)")
-print(f"   ✅ Academic tracking fields (JOIN_LOG, confidence, etc.)")
+print(f"   ✅ Academic tracking fields (confidence, lineage manifest)")
 print(f"   ✅ Matrix analysis fields (SSPSCRT, limiting factors)")
 print(f"   ⏳ Soil, slope, regulatory data (Phase 2)")
 print()
@@ -4,6 +4,7 @@
 
 import arcpy
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
 
@@ -24,6 +25,12 @@ arcpy.env.workspace = str(gdb_path)
 arcpy.env.overwriteOutput = True
 arcpy.env.outputCoordinateSystem = "PROJCS['NAD_1983_UTM_Zone_4N']"
 
+sys.path.append(str(project_root / "scripts"))
+from cesspool_analysis.lineage import LineageManifest
+from cesspool_analysis.tmk_join import (
+    TMK_FIELD_CANDIDATES, null_value_map, multi_join, pick_tmk_field, to_extend_array
+)
+
 print(f"📁 Project: {project_root.name}")
 print(f"🗃️ Geodatabase: {gdb_path}")
 print(f"📍 Coordinate System: NAD 1983 UTM Zone 4N")
@@ -108,7 +115,6 @@ if arcpy.Exists(municipal_fc):
     
     # Add academic framework fields
     academic_fields = [
-        ("JOIN_LOG", "TEXT", 255, "Processing sequence tracking"),
         ("DATA_STATUS", "TEXT", 50, "Data completion status"),
         ("SOIL_CLASS", "TEXT", 20, "HAR 11-62 soil classification"),
         ("SLOPE_PERCENT", "DOUBLE", None, "Average slope percentage"),
@@ -148,15 +154,21 @@ if arcpy.Exists(municipal_fc):
     
     # Initialize tracking
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
-    with arcpy.da.UpdateCursor(str(foundation_path), ["JOIN_LOG", "DATA_STATUS", "LAST_UPDATED"]) as cursor:
-        for row in cursor:
-            row[0] = f"Foundation: {timestamp}"
-            row[1] = "Municipal wells only"
-            row[2] = datetime.now()
-            cursor.updateRow(row)
+    arcpy.management.CalculateField(str(foundation_path), "DATA_STATUS", "'Municipal wells only'", "PYTHON3")
+    arcpy.management.CalculateField(str(foundation_path), "LAST_UPDATED", "datetime.datetime.now()", "PYTHON3",
+                                    code_block="import datetime")
     
     final_count = int(arcpy.management.GetCount(str(foundation_path))[0])
     print(f"✅ Foundation initialized with {final_count:,} records")
+    
+    # Provenance per column (source, version hash, step) instead of a per-row JOIN_LOG
+    lineage = LineageManifest(foundation_folder / f"{foundation_name}_lineage.json")
+    lineage.record_source("municipal_wells", municipal_wells_shp, features=final_count)
+    foundation_columns = [f.name for f in arcpy.ListFields(str(foundation_path))
+                          if f.type not in ("OID", "Geometry")]
+    lineage.record_columns(foundation_columns, "foundation", ["municipal_wells"], parcels=final_count)
+    lineage.save()
+    print(f"✅ Lineage manifest: {lineage.manifest_path}")
     print()
     
     # =============================================================================
@@ -167,38 +179,46 @@ if arcpy.Exists(municipal_fc):
     print("-" * 40)
     
     if arcpy.Exists(domestic_fc):
-        # Find TMK fields
-        foundation_fields = [f.name for f in arcpy.ListFields(str(foundation_path))]
-        domestic_fields = [f.name for f in arcpy.ListFields(domestic_fc)]
-        
-        # Find matching TMK field
-        tmk_candidates = ['TMK', 'TMK9', 'TMK_txt']
-        foundation_tmk = None
-        domestic_tmk = None
+        foundation_fields = {f.name: f.type for f in arcpy.ListFields(str(foundation_path))}
+        domestic_fields = {f.name: f.type for f in arcpy.ListFields(domestic_fc)
+                           if f.type not in ("OID", "Geometry", "Blob", "Raster")
+                           and not f.name.startswith("Shape_")}
         
-        for candidate in tmk_candidates:
-            if candidate in foundation_fields and not foundation_tmk:
-                foundation_tmk = candidate
-            if candidate in domestic_fields and not domestic_tmk:
-                domestic_tmk = candidate
+        # Read both tables once; the TMK field is picked by content (most
+        # valid TMKs), so integer vs text TMK columns no longer break the join
+        foundation_oid = arcpy.Describe(str(foundation_path)).OIDFieldName
+        foundation_candidates = [f for f in TMK_FIELD_CANDIDATES if f in foundation_fields]
+        foundation_table = arcpy.da.TableToNumPyArray(
+            str(foundation_path), [foundation_oid] + foundation_candidates,
+            null_value=null_value_map([(f, foundation_fields[f]) for f in foundation_candidates])
+        )
+        domestic_table = arcpy.da.TableToNumPyArray(
+            domestic_fc, list(domestic_fields), null_value=null_value_map(list(domestic_fields.items()))
+        )
+        foundation_tmk = pick_tmk_field(foundation_table)
+        domestic_tmk = pick_tmk_field(domestic_table)
         
         if foundation_tmk and domestic_tmk:
             print(f"Joining on: {foundation_tmk} ←→ {domestic_tmk}")
             
             try:
-                arcpy.management.JoinField(
-                    in_data=str(foundation_path),
-                    in_field=foundation_tmk,
-                    join_table=domestic_fc,
-                    join_field=domestic_tmk
+                # In-memory join on canonical int64 TMKs, one ExtendTable write
+                joined_columns, join_stats = multi_join(
+                    foundation_table[foundation_tmk],
+                    [("Domestic wells", domestic_table, domestic_tmk, None)],
+                    existing_fields=list(foundation_fields)
                 )
+                join_stats[0].report()
+                arcpy.da.ExtendTable(str(foundation_path), foundation_oid,
+                                     to_extend_array(foundation_table[foundation_oid], joined_columns), "JOIN_OID")
                 
-                # Update status
-                with arcpy.da.UpdateCursor(str(foundation_path), ["JOIN_LOG", "DATA_STATUS"]) as cursor:
-                    for row in cursor:
-                        row[0] = f"{row[0]}; Domestic wells: {timestamp}"
-                        row[1] = "Both wells joined"
-                        cursor.updateRow(row)
+                # Update status and record the joined columns' source
+                arcpy.management.CalculateField(str(foundation_path), "DATA_STATUS", "'Both wells joined'", "PYTHON3")
+                lineage.record_source("domestic_wells", domestic_wells_shp, key_field=domestic_tmk,
+                                      features=int(arcpy.management.GetCount(domestic_fc)[0]))
+                lineage.record_columns(list(joined_columns), "domestic_wells_join", ["domestic_wells"],
+                                       parcels=final_count)
+                lineage.save()
                 
                 print("✅ Domestic wells data joined successfully")
                 
@@ -229,7 +249,7 @@ if arcpy.Exists(municipal_fc):
     print()
     print("📋 TO USE THIS FOUNDATION:")
     print(f"   1. Add layer to map from: {foundation_path}")
-    print(f"   2. Check JOIN_LOG field for processing history")
+    print(f"   2. Check {lineage.manifest_path} for processing history")
     print(f"   3. Proceed with Phase 2 notebooks")
     
     # Clean up temporary imports
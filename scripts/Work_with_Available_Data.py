@@ -82,9 +82,14 @@ Hawaii Cesspool Technology Matrix - Demo Analysis
 Shows how to work with the binary suitability matrix
 """
 
+import sys
 import pandas as pd
 import numpy as np
 
+sys.path.append(r"C:\\Users\\rober\\OneDrive\\Documents\\GIS_Projects\\ParcelAnalysis\\scripts")
+from cesspool_analysis.matrix_sieve import compile_matrix, encode_conditions, sieve
+from cesspool_analysis.matrix_sieve import suitable_technologies as list_suitable
+
 def load_technology_matrix(file_path):
     """Load and validate the technology matrix"""
     print(f"Loading technology matrix from: {file_path}")
@@ -118,21 +123,11 @@ def demonstrate_sieve_analysis(df, binary_cols, site_conditions):
     print("\\n=== SIEVE ANALYSIS DEMONSTRATION ===")
     print(f"Site conditions: {site_conditions}")
     
-    suitable_technologies = []
-    
-    for idx, row in df.iterrows():
-        technology = row['Technology']
-        
-        # Check if technology is suitable for ALL site conditions
-        suitable = True
-        for condition in site_conditions:
-            if condition in binary_cols:
-                if row[condition] != 1:  # Technology not suitable for this condition
-                    suitable = False
-                    break
-        
-        if suitable:
-            suitable_technologies.append(technology)
+    # Compile the matrix into technology x criterion bits once, then test
+    # the parcel's condition mask against every technology in one step
+    matrix = compile_matrix(df, binary_cols)
+    suitable_bits = sieve(matrix, encode_conditions(matrix, [site_conditions]))
+    suitable_technologies = list_suitable(matrix, suitable_bits, 0)
     
     print(f"\\nSuitable technologies: {len(suitable_technologies)} out of {len(df)}")
     for tech in suitable_technologies[:5]:  # Show first 5
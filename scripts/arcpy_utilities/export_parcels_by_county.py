@@ -1,3 +1,6 @@
+# Export tmk_state to one feature class per county.
+# For a parallel statewide analysis, hawaii_cesspool_analysis.py --partitioned
+# selects each county into its own scratch geodatabase in a worker process.
 import arcpy
 
 # Set workspace to your ParcelAnalysis.gdb path
@@ -0,0 +1,42 @@
+"""
+Cesspool Analysis Engines for ParcelAnalysis Project
+University of Hawaii Water Resources Research Center
+
+Array-based computation modules used by the ArcGIS scripts and notebooks.
+Nothing in this package imports arcpy (except backends.arcpy_backend, loaded
+on request), so every module runs on Linux batch hosts as well as inside
+ArcGIS Pro.
+
+Modules:
+    har_standards       HAR 11-62 constants and scalar classification rules
+    har_classification  Vectorized HAR 11-62 soil classification engine
+    sizing              Design flow, septic tank, lot-size and disposal area rules
+    sizing_kernel       Vectorized sizing kernel (flow, tank, disposal area, lot category)
+    priority            Preliminary upgrade priority scoring rules
+    priority_kernel     Vectorized, config-weighted priority scoring with per-island top-k
+    mpat_store          TMK-keyed columnar (Parquet) MPAT store
+    lineage             Per-column MPAT lineage manifest and incremental column refresh
+    matrix_sieve        Compiled technology x criterion bit-matrix sieve
+    technology_ranking  Batch technology cost estimates and per-parcel top-N ranking
+    tmk_codec           Packed int64 TMK parsing, decoding and validation
+    tmk_join            In-memory sort-merge TMK join engine
+    parcel_index        Packed STR-tree point-in-parcel assignment
+    well_distance       KD-tree nearest-well distances and setback flags
+    streaming_export    Batched CSV/Parquet/GeoPackage result exporter
+    step_cache          Content-hash cache for skipping unchanged workflow phases
+    coordinate_transform  Cached pyproj transformers and vectorized geometry reprojection
+    reprojection        Manifest-aware parallel batch reprojection runner
+    projection_inventory  Concurrent .prj scan with cached WKT parses and JSON/CSV report
+    partitioned         County-partitioned process-pool runs and deterministic merge
+    summary_cube        Single-pass island x bedrooms x priority x lot-size summary cube
+    raster_io           Memory-mapped tiled raster reads (.flt / .npy)
+    rasterize           Scanline polygon rasterization and per-polygon reductions
+    dem_slope           Tiled DEM slope with per-parcel mean / max / p90
+    zonal_stats         Cached parcel label grid and streaming per-parcel raster statistics
+    disposal_area       Available disposal area after setbacks and largest usable rectangle
+    soil_overlay        Area-weighted soil-parcel overlay with dominant class attribution
+    shapefile_reader    Memory-mapped .shp/.shx/.dbf reader (columns and flat geometry buffers)
+    backends            Lazily loaded arcpy / NumPy data-access backends
+    synthetic           Seeded synthetic statewide parcels, cesspools, wells and soils
+    benchmark           Per-phase timing suite with per-commit history
+"""
@@ -0,0 +1,136 @@
+"""
+Pluggable Data-Access Backends
+University of Hawaii Water Resources Research Center
+
+The computation engines in cesspool_analysis work on NumPy arrays; a
+backend moves those arrays in and out of datasets:
+
+    arcpy   File geodatabases and shapefiles through arcpy.da (production)
+    numpy   Parquet/CSV tables, and spatial files through GeoPandas (batch
+            servers and tests, no ArcGIS needed)
+
+Backend modules are imported on first use only, so importing this package
+never loads ArcGIS. The default is the CESSPOOL_BACKEND environment
+variable, else arcpy when it is installed, else numpy. Other backends can
+be added with register_backend.
+
+Usage:
+    from cesspool_analysis.backends import get_backend
+    backend = get_backend()
+    table = backend.read_table(layer, ['OID@', 'slope_r'])
+"""
+
+import importlib
+import importlib.util
+import os
+
+# ============================================================================
+# LAZY MODULES
+# ============================================================================
+
+class LazyModule:
+    """
+    Module proxy that imports on first attribute access
+
+    Lets a script keep writing arcpy.management.CopyFeatures(...) while the
+    ArcGIS import cost is paid only when arcpy is actually used.
+    """
+
+    def __init__(self, name, install_hint=None):
+        self.__dict__['_name'] = name
+        self.__dict__['_install_hint'] = install_hint
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        if self._module is None:
+            try:
+                self.__dict__['_module'] = importlib.import_module(self._name)
+            except ImportError as e:
+                hint = f" ({self._install_hint})" if self._install_hint else ""
+                raise ImportError(f"{self._name} is required here but could not be imported{hint}: {e}") from e
+        return self._module
+
+    @property
+    def is_loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self._load(), attribute, value)
+
+    def __repr__(self):
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+def lazy_import(name, install_hint=None):
+    """Return a LazyModule proxy for name"""
+    return LazyModule(name, install_hint)
+
+def module_available(name):
+    """True when a module can be imported (checked without importing it)"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+# ============================================================================
+# BACKEND REGISTRY
+# ============================================================================
+
+BACKEND_ENV_VAR = "CESSPOOL_BACKEND"
+
+# Backend name -> "module:Class" (relative modules are inside this package)
+BACKENDS = {
+    'arcpy': '.arcpy_backend:ArcpyBackend',
+    'numpy': '.numpy_backend:NumpyBackend',
+}
+
+_instances = {}
+
+def register_backend(name, target):
+    """
+    Register a backend
+
+    Args:
+        name (str): Backend name used with get_backend
+        target (str or callable): "package.module:Class" path (imported on
+            first use) or a factory called with the get_backend options
+    """
+    BACKENDS[name] = target
+    _instances.pop(name, None)
+
+def default_backend_name():
+    name = os.environ.get(BACKEND_ENV_VAR)
+    if name:
+        return name
+    return 'arcpy' if module_available('arcpy') else 'numpy'
+
+def _resolve(target):
+    if callable(target):
+        return target
+    module_path, _, class_name = target.partition(':')
+    module = importlib.import_module(module_path, package=__name__ if module_path.startswith('.') else None)
+    return getattr(module, class_name)
+
+def get_backend(name=None, **options):
+    """
+    Load (on first use) and return a data-access backend
+
+    Args:
+        name (str): Backend name (default: default_backend_name())
+        **options: Backend constructor options (e.g. workspace); a backend
+            requested without options is created once and shared
+
+    Returns:
+        DataBackend: Backend instance
+    """
+    name = name or default_backend_name()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'. Available: {sorted(BACKENDS)}")
+    if options:
+        return _resolve(BACKENDS[name])(**options)
+    if name not in _instances:
+        _instances[name] = _resolve(BACKENDS[name])()
+    return _instances[name]
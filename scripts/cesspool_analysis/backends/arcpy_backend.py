@@ -0,0 +1,79 @@
+"""
+ArcPy Data-Access Backend
+University of Hawaii Water Resources Research Center
+
+Production backend: whole-column reads with arcpy.da.TableToNumPyArray and
+bulk writes with arcpy.da.ExtendTable. Only imported when requested through
+get_backend, so arcpy is never loaded by the computation modules themselves.
+Unfiltered column reads from shapefiles skip arcpy and use the memory-mapped
+shapefile_reader.
+"""
+
+import os
+
+import arcpy
+
+from ..shapefile_reader import ShapefileReader
+from ..tmk_join import null_value_map
+from .base import OID_TOKEN, DataBackend, shapefile_table
+
+class ArcpyBackend(DataBackend):
+    """arcpy.da bulk read/write backend"""
+
+    name = 'arcpy'
+
+    def __init__(self, workspace=None):
+        if workspace:
+            arcpy.env.workspace = workspace
+            arcpy.env.overwriteOutput = True
+
+    def exists(self, dataset):
+        return bool(arcpy.Exists(dataset))
+
+    def list_fields(self, dataset):
+        return [(f.name, f.type) for f in arcpy.ListFields(dataset)]
+
+    def count(self, dataset):
+        return int(arcpy.management.GetCount(dataset)[0])
+
+    def _shapefile(self, dataset):
+        """
+        ShapefileReader for a shapefile on disk, else None
+
+        Files with deleted .dbf records are left to arcpy so that record
+        positions stay equal to the FIDs.
+        """
+        path = str(dataset)
+        if not os.path.isabs(path) and arcpy.env.workspace:
+            path = os.path.join(arcpy.env.workspace, path)
+        if not path.lower().endswith('.shp') or not os.path.isfile(path):
+            return None
+        reader = ShapefileReader(path)
+        return reader if len(reader) == reader.total_records else None
+
+    def read_table(self, dataset, fields, where=None):
+        reader = self._shapefile(dataset) if where is None else None
+        if reader is not None and all(name == OID_TOKEN or name in reader.fields for name in fields):
+            return shapefile_table(reader, fields, first_id=0)   # shapefile FIDs start at 0
+        field_types = dict(self.list_fields(dataset))
+        null_values = null_value_map([(name, field_types[name]) for name in fields if name in field_types])
+        return arcpy.da.TableToNumPyArray(dataset, list(fields), where_clause=where, null_value=null_values)
+
+    def read_xy(self, dataset, spatial_reference=None):
+        array = arcpy.da.FeatureClassToNumPyArray(
+            dataset, [OID_TOKEN, "SHAPE@XY"], spatial_reference=spatial_reference
+        )
+        return array[OID_TOKEN], array["SHAPE@XY"][:, 0], array["SHAPE@XY"][:, 1]
+
+    def extend_table(self, dataset, array, key_field):
+        # ExtendTable only adds new fields, so drop the ones from earlier runs
+        existing = set(self.field_names(dataset))
+        stale = [name for name in array.dtype.names if name != key_field and name in existing]
+        if stale:
+            arcpy.management.DeleteField(dataset, stale)
+        oid_field = arcpy.Describe(dataset).OIDFieldName
+        arcpy.da.ExtendTable(dataset, oid_field, array, key_field)
+
+    def copy(self, source, target):
+        arcpy.management.CopyFeatures(source, target)
+        return target
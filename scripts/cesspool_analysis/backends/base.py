@@ -0,0 +1,108 @@
+"""
+Data-Access Backend Interface
+University of Hawaii Water Resources Research Center
+
+Every backend reads whole columns into NumPy structured arrays and writes
+computed columns back keyed on record IDs, matching the
+TableToNumPyArray / ExtendTable pattern used across the project scripts.
+"""
+
+import numpy as np
+
+# Field token for record IDs (ObjectID in arcpy, 1-based row number otherwise)
+OID_TOKEN = "OID@"
+
+def shapefile_table(reader, fields, first_id=1):
+    """
+    read_table result for a shapefile read with shapefile_reader
+
+    Args:
+        reader (ShapefileReader): Open shapefile
+        fields (list): Field names; OID_TOKEN returns live-record row
+            numbers starting at first_id
+        first_id (int): ID of the first record (1 = row number, 0 = FID)
+
+    Returns:
+        numpy.ndarray: Structured array with one field per requested name
+    """
+    columns = reader.read_columns([name for name in fields if name != OID_TOKEN])
+    if OID_TOKEN in fields:
+        columns[OID_TOKEN] = np.arange(len(reader), dtype=np.int64) + first_id
+    table = np.empty(len(reader), dtype=[(name, columns[name].dtype) for name in fields])
+    for name in fields:
+        table[name] = columns[name]
+    return table
+
+class DataBackend:
+    """Base class for data-access backends"""
+
+    name = None
+
+    def exists(self, dataset):
+        """True when the dataset exists"""
+        raise NotImplementedError
+
+    def list_fields(self, dataset):
+        """(name, arcpy-style field type) pairs, e.g. ('BED_ROOMS', 'Integer')"""
+        raise NotImplementedError
+
+    def field_names(self, dataset):
+        return [name for name, _ in self.list_fields(dataset)]
+
+    def count(self, dataset):
+        """Number of records"""
+        raise NotImplementedError
+
+    def read_table(self, dataset, fields, where=None):
+        """
+        Read whole columns into a structured array
+
+        Nulls are filled like TableToNumPyArray with tmk_join.null_value_map:
+        '' for text, NaN for floating point and -1 for integers.
+
+        Args:
+            dataset (str): Dataset path or name
+            fields (list): Field names; OID_TOKEN returns the record IDs
+            where (str): Optional filter in the backend's expression syntax
+
+        Returns:
+            numpy.ndarray: Structured array with one field per requested name
+        """
+        raise NotImplementedError
+
+    def read_xy(self, dataset, spatial_reference=None):
+        """
+        Read feature coordinates (centroids for polygons)
+
+        Returns:
+            tuple: (record IDs, x, y) arrays
+        """
+        raise NotImplementedError
+
+    def extend_table(self, dataset, array, key_field):
+        """
+        Add the non-key fields of a structured array to a dataset
+
+        Like arcpy.da.ExtendTable keyed on record IDs, except that fields
+        already on the dataset are replaced rather than kept.
+        """
+        raise NotImplementedError
+
+    def write_columns(self, dataset, ids, columns):
+        """
+        Write computed columns back to the records with the given IDs
+
+        Args:
+            dataset (str): Dataset path or name
+            ids (array-like): Record IDs (from OID_TOKEN) in column order
+            columns (dict): Field name -> array
+        """
+        from ..tmk_join import to_extend_array
+        self.extend_table(dataset, to_extend_array(ids, columns), "JOIN_OID")
+
+    def copy(self, source, target):
+        """Copy a dataset (features and attributes)"""
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"<{self.name} backend>"
@@ -0,0 +1,216 @@
+"""
+NumPy/GeoPandas Data-Access Backend
+University of Hawaii Water Resources Research Center
+
+ArcGIS-free backend for batch servers and tests. Datasets are files:
+
+    .parquet, .csv, .txt            read with pandas
+    .shp, .gpkg, .geojson, .fgb     read with GeoPandas (optional)
+    <name>.gdb/<layer>              file geodatabase layer via GeoPandas
+
+Shapefile reads (fields, counts, columns, centroids) go through the
+memory-mapped shapefile_reader and need neither GeoPandas nor GDAL; only
+writes load the file with GeoPandas. Record IDs are 1-based row numbers, so IDs read with OID@ can be passed
+straight back to write_columns. Writes rewrite the whole file, which is
+fine for the table sizes this project handles (a few hundred thousand rows).
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from ..coordinate_transform import transform_xy
+from ..shapefile_reader import ShapefileReader
+from .base import OID_TOKEN, DataBackend, shapefile_table
+
+try:
+    import geopandas as gpd
+except ImportError:
+    gpd = None
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+SPATIAL_EXTENSIONS = {'.shp', '.gpkg', '.geojson', '.json', '.fgb'}
+
+# Column names checked for point coordinates in non-spatial tables
+XY_FIELD_PAIRS = [('X', 'Y'), ('POINT_X', 'POINT_Y'), ('x', 'y'), ('LONGITUDE', 'LATITUDE')]
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def _require_geopandas(path):
+    if gpd is None:
+        raise ImportError(f"geopandas is required to read {path}. Install with: pip install geopandas")
+
+def _field_type(series):
+    """arcpy-style field type for a pandas column"""
+    if gpd is not None and isinstance(series.dtype, gpd.array.GeometryDtype):
+        return 'Geometry'
+    if pd.api.types.is_bool_dtype(series):
+        return 'SmallInteger'
+    if pd.api.types.is_integer_dtype(series):
+        return 'Integer'
+    if pd.api.types.is_float_dtype(series):
+        return 'Double'
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'Date'
+    return 'String'
+
+def _filled(series):
+    """Column values with nulls filled like TableToNumPyArray"""
+    field_type = _field_type(series)
+    if field_type == 'String':
+        return series.astype(object).where(series.notna(), '').to_numpy().astype(str)
+    if field_type in ('Integer', 'SmallInteger'):
+        return series.fillna(-1).to_numpy(dtype=np.int64)
+    if field_type == 'Double':
+        return series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return series.to_numpy()
+
+# ============================================================================
+# BACKEND
+# ============================================================================
+
+class NumpyBackend(DataBackend):
+    """File-based backend built on pandas (and GeoPandas for spatial files)"""
+
+    name = 'numpy'
+
+    def __init__(self, workspace=None):
+        self.workspace = workspace
+
+    def _path(self, dataset):
+        dataset = str(dataset)
+        if self.workspace and not os.path.isabs(dataset):
+            return os.path.join(self.workspace, dataset)
+        return dataset
+
+    @staticmethod
+    def _split_gdb(path):
+        """('folder.gdb', 'layer') for a geodatabase layer path, else (path, None)"""
+        parent, name = os.path.split(path)
+        if parent.lower().endswith('.gdb'):
+            return parent, name
+        return path, None
+
+    def _shapefile(self, dataset):
+        """ShapefileReader for a .shp path, else None"""
+        path = self._path(dataset)
+        if path.lower().endswith('.shp') and os.path.exists(path):
+            return ShapefileReader(path)
+        return None
+
+    def _load(self, dataset):
+        path = self._path(dataset)
+        source, layer = self._split_gdb(path)
+        extension = os.path.splitext(source)[1].lower()
+        if extension == '.parquet':
+            frame = pd.read_parquet(source)
+        elif extension in ('.csv', '.txt'):
+            frame = pd.read_csv(source)
+        elif extension in SPATIAL_EXTENSIONS or layer:
+            _require_geopandas(path)
+            frame = gpd.read_file(source, layer=layer) if layer else gpd.read_file(source)
+        else:
+            raise ValueError(f"Unsupported dataset for the numpy backend: {path}")
+        return frame.reset_index(drop=True)
+
+    def _save(self, frame, dataset):
+        path = self._path(dataset)
+        source, layer = self._split_gdb(path)
+        extension = os.path.splitext(source)[1].lower()
+        if extension == '.parquet':
+            frame.to_parquet(source, index=False)
+        elif extension in ('.csv', '.txt'):
+            frame.to_csv(source, index=False)
+        else:
+            _require_geopandas(path)
+            if not isinstance(frame, gpd.GeoDataFrame):
+                frame = gpd.GeoDataFrame(frame)
+            frame.to_file(source, layer=layer) if layer else frame.to_file(source)
+
+    def exists(self, dataset):
+        path = self._path(dataset)
+        source, layer = self._split_gdb(path)
+        if layer is None:
+            return os.path.exists(path)
+        if not os.path.isdir(source):
+            return False
+        _require_geopandas(path)
+        return layer in gpd.list_layers(source)['name'].tolist()
+
+    def list_fields(self, dataset):
+        reader = self._shapefile(dataset)
+        if reader is not None:
+            return reader.field_types() + [('geometry', 'Geometry')]
+        frame = self._load(dataset)
+        return [(name, _field_type(frame[name])) for name in frame.columns]
+
+    def count(self, dataset):
+        reader = self._shapefile(dataset)
+        if reader is not None:
+            return len(reader)
+        return len(self._load(dataset))
+
+    def read_table(self, dataset, fields, where=None):
+        """Read columns; where is a pandas query string (e.g. "BED_ROOMS >= 1")"""
+        reader = self._shapefile(dataset)
+        if reader is not None and not where:
+            return shapefile_table(reader, fields)
+        if reader is not None:
+            frame = pd.DataFrame(reader.read_columns())
+        else:
+            frame = self._load(dataset)
+        if where:
+            frame = frame.query(where)
+        columns = [frame.index.to_numpy() + 1 if name == OID_TOKEN else _filled(frame[name])
+                   for name in fields]
+        table = np.empty(len(frame), dtype=[(name, values.dtype) for name, values in zip(fields, columns)])
+        for name, values in zip(fields, columns):
+            table[name] = values
+        return table
+
+    def read_xy(self, dataset, spatial_reference=None):
+        reader = self._shapefile(dataset)
+        if reader is not None:
+            x, y = reader.centroids()
+            if spatial_reference is not None:
+                if reader.crs is None:
+                    raise ValueError(f"No .prj for {self._path(dataset)}; cannot project to {spatial_reference}")
+                x, y = transform_xy(x, y, reader.crs, spatial_reference)
+            return np.arange(1, len(x) + 1), x, y
+        frame = self._load(dataset)
+        ids = frame.index.to_numpy() + 1
+        if gpd is not None and isinstance(frame, gpd.GeoDataFrame):
+            if spatial_reference is not None:
+                frame = frame.to_crs(spatial_reference)
+            points = frame.geometry.centroid
+            return ids, points.x.to_numpy(), points.y.to_numpy()
+        for x_field, y_field in XY_FIELD_PAIRS:
+            if x_field in frame.columns and y_field in frame.columns:
+                return ids, frame[x_field].to_numpy(dtype=float), frame[y_field].to_numpy(dtype=float)
+        raise ValueError(f"No geometry or X/Y columns in {self._path(dataset)}")
+
+    def extend_table(self, dataset, array, key_field):
+        frame = self._load(dataset)
+        rows = np.asarray(array[key_field], dtype=np.int64) - 1
+        for name in array.dtype.names:
+            if name == key_field:
+                continue
+            # Records missing from the array get nulls, as with ExtendTable
+            frame[name] = pd.Series(array[name], index=rows).reindex(frame.index)
+        self._save(frame, dataset)
+
+    def copy(self, source, target):
+        source_path, target_path = self._path(source), self._path(target)
+        same_format = (os.path.splitext(source_path)[1].lower() == os.path.splitext(target_path)[1].lower())
+        if same_format and os.path.isfile(source_path) and not source_path.lower().endswith('.shp'):
+            shutil.copyfile(source_path, target_path)
+        else:
+            self._save(self._load(source), target)
+        return target
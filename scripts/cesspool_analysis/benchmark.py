@@ -0,0 +1,354 @@
+"""
+Analysis Phase Benchmark Suite
+University of Hawaii Water Resources Research Center
+
+Times each analysis phase on a seeded synthetic statewide dataset (see
+synthetic.py) so performance changes can be compared commit to commit
+without the project geodatabase or ArcGIS Pro:
+
+    join                bedrooms CSV -> parcels TMK join
+    filter              residential parcel filter
+    parcel_assignment   cesspool point-in-parcel assignment
+    reprojection        parcel vertices UTM 4N -> Hawaii State Plane zone 3 (pyproj)
+    well_distances      nearest municipal/domestic well distances
+    har_classification  HAR 11-62 soil classification
+    sizing              wastewater flow, septic tank volume, lot-size category
+    scoring             upgrade priority score, island and per-island top parcels
+    matrix_sieve        technology matrix screening (when the Matrix workbook exists)
+    technology_ranking  per-parcel top-N technologies and island cost roll-up
+    summaries           summary cube and its island / bedroom / priority roll-ups
+    export              CSV export of the analysis table
+
+Each run appends one JSON line (commit, scale, seed, environment and best
+seconds per phase) to a history file, and --compare prints the run next to
+the previous one (or a given commit).
+
+Usage (from the scripts folder):
+    python -m cesspool_analysis.benchmark --scale 0.25 --repeat 3 --compare
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .coordinate_transform import COUNTY_WKIDS, HCPT_TARGET_EPSG, transform_coordinates
+from .har_classification import classify_soil_arrays
+from .matrix_sieve import (
+    DEFAULT_MATRIX_FILE, load_compiled_matrix, site_condition_flags, encode_conditions, sieve
+)
+from .parcel_index import ParcelIndex
+from .priority_kernel import priority_scores, top_k_by_group
+from .sizing_kernel import size_systems
+from .streaming_export import export_rows
+from .summary_cube import SummaryCube
+from .synthetic import DEFAULT_SEED, generate_dataset
+from .technology_ranking import cost_rollup, load_technology_database, rank_technologies, site_difficulty
+from .tmk_codec import island_names
+from .tmk_join import multi_join
+from .well_distance import WellIndex, compute_well_distances
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_HISTORY_FILE = os.path.join(PROJECT_ROOT, "validation", "benchmarks", "benchmark_history.jsonl")
+
+# Analysis rules (hawaii_cesspool_analysis.Config defaults)
+GALLONS_PER_BEDROOM = 200
+MIN_BEDROOMS = 1
+MAX_BEDROOMS = 20
+MIN_ACRES = 0.1
+TOP_K = 500  # Parcels ranked per island (priority_top_k)
+
+# ============================================================================
+# PHASES
+# ============================================================================
+
+def phase_join(state):
+    data = state['data']
+    columns, stats = multi_join(data.parcels['TMK'].to_numpy(),
+                                [("bedrooms", data.bedrooms, "TMK", ["BED_ROOMS"])])
+    state['bedrooms'] = columns['BED_ROOMS'].astype(float)
+    return stats[0].matched
+
+def phase_filter(state):
+    bedrooms = state['bedrooms']
+    acres = state['data'].parcels['ACRES'].to_numpy()
+    keep = ((bedrooms >= MIN_BEDROOMS) & (bedrooms <= MAX_BEDROOMS)
+            & ((acres >= MIN_ACRES) | np.isnan(acres)))
+    state['keep'] = keep
+    return int(keep.sum())
+
+def phase_parcel_assignment(state):
+    data = state['data']
+    index = ParcelIndex(data.parcel_coords, data.parcel_ring_offsets,
+                        data.parcel_polygon_ring_offsets, data.parcels['TMK'].to_numpy())
+    assignment = index.query_points(data.cesspools['X'].to_numpy(), data.cesspools['Y'].to_numpy())
+    return int((assignment.hit_count > 0).sum())
+
+def phase_reprojection(state):
+    coords = state['data'].parcel_coords
+    transform_coordinates(coords, HCPT_TARGET_EPSG, COUNTY_WKIDS['Honolulu'])
+    return len(coords)
+
+def phase_well_distances(state):
+    data = state['data']
+    parcels = data.parcels
+    x = (parcels['XMIN'].to_numpy() + parcels['XMAX'].to_numpy()) / 2
+    y = (parcels['YMIN'].to_numpy() + parcels['YMAX'].to_numpy()) / 2
+    wells = {
+        layer: WellIndex(frame['X'].to_numpy(), frame['Y'].to_numpy(), frame['WELL_ID'].to_numpy())
+        for layer, frame in [('municipal', data.municipal_wells), ('domestic', data.domestic_wells)]
+    }
+    columns = compute_well_distances(x, y, wells, k=1, feet_per_unit=3.28084)
+    return len(next(iter(columns.values())))
+
+def phase_har_classification(state):
+    soils = state['data'].soils
+    results = classify_soil_arrays(soils['slope_r'].to_numpy(), soils['ksat_r'].to_numpy(),
+                                   soils['drainagecl'].to_numpy())
+    state['soil_results'] = results
+    return len(results['HAR_SLOPE_CLASS'])
+
+def phase_sizing(state):
+    keep = state['keep']
+    bedrooms = state['bedrooms'][keep]
+    acres = state['data'].parcels['ACRES'].to_numpy()[keep]
+
+    state['sizing'] = size_systems(bedrooms, acres=acres, gallons_per_bedroom=GALLONS_PER_BEDROOM)
+    return len(bedrooms)
+
+def phase_scoring(state):
+    keep = state['keep']
+    bedrooms = state['bedrooms'][keep]
+    lot_size = state['sizing']['LOT_SIZE_SF']
+
+    score = priority_scores({'BED_ROOMS': bedrooms, 'LOT_SIZE_SF': lot_size})
+    islands = island_names(state['data'].parcels['TMK'].to_numpy()[keep])
+    state['top_parcels'] = top_k_by_group(score, islands, TOP_K)
+    state['scoring'] = {'PRIORITY_SCORE': score, 'ISLAND': islands}
+    return len(score)
+
+def phase_matrix_sieve(state):
+    matrix = state.get('matrix')
+    if matrix is None:
+        return None
+    lot_size = state['sizing']['LOT_SIZE_SF']
+    flags = site_condition_flags(matrix, len(lot_size), lot_size_sf=lot_size)
+    suitable = sieve(matrix, encode_conditions(matrix, flags))
+    state['suitable_bits'] = suitable
+    return int(suitable.shape[0])
+
+def phase_technology_ranking(state):
+    if state.get('suitable_bits') is None or state.get('technologies') is None:
+        return None
+    keep = state['keep']
+    lot_size = state['sizing']['LOT_SIZE_SF']
+    ranking = rank_technologies(state['matrix'], state['suitable_bits'], state['technologies'],
+                                state['bedrooms'][keep], site_difficulty(len(lot_size), lot_size_sf=lot_size))
+    cost_rollup(ranking, state['scoring']['ISLAND'])
+    return len(ranking.index)
+
+def _analysis_frame(state):
+    keep = state['keep']
+    frame = pd.DataFrame({'TMK': state['data'].parcels['TMK'].to_numpy()[keep],
+                          'BED_ROOMS': state['bedrooms'][keep]})
+    for columns in (state['sizing'], state['scoring']):
+        for field, values in columns.items():
+            frame[field] = values
+    return frame
+
+def phase_summaries(state):
+    frame = _analysis_frame(state)
+    cube = SummaryCube.from_columns(frame)
+    tables = [cube.rollup('ISLAND'), cube.rollup('BED_ROOMS'),
+              cube.rollup('PRIORITY_SCORE'), cube.rollup('LOT_SIZE_CAT')]
+    state['frame'] = frame
+    return sum(len(table) for table in tables)
+
+def phase_export(state):
+    frame = state['frame']
+    fields = list(frame.columns)
+    with tempfile.TemporaryDirectory() as folder:
+        stats = export_rows(frame.itertuples(index=False, name=None),
+                            os.path.join(folder, "benchmark_export.csv"), fields)
+    return stats.rows
+
+PHASES = [
+    ('join', phase_join),
+    ('filter', phase_filter),
+    ('parcel_assignment', phase_parcel_assignment),
+    ('reprojection', phase_reprojection),
+    ('well_distances', phase_well_distances),
+    ('har_classification', phase_har_classification),
+    ('sizing', phase_sizing),
+    ('scoring', phase_scoring),
+    ('matrix_sieve', phase_matrix_sieve),
+    ('technology_ranking', phase_technology_ranking),
+    ('summaries', phase_summaries),
+    ('export', phase_export),
+]
+
+# ============================================================================
+# RUNNER
+# ============================================================================
+
+def _git(*args):
+    try:
+        result = subprocess.run(['git'] + list(args), cwd=PROJECT_ROOT, capture_output=True,
+                                text=True, timeout=30)
+        return result.stdout.strip() if result.returncode == 0 else None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def environment_info():
+    """Commit and machine details stored with every run"""
+    return {
+        'commit': _git('rev-parse', '--short', 'HEAD'),
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+def run_benchmark(scale=0.1, seed=DEFAULT_SEED, repeat=1, phases=None, matrix_file=None):
+    """
+    Generate a synthetic dataset and time every phase
+
+    Each phase runs repeat times on the same inputs; the best time is kept.
+    Phases run in order because later ones use earlier results.
+
+    Args:
+        scale (float): Synthetic dataset scale (1.0 = statewide)
+        seed (int): Synthetic dataset seed
+        repeat (int): Timings per phase
+        phases (list): Phase names to report (default: all)
+        matrix_file (str): Technology matrix workbook (default: Matrix folder)
+
+    Returns:
+        dict: Run record (environment, dataset counts, seconds and rows per phase)
+    """
+    started = time.perf_counter()
+    data = generate_dataset(scale, seed)
+    generate_seconds = time.perf_counter() - started
+
+    state = {'data': data}
+    matrix_file = matrix_file or DEFAULT_MATRIX_FILE
+    if os.path.exists(matrix_file):
+        state['matrix'] = load_compiled_matrix(matrix_file)
+        state['technologies'] = load_technology_database()
+
+    selected = set(phases or [name for name, _ in PHASES])
+    timings, rows = {}, {}
+    for name, phase in PHASES:
+        best = None
+        for _ in range(max(1, repeat)):
+            phase_start = time.perf_counter()
+            count = phase(state)
+            elapsed = time.perf_counter() - phase_start
+            best = elapsed if best is None else min(best, elapsed)
+        if count is None:
+            continue   # Phase skipped (missing optional input)
+        if name in selected:
+            timings[name] = round(best, 4)
+            rows[name] = count
+
+    record = {'timestamp': datetime.now().isoformat(timespec='seconds')}
+    record.update(environment_info())
+    record.update({
+        'scale': scale,
+        'seed': seed,
+        'repeat': repeat,
+        'dataset': data.summary(),
+        'generate_seconds': round(generate_seconds, 4),
+        'seconds': timings,
+        'rows': rows,
+        'total_seconds': round(sum(timings.values()), 4),
+    })
+    return record
+
+# ============================================================================
+# HISTORY AND COMPARISON
+# ============================================================================
+
+def append_history(record, history_file=DEFAULT_HISTORY_FILE):
+    os.makedirs(os.path.dirname(os.path.abspath(history_file)), exist_ok=True)
+    with open(history_file, 'a') as f:
+        f.write(json.dumps(record, sort_keys=True) + "\n")
+
+def load_history(history_file=DEFAULT_HISTORY_FILE):
+    if not os.path.exists(history_file):
+        return []
+    with open(history_file, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def find_baseline(history, record, commit=None):
+    """Latest earlier run with the same scale and seed (optionally at a commit)"""
+    for previous in reversed(history):
+        if previous is record or previous.get('timestamp') == record.get('timestamp'):
+            continue
+        if previous.get('scale') != record['scale'] or previous.get('seed') != record['seed']:
+            continue
+        if commit and not str(previous.get('commit') or '').startswith(commit):
+            continue
+        return previous
+    return None
+
+def print_report(record, baseline=None):
+    dataset = record['dataset']
+    commit = record.get('commit') or 'unknown'
+    print(f"BENCHMARK  commit {commit}{' (dirty)' if record.get('dirty') else ''}  "
+          f"scale {record['scale']}  seed {record['seed']}")
+    print(f"  {dataset['parcels']:,} parcels, {dataset['cesspools']:,} cesspools, "
+          f"{dataset['soil_units']:,} soil units (generated in {record['generate_seconds']:.2f} s)")
+    if baseline:
+        print(f"  Compared with commit {baseline.get('commit') or 'unknown'} ({baseline['timestamp']})")
+    print("-" * 60)
+
+    for name, seconds in record['seconds'].items():
+        line = f"  {name:<20} {seconds:>9.4f} s  {record['rows'][name]:>10,} rows"
+        before = (baseline or {}).get('seconds', {}).get(name)
+        if before:
+            line += f"  {before / seconds if seconds else float('inf'):>6.2f}x vs {before:.4f} s"
+        print(line)
+    print("-" * 60)
+    print(f"  {'total':<20} {record['total_seconds']:>9.4f} s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time analysis phases on synthetic statewide data")
+    parser.add_argument('--scale', type=float, default=0.1, help="1.0 = statewide (default 0.1)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--repeat', type=int, default=1, help="Timings per phase (best is kept)")
+    parser.add_argument('--phases', nargs='+', choices=[name for name, _ in PHASES])
+    parser.add_argument('--history', default=DEFAULT_HISTORY_FILE, help="JSON-lines history file")
+    parser.add_argument('--no-record', action='store_true', help="Do not append to the history")
+    parser.add_argument('--compare', nargs='?', const='', metavar='COMMIT',
+                        help="Compare with the previous run (or the latest run at COMMIT)")
+    args = parser.parse_args(argv)
+
+    record = run_benchmark(args.scale, args.seed, args.repeat, args.phases)
+    history = load_history(args.history)
+    baseline = find_baseline(history, record, args.compare) if args.compare is not None else None
+    print_report(record, baseline)
+    if args.compare and baseline is None:
+        print(f"⚠️ No earlier run at commit {args.compare} with this scale and seed")
+
+    if not args.no_record:
+        append_history(record, args.history)
+        print(f"✅ Recorded in {args.history}")
+    return record
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
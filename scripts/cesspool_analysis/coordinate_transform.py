@@ -0,0 +1,197 @@
+"""
+Vectorized Coordinate Transformation Backend
+University of Hawaii Water Resources Research Center
+
+ArcGIS-free reprojection with pyproj. Geometries are handled as flat
+coordinate arrays: shapely.transform hands every vertex of a geometry array
+to one pyproj call and rebuilds the geometries in C, so no per-vertex
+Python objects are created. Transformers are built once per (source CRS,
+target CRS) pair and cached for the life of the process.
+
+Also holds the project's CRS table (HCPT target and county State Plane
+zones) so scripts stop hard-coding WKIDs.
+"""
+
+import functools
+
+import numpy as np
+
+try:
+    import pyproj
+except ImportError:  # pragma: no cover - raised with a hint on first use
+    pyproj = None
+
+try:
+    import shapely
+except ImportError:  # pragma: no cover - raised with a hint on first use
+    shapely = None
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+# HCPT standard: UTM Zone 4N (State GIS Program layers)
+HCPT_TARGET_EPSG = 26904
+
+# CRSs accepted as already in the target. State GIS .prj files name the HARN
+# realization (NAD_1983_HARN_UTM_Zone_4N = EPSG:3750), which the project
+# has always treated as the HCPT standard.
+TARGET_EQUIVALENTS = {
+    HCPT_TARGET_EPSG: (HCPT_TARGET_EPSG, 3750),
+}
+
+# Minimum pyproj match confidence for identifying a CRS by EPSG code
+EPSG_MIN_CONFIDENCE = 70
+
+# County State Plane zones (Esri WKIDs, NAD 1983 US feet): Hawaii zone 1
+# (Hawaii Island), zone 2 (Maui County), zone 3 (Oahu), zone 4 (Kauai)
+COUNTY_WKIDS = {
+    'Hawaii': 102661,
+    'Maui': 102662,
+    'Honolulu': 102663,
+    'Kauai': 102664,
+}
+
+# ============================================================================
+# CRS AND TRANSFORMERS
+# ============================================================================
+
+def _require_pyproj():
+    if pyproj is None:
+        raise ImportError("pyproj is required for the coordinate transformation backend. "
+                          "Install with: pip install pyproj")
+
+def _require_shapely():
+    if shapely is None:
+        raise ImportError("shapely>=2.0 is required to transform geometries. Install with: pip install shapely")
+
+@functools.lru_cache(maxsize=None)
+def _crs_from_code(code):
+    """EPSG code, else Esri WKID (ArcGIS factory codes use both registries)"""
+    for authority in ('EPSG', 'ESRI'):
+        try:
+            return pyproj.CRS.from_authority(authority, code)
+        except pyproj.exceptions.CRSError:
+            continue
+    raise ValueError(f"Unknown coordinate system code: {code}")
+
+def to_crs(crs):
+    """
+    pyproj CRS from a WKID/EPSG code, 'EPSG:n' / 'ESRI:n' string, WKT or CRS
+
+    Returns:
+        pyproj.CRS
+    """
+    _require_pyproj()
+    if isinstance(crs, pyproj.CRS):
+        return crs
+    if isinstance(crs, (int, np.integer)):
+        return _crs_from_code(str(int(crs)))
+    if isinstance(crs, str) and crs.strip().isdigit():
+        return _crs_from_code(crs.strip())
+    return pyproj.CRS.from_user_input(crs)
+
+def _crs_key(crs):
+    """Hashable cache key for a CRS given in any form to_crs accepts"""
+    if isinstance(crs, (int, np.integer)):
+        return int(crs)
+    if pyproj is not None and isinstance(crs, pyproj.CRS):
+        return crs.to_wkt()
+    return str(crs)
+
+@functools.lru_cache(maxsize=64)
+def _cached_transformer(source_key, target_key):
+    return pyproj.Transformer.from_crs(to_crs(source_key), to_crs(target_key), always_xy=True)
+
+def get_transformer(source_crs, target_crs=HCPT_TARGET_EPSG):
+    """
+    Transformer for a CRS pair, built once per process
+
+    Axis order is always x/easting, y/northing (longitude, latitude).
+    """
+    _require_pyproj()
+    return _cached_transformer(_crs_key(source_crs), _crs_key(target_crs))
+
+def same_crs(source_crs, target_crs):
+    """True when no transformation is needed"""
+    return to_crs(source_crs) == to_crs(target_crs)
+
+def accepted_epsg(target_epsg=HCPT_TARGET_EPSG):
+    """EPSG codes accepted as already in the target CRS (see TARGET_EQUIVALENTS)"""
+    return TARGET_EQUIVALENTS.get(target_epsg, (target_epsg,))
+
+def is_target_crs(crs, target_epsg=HCPT_TARGET_EPSG):
+    """True when a CRS (any form to_crs accepts) is the target or an accepted equivalent"""
+    return to_crs(crs).to_epsg(min_confidence=EPSG_MIN_CONFIDENCE) in accepted_epsg(target_epsg)
+
+# ============================================================================
+# COORDINATE ARRAYS
+# ============================================================================
+
+def transform_xy(x, y, source_crs, target_crs=HCPT_TARGET_EPSG):
+    """
+    Transform coordinate arrays in one call
+
+    Returns:
+        tuple: (x, y) float64 arrays in the target CRS
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    return get_transformer(source_crs, target_crs).transform(x, y)
+
+def transform_coordinates(coords, source_crs, target_crs=HCPT_TARGET_EPSG):
+    """
+    Transform an (N, 2) or (N, 3) coordinate array (z is kept as is)
+
+    Returns:
+        numpy.ndarray: New float64 array of the same shape
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    result = coords.copy()
+    if len(coords):
+        result[:, 0], result[:, 1] = transform_xy(coords[:, 0], coords[:, 1], source_crs, target_crs)
+    return result
+
+# ============================================================================
+# GEOMETRIES
+# ============================================================================
+
+def transform_geometries(geometries, source_crs, target_crs=HCPT_TARGET_EPSG):
+    """
+    Reproject a shapely geometry array
+
+    All vertices go through a single transformer call; the geometries are
+    rebuilt from the transformed flat coordinate array.
+
+    Args:
+        geometries (array-like): shapely geometries (None allowed)
+        source_crs, target_crs: Anything to_crs accepts
+
+    Returns:
+        numpy.ndarray: New object array of shapely geometries
+    """
+    _require_shapely()
+    geometries = np.asarray(geometries, dtype=object)
+    transformer = get_transformer(source_crs, target_crs)
+
+    def project(coords):
+        x, y = transformer.transform(coords[:, 0], coords[:, 1])
+        return np.column_stack([x, y])
+
+    return shapely.transform(geometries, project)
+
+def transform_wkb(wkb_values, source_crs, target_crs=HCPT_TARGET_EPSG):
+    """
+    Reproject WKB geometries (e.g. a SHAPE@WKB cursor column)
+
+    Returns:
+        numpy.ndarray: WKB bytes per input (None stays None)
+    """
+    _require_shapely()
+    geometries = shapely.from_wkb(np.asarray(wkb_values, dtype=object))
+    return shapely.to_wkb(transform_geometries(geometries, source_crs, target_crs))
+
+def vertex_count(geometries):
+    """Total vertices in a geometry array"""
+    _require_shapely()
+    return int(shapely.get_num_coordinates(np.asarray(geometries, dtype=object)).sum())
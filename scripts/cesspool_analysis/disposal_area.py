@@ -0,0 +1,303 @@
+"""
+Available Disposal Area Engine
+University of Hawaii Water Resources Research Center
+
+Computes the area left for an onsite wastewater system on every parcel
+after the HAR 11-62-32 setbacks (Table II), with vectorized shapely 2
+geometry operations in parallel parcel chunks:
+
+    1. Each constraint layer (buildings, wells, shoreline, surface water)
+       gets an STR-tree; one bulk 'dwithin' query per layer finds the
+       features within setback distance of each parcel
+    2. The parcel is shrunk by the property-line setback, then the buffered
+       constraint features of each layer are removed with one element-wise
+       difference per layer
+    3. The largest contiguous usable rectangle is found on a grid aligned
+       with the parcel's orientation: the usable area is rasterized with
+       the scanline rasterizer and a batched maximal-rectangle search runs
+       over all parcels of a chunk at once
+
+Outputs (AVAILABLE_AREA and the rectangle fields) are in square feet / feet;
+coordinates can be in any projected unit (feet_per_unit converts). The
+rectangle is measured to within one grid cell (parcel extent / resolution).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    import shapely
+except ImportError:  # pragma: no cover - raised with a hint on first use
+    shapely = None
+
+from .har_standards import SETBACK_DISTANCES
+from .rasterize import polygon_spans, span_pixels
+from .well_distance import FEET_PER_METER
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+# Constraint layer -> setback in feet (HAR 11-62-32, Table II)
+SETBACK_LAYERS = {
+    'buildings': SETBACK_DISTANCES['BUILDINGS'],
+    'public_wells': SETBACK_DISTANCES['PUBLIC_WELLS'],
+    'private_wells': SETBACK_DISTANCES['PRIVATE_WELLS'],
+    'shoreline': SETBACK_DISTANCES['SHORELINE'],
+    'surface_water': SETBACK_DISTANCES['SURFACE_WATER'],
+}
+PROPERTY_LINE_SETBACK_FT = SETBACK_DISTANCES['PROPERTY_LINES']
+
+DEFAULT_CHUNK_SIZE = 2000         # Parcels per worker task
+RECTANGLE_RESOLUTION = 64         # Grid cells along the longer side of a parcel
+
+# Output field names
+AREA_FIELDS = ['AVAILABLE_AREA', 'RECT_LENGTH_FT', 'RECT_WIDTH_FT', 'RECT_AREA_SF']
+
+# ============================================================================
+# GEOMETRY INPUT
+# ============================================================================
+
+def _require_shapely():
+    if shapely is None:
+        raise ImportError("shapely>=2.0 is required for the disposal area engine. "
+                          "Install with: pip install shapely")
+
+def geometries_from_geo_interface(geometries):
+    """
+    shapely geometry array from __geo_interface__ objects or GeoJSON dicts
+
+    Works with arcpy geometries from a SHAPE@ cursor; None becomes an empty
+    polygon so the array stays aligned with the source records.
+    """
+    _require_shapely()
+    from shapely.geometry import shape
+
+    empty = shapely.from_wkt("POLYGON EMPTY")
+    result = np.empty(len(geometries), dtype=object)
+    for i, geometry in enumerate(geometries):
+        mapping = getattr(geometry, '__geo_interface__', geometry)
+        result[i] = shape(mapping) if mapping else empty
+    return result
+
+def setback_pairs(parcels, features, distance):
+    """
+    (parcel, feature) index pairs for features within distance of a parcel
+
+    Args:
+        parcels (numpy.ndarray): shapely parcel polygons
+        features (numpy.ndarray): shapely constraint features
+        distance (float): Setback in coordinate units
+
+    Returns:
+        tuple: (parcel_index, feature_index) arrays sorted by parcel
+    """
+    _require_shapely()
+    if len(features) == 0 or len(parcels) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    tree = shapely.STRtree(features)
+    parcel_index, feature_index = tree.query(parcels, predicate='dwithin', distance=distance)
+    order = np.argsort(parcel_index, kind='stable')
+    return parcel_index[order].astype(np.int64), feature_index[order].astype(np.int64)
+
+# ============================================================================
+# LARGEST USABLE RECTANGLE
+# ============================================================================
+
+def parcel_orientation(parcels):
+    """Angle (radians) of the first edge of each parcel's minimum rotated rectangle"""
+    envelopes = shapely.oriented_envelope(parcels)
+    coords, index = shapely.get_coordinates(envelopes, return_index=True)
+    angles = np.zeros(len(parcels))
+    if len(index) == 0:
+        # Every parcel is empty or None
+        return angles
+    first = np.searchsorted(index, np.arange(len(parcels)))
+    has_edge = (first + 1 < len(index)) & (index[np.minimum(first + 1, len(index) - 1)] == np.arange(len(parcels)))
+    start, end = first[has_edge], first[has_edge] + 1
+    angles[has_edge] = np.arctan2(coords[end, 1] - coords[start, 1], coords[end, 0] - coords[start, 0])
+    return angles
+
+def maximal_rectangles(mask):
+    """
+    Largest all-True axis-aligned rectangle in each of a stack of grids
+
+    Row-by-row height/left/right dynamic programme, vectorized over the
+    parcels and columns (np.maximum.accumulate finds the run boundaries).
+
+    Args:
+        mask (numpy.ndarray): (N, rows, cols) boolean grids
+
+    Returns:
+        tuple: (height, width) in cells of the largest rectangle per grid
+    """
+    n, n_rows, n_cols = mask.shape
+    columns = np.arange(n_cols, dtype=np.int32)
+    height = np.zeros((n, n_cols), dtype=np.int32)
+    left = np.zeros((n, n_cols), dtype=np.int32)
+    right = np.full((n, n_cols), n_cols, dtype=np.int32)
+    best_area = np.zeros(n, dtype=np.int64)
+    best_height = np.zeros(n, dtype=np.int64)
+    best_width = np.zeros(n, dtype=np.int64)
+    parcel = np.arange(n)
+
+    for row in range(n_rows):
+        cells = mask[:, row]
+        height = np.where(cells, height + 1, 0)
+        # Left edge: one past the last empty cell at or before each column
+        run_left = np.maximum.accumulate(np.where(cells, 0, columns + 1), axis=1)
+        left = np.where(cells, np.maximum(left, run_left), 0)
+        # Right edge: the first empty cell at or after each column
+        run_right = np.minimum.accumulate(np.where(cells, n_cols, columns)[:, ::-1], axis=1)[:, ::-1]
+        right = np.where(cells, np.minimum(right, run_right), n_cols)
+
+        area = height * (right - left)
+        column = area.argmax(axis=1)
+        row_best = area[parcel, column]
+        better = row_best > best_area
+        best_area[better] = row_best[better]
+        best_height[better] = height[parcel, column][better]
+        best_width[better] = (right - left)[parcel, column][better]
+    return best_height, best_width
+
+def largest_rectangles(polygons, angles, resolution=RECTANGLE_RESOLUTION):
+    """
+    Largest usable rectangle inside each polygon, aligned with angles
+
+    Args:
+        polygons (numpy.ndarray): shapely polygons (empty allowed)
+        angles (numpy.ndarray): Grid orientation per polygon (radians)
+        resolution (int): Grid cells along the longer side of each polygon
+
+    Returns:
+        tuple: (length, width) arrays in coordinate units (length >= width)
+    """
+    n = len(polygons)
+    length, width = np.zeros(n), np.zeros(n)
+    nonempty = np.flatnonzero(~shapely.is_empty(polygons) & (shapely.area(polygons) > 0))
+    if not len(nonempty):
+        return length, width
+
+    # Flat vertex buffers: all rings of a polygon's parts form one even-odd polygon
+    parts, part_polygon = shapely.get_parts(polygons[nonempty], return_index=True)
+    rings, ring_part = shapely.get_rings(parts, return_index=True)
+    coords, vertex_ring = shapely.get_coordinates(rings, return_index=True)
+    ring_offsets = np.zeros(len(rings) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(vertex_ring, minlength=len(rings)), out=ring_offsets[1:])
+    ring_polygon = part_polygon[ring_part]
+    polygon_ring_offsets = np.zeros(len(nonempty) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ring_polygon, minlength=len(nonempty)), out=polygon_ring_offsets[1:])
+
+    # Rotate into each parcel's frame and scale to grid cells
+    vertex_polygon = ring_polygon[vertex_ring]
+    theta = -angles[nonempty][vertex_polygon]
+    x = coords[:, 0] * np.cos(theta) - coords[:, 1] * np.sin(theta)
+    y = coords[:, 0] * np.sin(theta) + coords[:, 1] * np.cos(theta)
+    starts = ring_offsets[polygon_ring_offsets[:-1]]
+    x_min, y_min = np.minimum.reduceat(x, starts), np.minimum.reduceat(y, starts)
+    extent = np.maximum(np.maximum.reduceat(x, starts) - x_min, np.maximum.reduceat(y, starts) - y_min)
+    cell = np.maximum(extent / resolution, np.finfo(float).tiny)
+
+    # Stack the parcel grids vertically: parcel k owns rows k*R .. k*R + R - 1
+    m = len(nonempty)
+    grid_x = (x - x_min[vertex_polygon]) / cell[vertex_polygon]
+    grid_y = (y - y_min[vertex_polygon]) / cell[vertex_polygon] + (m - 1 - vertex_polygon) * resolution
+    spans = polygon_spans(np.column_stack([grid_x, grid_y]), ring_offsets, polygon_ring_offsets,
+                          0.0, float(m * resolution), 1.0, m * resolution, resolution)
+    _, pixels = span_pixels(*spans, resolution)
+    mask = np.zeros(m * resolution * resolution, dtype=bool)
+    mask[pixels] = True
+
+    rows, cols = maximal_rectangles(mask.reshape(m, resolution, resolution))
+    length[nonempty] = np.maximum(rows, cols) * cell
+    width[nonempty] = np.minimum(rows, cols) * cell
+    return length, width
+
+# ============================================================================
+# AVAILABLE AREA
+# ============================================================================
+
+def _available_chunk(task):
+    """
+    Usable area and largest rectangle for one chunk of parcels (runs in a worker)
+
+    Returns:
+        tuple: (area, length, width) in coordinate units
+    """
+    parcels, layers, property_setback, resolution = task
+    empty = shapely.from_wkt("POLYGON EMPTY")
+
+    usable = shapely.buffer(parcels, -property_setback) if property_setback > 0 else parcels
+    for parcel_index, features, setback in layers:
+        if not len(parcel_index):
+            continue
+        # One collection per affected parcel, buffered once (buffering unions overlaps)
+        affected, collection_index = np.unique(parcel_index, return_inverse=True)
+        zones = shapely.buffer(shapely.geometrycollections(features, indices=collection_index), setback)
+        exclusion = np.full(len(parcels), empty, dtype=object)
+        exclusion[affected] = zones
+        usable = shapely.difference(usable, exclusion)
+
+    length, width = largest_rectangles(usable, parcel_orientation(parcels), resolution)
+    return shapely.area(usable), length, width
+
+def compute_available_area(parcels, constraints, feet_per_unit=FEET_PER_METER,
+                           property_setback_ft=PROPERTY_LINE_SETBACK_FT, chunk_size=DEFAULT_CHUNK_SIZE,
+                           resolution=RECTANGLE_RESOLUTION, max_workers=None):
+    """
+    Available disposal area after setbacks for every parcel
+
+    Args:
+        parcels (numpy.ndarray): shapely parcel polygons
+        constraints (dict): Layer name -> geometries, or -> (geometries,
+            setback_ft); bare geometries use SETBACK_LAYERS[name]
+        feet_per_unit (float): Feet per coordinate unit (FEET_PER_METER for UTM)
+        property_setback_ft (float): Inward setback from the parcel boundary
+        chunk_size (int): Parcels per worker task
+        resolution (int): Rectangle grid cells along the longer parcel side
+        max_workers (int): Worker processes (default: CPU count; 1 = in process)
+
+    Returns:
+        dict: AREA_FIELDS name -> array (square feet / feet)
+    """
+    _require_shapely()
+    parcels = np.asarray(parcels, dtype=object)
+    n = len(parcels)
+
+    # One bulk STR-tree query per constraint layer
+    layers = []
+    for name, layer in constraints.items():
+        features, setback_ft = layer if isinstance(layer, tuple) else (layer, SETBACK_LAYERS[name])
+        features = np.asarray(features, dtype=object)
+        setback = setback_ft / feet_per_unit
+        parcel_index, feature_index = setback_pairs(parcels, features, setback)
+        layers.append((parcel_index, features, feature_index, setback))
+
+    def tasks():
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            chunk_layers = []
+            for parcel_index, features, feature_index, setback in layers:
+                lo, hi = np.searchsorted(parcel_index, [start, stop])
+                chunk_layers.append((parcel_index[lo:hi] - start, features[feature_index[lo:hi]], setback))
+            yield (parcels[start:stop], chunk_layers, property_setback_ft / feet_per_unit, resolution)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers <= 1 or n <= chunk_size:
+        results = [_available_chunk(task) for task in tasks()]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_available_chunk, tasks()))
+
+    area = np.concatenate([r[0] for r in results]) if results else np.zeros(0)
+    length = np.concatenate([r[1] for r in results]) if results else np.zeros(0)
+    width = np.concatenate([r[2] for r in results]) if results else np.zeros(0)
+    square_feet = feet_per_unit ** 2
+    return {
+        'AVAILABLE_AREA': area * square_feet,
+        'RECT_LENGTH_FT': length * feet_per_unit,
+        'RECT_WIDTH_FT': width * feet_per_unit,
+        'RECT_AREA_SF': length * width * square_feet,
+    }
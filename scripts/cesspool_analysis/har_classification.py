@@ -0,0 +1,228 @@
+"""
+Vectorized HAR 11-62 Soil Classification Engine
+University of Hawaii Water Resources Research Center
+
+Classifies whole columns of NRCS soil attributes (slope_r, ksat_r,
+drainagecl) in a few array passes instead of walking an UpdateCursor.
+The three class codes (slope x percolation x drainage) only have 80
+combinations, so technology compatibility and limiting factors are
+looked up from tables built once from the scalar rules in har_standards.
+"""
+
+import itertools
+
+import numpy as np
+
+from .har_standards import (
+    VALID_CLASSIFICATIONS, SLOPE_THRESHOLDS, PERCOLATION_LIMITS,
+    KSAT_TO_PERC_FACTOR, classify_drainage_har,
+    check_septic_compatibility, check_atu_compatibility,
+    check_seepage_pit_compatibility
+)
+
+# ============================================================================
+# OUTPUT SCHEMA
+# ============================================================================
+
+SLOPE_CLASSES = VALID_CLASSIFICATIONS['SLOPE_CLASSES']
+PERCOLATION_CLASSES = VALID_CLASSIFICATIONS['PERCOLATION_CLASSES']
+DRAINAGE_CLASSES = VALID_CLASSIFICATIONS['DRAINAGE_CLASSES']
+
+# (field name, ArcGIS type, length) - same schema as process_soil_har_classifications
+HAR_OUTPUT_FIELDS = [
+    ("HAR_SLOPE_CLASS", "TEXT", 15),
+    ("HAR_PERC_CLASS", "TEXT", 20),
+    ("HAR_DRAINAGE_CLASS", "TEXT", 20),
+    ("PERC_RATE_EST", "DOUBLE", None),
+    ("MATRIX_SEPTIC_OK", "SHORT", None),
+    ("MATRIX_ATU_OK", "SHORT", None),
+    ("MATRIX_SEEPAGE_PIT_OK", "SHORT", None),
+    ("LIMITING_FACTORS", "TEXT", 200)
+]
+
+_NUMPY_TYPES = {"DOUBLE": "<f8", "SHORT": "<i2"}
+
+# ============================================================================
+# COLUMN ENCODERS
+# ============================================================================
+
+def encode_slope_classes(slope_r):
+    """
+    Encode slope percent values as indexes into SLOPE_CLASSES
+
+    Args:
+        slope_r (array-like): Slope percent; None/NaN means unknown
+
+    Returns:
+        numpy.ndarray: int8 class codes
+    """
+    slope = np.asarray(slope_r, dtype=float)
+    codes = ((slope >= SLOPE_THRESHOLDS['ABSORPTION_BEDS']).astype(np.int8)
+             + (slope > SLOPE_THRESHOLDS['ABSORPTION_TRENCHES']))
+    codes[np.isnan(slope)] = SLOPE_CLASSES.index('Unknown')
+    return codes
+
+def ksat_to_percolation_rates(ksat_r):
+    """
+    Convert Ksat (micrometers/second) to percolation rate (minutes/inch)
+
+    Returns:
+        numpy.ndarray: float64 rates rounded to 0.01, NaN where Ksat is missing or <= 0
+    """
+    ksat = np.asarray(ksat_r, dtype=float)
+    rates = np.full(ksat.shape, np.nan)
+    valid = ksat > 0
+    rates[valid] = np.round(KSAT_TO_PERC_FACTOR / ksat[valid], 2)
+    return rates
+
+def encode_percolation_classes(perc_rate):
+    """Encode percolation rates as indexes into PERCOLATION_CLASSES"""
+    rate = np.asarray(perc_rate, dtype=float)
+    codes = ((rate >= PERCOLATION_LIMITS['TOO_FAST']).astype(np.int8)
+             + (rate > PERCOLATION_LIMITS['SEEPAGE_PITS_MAX'])
+             + (rate > PERCOLATION_LIMITS['TRENCHES_BEDS_MAX']))
+    codes[np.isnan(rate)] = PERCOLATION_CLASSES.index('Unknown')
+    return codes
+
+def encode_drainage_classes(drainagecl):
+    """
+    Encode NRCS drainage classes as indexes into DRAINAGE_CLASSES
+
+    Only the distinct drainagecl strings (a dozen or so statewide) go
+    through the dictionary lookup; rows are mapped back with the inverse index.
+    """
+    values = np.asarray(drainagecl).astype(str)
+    unique_values, inverse = np.unique(values, return_inverse=True)
+    unique_codes = np.array(
+        [DRAINAGE_CLASSES.index(classify_drainage_har(v)) for v in unique_values],
+        dtype=np.int8
+    )
+    return unique_codes[inverse.reshape(values.shape)]
+
+# ============================================================================
+# COMPATIBILITY LOOKUP TABLES
+# ============================================================================
+
+_LOOKUP_TABLES = None
+
+def build_compatibility_tables():
+    """
+    Evaluate the scalar compatibility rules for every class combination
+
+    Returns:
+        dict: 'septic', 'atu', 'seepage_pit' int16 tables and a
+              'limiting_factors' string table, all shaped
+              (slope classes, percolation classes, drainage classes)
+    """
+    global _LOOKUP_TABLES
+    if _LOOKUP_TABLES is not None:
+        return _LOOKUP_TABLES
+
+    shape = (len(SLOPE_CLASSES), len(PERCOLATION_CLASSES), len(DRAINAGE_CLASSES))
+    tables = {
+        'septic': np.zeros(shape, dtype=np.int16),
+        'atu': np.zeros(shape, dtype=np.int16),
+        'seepage_pit': np.zeros(shape, dtype=np.int16),
+        'limiting_factors': np.empty(shape, dtype='U200')
+    }
+
+    for s, p, d in itertools.product(*(range(n) for n in shape)):
+        classes = (SLOPE_CLASSES[s], PERCOLATION_CLASSES[p], DRAINAGE_CLASSES[d])
+        septic_ok, septic_limits = check_septic_compatibility(*classes)
+        atu_ok, atu_limits = check_atu_compatibility(*classes)
+        seepage_ok, seepage_limits = check_seepage_pit_compatibility(*classes)
+
+        tables['septic'][s, p, d] = 1 if septic_ok else 0
+        tables['atu'][s, p, d] = 1 if atu_ok else 0
+        tables['seepage_pit'][s, p, d] = 1 if seepage_ok else 0
+
+        # Combine limiting factors, keeping first-seen order
+        all_limits = list(dict.fromkeys(septic_limits + atu_limits + seepage_limits))
+        tables['limiting_factors'][s, p, d] = '; '.join(all_limits) if all_limits else 'Suitable'
+
+    _LOOKUP_TABLES = tables
+    return tables
+
+# ============================================================================
+# CLASSIFICATION ENTRY POINTS
+# ============================================================================
+
+def classify_soil_arrays(slope_r, ksat_r, drainagecl):
+    """
+    Compute every HAR_* and MATRIX_*_OK output for whole soil columns
+
+    Args:
+        slope_r (array-like): Slope percent per soil polygon
+        ksat_r (array-like): Ksat (micrometers/second) per soil polygon
+        drainagecl (array-like): NRCS drainage class strings
+
+    Returns:
+        dict: Output field name -> numpy array, keyed by HAR_OUTPUT_FIELDS names
+    """
+    tables = build_compatibility_tables()
+
+    slope_codes = encode_slope_classes(slope_r)
+    perc_rate = ksat_to_percolation_rates(ksat_r)
+    perc_codes = encode_percolation_classes(perc_rate)
+    drainage_codes = encode_drainage_classes(drainagecl)
+    combo = (slope_codes, perc_codes, drainage_codes)
+
+    return {
+        "HAR_SLOPE_CLASS": np.array(SLOPE_CLASSES, dtype='U15')[slope_codes],
+        "HAR_PERC_CLASS": np.array(PERCOLATION_CLASSES, dtype='U20')[perc_codes],
+        "HAR_DRAINAGE_CLASS": np.array(DRAINAGE_CLASSES, dtype='U20')[drainage_codes],
+        "PERC_RATE_EST": perc_rate,
+        "MATRIX_SEPTIC_OK": tables['septic'][combo],
+        "MATRIX_ATU_OK": tables['atu'][combo],
+        "MATRIX_SEEPAGE_PIT_OK": tables['seepage_pit'][combo],
+        "LIMITING_FACTORS": tables['limiting_factors'][combo]
+    }
+
+def classify_soil_frame(df, slope_field='slope_r', ksat_field='ksat_r', drainage_field='drainagecl'):
+    """
+    Classify a pandas DataFrame of soil records
+
+    Returns:
+        pandas.DataFrame: Copy of df with the HAR output columns added
+    """
+    results = classify_soil_arrays(df[slope_field].to_numpy(), df[ksat_field].to_numpy(),
+                                   df[drainage_field].to_numpy())
+    out = df.copy()
+    for field_name, values in results.items():
+        out[field_name] = values
+    return out
+
+def to_structured_array(results, oids, oid_field="SOIL_OID"):
+    """
+    Pack classification results into a structured array for a bulk write
+
+    The result can be handed to arcpy.da.ExtendTable keyed on ObjectID,
+    which adds and fills every HAR field in one operation.
+
+    Args:
+        results (dict): Output of classify_soil_arrays
+        oids (array-like): ObjectIDs in the same order as the input columns
+        oid_field (str): Name of the join key field in the structured array
+
+    Returns:
+        numpy.ndarray: Structured array with the key plus HAR_OUTPUT_FIELDS
+    """
+    dtype = [(oid_field, '<i4')]
+    for field_name, field_type, field_length in HAR_OUTPUT_FIELDS:
+        dtype.append((field_name, f'<U{field_length}' if field_type == "TEXT" else _NUMPY_TYPES[field_type]))
+
+    packed = np.empty(len(oids), dtype=dtype)
+    packed[oid_field] = oids
+    for field_name, _, _ in HAR_OUTPUT_FIELDS:
+        packed[field_name] = results[field_name]
+    return packed
+
+def summarize_classes(results):
+    """Count records per class for the HAR text fields (for console reports)"""
+    summary = {}
+    for field_name in ("HAR_SLOPE_CLASS", "HAR_PERC_CLASS", "HAR_DRAINAGE_CLASS"):
+        labels, counts = np.unique(results[field_name], return_counts=True)
+        summary[field_name] = dict(zip(labels.tolist(), counts.tolist()))
+    for field_name in ("MATRIX_SEPTIC_OK", "MATRIX_ATU_OK", "MATRIX_SEEPAGE_PIT_OK"):
+        summary[field_name] = int(results[field_name].sum())
+    return summary
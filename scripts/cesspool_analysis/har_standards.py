@@ -0,0 +1,214 @@
+# HAR 11-62 STANDARDS - Regulatory Constants and Classification Rules
+# Hawaii Administrative Rules, Title 11, Chapter 62 - Wastewater Systems
+# Pure Python (no arcpy) so the rules can be shared by every engine
+
+# ============================================================================
+# HAR 11-62 REGULATORY CONSTANTS
+# ============================================================================
+
+# Maximum slope (percent) by disposal system type
+SLOPE_THRESHOLDS = {
+    'ABSORPTION_BEDS': 8.0,       # Max 8% slope
+    'ABSORPTION_TRENCHES': 12.0,  # Max 12% slope
+}
+
+# Percolation rate limits (minutes per inch)
+PERCOLATION_LIMITS = {
+    'TOO_FAST': 1.0,              # Faster than 1 min/inch - insufficient treatment
+    'SEEPAGE_PITS_MAX': 10.0,     # Max 10 min/inch
+    'TRENCHES_BEDS_MAX': 60.0,    # Max 60 min/inch
+}
+
+# Minimum horizontal setbacks in feet (HAR 11-62-32, Table II)
+SETBACK_DISTANCES = {
+    'PRIVATE_WELLS': 100,
+    'PUBLIC_WELLS': 150,
+    'SHORELINE': 50,
+    'SURFACE_WATER': 50,
+    'BUILDINGS': 10,
+    'PROPERTY_LINES': 5,
+    'SWIMMING_POOLS': 10,
+}
+
+# Design flow and tank sizing (HAR 11-62-33.1)
+DESIGN_FLOW_RATES = {
+    'GALLONS_PER_BEDROOM_PER_DAY': 200,
+    'GALLONS_PER_BATHROOM_PER_DAY': 50,  # Agricultural / non-residential
+    'MIN_SEPTIC_TANK_GALLONS': 1000,
+}
+
+# NRCS Ksat (micrometers/second) to percolation rate (minutes/inch)
+KSAT_TO_PERC_FACTOR = 4233.3
+
+VALID_CLASSIFICATIONS = {
+    'SLOPE_CLASSES': ['<8%', '8-12%', '>12%', 'Unknown'],
+    'PERCOLATION_CLASSES': ['<1 min/inch', '1-10 min/inch', '10-60 min/inch', '>60 min/inch', 'Unknown'],
+    'DRAINAGE_CLASSES': ['Good', 'Moderate', 'Poor', 'Unknown'],
+}
+
+# NRCS drainage class (drainagecl) to HAR suitability
+DRAINAGE_CLASSIFICATION_MAP = {
+    'Very limited': 'Poor',
+    'Somewhat limited': 'Moderate',
+    'Not rated': 'Unknown',
+    'Well drained': 'Good',
+    'Moderately well drained': 'Good',
+    'Somewhat poorly drained': 'Moderate',
+    'Poorly drained': 'Poor',
+    'Very poorly drained': 'Poor',
+    'Excessively drained': 'Good',
+}
+
+# ============================================================================
+# CONVERSION AND CLASSIFICATION FUNCTIONS
+# ============================================================================
+
+def ksat_to_percolation_rate(ksat_r):
+    """
+    Convert NRCS saturated hydraulic conductivity to a percolation rate
+
+    Args:
+        ksat_r (float): Ksat representative value (micrometers/second)
+
+    Returns:
+        float: Percolation rate in minutes per inch, or None if Ksat is missing
+    """
+    if ksat_r is None or ksat_r <= 0:
+        return None
+    return round(KSAT_TO_PERC_FACTOR / float(ksat_r), 2)
+
+def classify_slope_har(slope_r):
+    """Classify slope percent into HAR 11-62 slope classes"""
+    if slope_r is None:
+        return 'Unknown'
+    slope = float(slope_r)
+    if slope < SLOPE_THRESHOLDS['ABSORPTION_BEDS']:
+        return '<8%'
+    elif slope <= SLOPE_THRESHOLDS['ABSORPTION_TRENCHES']:
+        return '8-12%'
+    return '>12%'
+
+def classify_percolation_har(perc_rate):
+    """Classify percolation rate (min/inch) into HAR 11-62 percolation classes"""
+    if perc_rate is None:
+        return 'Unknown'
+    if perc_rate < PERCOLATION_LIMITS['TOO_FAST']:
+        return '<1 min/inch'
+    elif perc_rate <= PERCOLATION_LIMITS['SEEPAGE_PITS_MAX']:
+        return '1-10 min/inch'
+    elif perc_rate <= PERCOLATION_LIMITS['TRENCHES_BEDS_MAX']:
+        return '10-60 min/inch'
+    return '>60 min/inch'
+
+def classify_drainage_har(drainagecl):
+    """Map an NRCS drainage class to Good / Moderate / Poor / Unknown"""
+    if not drainagecl:
+        return 'Unknown'
+    return DRAINAGE_CLASSIFICATION_MAP.get(drainagecl, 'Unknown')
+
+# ============================================================================
+# TECHNOLOGY COMPATIBILITY CHECKS
+# ============================================================================
+
+def _check_drainage(drainage_class, limiting_factors):
+    """Shared drainage rule: Good or Moderate drainage required"""
+    if drainage_class in ['Good', 'Moderate']:
+        return True
+    if drainage_class == 'Poor':
+        limiting_factors.append('Poor drainage')
+    else:
+        limiting_factors.append('Unknown drainage')
+    return False
+
+def check_septic_compatibility(slope_class, perc_class, drainage_class):
+    """
+    Check standard septic system compatibility
+
+    Returns:
+        tuple: (compatible, list of limiting factors)
+    """
+    compatible = True
+    limiting_factors = []
+
+    # Absorption trenches allowed up to 12% slope
+    if slope_class not in ['<8%', '8-12%']:
+        compatible = False
+        if slope_class == '>12%':
+            limiting_factors.append('Steep slope')
+        else:
+            limiting_factors.append('Unknown slope')
+
+    # Percolation between 1 and 60 min/inch
+    if perc_class not in ['1-10 min/inch', '10-60 min/inch']:
+        compatible = False
+        if perc_class == '<1 min/inch':
+            limiting_factors.append('Percolation too fast')
+        elif perc_class == '>60 min/inch':
+            limiting_factors.append('Percolation too slow')
+        else:
+            limiting_factors.append('Unknown percolation rate')
+
+    if not _check_drainage(drainage_class, limiting_factors):
+        compatible = False
+
+    return compatible, limiting_factors
+
+def check_atu_compatibility(slope_class, perc_class, drainage_class):
+    """
+    Check aerobic treatment unit compatibility (tolerates fast percolation)
+
+    Returns:
+        tuple: (compatible, list of limiting factors)
+    """
+    compatible = True
+    limiting_factors = []
+
+    if slope_class not in ['<8%', '8-12%']:
+        compatible = False
+        if slope_class == '>12%':
+            limiting_factors.append('Steep slope')
+        else:
+            limiting_factors.append('Unknown slope')
+
+    if perc_class not in ['<1 min/inch', '1-10 min/inch', '10-60 min/inch']:
+        compatible = False
+        if perc_class == '>60 min/inch':
+            limiting_factors.append('Percolation too slow')
+        else:
+            limiting_factors.append('Unknown percolation rate')
+
+    if not _check_drainage(drainage_class, limiting_factors):
+        compatible = False
+
+    return compatible, limiting_factors
+
+def check_seepage_pit_compatibility(slope_class, perc_class, drainage_class):
+    """
+    Check seepage pit compatibility (screened for steep sites only)
+
+    Returns:
+        tuple: (compatible, list of limiting factors)
+    """
+    compatible = True
+    limiting_factors = []
+
+    # Seepage pits are the steep-slope alternative to trenches and beds
+    if slope_class != '>12%':
+        compatible = False
+        if slope_class == 'Unknown':
+            limiting_factors.append('Unknown slope')
+
+    # Seepage pits have stricter percolation requirements
+    if perc_class != '1-10 min/inch':
+        compatible = False
+        if perc_class == '<1 min/inch':
+            limiting_factors.append('Percolation too fast for seepage pits')
+        elif perc_class in ['>60 min/inch', '10-60 min/inch']:
+            limiting_factors.append('Percolation too slow for seepage pits')
+        else:
+            limiting_factors.append('Unknown percolation rate')
+
+    if not _check_drainage(drainage_class, limiting_factors):
+        compatible = False
+
+    return compatible, limiting_factors
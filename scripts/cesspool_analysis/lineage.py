@@ -0,0 +1,493 @@
+"""
+MPAT Column Lineage and Incremental Refresh
+University of Hawaii Water Resources Research Center
+
+Replaces the free-text JOIN_LOG field with a lineage manifest. For every MPAT
+column it records:
+
+    sources     the dataset(s) the column is derived from, with the version
+                (content hash) each one had when the column was written
+    step        the derivation step, with a hash of its code and params
+    refreshed   when, how (full / incremental) and for how many parcels
+
+Sources are hashed per feature (pandas row hashes over the attribute and WKB
+geometry columns) and the hashes are kept next to the manifest, so a new
+delivery is diffed against the last one feature by feature. A refresh then:
+
+    1. Skips sources whose file fingerprint is unchanged without reading them
+    2. Finds the added, modified and removed features of changed sources
+    3. Maps those features to parcels: TMK-keyed sources directly, spatial
+       sources through the derivation's link function (current features)
+       and the parcel-feature links stored by the last run (old features)
+    4. Re-derives only the columns that read a changed source, only for the
+       affected parcels, and patches them into the MPAT store
+
+Columns whose step code or params changed, or that have no usable baseline,
+are re-derived for every parcel. A new flood-zone delivery therefore re-runs
+one overlay for the parcels touching the changed polygons instead of a full
+foundation rebuild.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .step_cache import _digest, fingerprint_code, fingerprint_file, fingerprint_path
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+LINEAGE_NAME = "lineage.json"     # Manifest file inside an MPAT store folder
+ROW_HASH_FIELD = "ROW_HASH"
+LINK_PARCEL_FIELD = "PARCEL_KEY"
+LINK_FEATURE_FIELD = "FEATURE_KEY"
+SHAPEFILE_PARTS = ('.shp', '.shx', '.dbf', '.prj', '.cpg')
+
+# ============================================================================
+# SOURCE HASHING
+# ============================================================================
+
+def fingerprint_dataset(path):
+    """fingerprint_path, covering every sidecar file of a shapefile"""
+    path = str(path)
+    stem, extension = os.path.splitext(path)
+    if extension.lower() == '.shp':
+        parts = [(part, fingerprint_file(stem + part)) for part in SHAPEFILE_PARTS
+                 if os.path.exists(stem + part)]
+        return _digest(parts) if parts else None
+    return fingerprint_path(path)
+
+def feature_hashes(frame, key_field, hash_fields=None):
+    """
+    Content hash per source feature
+
+    Args:
+        frame (pandas.DataFrame): One row per feature
+        key_field (str): Unique feature id field
+        hash_fields (list): Fields to hash (default: every other field). Pass
+            geometry as WKB bytes so shape edits are detected.
+
+    Returns:
+        pandas.DataFrame: key_field and ROW_HASH (uint64)
+    """
+    keys = frame[key_field]
+    if not keys.is_unique:
+        raise ValueError(f"Duplicate {key_field} values in source features")
+    fields = list(hash_fields or [c for c in frame.columns if c != key_field])
+    if fields:
+        hashes = pd.util.hash_pandas_object(frame[fields], index=False).to_numpy()
+    else:
+        hashes = np.zeros(len(frame), dtype=np.uint64)
+    return pd.DataFrame({key_field: keys.to_numpy(), ROW_HASH_FIELD: hashes})
+
+def source_version(hashes, key_field):
+    """Order-independent SHA-256 over feature keys and row hashes"""
+    key_hashes = pd.util.hash_pandas_object(hashes[key_field], index=False).to_numpy()
+    combined = np.sort(key_hashes * np.uint64(1000003) + hashes[ROW_HASH_FIELD].to_numpy(np.uint64))
+    return hashlib.sha256(combined.tobytes()).hexdigest()
+
+def diff_features(previous, current, key_field):
+    """
+    Compare two feature hash tables
+
+    Returns:
+        dict: 'added', 'modified' and 'removed' feature key arrays
+    """
+    merged = current.merge(previous, on=key_field, how='outer', suffixes=('', '_OLD'), indicator=True)
+    both = merged['_merge'] == 'both'
+    changed = both & (merged[ROW_HASH_FIELD] != merged[ROW_HASH_FIELD + '_OLD'])
+    return {
+        'added': merged.loc[merged['_merge'] == 'left_only', key_field].to_numpy(),
+        'modified': merged.loc[changed, key_field].to_numpy(),
+        'removed': merged.loc[merged['_merge'] == 'right_only', key_field].to_numpy(),
+    }
+
+# ============================================================================
+# SOURCE AND DERIVATION DEFINITIONS
+# ============================================================================
+
+class Source:
+    """One input dataset of the MPAT"""
+
+    def __init__(self, name, load, key_field, dataset=None, hash_fields=None):
+        """
+        Args:
+            name (str): Unique source name (e.g. 'flood_zones')
+            load (callable): Zero-argument function returning a DataFrame
+                with one row per feature
+            key_field (str): Unique feature id field (the store key for
+                TMK-keyed tables)
+            dataset (str): File or dataset path; when its fingerprint is
+                unchanged the source is not loaded or hashed at all
+            hash_fields (list): Fields used for change detection (default: all)
+        """
+        self.name = name
+        self.load = load
+        self.key_field = key_field
+        self.dataset = dataset
+        self.hash_fields = hash_fields
+
+class Derivation:
+    """A step that derives MPAT columns from one or more sources"""
+
+    def __init__(self, name, derive, columns, sources, link=None, params=None,
+                 code=None, group=None):
+        """
+        Args:
+            name (str): Unique step name
+            derive (callable): derive(frames, parcels) -> DataFrame with the
+                store key field plus every column. frames maps source name
+                -> DataFrame (loaded on first access); parcels is an array of
+                store keys to compute, or None for every parcel. Every
+                requested parcel must get a row (use defaults for parcels no
+                feature touches any more).
+            columns (list): MPAT columns the step writes
+            sources (list): Source names the step reads
+            link (callable): link(source_name, features, frames) -> DataFrame
+                of PARCEL_KEY / FEATURE_KEY pairs for the given features, or
+                None for sources keyed by the store key. Needed to refresh
+                spatial sources incrementally.
+            params (dict): Settings the step uses (part of the step version)
+            code (list): Functions defining the step (default: derive, link)
+            group (str): MPAT column group (default: the step name)
+        """
+        self.name = name
+        self.derive = derive
+        self.columns = list(columns)
+        self.sources = list(sources)
+        self.link = link
+        self.params = dict(params or {})
+        self.code = list(code or [f for f in (derive, link) if f is not None])
+        self.group = group or name
+
+    @property
+    def version(self):
+        """Hash of the step's code and params"""
+        return _digest({'code': fingerprint_code(self.code), 'params': self.params})
+
+class _SourceFrames(dict):
+    """Source name -> DataFrame, loading each source on first access"""
+
+    def __init__(self, sources):
+        super().__init__()
+        self.sources = sources
+
+    def __missing__(self, name):
+        frame = self.sources[name].load()
+        self[name] = frame
+        return frame
+
+# ============================================================================
+# LINEAGE MANIFEST
+# ============================================================================
+
+class LineageManifest:
+    """Per-column MPAT lineage plus per-feature source hashes"""
+
+    def __init__(self, manifest_path, fingerprint=None):
+        """
+        Args:
+            manifest_path (str): JSON manifest; feature hashes and parcel
+                links go to a '<name>_features' folder beside it
+            fingerprint (callable): dataset -> str or None (default:
+                fingerprint_dataset). Return None for datasets that cannot
+                be fingerprinted reliably; they are always re-hashed.
+        """
+        self.manifest_path = str(manifest_path)
+        self.features_folder = os.path.splitext(self.manifest_path)[0] + "_features"
+        self.fingerprint = fingerprint or fingerprint_dataset
+        self.sources = {}
+        self.columns = {}
+        self.history = []
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r') as f:
+                    manifest = json.load(f)
+                self.sources = manifest.get('sources', {})
+                self.columns = manifest.get('columns', {})
+                self.history = manifest.get('history', [])
+            except (ValueError, OSError):
+                pass    # Unreadable manifest: every column is re-derived
+
+    @classmethod
+    def for_store(cls, store, fingerprint=None):
+        """Lineage manifest kept inside an MPAT store folder"""
+        return cls(os.path.join(store.store_path, LINEAGE_NAME), fingerprint)
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record_source(self, name, dataset=None, version=None, key_field=None, features=None,
+                      fingerprint=None):
+        """
+        Record a source delivery
+
+        Args:
+            name (str): Source name
+            dataset (str): File or dataset path
+            version (str): Content version (default: the dataset fingerprint)
+            key_field (str): Feature id field
+            features (int): Feature count
+            fingerprint (str): Dataset fingerprint (default: computed)
+
+        Returns:
+            str: The recorded version
+        """
+        if fingerprint is None and dataset is not None:
+            fingerprint = self.fingerprint(dataset)
+        self.sources[name] = {
+            'dataset': None if dataset is None else str(dataset),
+            'version': version or fingerprint,
+            'fingerprint': fingerprint,
+            'key_field': key_field,
+            'features': features,
+            'recorded': datetime.now().isoformat(timespec='seconds'),
+        }
+        return self.sources[name]['version']
+
+    def record_columns(self, columns, step, sources, step_version=None, group=None,
+                       parcels=None, mode="full"):
+        """
+        Record how a set of columns was produced
+
+        Args:
+            columns (list): MPAT column names
+            step (str): Derivation step name
+            sources (list or dict): Source names (their recorded versions are
+                used) or source name -> version
+            step_version (str): Hash of the step code/params (optional)
+            group (str): MPAT column group (optional)
+            parcels (int): Parcels written
+            mode (str): 'full' or 'incremental'
+        """
+        if isinstance(sources, dict):
+            versions = dict(sources)
+        else:
+            unknown = [name for name in sources if name not in self.sources]
+            if unknown:
+                raise KeyError(f"Sources not recorded: {unknown}")
+            versions = {name: self.sources[name]['version'] for name in sources}
+        refreshed = datetime.now().isoformat(timespec='seconds')
+        for column in columns:
+            self.columns[column] = {
+                'step': step,
+                'step_version': step_version,
+                'group': group,
+                'sources': versions,
+                'refreshed': refreshed,
+                'mode': mode,
+                'parcels': parcels,
+            }
+        self.history.append({'step': step, 'mode': mode, 'columns': list(columns),
+                             'sources': versions, 'parcels': parcels, 'completed': refreshed})
+
+    def save(self):
+        folder = os.path.dirname(os.path.abspath(self.manifest_path))
+        os.makedirs(folder, exist_ok=True)
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({'sources': self.sources, 'columns': self.columns, 'history': self.history},
+                      f, indent=2, default=str)
+        os.replace(temp_path, self.manifest_path)
+
+    def describe(self):
+        """Print each column with its step and source versions"""
+        print(f"Lineage: {self.manifest_path}")
+        for column, entry in self.columns.items():
+            sources = ", ".join(f"{name}@{(version or '?')[:10]}" for name, version in entry['sources'].items())
+            print(f"  {column}: {entry['step']} ({entry['mode']}, {entry['refreshed']}) <- {sources}")
+
+    # ------------------------------------------------------------------
+    # Stored feature hashes and parcel links
+    # ------------------------------------------------------------------
+
+    def _hashes_path(self, source_name):
+        return os.path.join(self.features_folder, f"source_{source_name}.parquet")
+
+    def _links_path(self, step, source_name):
+        return os.path.join(self.features_folder, f"links_{step}_{source_name}.parquet")
+
+    def _read(self, path):
+        return pd.read_parquet(path) if os.path.exists(path) else None
+
+    def _write(self, path, frame):
+        os.makedirs(self.features_folder, exist_ok=True)
+        frame.to_parquet(path, index=False)
+
+    def source_state(self, source, frames):
+        """
+        Current version of a source and its feature changes since the last refresh
+
+        Returns:
+            dict: version, fingerprint, hashes (None when not re-hashed),
+            baseline (version the changes are relative to) and changes
+            (None when unchanged or there is no baseline)
+        """
+        entry = self.sources.get(source.name, {})
+        fingerprint = self.fingerprint(source.dataset) if source.dataset else None
+        state = {'version': entry.get('version'), 'fingerprint': fingerprint, 'hashes': None,
+                 'baseline': entry.get('version'), 'changes': None}
+        if fingerprint is not None and fingerprint == entry.get('fingerprint') \
+                and os.path.exists(self._hashes_path(source.name)):
+            return state
+
+        hashes = feature_hashes(frames[source.name], source.key_field, source.hash_fields)
+        state['hashes'] = hashes
+        state['version'] = source_version(hashes, source.key_field)
+        previous = self._read(self._hashes_path(source.name))
+        if state['version'] != state['baseline'] and previous is not None:
+            state['changes'] = diff_features(previous, hashes, source.key_field)
+        return state
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def _affected_parcels(self, store, derivation, sources, frames, states, recorded):
+        """
+        Parcels touched by the source changes since the columns were written
+
+        Returns:
+            tuple: (parcel keys, new links per source), or (None, None) when
+            the columns have to be re-derived for every parcel
+        """
+        parcels, new_links, relink = [], {}, False
+        for name in derivation.sources:
+            state = states[name]
+            if recorded[name] == state['version']:
+                continue
+            if state['changes'] is None or recorded[name] != state['baseline']:
+                return None, None
+            changes = state['changes']
+            source = sources[name]
+            current_keys = np.concatenate([changes['added'], changes['modified']])
+            old_keys = np.concatenate([changes['modified'], changes['removed']])
+
+            links = None
+            if derivation.link is not None:
+                features = frames[name]
+                links = derivation.link(name, features[features[source.key_field].isin(current_keys)], frames)
+            if links is None:
+                if source.key_field != store.key_field:
+                    return None, None
+                parcels.extend([current_keys, changes['removed']])
+                # Edited parcels may now touch other features: relink them all
+                relink = derivation.link is not None
+                continue
+
+            stored = self._read(self._links_path(derivation.name, name))
+            if stored is None:
+                return None, None
+            parcels.append(links[LINK_PARCEL_FIELD].to_numpy())
+            parcels.append(stored.loc[stored[LINK_FEATURE_FIELD].isin(old_keys), LINK_PARCEL_FIELD].to_numpy())
+            kept = stored[~stored[LINK_FEATURE_FIELD].isin(old_keys)]
+            new_links[name] = pd.concat([kept, links[[LINK_PARCEL_FIELD, LINK_FEATURE_FIELD]]],
+                                        ignore_index=True)
+        if relink:
+            new_links = self._link_all(derivation, frames, write=False)
+        parcels = pd.unique(np.concatenate(parcels)) if parcels else np.empty(0, dtype=np.int64)
+        return parcels, new_links
+
+    def _link_all(self, derivation, frames, write=True):
+        """Parcel-feature links for every feature of each linked source"""
+        all_links = {}
+        for name in derivation.sources:
+            links = derivation.link(name, frames[name], frames)
+            if links is not None:
+                all_links[name] = links[[LINK_PARCEL_FIELD, LINK_FEATURE_FIELD]]
+                if write:
+                    self._write(self._links_path(derivation.name, name), all_links[name])
+        return all_links
+
+    def _refresh_derivation(self, store, derivation, sources, frames, states, full):
+        step_version = derivation.version
+        current = {name: states[name]['version'] for name in derivation.sources}
+        entries = [self.columns.get(column) for column in derivation.columns]
+        group_info = store.manifest['column_groups'].get(derivation.group)
+        in_store = group_info is not None and set(derivation.columns) <= set(group_info['columns'])
+
+        usable = in_store and all(entry is not None and entry['step_version'] == step_version
+                                  and set(entry['sources']) == set(current) for entry in entries)
+        if usable and not full and all(entry['sources'] == current for entry in entries):
+            return {'mode': 'current', 'parcels': 0}
+
+        parcels, new_links = (None, None)
+        if usable and not full:
+            # A partial refresh needs one baseline for all of the step's columns
+            recorded = entries[0]['sources']
+            if all(entry['sources'] == recorded for entry in entries):
+                parcels, new_links = self._affected_parcels(store, derivation, sources, frames,
+                                                            states, recorded)
+
+        if parcels is None:
+            result = derivation.derive(frames, None)
+            store.add_parcels(result[store.key_field])
+            store.append_columns(result[[store.key_field] + derivation.columns], derivation.group,
+                                 replace=True)
+            if derivation.link is not None:
+                self._link_all(derivation, frames)
+            mode, count = "full", len(result)
+        else:
+            if len(parcels):
+                result = derivation.derive(frames, parcels)
+                # Parcels added by the delivery get store rows before the patch
+                store.add_parcels(result[store.key_field])
+                store.update_columns(result[[store.key_field] + derivation.columns], derivation.group)
+            for name, links in new_links.items():
+                self._write(self._links_path(derivation.name, name), links)
+            mode, count = "incremental", len(parcels)
+
+        self.record_columns(derivation.columns, derivation.name, current, step_version,
+                            derivation.group, count, mode)
+        self.save()
+        return {'mode': mode, 'parcels': count}
+
+    def refresh(self, store, sources, derivations, full=False):
+        """
+        Bring derived MPAT columns up to date with their sources
+
+        Args:
+            store (MPATStore): Store holding the derived columns
+            sources (list): Source objects for every source a derivation reads
+            derivations (list): Derivation objects in dependency order
+            full (bool): Re-derive every column for every parcel
+
+        Returns:
+            dict: Step name -> {'mode': 'current' / 'incremental' / 'full',
+            'parcels': parcels written}
+        """
+        sources = {source.name: source for source in sources}
+        missing = sorted({name for d in derivations for name in d.sources} - set(sources))
+        if missing:
+            raise KeyError(f"Derivations read undefined sources: {missing}")
+
+        frames = _SourceFrames(sources)
+        states = {}
+        for derivation in derivations:
+            for name in derivation.sources:
+                if name not in states:
+                    states[name] = self.source_state(sources[name], frames)
+
+        results = {}
+        for derivation in derivations:
+            results[derivation.name] = self._refresh_derivation(store, derivation, sources, frames,
+                                                                states, full)
+            print(f"  {derivation.name}: {results[derivation.name]['mode']} "
+                  f"({results[derivation.name]['parcels']:,} parcels)")
+
+        # New deliveries become the baseline for the next diff
+        for name, state in states.items():
+            if state['hashes'] is not None:
+                self._write(self._hashes_path(name), state['hashes'])
+            features = None if state['hashes'] is None else len(state['hashes'])
+            self.record_source(name, sources[name].dataset, state['version'], sources[name].key_field,
+                               features if features is not None else self.sources.get(name, {}).get('features'),
+                               state['fingerprint'])
+        self.save()
+        return results
@@ -0,0 +1,296 @@
+"""
+Compiled Matrix Sieve Engine
+University of Hawaii Water Resources Research Center
+
+Loads the Technology Matrix screening spreadsheet once and compiles it into
+a technology x criterion bit matrix. Each parcel's site conditions become a
+bitmask over the same criteria, and a technology passes the sieve when every
+condition bit set for the parcel is also set for the technology:
+
+    suitable = (parcel_mask & ~technology_bits) == 0
+
+All parcels are evaluated against all technologies in chunked array
+operations, and the result is one suitability bitset per parcel (bit t set
+= technology t is suitable). Replaces the row-by-row iterrows() sieve in
+the Work_with_Available_Data demo.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from .har_classification import (
+    SLOPE_CLASSES, PERCOLATION_CLASSES, encode_slope_classes, encode_percolation_classes
+)
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+DEFAULT_MATRIX_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "Matrix", "Technology_Matrix_Screening_Updated.xlsx"
+)
+
+TECHNOLOGY_FIELD = "Technology"
+CHUNK_SIZE = 65536  # Parcels evaluated per vectorized block
+
+# Numeric site attributes -> Matrix criterion columns
+LOT_SIZE_CRITERIA = ["Lot <10k sf", "Lot 10k-21k sf", "Lot >21k sf"]
+DEPTH_CRITERIA = ["Depth <3 ft", "Depth 3-6 ft", "Depth >6 ft"]
+SLOPE_CRITERIA = {label: f"Slope {label}" for label in SLOPE_CLASSES if label != 'Unknown'}
+SOIL_CRITERIA = {label: f"Soil {label}" for label in PERCOLATION_CLASSES if label != 'Unknown'}
+SOIL_CRITERIA['Unknown'] = "Soil N/A"
+
+# ============================================================================
+# MATRIX LOADING AND COMPILATION
+# ============================================================================
+
+class CompiledMatrix:
+    """Technology x criterion bit matrix built from the screening spreadsheet"""
+
+    def __init__(self, technologies, criteria, allowed):
+        self.technologies = np.asarray(technologies, dtype=object)
+        self.criteria = list(criteria)
+        self.criterion_index = {name: i for i, name in enumerate(self.criteria)}
+        self.allowed = np.asarray(allowed, dtype=bool)            # (technologies, criteria)
+        self.technology_bits = pack_bits(self.allowed)             # (technologies, words)
+
+    @property
+    def n_technologies(self):
+        return len(self.technologies)
+
+    def __repr__(self):
+        return f"CompiledMatrix({self.n_technologies} technologies x {len(self.criteria)} criteria)"
+
+def load_technology_matrix(file_path=None, sheet_name=0):
+    """
+    Load the technology matrix and find its binary suitability columns
+
+    Args:
+        file_path (str): Matrix workbook (default: Matrix/Technology_Matrix_Screening_Updated.xlsx)
+        sheet_name: Worksheet to read
+
+    Returns:
+        tuple: (DataFrame of technologies, list of binary criterion columns)
+    """
+    df = pd.read_excel(file_path or DEFAULT_MATRIX_FILE, sheet_name=sheet_name)
+    df = df[df[TECHNOLOGY_FIELD].notna()].reset_index(drop=True)
+
+    binary_cols = []
+    for col in df.columns:
+        if col != TECHNOLOGY_FIELD:
+            unique_vals = df[col].dropna().unique()
+            if len(unique_vals) and set(unique_vals).issubset({0, 1, '0', '1'}):
+                binary_cols.append(col)
+    return df, binary_cols
+
+def compile_matrix(df, binary_cols, name_field=TECHNOLOGY_FIELD):
+    """Compile a loaded matrix DataFrame into a CompiledMatrix"""
+    allowed = df[binary_cols].apply(pd.to_numeric, errors='coerce').fillna(0).to_numpy() == 1
+    return CompiledMatrix(df[name_field].astype(str).to_numpy(), binary_cols, allowed)
+
+def load_compiled_matrix(file_path=None, sheet_name=0):
+    """Load and compile the screening spreadsheet in one call"""
+    df, binary_cols = load_technology_matrix(file_path, sheet_name)
+    return compile_matrix(df, binary_cols)
+
+# ============================================================================
+# BIT PACKING
+# ============================================================================
+
+def pack_bits(flags):
+    """
+    Pack a (rows, n) boolean array into (rows, ceil(n / 64)) uint64 words
+
+    Bit j of word j // 64 holds column j, so masks built from the same
+    column order can be combined with plain bitwise operators.
+    """
+    flags = np.atleast_2d(np.asarray(flags, dtype=bool))
+    n_words = max(1, -(-flags.shape[1] // 64))
+    padded = np.zeros((flags.shape[0], n_words * 64), dtype=bool)
+    padded[:, :flags.shape[1]] = flags
+    packed = np.packbits(padded, axis=1, bitorder='little')
+    return packed.view('<u8').reshape(flags.shape[0], n_words)
+
+def unpack_bits(words, n):
+    """Inverse of pack_bits: (rows, words) uint64 -> (rows, n) boolean"""
+    words = np.ascontiguousarray(np.atleast_2d(words), dtype='<u8')
+    flags = np.unpackbits(words.view(np.uint8), axis=1, bitorder='little')
+    return flags[:, :n].astype(bool)
+
+# ============================================================================
+# PARCEL CONDITION ENCODING
+# ============================================================================
+
+def _bin3(values, low, high):
+    """0 below low, 1 between low and high (inclusive), 2 above high, -1 missing"""
+    values = np.asarray(values, dtype=float)
+    codes = (values >= low).astype(np.int8) + (values > high)
+    codes[np.isnan(values)] = -1
+    return codes
+
+def _yes_no(values):
+    """Yes/No masks for a boolean attribute; NaN (unknown) is neither"""
+    values = np.asarray(values, dtype=float)
+    known = ~np.isnan(values)
+    return known & (values != 0), known & (values == 0)
+
+def flood_zone_condition(zones):
+    """
+    Encode FEMA flood zone designations for site_condition_flags
+
+    A and V zones (special flood hazard areas) are 1.0 and the mapped
+    minimal/moderate hazard zones X, B and C are 0.0. Blank, D (undetermined)
+    and any other designation stay NaN, so no flood condition is asserted.
+
+    Args:
+        zones (array-like): FEMA zone strings (AE, VE, X, ...)
+
+    Returns:
+        numpy.ndarray: float flood zone flag per parcel
+    """
+    zones = np.char.upper(np.char.strip(np.asarray(zones).astype(str)))
+    in_zone = np.char.startswith(zones, 'A') | np.char.startswith(zones, 'V')
+    in_zone &= zones != 'AREA NOT INCLUDED'
+    outside = (zones == 'X') | np.char.startswith(zones, 'X ') | np.isin(zones, ['B', 'C'])
+    condition = np.full(zones.shape, np.nan)
+    condition[outside] = 0.0
+    condition[in_zone] = 1.0
+    return condition
+
+def site_condition_flags(matrix, n_parcels, lot_size_sf=None, slope_percent=None,
+                         perc_rate=None, groundwater_depth_ft=None, flood_zone=None,
+                         stream_within_50ft=None, extra_conditions=None):
+    """
+    Build the parcel x criterion condition flags from site attributes
+
+    Any attribute left as None adds no condition. Criteria that are not
+    columns of the matrix are ignored, as in the original sieve.
+
+    Args:
+        matrix (CompiledMatrix): Compiled technology matrix
+        n_parcels (int): Number of parcels
+        lot_size_sf, slope_percent, perc_rate, groundwater_depth_ft (array-like):
+            Numeric site attributes
+        flood_zone, stream_within_50ft (array-like): Boolean site attributes;
+            NaN marks an unknown value and sets neither the Yes nor No criterion
+        extra_conditions (dict): Criterion name -> boolean array for any other
+            Matrix column (SMA, climate, ...)
+
+    Returns:
+        numpy.ndarray: (n_parcels, criteria) boolean condition flags
+    """
+    flags = np.zeros((n_parcels, len(matrix.criteria)), dtype=bool)
+    rows = np.arange(n_parcels)
+
+    def set_from_codes(codes, labels):
+        for code, label in enumerate(labels):
+            column = matrix.criterion_index.get(label)
+            if column is not None:
+                flags[rows[codes == code], column] = True
+
+    if lot_size_sf is not None:
+        set_from_codes(_bin3(lot_size_sf, 10000, 21000), LOT_SIZE_CRITERIA)
+    if groundwater_depth_ft is not None:
+        set_from_codes(_bin3(groundwater_depth_ft, 3, 6), DEPTH_CRITERIA)
+    if slope_percent is not None:
+        set_from_codes(encode_slope_classes(slope_percent),
+                       [SLOPE_CRITERIA.get(label) for label in SLOPE_CLASSES])
+    if perc_rate is not None:
+        set_from_codes(encode_percolation_classes(perc_rate),
+                       [SOIL_CRITERIA[label] for label in PERCOLATION_CLASSES])
+
+    boolean_conditions = dict(extra_conditions or {})
+    if flood_zone is not None:
+        boolean_conditions["Flood Zone Yes"], boolean_conditions["Flood Zone No"] = _yes_no(flood_zone)
+    if stream_within_50ft is not None:
+        boolean_conditions["Stream <50 ft Yes"], boolean_conditions["Stream <50 ft No"] = _yes_no(stream_within_50ft)
+
+    for criterion, values in boolean_conditions.items():
+        column = matrix.criterion_index.get(criterion)
+        if column is not None:
+            flags[:, column] |= np.asarray(values, dtype=bool)
+    return flags
+
+def encode_conditions(matrix, conditions):
+    """
+    Encode parcel site conditions as uint64 bitmasks
+
+    Args:
+        matrix (CompiledMatrix): Compiled technology matrix
+        conditions: One of
+            - (parcels, criteria) boolean array in matrix.criteria order
+            - DataFrame of boolean columns named after Matrix criteria
+            - list of criterion-name lists, one per parcel
+
+    Returns:
+        numpy.ndarray: (parcels, words) uint64 condition masks
+    """
+    if isinstance(conditions, pd.DataFrame):
+        flags = np.zeros((len(conditions), len(matrix.criteria)), dtype=bool)
+        for criterion in conditions.columns:
+            column = matrix.criterion_index.get(criterion)
+            if column is not None:
+                flags[:, column] = conditions[criterion].to_numpy(dtype=bool)
+    elif isinstance(conditions, np.ndarray) and conditions.dtype == bool:
+        flags = conditions
+    else:
+        flags = np.zeros((len(conditions), len(matrix.criteria)), dtype=bool)
+        for row, parcel_conditions in enumerate(conditions):
+            for criterion in parcel_conditions:
+                column = matrix.criterion_index.get(criterion)
+                if column is not None:
+                    flags[row, column] = True
+    return pack_bits(flags)
+
+# ============================================================================
+# SIEVE EVALUATION
+# ============================================================================
+
+def sieve(matrix, condition_masks, chunk_size=CHUNK_SIZE):
+    """
+    Evaluate every parcel against every technology
+
+    Args:
+        matrix (CompiledMatrix): Compiled technology matrix
+        condition_masks (numpy.ndarray): (parcels, words) masks from encode_conditions
+        chunk_size (int): Parcels per vectorized block (bounds peak memory)
+
+    Returns:
+        numpy.ndarray: (parcels, technology words) uint64 suitability bitsets
+    """
+    condition_masks = np.atleast_2d(condition_masks)
+    blocked = ~matrix.technology_bits                      # criteria each technology rejects
+    n_parcels = condition_masks.shape[0]
+    n_tech_words = max(1, -(-matrix.n_technologies // 64))
+    suitable_bits = np.zeros((n_parcels, n_tech_words), dtype='<u8')
+
+    for start in range(0, n_parcels, chunk_size):
+        block = condition_masks[start:start + chunk_size]
+        # (parcels, technologies): no requested condition is blocked
+        suitable = ~np.any(block[:, None, :] & blocked[None, :, :], axis=2)
+        suitable_bits[start:start + chunk_size] = pack_bits(suitable)
+    return suitable_bits
+
+def suitability_matrix(matrix, suitable_bits):
+    """Unpack sieve bitsets into a (parcels, technologies) boolean array"""
+    return unpack_bits(suitable_bits, matrix.n_technologies)
+
+def count_suitable(suitable_bits):
+    """Number of suitable technologies per parcel (popcount of the bitsets)"""
+    as_bytes = np.ascontiguousarray(suitable_bits, dtype='<u8').view(np.uint8)
+    return np.unpackbits(as_bytes, axis=1).sum(axis=1)
+
+def suitable_technologies(matrix, suitable_bits, parcel_index):
+    """Technology names that passed the sieve for one parcel"""
+    flags = unpack_bits(suitable_bits[parcel_index:parcel_index + 1], matrix.n_technologies)[0]
+    return matrix.technologies[flags].tolist()
+
+def sieve_summary(matrix, suitable_bits):
+    """Parcel counts per technology, as a DataFrame sorted by count"""
+    counts = suitability_matrix(matrix, suitable_bits).sum(axis=0)
+    return (pd.DataFrame({'Technology': matrix.technologies, 'Suitable_Parcels': counts})
+            .sort_values('Suitable_Parcels', ascending=False, kind='stable')
+            .reset_index(drop=True))
@@ -0,0 +1,416 @@
+"""
+Columnar Master Parcel Attribute Table (MPAT) Store
+University of Hawaii Water Resources Research Center
+
+Parquet-backed replacement for the MPAT shapefiles. The table is keyed by
+TMK and stored as a set of column groups that share one row order:
+
+    mpat_store/
+        manifest.json            key field, row count, column -> group map
+        keys.parquet             TMK, ISLAND, COUNTY
+        group_<name>.parquet     TMK, ISLAND, COUNTY + that group's columns
+
+TMKs are stored as canonical int64 keys (tmk_codec.parse_tmk), and incoming
+keys are parsed the same way, so text, dashed and numeric TMKs all match.
+Rows are sorted by island and TMK and written in fixed-size row groups, so
+island/county filters are pushed down to Parquet row-group statistics and
+whole row groups are skipped. Reading a handful of Matrix fields only opens
+the groups that hold them, and adding a new layer writes one new group file
+without touching the existing ones. No 255-character or dBASE size limits.
+"""
+
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - reported when a store is opened
+    pa = None
+    pq = None
+
+from .tmk_codec import INVALID_TMK, island_names, parse_tmk
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+MANIFEST_NAME = "manifest.json"
+KEYS_FILE = "keys.parquet"
+ROW_GROUP_SIZE = 16384
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("The MPAT store requires pyarrow: pip install pyarrow")
+
+def island_from_tmk(tmk_values):
+    """
+    Derive the island/county name from the TMK county digit
+
+    Args:
+        tmk_values (array-like): TMKs in any format parse_tmk accepts
+
+    Returns:
+        numpy.ndarray: Island names ('Unknown' when the TMK does not parse)
+    """
+    return island_names(parse_tmk(tmk_values))
+
+def _parse_keys(values, key_field):
+    """Canonical int64 TMKs; raises when any value is not a valid TMK"""
+    keys = parse_tmk(values)
+    invalid = keys == INVALID_TMK
+    if invalid.any():
+        examples = pd.Series(values)[invalid].head(5).tolist()
+        raise ValueError(f"{int(invalid.sum()):,} {key_field} values are not valid TMKs, e.g. {examples}")
+    return keys
+
+# ============================================================================
+# MPAT STORE
+# ============================================================================
+
+class MPATStore:
+    """TMK-keyed columnar MPAT stored as Parquet column groups"""
+
+    def __init__(self, store_path):
+        _require_pyarrow()
+        self.store_path = str(store_path)
+        manifest_path = os.path.join(self.store_path, MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"No MPAT store at {self.store_path} (missing {MANIFEST_NAME})")
+        with open(manifest_path, 'r') as f:
+            self.manifest = json.load(f)
+
+    # ------------------------------------------------------------------
+    # Creation
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def create(cls, store_path, df, key_field="TMK", island_field="ISLAND",
+               county_field="COUNTY", group="foundation", overwrite=False):
+        """
+        Create a new store from a DataFrame of MPAT records
+
+        Args:
+            store_path (str): Store folder (created if needed)
+            df (pandas.DataFrame): Records with at least the key field
+            key_field (str): TMK field name
+            island_field (str): Island field; derived from the TMK if absent
+            county_field (str): County field; copied from the island if absent
+            group (str): Name of the first column group
+            overwrite (bool): Replace an existing store at store_path
+
+        Returns:
+            MPATStore: The opened store
+        """
+        _require_pyarrow()
+        store_path = str(store_path)
+        manifest_path = os.path.join(store_path, MANIFEST_NAME)
+        if os.path.exists(manifest_path) and not overwrite:
+            raise FileExistsError(f"MPAT store already exists: {store_path}")
+        os.makedirs(store_path, exist_ok=True)
+
+        if key_field not in df.columns:
+            raise ValueError(f"Key field '{key_field}' not in DataFrame columns")
+
+        records = df.copy()
+        records[key_field] = _parse_keys(records[key_field], key_field)
+        if island_field not in records.columns:
+            records[island_field] = island_from_tmk(records[key_field])
+        if county_field not in records.columns:
+            records[county_field] = records[island_field]
+
+        # Sort so island/county predicates prune whole row groups
+        records = records.sort_values([island_field, key_field], kind="stable").reset_index(drop=True)
+
+        index_fields = [key_field, island_field, county_field]
+        pq.write_table(pa.Table.from_pandas(records[index_fields], preserve_index=False),
+                       os.path.join(store_path, KEYS_FILE), row_group_size=ROW_GROUP_SIZE)
+
+        manifest = {
+            'key_field': key_field,
+            'island_field': island_field,
+            'county_field': county_field,
+            'row_count': len(records),
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'column_groups': {}
+        }
+        cls._write_manifest(store_path, manifest)
+
+        store = cls(store_path)
+        value_columns = [c for c in records.columns if c not in index_fields]
+        store._write_group(group, records[index_fields + value_columns], value_columns)
+        return store
+
+    # ------------------------------------------------------------------
+    # Metadata
+    # ------------------------------------------------------------------
+
+    @property
+    def key_field(self):
+        return self.manifest['key_field']
+
+    @property
+    def index_fields(self):
+        return [self.manifest['key_field'], self.manifest['island_field'], self.manifest['county_field']]
+
+    @property
+    def row_count(self):
+        return self.manifest['row_count']
+
+    @property
+    def columns(self):
+        """All value columns in the store, in group order"""
+        columns = []
+        for group_info in self.manifest['column_groups'].values():
+            columns.extend(group_info['columns'])
+        return columns
+
+    def column_groups(self):
+        """Map of column name -> column group name"""
+        lookup = {}
+        for group_name, group_info in self.manifest['column_groups'].items():
+            for column in group_info['columns']:
+                lookup[column] = group_name
+        return lookup
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _filters(self, islands=None, counties=None, filters=None):
+        predicates = list(filters or [])
+        if islands is not None:
+            predicates.append((self.manifest['island_field'], 'in', list(islands)))
+        if counties is not None:
+            predicates.append((self.manifest['county_field'], 'in', list(counties)))
+        return predicates or None
+
+    def read_table(self, columns=None, islands=None, counties=None, filters=None):
+        """
+        Read selected columns as a pyarrow Table
+
+        Args:
+            columns (list): Value columns to read (default: all)
+            islands (list): Keep only these islands (pushed down to Parquet)
+            counties (list): Keep only these counties (pushed down to Parquet)
+            filters (list): Extra pyarrow predicates on the index fields,
+                e.g. [('TMK', '>=', 200000000)]
+
+        Returns:
+            pyarrow.Table: Index fields followed by the requested columns
+        """
+        lookup = self.column_groups()
+        requested = self.columns if columns is None else list(columns)
+        missing = [c for c in requested if c not in lookup and c not in self.index_fields]
+        if missing:
+            raise KeyError(f"Columns not in MPAT store: {missing}")
+
+        predicates = self._filters(islands, counties, filters)
+        result = pq.read_table(os.path.join(self.store_path, KEYS_FILE),
+                               columns=self.index_fields, filters=predicates)
+
+        # Only open the groups that hold requested columns
+        by_group = {}
+        for column in requested:
+            if column in lookup:
+                by_group.setdefault(lookup[column], []).append(column)
+
+        for group_name, group_columns in by_group.items():
+            group_file = os.path.join(self.store_path, self.manifest['column_groups'][group_name]['file'])
+            group_table = pq.read_table(group_file, columns=group_columns, filters=predicates)
+            for column in group_columns:
+                result = result.append_column(column, group_table.column(column))
+        return result
+
+    def read(self, columns=None, islands=None, counties=None, filters=None):
+        """Read selected columns as a pandas DataFrame (see read_table)"""
+        return self.read_table(columns, islands, counties, filters).to_pandas()
+
+    def keys(self):
+        """All TMKs in store row order"""
+        return pq.read_table(os.path.join(self.store_path, KEYS_FILE),
+                             columns=[self.key_field]).column(0).to_numpy(zero_copy_only=False)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append_columns(self, df, group, key_field=None, replace=False):
+        """
+        Add new attribute columns as a new column group
+
+        Incoming rows are aligned to the store by parsed TMK; parcels without
+        a match get nulls. Existing group files are not rewritten.
+
+        Args:
+            df (pandas.DataFrame): Key field plus the new columns
+            group (str): Name of the new column group
+            key_field (str): Key field in df (default: the store key field)
+            replace (bool): Replace an existing group with the same name
+
+        Returns:
+            dict: Matched and unmatched record counts
+
+        Raises:
+            ValueError: When a key is not a valid TMK or no key matches the store
+        """
+        key_field = key_field or self.key_field
+        new_columns = [c for c in df.columns if c != key_field]
+        if not new_columns:
+            raise ValueError("No attribute columns to append")
+
+        groups = self.manifest['column_groups']
+        if group in groups and not replace:
+            raise ValueError(f"Column group '{group}' already exists (pass replace=True)")
+
+        lookup = self.column_groups()
+        clashes = [c for c in new_columns if c in lookup and lookup[c] != group]
+        if clashes:
+            raise ValueError(f"Columns already stored in other groups: {clashes}")
+
+        incoming_keys = pd.Index(_parse_keys(df[key_field], key_field))
+        if not incoming_keys.is_unique:
+            raise ValueError(f"Duplicate {key_field} values in appended columns")
+
+        index_table = pq.read_table(os.path.join(self.store_path, KEYS_FILE)).to_pandas()
+        positions = incoming_keys.get_indexer(parse_tmk(index_table[self.key_field]))
+        matched = positions >= 0
+        if len(df) and not matched.any():
+            raise ValueError(f"None of the {len(df):,} appended {key_field} values are in the MPAT store")
+
+        aligned = index_table
+        take = np.where(matched, positions, 0)
+        for column in new_columns:
+            if len(df) == 0:
+                aligned[column] = pd.Series([None] * len(aligned), dtype=object)
+                continue
+            values = df[column].iloc[take].reset_index(drop=True)
+            aligned[column] = values if matched.all() else values.where(matched)
+
+        self._write_group(group, aligned, new_columns)
+        return {'matched': int(matched.sum()), 'unmatched': int((~matched).sum())}
+
+    def update_columns(self, df, group, key_field=None):
+        """
+        Overwrite values of an existing column group for a subset of parcels
+
+        Used by incremental refreshes: only the rows in df change, every
+        other parcel keeps its stored values. The group file is rewritten.
+
+        Args:
+            df (pandas.DataFrame): Key field plus columns of the group
+            group (str): Existing column group
+            key_field (str): Key field in df (default: the store key field)
+
+        Returns:
+            dict: Updated and unmatched record counts
+
+        Raises:
+            ValueError: When a key is not a valid TMK or no key matches the store
+        """
+        key_field = key_field or self.key_field
+        group_info = self.manifest['column_groups'].get(group)
+        if group_info is None:
+            raise KeyError(f"Column group '{group}' not in MPAT store")
+        update_columns = [c for c in df.columns if c != key_field]
+        unknown = [c for c in update_columns if c not in group_info['columns']]
+        if unknown:
+            raise ValueError(f"Columns not in group '{group}': {unknown}")
+
+        incoming_keys = pd.Index(_parse_keys(df[key_field], key_field))
+        if not incoming_keys.is_unique:
+            raise ValueError(f"Duplicate {key_field} values in updated columns")
+
+        records = pq.read_table(os.path.join(self.store_path, group_info['file'])).to_pandas()
+        positions = incoming_keys.get_indexer(parse_tmk(records[self.key_field]))
+        matched = positions >= 0
+        if len(df) and not matched.any():
+            raise ValueError(f"None of the {len(df):,} updated {key_field} values are in the MPAT store")
+        take = np.where(matched, positions, 0)
+        for column in update_columns:
+            if len(df) == 0:
+                break
+            values = df[column].iloc[take].reset_index(drop=True)
+            records[column] = records[column].mask(matched, values)
+
+        self._write_group(group, records, group_info['columns'])
+        return {'updated': int(matched.sum()), 'unmatched': len(df) - int(matched.sum())}
+
+    def add_parcels(self, keys, key_field=None):
+        """
+        Add rows for TMKs that are not in the store yet
+
+        The island (and county, as in create) comes from the TMK and every
+        stored column is null for the new parcels. The key file and all
+        group files are rewritten in island/TMK order.
+
+        Args:
+            keys (array-like): TMKs in any format parse_tmk accepts
+            key_field (str): Key field name for error messages
+
+        Returns:
+            int: Number of parcels added
+
+        Raises:
+            ValueError: When a key is not a valid TMK
+        """
+        keys = pd.unique(_parse_keys(keys, key_field or self.key_field))
+        new_keys = keys[~np.isin(keys, self.keys())]
+        if len(new_keys) == 0:
+            return 0
+
+        island_field, county_field = self.manifest['island_field'], self.manifest['county_field']
+        islands = island_from_tmk(new_keys)
+        new_index = {self.key_field: new_keys, island_field: islands, county_field: islands}
+
+        def with_new_rows(path):
+            # Built in Arrow so stored column types survive the null rows
+            table = pq.read_table(path)
+            new_rows = pa.table({field.name: pa.array(new_index[field.name], type=field.type)
+                                 if field.name in new_index else pa.nulls(len(new_keys), field.type)
+                                 for field in table.schema}, schema=table.schema)
+            table = pa.concat_tables([table, new_rows])
+            pq.write_table(table.sort_by([(island_field, 'ascending'), (self.key_field, 'ascending')]),
+                           path, row_group_size=ROW_GROUP_SIZE)
+
+        with_new_rows(os.path.join(self.store_path, KEYS_FILE))
+        written = datetime.now().isoformat(timespec='seconds')
+        for group_info in self.manifest['column_groups'].values():
+            with_new_rows(os.path.join(self.store_path, group_info['file']))
+            group_info['written'] = written
+        self.manifest['row_count'] += len(new_keys)
+        self._write_manifest(self.store_path, self.manifest)
+        return len(new_keys)
+
+    def _write_group(self, group, records, value_columns):
+        file_name = f"group_{group}.parquet"
+        table = pa.Table.from_pandas(records, preserve_index=False)
+        pq.write_table(table, os.path.join(self.store_path, file_name), row_group_size=ROW_GROUP_SIZE)
+
+        self.manifest['column_groups'][group] = {
+            'file': file_name,
+            'columns': list(value_columns),
+            'written': datetime.now().isoformat(timespec='seconds')
+        }
+        self._write_manifest(self.store_path, self.manifest)
+
+    @staticmethod
+    def _write_manifest(store_path, manifest):
+        manifest_path = os.path.join(store_path, MANIFEST_NAME)
+        temp_path = manifest_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp_path, manifest_path)
+
+    def describe(self):
+        """Print a short summary of the store"""
+        print(f"MPAT store: {self.store_path}")
+        print(f"  Key field: {self.key_field}")
+        print(f"  Records: {self.row_count:,}")
+        for group_name, group_info in self.manifest['column_groups'].items():
+            print(f"  {group_name}: {len(group_info['columns'])} columns ({group_info['file']})")
@@ -0,0 +1,405 @@
+"""
+Packed STR-Tree Parcel Index
+University of Hawaii Water Resources Research Center
+
+Point-in-polygon engine for assigning the statewide cesspool points to
+tmk_state parcel polygons without a generic spatial join:
+
+    1. Parcel rings are stored as flat vertex buffers (one coordinate array
+       plus offsets), so 384k parcels are a handful of numpy arrays
+    2. A packed Sort-Tile-Recursive (STR) tree is built over the parcel
+       bounding boxes once and cached to disk (.npz)
+    3. Point batches walk the tree level by level with vectorized bbox tests
+    4. Surviving (point, parcel) candidates get an exact even-odd ray test
+       over the parcel edges, in bounded-memory chunks
+
+Points that hit no parcel (gaps, road right-of-way, offshore) and points
+that hit several parcels (overlapping or duplicated polygons) are reported
+so the TMK mismatches diagnosed in the MPAT notebook can be reviewed.
+"""
+
+import os
+
+import numpy as np
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+NODE_CAPACITY = 16           # Children per STR-tree node
+POINT_BATCH_SIZE = 65536     # Points walked through the tree at once
+EDGE_CHUNK_SIZE = 4_000_000  # (candidate, edge) pairs per exact-test block
+CACHE_VERSION = 1
+
+# ============================================================================
+# POLYGON BUFFERS
+# ============================================================================
+
+def polygons_from_geo_interface(geometries):
+    """
+    Flatten GeoJSON-like polygons into vertex buffers
+
+    Works with anything exposing __geo_interface__ (arcpy geometries from a
+    SHAPE@ cursor, shapely, geopandas) or plain GeoJSON geometry dicts.
+    All rings of a polygon (outer rings, holes, multipolygon parts) are kept
+    together; the even-odd test handles holes without knowing ring roles.
+
+    Args:
+        geometries (iterable): Polygon or MultiPolygon geometries
+
+    Returns:
+        tuple: (coords (V, 2) float64, ring_offsets (R+1), polygon_ring_offsets (P+1))
+    """
+    rings = []
+    polygon_ring_offsets = [0]
+    for geometry in geometries:
+        mapping = getattr(geometry, '__geo_interface__', geometry)
+        if mapping is None:
+            polygon_ring_offsets.append(len(rings))
+            continue
+        if mapping['type'] == 'Polygon':
+            parts = [mapping['coordinates']]
+        elif mapping['type'] == 'MultiPolygon':
+            parts = mapping['coordinates']
+        else:
+            raise ValueError(f"Unsupported geometry type: {mapping['type']}")
+        for part in parts:
+            for ring in part:
+                ring = np.asarray(ring, dtype=np.float64)[:, :2]
+                if len(ring) >= 3:
+                    rings.append(ring)
+        polygon_ring_offsets.append(len(rings))
+
+    ring_offsets = np.zeros(len(rings) + 1, dtype=np.int64)
+    if rings:
+        ring_offsets[1:] = np.cumsum([len(ring) for ring in rings])
+        coords = np.concatenate(rings)
+    else:
+        coords = np.empty((0, 2), dtype=np.float64)
+    return coords, ring_offsets, np.asarray(polygon_ring_offsets, dtype=np.int64)
+
+# ============================================================================
+# PACKED STR TREE
+# ============================================================================
+
+def _str_order(boxes, capacity):
+    """Sort-Tile-Recursive ordering of boxes: x slices, then y within a slice"""
+    n = len(boxes)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    center_x = (boxes[:, 0] + boxes[:, 2]) / 2
+    center_y = (boxes[:, 1] + boxes[:, 3]) / 2
+    n_nodes = -(-n // capacity)
+    n_slices = int(np.ceil(np.sqrt(n_nodes)))
+    slice_size = n_slices * capacity
+
+    by_x = np.argsort(center_x, kind='stable')
+    slice_id = np.empty(n, dtype=np.int64)
+    slice_id[by_x] = np.arange(n) // slice_size
+    # Sort by (slice, y): lexsort uses the last key as primary
+    return np.lexsort((center_y, slice_id))
+
+def _union_boxes(boxes, capacity):
+    """Bounding box of each consecutive group of `capacity` boxes"""
+    starts = np.arange(0, len(boxes), capacity)
+    return np.column_stack([
+        np.minimum.reduceat(boxes[:, 0], starts),
+        np.minimum.reduceat(boxes[:, 1], starts),
+        np.maximum.reduceat(boxes[:, 2], starts),
+        np.maximum.reduceat(boxes[:, 3], starts),
+    ])
+
+class PointAssignment:
+    """Result of a bulk point-in-parcel query"""
+
+    def __init__(self, n_points, pair_points, pair_polygons, polygon_ids):
+        self.n_points = n_points
+        order = np.lexsort((pair_polygons, pair_points))
+        self.pair_points = pair_points[order]            # every (point, parcel) hit
+        self.pair_polygons = pair_polygons[order]
+        self.hit_count = np.bincount(self.pair_points, minlength=n_points)
+
+        # First hit per point (lowest parcel index), -1 when no parcel contains it
+        self.polygon_index = np.full(n_points, -1, dtype=np.int64)
+        first = np.ones(len(self.pair_points), dtype=bool)
+        first[1:] = self.pair_points[1:] != self.pair_points[:-1]
+        self.polygon_index[self.pair_points[first]] = self.pair_polygons[first]
+
+        self.polygon_ids = polygon_ids
+
+    @property
+    def no_hit(self):
+        """Indices of points outside every parcel"""
+        return np.flatnonzero(self.hit_count == 0)
+
+    @property
+    def multi_hit(self):
+        """Indices of points inside more than one parcel"""
+        return np.flatnonzero(self.hit_count > 1)
+
+    def assigned_ids(self, missing=None):
+        """Parcel id (TMK, OID ...) per point, `missing` where unassigned"""
+        ids = np.asarray(self.polygon_ids, dtype=object)[np.maximum(self.polygon_index, 0)]
+        ids[self.polygon_index < 0] = missing
+        return ids
+
+    def as_dict(self):
+        return {
+            'points': self.n_points,
+            'assigned': int((self.hit_count > 0).sum()),
+            'no_hit': int((self.hit_count == 0).sum()),
+            'multi_hit': int((self.hit_count > 1).sum())
+        }
+
+    def report(self):
+        """Print a short assignment report"""
+        summary = self.as_dict()
+        rate = (summary['assigned'] / self.n_points) * 100 if self.n_points else 0
+        print(f"  Points assigned to a parcel: {summary['assigned']:,}/{self.n_points:,} ({rate:.1f}%)")
+        if summary['no_hit']:
+            print(f"    Outside every parcel: {summary['no_hit']:,}")
+        if summary['multi_hit']:
+            print(f"    Inside several parcels (overlaps): {summary['multi_hit']:,}")
+
+class ParcelIndex:
+    """Packed STR tree over parcel polygons with exact point-in-polygon tests"""
+
+    def __init__(self, coords, ring_offsets, polygon_ring_offsets, polygon_ids=None,
+                 node_capacity=NODE_CAPACITY, _tree=None):
+        self.coords = np.ascontiguousarray(coords, dtype=np.float64)
+        self.ring_offsets = np.asarray(ring_offsets, dtype=np.int64)
+        self.polygon_ring_offsets = np.asarray(polygon_ring_offsets, dtype=np.int64)
+        self.n_polygons = len(self.polygon_ring_offsets) - 1
+        self.polygon_ids = (np.arange(self.n_polygons) if polygon_ids is None
+                            else np.asarray(polygon_ids))
+        self.node_capacity = node_capacity
+
+        # Rings of a polygon are contiguous, so each polygon is one vertex range
+        self.polygon_vertex_offsets = self.ring_offsets[self.polygon_ring_offsets]
+
+        # Edge k runs from vertex k to edge_end[k] (ring start for the last vertex)
+        self.edge_end = np.arange(1, len(self.coords) + 1, dtype=np.int64)
+        ring_starts, ring_ends = self.ring_offsets[:-1], self.ring_offsets[1:]
+        nonempty = ring_ends > ring_starts
+        self.edge_end[ring_ends[nonempty] - 1] = ring_starts[nonempty]
+
+        if _tree is None:
+            self._build_tree()
+        else:
+            self.leaf_order, self.level_boxes = _tree
+
+    @classmethod
+    def from_geometries(cls, geometries, polygon_ids=None, node_capacity=NODE_CAPACITY):
+        """Build an index from __geo_interface__ polygons (see polygons_from_geo_interface)"""
+        coords, ring_offsets, polygon_ring_offsets = polygons_from_geo_interface(geometries)
+        return cls(coords, ring_offsets, polygon_ring_offsets, polygon_ids, node_capacity)
+
+    # ------------------------------------------------------------------
+    # Tree construction
+    # ------------------------------------------------------------------
+
+    def polygon_bounds(self):
+        """(P, 4) minx, miny, maxx, maxy per polygon (NaN for empty polygons)"""
+        starts = self.polygon_vertex_offsets[:-1]
+        ends = self.polygon_vertex_offsets[1:]
+        boxes = np.full((self.n_polygons, 4), np.nan)
+        nonempty = ends > starts
+        if nonempty.any() and len(self.coords):
+            idx = starts[nonempty]
+            x, y = self.coords[:, 0], self.coords[:, 1]
+            boxes[nonempty, 0] = np.minimum.reduceat(x, idx)
+            boxes[nonempty, 1] = np.minimum.reduceat(y, idx)
+            boxes[nonempty, 2] = np.maximum.reduceat(x, idx)
+            boxes[nonempty, 3] = np.maximum.reduceat(y, idx)
+        return boxes
+
+    def _build_tree(self):
+        boxes = self.polygon_bounds()
+        valid = np.flatnonzero(~np.isnan(boxes[:, 0]))
+        order = valid[_str_order(boxes[valid], self.node_capacity)]
+
+        # Level 0 holds the polygon boxes in STR order; each higher level packs
+        # `node_capacity` consecutive children, so node i owns children
+        # [i * capacity, (i + 1) * capacity) of the level below
+        self.leaf_order = order
+        levels = [boxes[order]]
+        while len(levels[-1]) > self.node_capacity:
+            parent = _union_boxes(levels[-1], self.node_capacity)
+            levels.append(parent)
+        self.level_boxes = levels
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def candidate_pairs(self, x, y):
+        """
+        Walk the tree for a batch of points
+
+        Returns:
+            tuple: (point index, polygon index) arrays for every bbox hit
+        """
+        n = len(x)
+        if not len(self.leaf_order) or n == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        top = self.level_boxes[-1]
+        points = np.repeat(np.arange(n), len(top))
+        nodes = np.tile(np.arange(len(top)), n)
+
+        for level in range(len(self.level_boxes) - 1, -1, -1):
+            boxes = self.level_boxes[level]
+            if level < len(self.level_boxes) - 1:
+                # Expand each surviving parent into its children
+                n_children = np.minimum((nodes + 1) * self.node_capacity, len(boxes)) - nodes * self.node_capacity
+                points = np.repeat(points, n_children)
+                first_child = np.repeat(nodes * self.node_capacity, n_children)
+                group_start = np.repeat(np.cumsum(n_children) - n_children, n_children)
+                nodes = first_child + (np.arange(len(points)) - group_start)
+
+            px, py = x[points], y[points]
+            b = boxes[nodes]
+            inside = (px >= b[:, 0]) & (px <= b[:, 2]) & (py >= b[:, 1]) & (py <= b[:, 3])
+            points, nodes = points[inside], nodes[inside]
+
+        return points, self.leaf_order[nodes]
+
+    def contains_pairs(self, x, y, points, polygons, edge_chunk_size=EDGE_CHUNK_SIZE):
+        """
+        Exact even-odd test for (point, polygon) candidate pairs
+
+        Returns:
+            numpy.ndarray: Boolean mask of pairs whose point lies inside the polygon
+        """
+        inside = np.zeros(len(points), dtype=bool)
+        if not len(points):
+            return inside
+
+        starts = self.polygon_vertex_offsets[polygons]
+        n_edges = self.polygon_vertex_offsets[polygons + 1] - starts
+        cumulative = np.cumsum(n_edges)
+
+        begin = 0
+        while begin < len(points):
+            # Take as many pairs as fit in one (pair, edge) block
+            limit = (cumulative[begin - 1] if begin else 0) + edge_chunk_size
+            end = max(begin + 1, int(np.searchsorted(cumulative, limit, side='right')))
+            counts = n_edges[begin:end]
+            pair = np.repeat(np.arange(begin, end), counts)
+            offset = np.arange(len(pair)) - np.repeat(np.cumsum(counts) - counts, counts)
+            edge = starts[pair] + offset
+
+            px, py = x[points[pair]], y[points[pair]]
+            x0, y0 = self.coords[edge, 0], self.coords[edge, 1]
+            end_vertex = self.edge_end[edge]
+            x1, y1 = self.coords[end_vertex, 0], self.coords[end_vertex, 1]
+
+            straddles = (y0 > py) != (y1 > py)
+            dy = np.where(straddles, y1 - y0, 1.0)
+            x_cross = x0 + (py - y0) * (x1 - x0) / dy
+            crossings = straddles & (px < x_cross)
+
+            inside[begin:end] = np.bincount(pair - begin, weights=crossings,
+                                            minlength=end - begin).astype(np.int64) % 2 == 1
+            begin = end
+        return inside
+
+    def query_points(self, x, y, batch_size=POINT_BATCH_SIZE):
+        """
+        Assign points to the parcels that contain them
+
+        Args:
+            x, y (array-like): Point coordinates in the parcel coordinate system
+            batch_size (int): Points per tree walk (bounds peak memory)
+
+        Returns:
+            PointAssignment: First hit per point plus no-hit / multi-hit sets
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        hit_points, hit_polygons = [], []
+
+        for start in range(0, len(x), batch_size):
+            bx, by = x[start:start + batch_size], y[start:start + batch_size]
+            points, polygons = self.candidate_pairs(bx, by)
+            inside = self.contains_pairs(bx, by, points, polygons)
+            hit_points.append(points[inside] + start)
+            hit_polygons.append(polygons[inside])
+
+        pair_points = np.concatenate(hit_points) if hit_points else np.empty(0, dtype=np.int64)
+        pair_polygons = np.concatenate(hit_polygons) if hit_polygons else np.empty(0, dtype=np.int64)
+        return PointAssignment(len(x), pair_points, pair_polygons, self.polygon_ids)
+
+    # ------------------------------------------------------------------
+    # Disk cache
+    # ------------------------------------------------------------------
+
+    def save(self, cache_path, signature=""):
+        """
+        Save buffers and tree to an .npz cache
+
+        Args:
+            cache_path (str): Output .npz file
+            signature (str): Source fingerprint checked by load()
+        """
+        arrays = {
+            'version': np.array(CACHE_VERSION),
+            'signature': np.array(signature),
+            'node_capacity': np.array(self.node_capacity),
+            'coords': self.coords,
+            'ring_offsets': self.ring_offsets,
+            'polygon_ring_offsets': self.polygon_ring_offsets,
+            'polygon_ids': (self.polygon_ids.astype(str) if self.polygon_ids.dtype == object
+                            else self.polygon_ids),
+            'leaf_order': self.leaf_order,
+            'n_levels': np.array(len(self.level_boxes)),
+        }
+        for level, boxes in enumerate(self.level_boxes):
+            arrays[f'level_{level}'] = boxes
+
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        temp_path = cache_path + ".tmp.npz"
+        np.savez(temp_path, **arrays)
+        os.replace(temp_path, cache_path)
+
+    @classmethod
+    def load(cls, cache_path, signature=None):
+        """
+        Load a cached index
+
+        Returns:
+            ParcelIndex: The index, or None when the cache is missing, from
+            another cache version, or built from a different source signature
+        """
+        if not os.path.exists(cache_path):
+            return None
+        with np.load(cache_path, allow_pickle=False) as data:
+            if int(data['version']) != CACHE_VERSION:
+                return None
+            if signature is not None and str(data['signature']) != signature:
+                return None
+            levels = [data[f'level_{level}'] for level in range(int(data['n_levels']))]
+            return cls(data['coords'], data['ring_offsets'], data['polygon_ring_offsets'],
+                       data['polygon_ids'], int(data['node_capacity']),
+                       _tree=(data['leaf_order'], levels))
+
+    @classmethod
+    def load_or_build(cls, cache_path, signature, geometry_loader):
+        """
+        Load the cached index for this source, or build and cache it
+
+        Args:
+            cache_path (str): .npz cache file
+            signature (str): Source fingerprint (path, size, mtime, count ...)
+            geometry_loader (callable): Returns (geometries, polygon_ids) on a miss
+
+        Returns:
+            tuple: (ParcelIndex, True if it came from the cache)
+        """
+        index = cls.load(cache_path, signature)
+        if index is not None:
+            return index, True
+        geometries, polygon_ids = geometry_loader()
+        index = cls.from_geometries(geometries, polygon_ids)
+        index.save(cache_path, signature)
+        return index, False
@@ -0,0 +1,188 @@
+"""
+County-Partitioned Parallel Execution
+University of Hawaii Water Resources Research Center
+
+Runs one workflow per county (Hawaii, Maui, Honolulu, Kauai) in a process
+pool. Each worker gets its own scratch folder, so geodatabase locks and
+intermediate datasets never collide, and returns the paths of what it
+wrote. Partition outputs are then merged in a fixed county order and
+sorted by TMK, so the statewide table is identical no matter which worker
+finished first or how many cores were used.
+"""
+
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .tmk_codec import TMK_COUNTY_CODES, parse_tmk
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+# County partitions in TMK county-code order (1=Hawaii ... 4=Kauai)
+COUNTY_PARTITIONS = [TMK_COUNTY_CODES[code] for code in sorted(TMK_COUNTY_CODES)]
+
+# ============================================================================
+# WORKER PROCESSES
+# ============================================================================
+
+def use_python_for_workers():
+    """
+    Start worker processes with python.exe when running inside ArcGIS Pro
+
+    There sys.executable is the ArcGIS Pro application, not Python, so a
+    process pool would launch copies of the application. Call before
+    creating a pool from a script that may run in the Pro Python window.
+    """
+    python_exe = os.path.join(sys.exec_prefix, "python.exe")
+    if os.path.basename(sys.executable).lower().startswith("arcgispro") and os.path.exists(python_exe):
+        multiprocessing.set_executable(python_exe)
+
+# ============================================================================
+# PARTITION EXECUTION
+# ============================================================================
+
+class PartitionResult:
+    """Outcome of one partition worker"""
+
+    def __init__(self, partition, outputs=None, seconds=0.0, error=None):
+        self.partition = partition
+        self.outputs = outputs or {}
+        self.seconds = seconds
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else "failed"
+        return f"PartitionResult({self.partition}, {status}, {self.seconds:.1f} s)"
+
+def partition_scratch(scratch_root, partition, clean=False):
+    """Create (and optionally empty) the scratch folder for one partition"""
+    folder = os.path.join(str(scratch_root), str(partition).replace(' ', '_'))
+    if clean and os.path.isdir(folder):
+        shutil.rmtree(folder)
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+def _run_partition(worker, partition, scratch_dir, args, kwargs):
+    """Run one worker in the child process and capture its outcome"""
+    started = time.perf_counter()
+    try:
+        outputs = worker(partition, scratch_dir, *args, **kwargs)
+        return PartitionResult(partition, outputs, time.perf_counter() - started)
+    except Exception:
+        return PartitionResult(partition, seconds=time.perf_counter() - started,
+                               error=traceback.format_exc())
+
+def run_partitions(worker, scratch_root, partitions=None, max_workers=None,
+                   clean_scratch=False, args=(), kwargs=None, mp_context=None):
+    """
+    Run worker(partition, scratch_dir, *args, **kwargs) for every partition
+
+    Args:
+        worker (callable): Module-level (picklable) function returning a dict
+            of output name -> path
+        scratch_root (str): Folder holding one scratch folder per partition
+        partitions (list): Partition names (default: the four counties)
+        max_workers (int): Processes (default: one per partition, capped at
+            the CPU count); 1 runs everything in this process
+        clean_scratch (bool): Empty each scratch folder before the run
+        args, kwargs: Extra worker arguments
+        mp_context: multiprocessing context for the pool
+
+    Returns:
+        list: PartitionResult per partition, in partition order
+    """
+    partitions = list(partitions or COUNTY_PARTITIONS)
+    kwargs = dict(kwargs or {})
+    if max_workers is None:
+        max_workers = min(len(partitions), os.cpu_count() or 1)
+    scratch = {p: partition_scratch(scratch_root, p, clean_scratch) for p in partitions}
+
+    if max_workers <= 1:
+        results = [_run_partition(worker, p, scratch[p], args, kwargs) for p in partitions]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as pool:
+            futures = {p: pool.submit(_run_partition, worker, p, scratch[p], args, kwargs)
+                       for p in partitions}
+            results = [futures[p].result() for p in partitions]
+
+    for result in results:
+        if result.ok:
+            print(f"  ✅ {result.partition}: {result.seconds:.1f} s")
+        else:
+            print(f"  ❌ {result.partition} failed after {result.seconds:.1f} s")
+            print(result.error)
+    return results
+
+# ============================================================================
+# DETERMINISTIC MERGE
+# ============================================================================
+
+def merge_partition_frames(frames, key_field="TMK", partition_field=None):
+    """
+    Merge per-partition DataFrames into one statewide DataFrame
+
+    Rows are ordered by partition (in the order given) and then by parsed
+    int64 TMK with a stable sort, so the result does not depend on worker
+    completion order or on whether the key column is text or numeric.
+
+    Args:
+        frames (list): (partition, DataFrame) pairs in partition order
+        key_field (str): Sort key within a partition (None keeps row order)
+        partition_field (str): Optional column recording the source partition
+
+    Returns:
+        pandas.DataFrame: Merged table with a fresh RangeIndex
+    """
+    parts = []
+    for partition, frame in frames:
+        if key_field and key_field in frame.columns:
+            frame = frame.iloc[np.argsort(parse_tmk(frame[key_field]), kind='stable')]
+        if partition_field:
+            frame = frame.assign(**{partition_field: partition})
+        parts.append(frame)
+    if not parts:
+        return pd.DataFrame()
+    return pd.concat(parts, ignore_index=True)
+
+def merge_partition_files(results, output_name, output_path, key_field="TMK",
+                          partition_field=None):
+    """
+    Merge one Parquet or CSV output from every successful partition
+
+    Args:
+        results (list): PartitionResult list from run_partitions
+        output_name (str): Key of the output in each result's outputs dict
+        output_path (str): Statewide output file (.parquet or .csv)
+        key_field (str): Sort key within a partition
+        partition_field (str): Optional column recording the source partition
+
+    Returns:
+        int: Rows written
+    """
+    frames = []
+    for result in results:
+        path = result.outputs.get(output_name) if result.ok else None
+        if not path or not os.path.exists(path):
+            continue
+        reader = pd.read_parquet if path.endswith('.parquet') else pd.read_csv
+        frames.append((result.partition, reader(path)))
+
+    merged = merge_partition_frames(frames, key_field, partition_field)
+    if output_path.endswith('.parquet'):
+        merged.to_parquet(output_path, index=False)
+    else:
+        merged.to_csv(output_path, index=False)
+    return len(merged)
@@ -0,0 +1,54 @@
+# PRIORITY SCORING - Cesspool Upgrade Priority Rules
+# Preliminary 1-10 upgrade priority from bedrooms and lot size
+# Pure Python (no arcpy, no NumPy) so it imports in milliseconds
+# (priority_kernel.py scores whole tables from a configurable spec)
+
+from .sizing import LOT_SIZE_BREAKS_SF
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+PRIORITY_BASE_SCORE = 5
+PRIORITY_MAX_SCORE = 10
+DEFAULT_BEDROOMS = 1   # Used when the bedroom count is missing
+
+# (minimum bedrooms, points) - more bedrooms = more wastewater = higher priority
+BEDROOM_POINTS = [(6, 3), (4, 2), (2, 1)]
+
+# Smaller lots = higher priority (harder to upgrade on site)
+SMALL_LOT_POINTS = 2    # Below the first lot-size break
+MEDIUM_LOT_POINTS = 1   # Up to and including the second break
+
+# ============================================================================
+# SCORING
+# ============================================================================
+
+def bedroom_points(bedrooms):
+    for minimum, points in BEDROOM_POINTS:
+        if bedrooms >= minimum:
+            return points
+    return 0
+
+def lot_size_points(lot_sf):
+    if lot_sf < LOT_SIZE_BREAKS_SF[0]:
+        return SMALL_LOT_POINTS
+    elif lot_sf <= LOT_SIZE_BREAKS_SF[1]:
+        return MEDIUM_LOT_POINTS
+    return 0
+
+def calculate_priority(bedrooms, lot_sf):
+    """
+    Preliminary upgrade priority score
+
+    Args:
+        bedrooms (int): Number of bedrooms (missing counts as DEFAULT_BEDROOMS)
+        lot_sf (float): Lot size in square feet
+
+    Returns:
+        int: Score from PRIORITY_BASE_SCORE to PRIORITY_MAX_SCORE
+    """
+    score = PRIORITY_BASE_SCORE
+    score += bedroom_points(bedrooms or DEFAULT_BEDROOMS)
+    score += lot_size_points(lot_sf or 0)
+    return min(score, PRIORITY_MAX_SCORE)
@@ -0,0 +1,297 @@
+"""
+Vectorized Priority Scoring Engine
+University of Hawaii Water Resources Research Center
+
+Scores every parcel in one pass from factor columns (bedrooms, lot size,
+well proximity, soil class, slope, flood zone) and a weight/threshold spec
+that lives in configs/hawaii_config.yaml instead of a CalculateField code
+block. Each factor becomes an np.select (threshold rules) or a lookup
+(category points); the score is base + sum(weight x points), clipped to the
+score range. top_k_by_group picks the highest-scoring parcels per island
+with np.argpartition, so re-ranking the statewide list after a weight change
+takes milliseconds. The scalar rules in priority.py stay the reference for
+the default spec.
+"""
+
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import yaml
+except ImportError:  # pragma: no cover - raised with a hint on first use
+    yaml = None
+
+from .priority import (
+    PRIORITY_BASE_SCORE, PRIORITY_MAX_SCORE, DEFAULT_BEDROOMS, BEDROOM_POINTS,
+    SMALL_LOT_POINTS, MEDIUM_LOT_POINTS
+)
+from .sizing import LOT_SIZE_BREAKS_SF
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+DEFAULT_CONFIG_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "configs", "hawaii_config.yaml"
+)
+CONFIG_SECTION = "priority_scoring"
+
+# Threshold rule operators: [operator, threshold, points], first match wins
+RULE_OPERATORS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '==': np.equal,
+}
+
+# Default spec = the preliminary 1-10 score of priority.calculate_priority.
+# Site factors are listed with weight 0; give them a weight in the config to
+# include them in the score.
+DEFAULT_PRIORITY_SPEC = {
+    'base_score': PRIORITY_BASE_SCORE,
+    'min_score': 1,
+    'max_score': PRIORITY_MAX_SCORE,
+    'factors': {
+        'bedrooms': {
+            'field': 'BED_ROOMS',
+            'weight': 1.0,
+            'missing': DEFAULT_BEDROOMS,
+            'rules': [['>=', minimum, points] for minimum, points in BEDROOM_POINTS],
+        },
+        'lot_size': {
+            'field': 'LOT_SIZE_SF',
+            'weight': 1.0,
+            'missing': 0,
+            'rules': [['<', LOT_SIZE_BREAKS_SF[0], SMALL_LOT_POINTS],
+                      ['<=', LOT_SIZE_BREAKS_SF[1], MEDIUM_LOT_POINTS]],
+        },
+        'well_proximity': {
+            'field': 'Dist_Domestic_Wells_ft',
+            'weight': 0.0,
+            'rules': [['<=', 100, 3], ['<=', 500, 2], ['<=', 1000, 1]],
+        },
+        'soil_class': {
+            'field': 'SOIL_HAR_CLASS',
+            'weight': 0.0,
+            'points': {'<1 min/inch': 2, '>60 min/inch': 2, '10-60 min/inch': 1},
+        },
+        'slope': {
+            'field': 'SLOPE_PERCENT',
+            'weight': 0.0,
+            'rules': [['>', 20, 2], ['>', 12, 1]],
+        },
+        'flood_zone': {
+            'field': 'FLOOD_ZONE',
+            'weight': 0.0,
+            'points': {'VE': 3, 'V': 3, 'AE': 2, 'A': 2, 'AO': 2, 'AH': 2},
+        },
+    },
+}
+
+# ============================================================================
+# SPEC
+# ============================================================================
+
+def _require_yaml():
+    if yaml is None:
+        raise ImportError("Loading the priority spec from YAML requires PyYAML: pip install pyyaml")
+
+def merge_priority_spec(overrides, base=None):
+    """
+    Overlay a (partial) spec on the default one
+
+    Factor entries are merged key by key, so a config that only sets
+    'weight: 0.5' for well_proximity keeps the default field and rules.
+
+    Args:
+        overrides (dict): Spec keys to change (None = no change)
+        base (dict): Spec to start from (default: DEFAULT_PRIORITY_SPEC)
+
+    Returns:
+        dict: New spec
+    """
+    spec = copy.deepcopy(base or DEFAULT_PRIORITY_SPEC)
+    for key, value in (overrides or {}).items():
+        if key != 'factors':
+            spec[key] = value
+            continue
+        for name, factor in (value or {}).items():
+            spec['factors'][name] = {**spec['factors'].get(name, {}), **(factor or {})}
+    return spec
+
+def load_priority_spec(config_file=None, section=CONFIG_SECTION):
+    """
+    Priority spec from the project YAML config (defaults for anything unset)
+
+    Args:
+        config_file (str): YAML file (default: configs/hawaii_config.yaml)
+        section (str): Top-level key holding the spec
+
+    Returns:
+        dict: Spec for score_parcels
+    """
+    config_file = config_file or DEFAULT_CONFIG_FILE
+    if not os.path.exists(config_file):
+        return merge_priority_spec(None)
+    _require_yaml()
+    with open(config_file, encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+    return merge_priority_spec(config.get(section))
+
+def active_factors(spec=None):
+    """Factors with a non-zero weight, in spec order"""
+    spec = spec or DEFAULT_PRIORITY_SPEC
+    return {name: factor for name, factor in spec['factors'].items() if factor.get('weight', 0)}
+
+def required_fields(spec=None):
+    """Input columns the spec needs"""
+    return [factor['field'] for factor in active_factors(spec).values()]
+
+# ============================================================================
+# SCORING
+# ============================================================================
+
+def factor_points(values, factor):
+    """
+    Points per parcel for one factor
+
+    Args:
+        values (array-like): Factor column
+        factor (dict): 'rules' ([operator, threshold, points] list, first
+            match wins) or 'points' (category -> points); optional
+            'missing' (value used for nulls) and 'default' (points when no
+            rule matches, 0)
+
+    Returns:
+        numpy.ndarray: float64 points
+    """
+    default = float(factor.get('default', 0))
+    if 'points' in factor:
+        labels = pd.Series(values, dtype=object)
+        if 'missing' in factor:
+            labels = labels.fillna(factor['missing'])
+        # Look up the distinct labels only; nulls (code -1) get the default
+        codes, uniques = pd.factorize(labels)
+        categories = pd.Index([str(label) for label in factor['points']])
+        table = np.append(np.array(list(factor['points'].values()), dtype=float), default)
+        lookup = np.append(table[categories.get_indexer(pd.Index(uniques).astype(str))], default)
+        return lookup[codes]
+
+    values = np.asarray(values, dtype=float)
+    if 'missing' in factor:
+        values = np.where(np.isnan(values), float(factor['missing']), values)
+    conditions, choices = [], []
+    for operator, threshold, points in factor.get('rules', []):
+        if operator not in RULE_OPERATORS:
+            raise ValueError(f"Unknown rule operator {operator!r} (use one of {list(RULE_OPERATORS)})")
+        conditions.append(RULE_OPERATORS[operator](values, threshold))   # NaN compares False
+        choices.append(float(points))
+    if not conditions:
+        return np.full(len(values), default)
+    return np.select(conditions, choices, default)
+
+def score_parcels(columns, spec=None, return_points=False):
+    """
+    Priority score for every parcel
+
+    Args:
+        columns (dict or DataFrame): Field -> array for every active factor
+        spec (dict): Weights and thresholds (default: DEFAULT_PRIORITY_SPEC)
+        return_points (bool): Also return the unweighted points per factor
+
+    Returns:
+        numpy.ndarray: float64 scores clipped to [min_score, max_score]
+        (with return_points: (scores, dict factor -> points))
+    """
+    spec = spec or DEFAULT_PRIORITY_SPEC
+    factors = active_factors(spec)
+    missing = [factor['field'] for factor in factors.values() if factor['field'] not in columns]
+    if missing:
+        raise KeyError(f"Priority factor columns not found: {missing}")
+
+    n = len(next(iter(columns.values()))) if len(columns) else 0
+    score = np.full(n, float(spec.get('base_score', 0)))
+    points = {}
+    for name, factor in factors.items():
+        points[name] = factor_points(columns[factor['field']], factor)
+        score += float(factor['weight']) * points[name]
+    score = np.clip(score, spec.get('min_score', -np.inf), spec.get('max_score', np.inf))
+    return (score, points) if return_points else score
+
+def priority_scores(columns, spec=None):
+    """Scores rounded to whole numbers for the SHORT PRIORITY_SCORE field"""
+    return np.rint(score_parcels(columns, spec)).astype(np.int16)
+
+# ============================================================================
+# TOP-K SELECTION
+# ============================================================================
+
+def top_k(scores, k):
+    """
+    Positions of the k highest scores, best first
+
+    np.argpartition finds the k-th score in linear time; only the selected
+    parcels are sorted. Ties at the cut-off go to the lower position, so the
+    result does not depend on the partition order.
+    """
+    scores = np.asarray(scores, dtype=float)
+    k = min(int(k), len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        cutoff = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = np.flatnonzero(scores > cutoff)
+        tied = np.flatnonzero(scores == cutoff)[:k - len(above)]
+        selected = np.concatenate([above, tied])
+    else:
+        selected = np.arange(len(scores))
+    return selected[np.lexsort((selected, -scores[selected]))]
+
+def top_k_by_group(scores, groups, k):
+    """
+    Top-k parcels per group (island) in one pass over the scores
+
+    Args:
+        scores (array-like): Score per parcel
+        groups (array-like): Group label per parcel (e.g. island_names(tmk))
+        k (int): Parcels to keep per group
+
+    Returns:
+        dict: Group label -> positions into scores, best first
+    """
+    scores = np.asarray(scores, dtype=float)
+    codes, labels = pd.factorize(pd.Series(groups), sort=True)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(codes[codes >= 0], minlength=len(labels)))])
+    order = order[(codes < 0).sum():]   # nulls (code -1) sort first
+    result = {}
+    for code, label in enumerate(labels):
+        members = order[bounds[code]:bounds[code + 1]]
+        result[label] = members[top_k(scores[members], k)]
+    return result
+
+def ranked_table(scores, groups, k, keys=None, group_field='ISLAND'):
+    """
+    Top-k per group as a table (group, rank, score, key)
+
+    Args:
+        scores, groups, k: As for top_k_by_group
+        keys (array-like): Parcel identifiers (e.g. TMK; default: position)
+
+    Returns:
+        pandas.DataFrame: One row per selected parcel
+    """
+    scores = np.asarray(scores, dtype=float)
+    keys = np.arange(len(scores)) if keys is None else np.asarray(keys)
+    frames = [pd.DataFrame({group_field: label,
+                            'RANK': np.arange(1, len(positions) + 1),
+                            'PRIORITY_SCORE': scores[positions],
+                            'KEY': keys[positions]})
+              for label, positions in top_k_by_group(scores, groups, k).items()]
+    if not frames:
+        return pd.DataFrame(columns=[group_field, 'RANK', 'PRIORITY_SCORE', 'KEY'])
+    return pd.concat(frames, ignore_index=True)
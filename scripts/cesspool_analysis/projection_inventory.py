@@ -0,0 +1,332 @@
+"""
+Projection Inventory Scanner
+University of Hawaii Water Resources Research Center
+
+Reports the coordinate system of every shapefile under a downloads tree
+without ArcGIS:
+
+    1. Directories are listed with os.scandir across a thread pool; a
+       shapefile's .prj sidecar is found in the same listing, so each file
+       costs one stat and, only when it changed, one read
+    2. Each distinct .prj text is parsed once (pyproj), cached by content
+       hash; the cache is kept in the report for the next run
+    3. Every dataset is classified as target (already in the HCPT CRS),
+       transformable (known CRS with a datum pyproj can transform from) or
+       unknown (no .prj, unparsable or a local CRS)
+
+The report is written as JSON (read back by the next scan, which re-reads
+only files whose mtime or size changed) and CSV. Without pyproj the
+classification falls back to matching the Esri WKT names.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+
+from .coordinate_transform import EPSG_MIN_CONFIDENCE, HCPT_TARGET_EPSG, accepted_epsg, get_transformer
+
+try:
+    import pyproj
+except ImportError:  # pragma: no cover - falls back to WKT name matching
+    pyproj = None
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+REPORT_NAME = "projection_inventory.json"
+CLASSIFIER_VERSION = 1  # Bump when classify_wkt changes its statuses
+
+STATUS_TARGET = 'target'
+STATUS_TRANSFORMABLE = 'transformable'
+STATUS_UNKNOWN = 'unknown'
+STATUSES = (STATUS_TARGET, STATUS_TRANSFORMABLE, STATUS_UNKNOWN)
+
+# Backups left by the old in-place projection fixers
+EXCLUDED_SUFFIXES = ('_original.shp', '_reprojected.shp', '_temp.shp')
+
+CSV_FIELDS = ['path', 'status', 'epsg', 'crs_name', 'kind', 'message',
+              'prj_hash', 'shp_mtime', 'shp_size', 'prj_mtime']
+
+# ============================================================================
+# WKT CLASSIFICATION
+# ============================================================================
+
+def _classify_by_name(wkt, target_epsg):
+    """String-matching classification used when pyproj is not installed"""
+    if target_epsg == HCPT_TARGET_EPSG and "UTM_Zone_4N" in wkt and "North_American_1983" in wkt:
+        return {'status': STATUS_TARGET, 'epsg': None, 'crs_name': "NAD 83 UTM Zone 4N",
+                'kind': 'projected', 'message': 'matched by name (pyproj not installed)'}
+    if "GEOGCS" in wkt and "PROJCS" not in wkt:
+        kind, name = 'geographic', "Geographic coordinates (degrees)"
+    elif "State_Plane" in wkt:
+        kind, name = 'projected', "Hawaii State Plane"
+    elif "WGS_1984" in wkt:
+        kind, name = 'projected', "WGS84"
+    elif "PROJCS" in wkt:
+        kind, name = 'projected', "Other projection"
+    else:
+        return {'status': STATUS_UNKNOWN, 'epsg': None, 'crs_name': None, 'kind': None,
+                'message': 'not a recognizable WKT (pyproj not installed)'}
+    return {'status': STATUS_TRANSFORMABLE, 'epsg': None, 'crs_name': name, 'kind': kind,
+            'message': 'matched by name (pyproj not installed)'}
+
+def classify_wkt(wkt, target_epsg=HCPT_TARGET_EPSG):
+    """
+    Classify one .prj text against the target CRS
+
+    Args:
+        wkt (str): .prj content (Esri WKT1 or OGC WKT)
+        target_epsg (int): Target EPSG code
+
+    Returns:
+        dict: status, epsg (None when not identified), crs_name, kind
+        (geographic / projected / ...) and message
+    """
+    if not wkt.strip():
+        return {'status': STATUS_UNKNOWN, 'epsg': None, 'crs_name': None, 'kind': None,
+                'message': 'empty .prj'}
+    if pyproj is None:
+        return _classify_by_name(wkt, target_epsg)
+
+    try:
+        crs = pyproj.CRS.from_wkt(wkt)
+    except pyproj.exceptions.CRSError as e:
+        return {'status': STATUS_UNKNOWN, 'epsg': None, 'crs_name': None, 'kind': None,
+                'message': f"unparsable WKT: {e}"}
+
+    epsg = crs.to_epsg(min_confidence=EPSG_MIN_CONFIDENCE)
+    kind = 'projected' if crs.is_projected else 'geographic' if crs.is_geographic else crs.type_name.lower()
+    info = {'epsg': epsg, 'crs_name': crs.name, 'kind': kind, 'message': ''}
+    if epsg in accepted_epsg(target_epsg):
+        return {**info, 'status': STATUS_TARGET}
+    if crs.geodetic_crs is None:
+        return {**info, 'status': STATUS_UNKNOWN, 'message': 'no datum (local or engineering CRS)'}
+    try:
+        get_transformer(crs, target_epsg)
+    except (pyproj.exceptions.ProjError, pyproj.exceptions.CRSError) as e:
+        return {**info, 'status': STATUS_UNKNOWN, 'message': f"no transformation to EPSG:{target_epsg}: {e}"}
+    return {**info, 'status': STATUS_TRANSFORMABLE}
+
+def classifier_signature(target_epsg=HCPT_TARGET_EPSG):
+    """
+    Settings a stored classification depends on
+
+    A previous report whose signature differs (another classifier version,
+    accepted EPSG set or confidence threshold, or pyproj added/removed) is
+    not reused.
+    """
+    return {'version': CLASSIFIER_VERSION,
+            'accepted_epsg': sorted(accepted_epsg(target_epsg)),
+            'min_confidence': EPSG_MIN_CONFIDENCE,
+            'pyproj': pyproj is not None}
+
+class WktCache:
+    """classify_wkt results keyed by .prj content hash"""
+
+    def __init__(self, target_epsg=HCPT_TARGET_EPSG, entries=None):
+        self.target_epsg = target_epsg
+        self.entries = dict(entries or {})
+        self.parsed = 0
+
+    @staticmethod
+    def content_hash(wkt):
+        return hashlib.sha1(wkt.strip().encode('utf-8')).hexdigest()
+
+    def classify(self, wkt):
+        """
+        Returns:
+            tuple: (content hash, classification dict)
+        """
+        key = self.content_hash(wkt)
+        if key not in self.entries:
+            self.entries[key] = classify_wkt(wkt, self.target_epsg)
+            self.parsed += 1
+        return key, self.entries[key]
+
+# ============================================================================
+# SCANNING
+# ============================================================================
+
+def _read_text(path):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+def _scan_directory(folder, root, previous, exclude_suffixes):
+    """
+    One directory listing: shapefile records and subdirectories
+
+    Records whose .shp and .prj mtime and size match the previous report
+    are marked 'reuse'; for the rest the .prj text is read here.
+    """
+    subdirs, files = [], {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                # File geodatabases hold no shapefiles
+                if not entry.name.lower().endswith('.gdb'):
+                    subdirs.append(entry.path)
+            elif entry.is_file():
+                files[entry.name.lower()] = entry
+
+    records = []
+    for name, entry in files.items():
+        if not name.endswith('.shp') or name.endswith(exclude_suffixes):
+            continue
+        shp_stat = entry.stat()
+        prj_entry = files.get(name[:-4] + '.prj')
+        prj_stat = prj_entry.stat() if prj_entry else None
+        record = {
+            'path': os.path.relpath(entry.path, root).replace(os.sep, '/'),
+            'shp_mtime': shp_stat.st_mtime_ns,
+            'shp_size': shp_stat.st_size,
+            'prj_mtime': prj_stat.st_mtime_ns if prj_stat else None,
+            'prj_size': prj_stat.st_size if prj_stat else None,
+        }
+        old = previous.get(record['path'])
+        if old and all(old.get(key) == record[key]
+                       for key in ('shp_mtime', 'shp_size', 'prj_mtime', 'prj_size')):
+            record['reuse'] = old
+        elif prj_entry:
+            try:
+                record['wkt'] = _read_text(prj_entry.path)
+            except OSError as e:
+                record['error'] = f"cannot read .prj: {e}"
+        records.append(record)
+    return subdirs, records
+
+def scan_shapefiles(root, previous=None, max_workers=None, exclude_suffixes=EXCLUDED_SUFFIXES):
+    """
+    List every shapefile under root with its .prj text, concurrently
+
+    Each directory is one thread-pool task; subdirectories are submitted as
+    they are found.
+
+    Args:
+        root (str): Folder to scan
+        previous (dict): Relative path -> record from the last report; files
+            with the same mtimes and sizes are not re-read
+        max_workers (int): Threads (default: min(32, CPU count + 4))
+        exclude_suffixes (tuple): Lower-case name endings to skip
+
+    Returns:
+        list: Records (path, stat fields, and 'wkt', 'reuse' or 'error'),
+        sorted by path
+    """
+    previous = previous or {}
+    exclude_suffixes = tuple(suffix.lower() for suffix in exclude_suffixes)
+    records = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {pool.submit(_scan_directory, root, root, previous, exclude_suffixes)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                subdirs, found = future.result()
+                records.extend(found)
+                pending |= {pool.submit(_scan_directory, folder, root, previous, exclude_suffixes)
+                            for folder in subdirs}
+    return sorted(records, key=lambda record: record['path'])
+
+# ============================================================================
+# INVENTORY
+# ============================================================================
+
+def summarize(datasets):
+    """Dataset count per status"""
+    counts = {status: 0 for status in STATUSES}
+    for dataset in datasets:
+        counts[dataset['status']] += 1
+    counts['total'] = len(datasets)
+    return counts
+
+def load_report(report_path):
+    """Previous JSON report, or None when missing or unreadable"""
+    if not report_path or not os.path.exists(report_path):
+        return None
+    try:
+        with open(report_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def scan_projections(root, target_epsg=HCPT_TARGET_EPSG, report_path=None, incremental=True,
+                     max_workers=None, exclude_suffixes=EXCLUDED_SUFFIXES):
+    """
+    Projection inventory of a downloads tree
+
+    Args:
+        root (str): Folder to scan (e.g. data/gis_downloads)
+        target_epsg (int): Target EPSG code
+        report_path (str): Previous JSON report to reuse (default:
+            REPORT_NAME in root); ignored when incremental is False or the
+            report was made for another target or classifier_signature
+        incremental (bool): Skip files unchanged since the previous report
+        max_workers (int): Scanner threads
+        exclude_suffixes (tuple): Shapefile name endings to skip
+
+    Returns:
+        dict: root, target_epsg, scanned (timestamp), seconds, summary
+        (count per status), stats (reused / read / parsed), datasets
+        (one dict per shapefile), classifier (classifier_signature) and wkt_cache
+    """
+    started = time.perf_counter()
+    report_path = report_path or os.path.join(root, REPORT_NAME)
+    old = load_report(report_path) if incremental else None
+    signature = classifier_signature(target_epsg)
+    if old and (old.get('target_epsg') != target_epsg or old.get('classifier') != signature):
+        old = None
+    previous = {dataset['path']: dataset for dataset in (old or {}).get('datasets', [])}
+    cache = WktCache(target_epsg, (old or {}).get('wkt_cache'))
+
+    datasets, reused, read = [], 0, 0
+    for record in scan_shapefiles(root, previous, max_workers, exclude_suffixes):
+        if 'reuse' in record:
+            datasets.append(record['reuse'])
+            reused += 1
+            continue
+        dataset = {key: record[key] for key in ('path', 'shp_mtime', 'shp_size', 'prj_mtime', 'prj_size')}
+        if 'wkt' in record:
+            read += 1
+            dataset['prj_hash'], info = cache.classify(record['wkt'])
+        else:
+            dataset['prj_hash'] = None
+            info = {'status': STATUS_UNKNOWN, 'epsg': None, 'crs_name': None, 'kind': None,
+                    'message': record.get('error', 'no .prj file')}
+        dataset.update(info)
+        datasets.append(dataset)
+
+    # Drop cached parses no dataset refers to any more
+    used = {dataset.get('prj_hash') for dataset in datasets}
+    return {
+        'root': os.path.abspath(root),
+        'target_epsg': target_epsg,
+        'classifier': signature,
+        'scanned': datetime.now().isoformat(timespec='seconds'),
+        'seconds': round(time.perf_counter() - started, 3),
+        'summary': summarize(datasets),
+        'stats': {'reused': reused, 'read': read, 'parsed': cache.parsed},
+        'datasets': datasets,
+        'wkt_cache': {key: value for key, value in cache.entries.items() if key in used},
+    }
+
+def write_report(report, json_path, csv_path=None):
+    """
+    Write the inventory as JSON (input of the next incremental scan) and,
+    optionally, one CSV row per dataset
+    """
+    folder = os.path.dirname(os.path.abspath(json_path))
+    os.makedirs(folder, exist_ok=True)
+    temp_path = json_path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    os.replace(temp_path, json_path)
+
+    if csv_path:
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(report['datasets'])
@@ -0,0 +1,200 @@
+"""
+Memory-Mapped Raster Access
+University of Hawaii Water Resources Research Center
+
+Reads large single-band rasters (the 10 m statewide DEM, groundwater
+depth surfaces) through numpy memory maps, one tile at a time, so a
+raster never has to fit in memory:
+
+    .flt + .hdr     ESRI GridFloat (arcpy.conversion.RasterToFloat output)
+    .npy + .json    NumPy array with a JSON grid sidecar (write_npy_raster)
+
+Tiles can be read with an overlap halo for neighborhood operations such
+as slope. A MemmapRaster pickles as its path and grid, so process-pool
+workers reopen the map themselves instead of receiving array data.
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+DEFAULT_TILE_SIZE = 2048   # Rows/columns per tile (16 MB of float32)
+
+# ============================================================================
+# GRID GEOMETRY
+# ============================================================================
+
+class RasterGrid:
+    """North-up raster grid: size, upper-left corner and square cell size"""
+
+    def __init__(self, n_rows, n_cols, x_min, y_max, cell_size, nodata=None):
+        self.n_rows = int(n_rows)
+        self.n_cols = int(n_cols)
+        self.x_min = float(x_min)
+        self.y_max = float(y_max)
+        self.cell_size = float(cell_size)
+        self.nodata = nodata
+
+    @property
+    def x_max(self):
+        return self.x_min + self.n_cols * self.cell_size
+
+    @property
+    def y_min(self):
+        return self.y_max - self.n_rows * self.cell_size
+
+    @property
+    def shape(self):
+        return (self.n_rows, self.n_cols)
+
+    def window_origin(self, row0, col0):
+        """(x_min, y_max) of the window starting at row0, col0"""
+        return self.x_min + col0 * self.cell_size, self.y_max - row0 * self.cell_size
+
+    def pixel_ranges(self, x_min, y_min, x_max, y_max):
+        """
+        Row and column ranges of the pixels whose centers can fall in a box
+
+        Returns:
+            tuple: (row_start, row_stop, col_start, col_stop), clipped to the grid
+        """
+        cs = self.cell_size
+        col_start = np.clip(np.floor((np.asarray(x_min) - self.x_min) / cs), 0, self.n_cols).astype(np.int64)
+        col_stop = np.clip(np.ceil((np.asarray(x_max) - self.x_min) / cs), 0, self.n_cols).astype(np.int64)
+        row_start = np.clip(np.floor((self.y_max - np.asarray(y_max)) / cs), 0, self.n_rows).astype(np.int64)
+        row_stop = np.clip(np.ceil((self.y_max - np.asarray(y_min)) / cs), 0, self.n_rows).astype(np.int64)
+        return row_start, row_stop, col_start, col_stop
+
+    def as_dict(self):
+        return {'n_rows': self.n_rows, 'n_cols': self.n_cols, 'x_min': self.x_min,
+                'y_max': self.y_max, 'cell_size': self.cell_size, 'nodata': self.nodata}
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(values['n_rows'], values['n_cols'], values['x_min'], values['y_max'],
+                   values['cell_size'], values.get('nodata'))
+
+    def __eq__(self, other):
+        return isinstance(other, RasterGrid) and self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        return (f"RasterGrid({self.n_rows:,} x {self.n_cols:,}, cell {self.cell_size:g}, "
+                f"origin ({self.x_min:.1f}, {self.y_max:.1f}))")
+
+def iter_tiles(grid, tile_size=DEFAULT_TILE_SIZE):
+    """Yield (row0, col0, n_rows, n_cols) tiles covering the grid in row-major order"""
+    for row0 in range(0, grid.n_rows, tile_size):
+        for col0 in range(0, grid.n_cols, tile_size):
+            yield (row0, col0, min(tile_size, grid.n_rows - row0), min(tile_size, grid.n_cols - col0))
+
+# ============================================================================
+# MEMORY-MAPPED RASTERS
+# ============================================================================
+
+def _read_hdr(path):
+    """Parse an ESRI .hdr file into a lower-case key -> value dict"""
+    values = {}
+    with open(path, 'r') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2:
+                values[parts[0].lower()] = parts[1]
+    return values
+
+class MemmapRaster:
+    """Single-band raster read through a numpy memory map"""
+
+    def __init__(self, path, grid, dtype='<f4', offset=0):
+        self.path = str(path)
+        self.grid = grid
+        self.dtype = np.dtype(dtype)
+        self.offset = offset
+        self._array = None
+
+    @classmethod
+    def open(cls, path):
+        """Open a .flt (with .hdr) or .npy (with .json) raster"""
+        base, extension = os.path.splitext(str(path))
+        extension = extension.lower()
+        if extension == '.flt':
+            header = _read_hdr(base + '.hdr')
+            n_rows, n_cols = int(header['nrows']), int(header['ncols'])
+            cell_size = float(header['cellsize'])
+            if 'xllcenter' in header:
+                x_min = float(header['xllcenter']) - cell_size / 2
+                y_min = float(header['yllcenter']) - cell_size / 2
+            else:
+                x_min, y_min = float(header['xllcorner']), float(header['yllcorner'])
+            nodata = float(header['nodata_value']) if 'nodata_value' in header else None
+            byte_order = '>' if header.get('byteorder', 'LSBFIRST').upper().startswith('MSB') else '<'
+            grid = RasterGrid(n_rows, n_cols, x_min, y_min + n_rows * cell_size, cell_size, nodata)
+            return cls(path, grid, byte_order + 'f4')
+        if extension == '.npy':
+            with open(base + '.json', 'r') as f:
+                grid = RasterGrid.from_dict(json.load(f))
+            return cls(path, grid, dtype=None)
+        raise ValueError(f"Unsupported raster format (use .flt or .npy): {path}")
+
+    @property
+    def array(self):
+        """The memory-mapped (n_rows, n_cols) array (opened on first use)"""
+        if self._array is None:
+            if self.path.lower().endswith('.npy'):
+                self._array = np.load(self.path, mmap_mode='r')
+                self.dtype = self._array.dtype
+            else:
+                self._array = np.memmap(self.path, dtype=self.dtype, mode='r',
+                                        offset=self.offset, shape=self.grid.shape)
+        return self._array
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_array'] = None   # Workers reopen the map
+        return state
+
+    def read_window(self, row0, col0, n_rows, n_cols, halo=0):
+        """
+        Read a window as float64 with nodata as NaN
+
+        Args:
+            row0, col0 (int): Window origin (without halo)
+            n_rows, n_cols (int): Window size (without halo)
+            halo (int): Extra cells on every side; cells beyond the grid edge
+                repeat the nearest edge cell
+
+        Returns:
+            numpy.ndarray: (n_rows + 2*halo, n_cols + 2*halo) values
+        """
+        grid = self.grid
+        top, left = row0 - halo, col0 - halo
+        bottom, right = row0 + n_rows + halo, col0 + n_cols + halo
+        r0, r1 = max(top, 0), min(bottom, grid.n_rows)
+        c0, c1 = max(left, 0), min(right, grid.n_cols)
+
+        # Always a writable copy: a float64 memmap slice is a read-only view
+        window = np.array(self.array[r0:r1, c0:c1], dtype=np.float64, copy=True)
+        if grid.nodata is not None:
+            window[window == grid.nodata] = np.nan
+        pad = ((r0 - top, bottom - r1), (c0 - left, right - c1))
+        if any(p for side in pad for p in side):
+            window = np.pad(window, pad, mode='edge')
+        return window
+
+    def __repr__(self):
+        return f"MemmapRaster({os.path.basename(self.path)}, {self.grid})"
+
+def write_npy_raster(path, array, grid):
+    """Save an array as .npy with its grid in a .json sidecar (for MemmapRaster.open)"""
+    np.save(path, np.asarray(array))
+    with open(os.path.splitext(str(path))[0] + '.json', 'w') as f:
+        json.dump(grid.as_dict(), f, indent=2)
+    return path
+
+def tile_count(grid, tile_size=DEFAULT_TILE_SIZE):
+    return math.ceil(grid.n_rows / tile_size) * math.ceil(grid.n_cols / tile_size)
@@ -0,0 +1,264 @@
+"""
+Manifest-Aware Batch Reprojection Runner
+University of Hawaii Water Resources Research Center
+
+Keeps a manifest next to the standardized outputs recording, for every
+source dataset, its content fingerprint, source CRS, output path and the
+verified output fingerprint. A batch run then:
+
+    1. Lists the source datasets and fingerprints them (sampled hashes, all
+       shapefile sidecars)
+    2. Skips datasets whose source, target CRS and output are unchanged
+    3. Reprojects the rest in a process pool; each worker verifies its own
+       output CRS, and the manifest is saved as every result arrives
+
+Re-running after one new download therefore reprojects only that file, and
+an interrupted run resumes where it stopped. The reprojection itself is a
+worker function passed in by the caller: arcpy Project in
+data_standardization/reproject_all_data.py, or pyproj_worker here, which
+reprojects with the coordinate_transform backend and needs no ArcGIS.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from .coordinate_transform import HCPT_TARGET_EPSG, is_target_crs, to_crs, transform_geometries
+from .lineage import fingerprint_dataset
+
+try:
+    import geopandas as gpd
+except ImportError:  # pragma: no cover - raised with a hint on first use
+    gpd = None
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+MANIFEST_NAME = "reprojection_manifest.json"
+
+DEFAULT_EXTENSIONS = ('.shp', '.gdb')
+
+# ============================================================================
+# DISCOVERY
+# ============================================================================
+
+def find_datasets(input_folder, extensions=DEFAULT_EXTENSIONS):
+    """
+    Relative paths of the datasets under a folder, in sorted order
+
+    Shapefiles are matched by file extension and file geodatabases by
+    folder name (their contents are not walked).
+    """
+    extensions = tuple(extension.lower() for extension in extensions)
+    datasets = []
+    for root, dirs, files in os.walk(input_folder):
+        for name in list(dirs):
+            if name.lower().endswith(extensions):
+                datasets.append(os.path.relpath(os.path.join(root, name), input_folder))
+                dirs.remove(name)
+        datasets.extend(os.path.relpath(os.path.join(root, name), input_folder)
+                        for name in files if name.lower().endswith(extensions))
+    return sorted(datasets)
+
+# ============================================================================
+# MANIFEST
+# ============================================================================
+
+class ReprojectionManifest:
+    """Source fingerprint, CRS and verified output per dataset"""
+
+    def __init__(self, manifest_path):
+        self.manifest_path = str(manifest_path)
+        self.entries = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.entries = json.load(f).get('datasets', {})
+
+    @classmethod
+    def for_folder(cls, output_folder):
+        return cls(os.path.join(output_folder, MANIFEST_NAME))
+
+    def is_current(self, dataset, source_hash, target_epsg, output_path):
+        """True when the recorded output is verified and still matches its source"""
+        entry = self.entries.get(dataset)
+        return bool(entry
+                    and entry.get('verified')
+                    and entry.get('source_hash') == source_hash
+                    and entry.get('target_epsg') == target_epsg
+                    and entry.get('output_hash') == fingerprint_dataset(output_path))
+
+    def record(self, dataset, source_hash, target_epsg, output_path, result):
+        """Store one worker result (see run_reprojection for its keys)"""
+        self.entries[dataset] = {
+            'source_hash': source_hash,
+            'source_crs': result.get('source_crs'),
+            'target_epsg': target_epsg,
+            'output': output_path,
+            'output_hash': fingerprint_dataset(output_path) if result.get('ok') else None,
+            'verified': bool(result.get('ok')),
+            'message': result.get('message', ''),
+            'seconds': round(result.get('seconds', 0.0), 3),
+            'processed': datetime.now().isoformat(timespec='seconds'),
+        }
+
+    def prune(self, datasets):
+        """Drop entries whose source is gone (outputs are left on disk)"""
+        removed = sorted(set(self.entries) - set(datasets))
+        for dataset in removed:
+            del self.entries[dataset]
+        return removed
+
+    def save(self):
+        folder = os.path.dirname(os.path.abspath(self.manifest_path))
+        os.makedirs(folder, exist_ok=True)
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({'datasets': self.entries}, f, indent=2, default=str)
+        os.replace(temp_path, self.manifest_path)
+
+# ============================================================================
+# BATCH RUN
+# ============================================================================
+
+def plan_reprojection(input_folder, output_folder, manifest, target_epsg=HCPT_TARGET_EPSG,
+                      extensions=DEFAULT_EXTENSIONS, force=False):
+    """
+    Split the source datasets into pending tasks and up-to-date outputs
+
+    Returns:
+        tuple: (list of task dicts with dataset, source, output and
+        source_hash; list of up-to-date dataset paths)
+    """
+    tasks, current = [], []
+    for dataset in find_datasets(input_folder, extensions):
+        source = os.path.join(input_folder, dataset)
+        output = os.path.join(output_folder, dataset)
+        source_hash = fingerprint_dataset(source)
+        if not force and manifest.is_current(dataset, source_hash, target_epsg, output):
+            current.append(dataset)
+        else:
+            tasks.append({'dataset': dataset, 'source': source, 'output': output,
+                          'source_hash': source_hash})
+    return tasks, current
+
+def run_reprojection(input_folder, output_folder, worker, target_epsg=HCPT_TARGET_EPSG,
+                     extensions=DEFAULT_EXTENSIONS, max_workers=None, force=False, on_result=None):
+    """
+    Reproject every dataset that is not up to date, concurrently
+
+    Args:
+        input_folder (str): Root of the raw downloads
+        output_folder (str): Root of the standardized outputs (holds the manifest)
+        worker (callable): worker(source, output, target_epsg) -> dict with
+            'ok' (output written and verified in the target CRS),
+            'source_crs', optional 'message' and 'seconds'. Must be a
+            module-level function so it can run in a worker process.
+        target_epsg (int): Target EPSG code
+        extensions (tuple): Dataset extensions to process
+        max_workers (int): Worker processes (default: CPU count; <= 1 runs inline)
+        force (bool): Reproject everything regardless of the manifest
+        on_result (callable): on_result(task, result) as each dataset finishes
+
+    Returns:
+        dict: 'reprojected', 'failed', 'current' and 'removed' dataset lists
+    """
+    manifest = ReprojectionManifest.for_folder(output_folder)
+    tasks, current = plan_reprojection(input_folder, output_folder, manifest, target_epsg,
+                                       extensions, force)
+    datasets = current + [task['dataset'] for task in tasks]
+    summary = {'reprojected': [], 'failed': [], 'current': current,
+               'removed': manifest.prune(datasets)}
+
+    def finish(task, result):
+        manifest.record(task['dataset'], task['source_hash'], target_epsg, task['output'], result)
+        manifest.save()
+        summary['reprojected' if result.get('ok') else 'failed'].append(task['dataset'])
+        if on_result:
+            on_result(task, result)
+
+    workers = min(max_workers or os.cpu_count() or 1, max(len(tasks), 1))
+    if workers <= 1:
+        for task in tasks:
+            try:
+                result = worker(task['source'], task['output'], target_epsg)
+            except Exception as e:
+                result = {'ok': False, 'message': str(e)}
+            finish(task, result)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(worker, task['source'], task['output'], target_epsg): task
+                       for task in tasks}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'ok': False, 'message': str(e)}
+                finish(futures[future], result)
+    manifest.save()
+    return summary
+
+# ============================================================================
+# PYPROJ WORKER
+# ============================================================================
+
+def _require_geopandas():
+    if gpd is None:
+        raise ImportError("geopandas is required to read and write datasets without ArcGIS. "
+                          "Install with: pip install geopandas")
+
+def _reproject_frame(frame, target_epsg):
+    """
+    GeoDataFrame with its geometry moved to the target CRS by the pyproj backend
+
+    Sources already in the target or an accepted equivalent (such as the
+    HARN realization) are copied unchanged, as the arcpy worker does.
+    """
+    if frame.crs is None:
+        raise ValueError("source has no coordinate system (missing .prj)")
+    if is_target_crs(frame.crs, target_epsg):
+        return frame
+    target = to_crs(target_epsg)
+    geometries = transform_geometries(frame.geometry.to_numpy(), frame.crs, target)
+    return frame.set_geometry(gpd.GeoSeries(geometries, index=frame.index, crs=target))
+
+def pyproj_worker(source, output, target_epsg=HCPT_TARGET_EPSG):
+    """
+    Reproject a shapefile or every layer of a file geodatabase without arcpy
+
+    Features are read and written with GeoPandas; coordinates go through
+    the cached pyproj transformers of coordinate_transform. The output CRS
+    is read back from the written file before reporting success.
+
+    Returns:
+        dict: ok, source_crs, message, seconds (see run_reprojection)
+    """
+    _require_geopandas()
+    started = time.perf_counter()
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    is_gdb = source.lower().endswith('.gdb')
+    layers = gpd.list_layers(source)['name'].tolist() if is_gdb else [None]
+
+    source_crs = None
+    for layer in layers:
+        frame = gpd.read_file(source, layer=layer) if layer else gpd.read_file(source)
+        source_crs = source_crs or (frame.crs.to_string() if frame.crs else None)
+        frame = _reproject_frame(frame, target_epsg)
+        if layer:
+            frame.to_file(output, layer=layer, driver="OpenFileGDB")
+        else:
+            frame.to_file(output)
+
+    # Verify the written output rather than the in-memory frame
+    check_layer = layers[0]
+    written = (gpd.read_file(output, layer=check_layer, rows=0) if check_layer
+               else gpd.read_file(output, rows=0))
+    ok = written.crs is not None and is_target_crs(written.crs, target_epsg)
+    return {
+        'ok': ok,
+        'source_crs': source_crs,
+        'message': '' if ok else f"output CRS is {written.crs}",
+        'seconds': time.perf_counter() - started,
+    }
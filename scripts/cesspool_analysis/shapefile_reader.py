@@ -0,0 +1,633 @@
+"""
+Memory-Mapped Shapefile Reader
+University of Hawaii Water Resources Research Center
+
+Reads .shp / .shx / .dbf directly, without arcpy, GDAL or per-row Python
+objects:
+
+    .dbf    The records are memory-mapped and every field is a strided view
+            into the mapping, so selecting columns only decodes the bytes
+            of those fields. Numbers, dates and logicals are parsed with
+            column-wise array operations; text is stripped and decoded in
+            one call per column.
+    .shx    Record offsets as a big-endian int32 view (no scan of the .shp)
+    .shp    Points come back as x / y arrays; multipoints, polylines and
+            polygons as the flat buffers used by parcel_index: coords
+            (V, 2), part_offsets (parts -> vertices) and record_part_offsets
+            (records -> parts). Coordinates are gathered straight from the
+            mapping; Z and M values are ignored.
+
+Nulls are filled like TableToNumPyArray with tmk_join.null_value_map: ''
+for text, NaN for floating point, -1 for integers and NaT for dates. The
+OS still reads whole pages, so column selection saves decoding and memory
+rather than disk I/O.
+"""
+
+import os
+from collections import namedtuple
+
+import numpy as np
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+INT_NULL = -1
+
+SHAPE_TYPES = {
+    0: 'Null', 1: 'Point', 3: 'Polyline', 5: 'Polygon', 8: 'Multipoint',
+    11: 'PointZ', 13: 'PolylineZ', 15: 'PolygonZ', 18: 'MultipointZ',
+    21: 'PointM', 23: 'PolylineM', 25: 'PolygonM', 28: 'MultipointM',
+}
+POINT_TYPES = {1, 11, 21}
+MULTIPOINT_TYPES = {8, 18, 28}
+PART_TYPES = {3, 5, 13, 15, 23, 25}
+POLYGON_TYPES = {5, 15, 25}
+
+SHP_FILE_CODE = 9994
+SHP_HEADER_BYTES = 100
+
+# dBASE field type -> arcpy-style field type ('N' and 'F' depend on size)
+DBF_FIELD_TYPES = {
+    'C': 'String',
+    'D': 'Date',
+    'L': 'SmallInteger',
+    'I': 'Integer',
+    '+': 'Integer',
+    'B': 'Double',
+    'O': 'Double',
+}
+SUPPORTED_DBF_TYPES = set(DBF_FIELD_TYPES) | {'N', 'F'}
+
+# Language driver IDs (.dbf byte 29) for files without a .cpg
+DBF_CODEPAGES = {
+    0x01: 'cp437', 0x02: 'cp850', 0x03: 'cp1252', 0x57: 'cp1252',
+    0x58: 'cp1252', 0x59: 'cp1252', 0x64: 'cp852', 0x65: 'cp866',
+    0x4D: 'cp936', 0x4E: 'cp949', 0x4F: 'cp950', 0x7B: 'cp932',
+}
+DEFAULT_ENCODING = 'latin-1'
+
+# Longest digit run converted exactly through int64 / float64 arithmetic;
+# longer values are parsed with float()
+MAX_EXACT_DIGITS = 15
+
+DbfField = namedtuple('DbfField', 'name type length decimals offset')
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def _open_map(path):
+    """Read-only byte mapping of a file (an empty array for empty files)"""
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode='r')
+
+def _encoding_from_cpg(cpg_path):
+    with open(cpg_path, encoding='ascii', errors='ignore') as f:
+        text = f.read().strip()
+    lowered = text.lower().replace('-', '').replace('_', '')
+    if lowered in ('utf8', '65001'):
+        return 'utf-8'
+    if lowered.isdigit():
+        return {'88591': 'latin-1'}.get(lowered, f"cp{lowered}")
+    return text or None
+
+def _gather(buffer, byte_offsets, dtype):
+    """Values of a fixed-size dtype stored at arbitrary byte offsets"""
+    dtype = np.dtype(dtype)
+    byte_offsets = np.asarray(byte_offsets, dtype=np.int64)
+    if not len(byte_offsets):
+        return np.zeros(0, dtype=dtype.newbyteorder('='))
+    index = byte_offsets[:, None] + np.arange(dtype.itemsize)
+    return np.ascontiguousarray(buffer[index]).view(dtype).ravel().astype(dtype.newbyteorder('='))
+
+def _ragged_arange(starts, counts):
+    """Concatenation of arange(start, start + count) for every pair"""
+    counts = np.asarray(counts, dtype=np.int64)
+    total = int(counts.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    ends = np.cumsum(counts)
+    shifts = np.repeat(np.asarray(starts, dtype=np.int64) - (ends - counts), counts)
+    return shifts + np.arange(total, dtype=np.int64)
+
+def _offsets(counts):
+    """(N+1) offsets from N counts"""
+    return np.concatenate([[0], np.cumsum(counts, dtype=np.int64)])
+
+# ============================================================================
+# FIXED-WIDTH TEXT PARSING
+# ============================================================================
+
+def _parse_numbers(chars, as_integer=False):
+    """
+    Parse right-justified dBASE numbers from an (n, width) byte matrix
+
+    One pass per character column accumulates the digits, sign and
+    decimal places of every row at once. Blank values are nulls; rows that
+    are too long or contain anything else (exponents, '*' overflow marks)
+    go through float() individually.
+    """
+    n, width = chars.shape
+    mantissa = np.zeros(n, dtype=np.int64)
+    digits = np.zeros(n, dtype=np.int16)
+    decimals = np.zeros(n, dtype=np.int16)
+    after_point = np.zeros(n, dtype=bool)
+    negative = np.zeros(n, dtype=bool)
+    other = np.zeros(n, dtype=bool)
+    for column in range(width):
+        c = chars[:, column]
+        is_digit = (c >= 48) & (c <= 57)
+        mantissa = np.where(is_digit, mantissa * 10 + (c.astype(np.int64) - 48), mantissa)
+        digits += is_digit
+        decimals += is_digit & after_point
+        after_point |= c == 46
+        negative |= c == 45
+        other |= ~(is_digit | (c == 32) | (c == 0) | (c == 43) | (c == 45) | (c == 46))
+
+    null = (digits == 0) & ~other
+    slow = other | (digits > MAX_EXACT_DIGITS)
+    if as_integer:
+        values = mantissa // 10 ** decimals.astype(np.int64)   # fractions truncated
+        values = np.where(negative, -values, values)
+        values[null] = INT_NULL
+    else:
+        # Exact: an integer below 2**53 divided by an exact power of ten is
+        # correctly rounded, i.e. the same double float() returns
+        values = mantissa / 10.0 ** decimals
+        values = np.where(negative, -values, values)
+        values[null] = np.nan
+
+    for row in np.flatnonzero(slow):
+        text = chars[row].tobytes().strip(b' \x00')
+        try:
+            value = float(text)
+        except ValueError:
+            value = None
+        if as_integer:
+            values[row] = INT_NULL if value is None or not np.isfinite(value) else int(value)
+        else:
+            values[row] = np.nan if value is None else value
+    return values
+
+def _parse_dates(chars):
+    """YYYYMMDD dBASE dates to datetime64[D] (NaT for blank or invalid)"""
+    n = len(chars)
+    if chars.shape[1] < 8 or not n:
+        return np.full(n, np.datetime64('NaT'), dtype='datetime64[D]')
+    c = chars[:, :8].astype(np.int64) - 48
+    valid = ((c >= 0) & (c <= 9)).all(axis=1)
+    c = np.where(valid[:, None], c, 0)
+    year = c[:, 0] * 1000 + c[:, 1] * 100 + c[:, 2] * 10 + c[:, 3]
+    month = c[:, 4] * 10 + c[:, 5]
+    day = c[:, 6] * 10 + c[:, 7]
+    valid &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    months = np.where(valid, (year - 1970) * 12 + month - 1, 0).astype('datetime64[M]')
+    dates = months.astype('datetime64[D]') + np.where(valid, day - 1, 0).astype('timedelta64[D]')
+    valid &= dates.astype('datetime64[M]') == months   # e.g. Feb 30 rolls over
+    return np.where(valid, dates, np.datetime64('NaT'))
+
+def _parse_logicals(chars):
+    """T/Y -> 1, F/N -> 0, anything else (blank, '?') -> INT_NULL"""
+    first = chars[:, 0] if chars.shape[1] else np.zeros(len(chars), dtype=np.uint8)
+    values = np.full(len(first), INT_NULL, dtype=np.int16)
+    values[np.isin(first, np.frombuffer(b'TtYy', dtype=np.uint8))] = 1
+    values[np.isin(first, np.frombuffer(b'FfNn', dtype=np.uint8))] = 0
+    return values
+
+def _decode_text(raw, encoding):
+    """Fixed-width bytes to str with trailing blanks removed"""
+    stripped = np.char.rstrip(raw, b' \x00')
+    try:
+        return stripped.astype(str)   # ASCII fast path
+    except UnicodeDecodeError:
+        return np.char.decode(stripped, encoding, errors='replace')
+
+# ============================================================================
+# DBF
+# ============================================================================
+
+class DbfTable:
+    """Memory-mapped dBASE table with column-wise decoding"""
+
+    def __init__(self, path, encoding=None):
+        self.path = str(path)
+        self._map = _open_map(self.path)
+        header = self._map[:32]
+        if len(header) < 32:
+            raise ValueError(f"Not a dBASE file: {self.path}")
+        self.num_records = int(header[4:8].view('<u4')[0])
+        self.header_length = int(header[8:10].view('<u2')[0])
+        self.record_length = int(header[10:12].view('<u2')[0])
+
+        cpg_path = os.path.splitext(self.path)[0] + '.cpg'
+        self.encoding = (encoding
+                         or (_encoding_from_cpg(cpg_path) if os.path.exists(cpg_path) else None)
+                         or DBF_CODEPAGES.get(int(header[29]), DEFAULT_ENCODING))
+
+        self.fields = []
+        offset = 1   # byte 0 of each record is the deletion flag
+        position = 32
+        while position + 32 <= self.header_length and self._map[position] != 0x0D:
+            descriptor = self._map[position:position + 32].tobytes()
+            name = descriptor[:11].split(b'\x00')[0].decode(self.encoding, errors='replace').strip()
+            field_type = chr(descriptor[11]).upper()
+            length, decimals = descriptor[16], descriptor[17]
+            if field_type == 'C':
+                length += decimals * 256   # Clipper/FoxPro text longer than 255
+                decimals = 0
+            self.fields.append(DbfField(name, field_type, length, decimals, offset))
+            offset += length
+            position += 32
+        self._by_name = {field.name: field for field in self.fields}
+
+        # Truncated files: only complete records are readable
+        available = max(len(self._map) - self.header_length, 0) // max(self.record_length, 1)
+        self.num_records = min(self.num_records, available)
+
+    @property
+    def field_names(self):
+        return [field.name for field in self.fields]
+
+    def field(self, name):
+        if name not in self._by_name:
+            raise KeyError(f"Field '{name}' not found in {self.path}. Available: {self.field_names}")
+        return self._by_name[name]
+
+    def field_types(self):
+        """(name, arcpy-style field type) pairs"""
+        result = []
+        for field in self.fields:
+            if field.type in ('N', 'F'):
+                if field.decimals or field.length > 9:
+                    field_type = 'Double'
+                else:
+                    field_type = 'SmallInteger' if field.length <= 4 else 'Integer'
+            else:
+                field_type = DBF_FIELD_TYPES.get(field.type, 'Blob')
+            result.append((field.name, field_type))
+        return result
+
+    def _view(self, offset, length, dtype=np.uint8):
+        """Strided view of `length` bytes at `offset` in every record (no copy)"""
+        dtype = np.dtype(dtype)
+        shape = (self.num_records, length) if dtype == np.uint8 else (self.num_records,)
+        strides = (self.record_length, 1) if dtype == np.uint8 else (self.record_length,)
+        if not self.num_records:
+            return np.zeros(shape, dtype=dtype)
+        return np.ndarray(shape, dtype=dtype, buffer=self._map,
+                          offset=self.header_length + offset, strides=strides)
+
+    @property
+    def deleted(self):
+        """True for records flagged as deleted"""
+        return self._view(0, 1)[:, 0] == ord('*')
+
+    def raw(self, name):
+        """Undecoded field bytes (fixed-width bytes array viewing the mapping)"""
+        field = self.field(name)
+        return self._view(field.offset, field.length, f"S{field.length}")
+
+    def column(self, name, rows=None):
+        """
+        Decode one field
+
+        Args:
+            name (str): Field name
+            rows (array-like): Record positions to decode (default: all)
+
+        Returns:
+            numpy.ndarray: str, int64, int16 (logical), float64 or
+            datetime64[D] values, nulls filled (see module docstring)
+        """
+        field = self.field(name)
+        if field.type not in SUPPORTED_DBF_TYPES:
+            raise ValueError(f"Field '{name}' has unsupported dBASE type '{field.type}'")
+
+        if field.type in ('I', '+'):
+            values = self._view(field.offset, 4, '<i4')
+            return (values if rows is None else values[rows]).astype(np.int64)
+        if field.type in ('B', 'O'):
+            values = self._view(field.offset, 8, '<f8')
+            return (values if rows is None else values[rows]).astype(np.float64)
+        if field.type == 'C':
+            raw = self.raw(name)
+            return _decode_text(raw if rows is None else raw[rows], self.encoding)
+
+        chars = self._view(field.offset, field.length)
+        if rows is not None:
+            chars = chars[rows]
+        if field.type == 'D':
+            return _parse_dates(chars)
+        if field.type == 'L':
+            return _parse_logicals(chars)
+        as_integer = dict(self.field_types())[name] != 'Double'
+        return _parse_numbers(chars, as_integer=as_integer)
+
+    def read_columns(self, fields=None, rows=None):
+        """Field name -> decoded array for the requested fields (default: all supported)"""
+        if fields is None:
+            fields = [field.name for field in self.fields if field.type in SUPPORTED_DBF_TYPES]
+        return {name: self.column(name, rows) for name in fields}
+
+# ============================================================================
+# SHP / SHX
+# ============================================================================
+
+GeometryBuffers = namedtuple('GeometryBuffers', 'coords part_offsets record_part_offsets shape_types')
+
+class ShapeFile:
+    """Memory-mapped .shp geometry with the .shx record index"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._map = _open_map(self.path)
+        if len(self._map) < SHP_HEADER_BYTES or int(self._map[:4].view('>i4')[0]) != SHP_FILE_CODE:
+            raise ValueError(f"Not a shapefile: {self.path}")
+        self.shape_type = int(self._map[32:36].view('<i4')[0])
+        self.bounds = tuple(float(value) for value in self._map[36:68].view('<f8'))
+
+        shx_path = os.path.splitext(self.path)[0] + '.shx'
+        if os.path.exists(shx_path):
+            index = _open_map(shx_path)
+            count = max(len(index) - SHP_HEADER_BYTES, 0) // 8
+            entries = np.ndarray((count, 2), dtype='>i4', buffer=index, offset=SHP_HEADER_BYTES) \
+                if count else np.zeros((0, 2), dtype='>i4')
+            self.record_offsets = entries[:, 0].astype(np.int64) * 2
+        else:
+            self.record_offsets = self._scan_offsets()
+        # Record content starts after the 8-byte record header
+        self.content_offsets = self.record_offsets + 8
+
+    def _scan_offsets(self):
+        """Record offsets by walking the record headers (no .shx)"""
+        offsets = []
+        position, end = SHP_HEADER_BYTES, len(self._map)
+        while position + 8 <= end:
+            offsets.append(position)
+            content_words = int(self._map[position + 4:position + 8].view('>i4')[0])
+            position += 8 + 2 * content_words
+        return np.array(offsets, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.record_offsets)
+
+    def shape_types(self, rows=None):
+        """Shape type code per record (0 = null shape)"""
+        offsets = self.content_offsets if rows is None else self.content_offsets[rows]
+        return _gather(self._map, offsets, '<i4')
+
+    def _doubles(self, byte_positions):
+        """float64 values at 4-byte aligned byte positions"""
+        values = np.empty(len(byte_positions), dtype=np.float64)
+        for shift in (0, 4):
+            selected = byte_positions % 8 == shift
+            if not selected.any():
+                continue
+            view = np.ndarray((len(self._map) - shift) // 8, dtype='<f8', buffer=self._map, offset=shift)
+            values[selected] = view[(byte_positions[selected] - shift) // 8]
+        return values
+
+    def points(self, rows=None):
+        """
+        Point coordinates (first vertex for multipoints; NaN for null shapes)
+
+        Returns:
+            tuple: (x, y) float64 arrays
+        """
+        offsets = self.content_offsets if rows is None else self.content_offsets[rows]
+        types = _gather(self._map, offsets, '<i4')
+        is_multi = np.isin(types, list(MULTIPOINT_TYPES))
+        position = np.where(is_multi, offsets + 40, offsets + 4)
+        has_point = np.isin(types, list(POINT_TYPES))
+        has_point[is_multi] = _gather(self._map, offsets[is_multi] + 36, '<i4') > 0
+        x = np.full(len(offsets), np.nan)
+        y = np.full(len(offsets), np.nan)
+        x[has_point] = self._doubles(position[has_point])
+        y[has_point] = self._doubles(position[has_point] + 8)
+        return x, y
+
+    def record_bounds(self, rows=None):
+        """(N, 4) xmin, ymin, xmax, ymax per record (NaN for null shapes)"""
+        offsets = self.content_offsets if rows is None else self.content_offsets[rows]
+        types = _gather(self._map, offsets, '<i4')
+        if self.shape_type in POINT_TYPES:
+            x, y = self.points(rows)
+            return np.column_stack([x, y, x, y])
+        bounds = np.full((len(offsets), 4), np.nan)
+        present = types != 0
+        base = offsets[present] + 4
+        for column in range(4):
+            bounds[present, column] = self._doubles(base + 8 * column)
+        return bounds
+
+    def geometry(self, rows=None):
+        """
+        Flat geometry buffers for every record
+
+        Polygon rings and polyline parts become parts; a multipoint record
+        is one part. Null shapes have no parts.
+
+        Returns:
+            GeometryBuffers: coords (V, 2) float64, part_offsets (P+1) into
+            coords, record_part_offsets (N+1) into parts, shape_types (N)
+        """
+        offsets = self.content_offsets if rows is None else self.content_offsets[rows]
+        types = _gather(self._map, offsets, '<i4')
+        n = len(offsets)
+        num_parts = np.zeros(n, dtype=np.int64)
+        num_points = np.zeros(n, dtype=np.int64)
+        points_at = np.zeros(n, dtype=np.int64)
+
+        is_points = np.isin(types, list(POINT_TYPES))
+        num_parts[is_points] = 1
+        num_points[is_points] = 1
+        points_at[is_points] = offsets[is_points] + 4
+
+        is_multi = np.isin(types, list(MULTIPOINT_TYPES))
+        num_points[is_multi] = _gather(self._map, offsets[is_multi] + 36, '<i4')
+        num_parts[is_multi] = num_points[is_multi] > 0
+        points_at[is_multi] = offsets[is_multi] + 40
+
+        has_parts = np.isin(types, list(PART_TYPES))
+        num_parts[has_parts] = _gather(self._map, offsets[has_parts] + 36, '<i4')
+        num_points[has_parts] = _gather(self._map, offsets[has_parts] + 40, '<i4')
+        points_at[has_parts] = offsets[has_parts] + 44 + 4 * num_parts[has_parts]
+
+        vertex_offsets = _offsets(num_points)
+        record_part_offsets = _offsets(num_parts)
+
+        # Part starts: stored (record-local) for part types, 0 otherwise
+        part_starts = np.zeros(int(record_part_offsets[-1]), dtype=np.int64)
+        part_records = np.repeat(np.arange(n), num_parts)
+        stored = has_parts[part_records]
+        if stored.any():
+            part_positions = _ragged_arange((offsets[has_parts] + 44) // 4, num_parts[has_parts])
+            int_view = np.ndarray(len(self._map) // 4, dtype='<i4', buffer=self._map)
+            part_starts[stored] = int_view[part_positions]
+        part_offsets = np.append(part_starts + vertex_offsets[part_records], vertex_offsets[-1])
+
+        # Vertex byte positions, 16 bytes apart within each record
+        vertex_bytes = _ragged_arange(points_at // 16, num_points) * 16 \
+            + np.repeat(points_at % 16, num_points)
+        coords = np.column_stack([self._doubles(vertex_bytes), self._doubles(vertex_bytes + 8)])
+        return GeometryBuffers(coords, part_offsets, record_part_offsets, types)
+
+# ============================================================================
+# SHAPEFILE
+# ============================================================================
+
+def _polygon_centroids(buffers):
+    """Area-weighted centroid per record (vertex mean where the area is 0)"""
+    coords, part_offsets, record_part_offsets = buffers.coords, buffers.part_offsets, buffers.record_part_offsets
+    n = len(record_part_offsets) - 1
+    x, y = coords[:, 0], coords[:, 1]
+    if not len(coords):
+        return np.full(n, np.nan), np.full(n, np.nan)
+
+    # Shoelace terms per edge (vertex i -> i+1 within the same part)
+    part_of_vertex = np.repeat(np.arange(len(part_offsets) - 1), np.diff(part_offsets))
+    record_of_part = np.repeat(np.arange(n), np.diff(record_part_offsets))
+    record_of_vertex = record_of_part[part_of_vertex]
+    following = np.arange(1, len(coords) + 1)
+    last_in_part = np.zeros(len(coords), dtype=bool)
+    last_in_part[part_offsets[1:][np.diff(part_offsets) > 0] - 1] = True
+    following[last_in_part] = part_offsets[:-1][np.diff(part_offsets) > 0]
+    # Shift each record to its first vertex for precision with UTM coordinates
+    first = part_offsets[record_part_offsets[:-1]]
+    has_vertices = np.diff(part_offsets[record_part_offsets]) > 0
+    origin_x = np.where(has_vertices, x[np.minimum(first, len(x) - 1)], 0.0)
+    origin_y = np.where(has_vertices, y[np.minimum(first, len(y) - 1)], 0.0)
+    x0, y0 = x - origin_x[record_of_vertex], y - origin_y[record_of_vertex]
+    cross = x0 * y0[following] - x0[following] * y0
+
+    area = np.bincount(record_of_vertex, cross, minlength=n)
+    cx = np.bincount(record_of_vertex, (x0 + x0[following]) * cross, minlength=n)
+    cy = np.bincount(record_of_vertex, (y0 + y0[following]) * cross, minlength=n)
+    counts = np.bincount(record_of_vertex, minlength=n)
+    mean_x = np.divide(np.bincount(record_of_vertex, x0, minlength=n), counts,
+                       out=np.full(n, np.nan), where=counts > 0)
+    mean_y = np.divide(np.bincount(record_of_vertex, y0, minlength=n), counts,
+                       out=np.full(n, np.nan), where=counts > 0)
+    has_area = area != 0
+    centroid_x = np.where(has_area, cx / np.where(has_area, 3 * area, 1), mean_x) + origin_x
+    centroid_y = np.where(has_area, cy / np.where(has_area, 3 * area, 1), mean_y) + origin_y
+    return centroid_x, centroid_y
+
+class ShapefileReader:
+    """
+    Attributes and geometry of one shapefile
+
+    Deleted .dbf records are skipped by every read, as GDAL does; record
+    IDs returned by record_ids() stay the original record positions.
+    """
+
+    def __init__(self, path, encoding=None):
+        self.path = str(path)
+        base = os.path.splitext(self.path)[0]
+        self.table = DbfTable(base + '.dbf', encoding) if os.path.exists(base + '.dbf') else None
+        self.shapes = ShapeFile(self.path) if os.path.exists(self.path) else None
+        if self.table is None and self.shapes is None:
+            raise FileNotFoundError(f"Shapefile not found: {self.path}")
+        prj_path = base + '.prj'
+        self.crs = None
+        if os.path.exists(prj_path):
+            with open(prj_path, encoding='utf-8', errors='replace') as f:
+                self.crs = f.read().strip() or None
+
+        self._rows = None
+        if self.table is not None:
+            deleted = self.table.deleted
+            if deleted.any():
+                self._rows = np.flatnonzero(~deleted)
+
+    @property
+    def fields(self):
+        return self.table.field_names if self.table is not None else []
+
+    def field_types(self):
+        return self.table.field_types() if self.table is not None else []
+
+    @property
+    def total_records(self):
+        if self.table is not None:
+            return self.table.num_records
+        return len(self.shapes)
+
+    def __len__(self):
+        return self.total_records if self._rows is None else len(self._rows)
+
+    def record_ids(self, base=0):
+        """Original record position + base for every live record"""
+        rows = np.arange(self.total_records) if self._rows is None else self._rows
+        return rows.astype(np.int64) + base
+
+    def read_columns(self, fields=None):
+        """Field name -> decoded array (live records only)"""
+        if self.table is None:
+            raise ValueError(f"No .dbf for {self.path}")
+        return self.table.read_columns(fields, self._rows)
+
+    def read_table(self, fields=None):
+        """Structured array of the requested fields (default: all supported)"""
+        columns = self.read_columns(fields)
+        table = np.empty(len(self), dtype=[(name, values.dtype) for name, values in columns.items()])
+        for name, values in columns.items():
+            table[name] = values
+        return table
+
+    def _require_shapes(self):
+        if self.shapes is None:
+            raise ValueError(f"No .shp for {self.path}")
+        return self.shapes
+
+    def geometry(self):
+        """Flat geometry buffers of the live records (see ShapeFile.geometry)"""
+        return self._require_shapes().geometry(self._rows)
+
+    def points(self):
+        return self._require_shapes().points(self._rows)
+
+    def record_bounds(self):
+        return self._require_shapes().record_bounds(self._rows)
+
+    def centroids(self):
+        """
+        One x / y per record: the point itself, the area-weighted centroid of
+        a polygon, or the vertex mean of a polyline / multipoint
+
+        Returns:
+            tuple: (x, y) float64 arrays (NaN for null shapes)
+        """
+        shapes = self._require_shapes()
+        if shapes.shape_type in POINT_TYPES:
+            return shapes.points(self._rows)
+        buffers = shapes.geometry(self._rows)
+        if shapes.shape_type in POLYGON_TYPES:
+            return _polygon_centroids(buffers)
+        vertex_offsets = buffers.part_offsets[buffers.record_part_offsets]
+        record_of_vertex = np.repeat(np.arange(len(buffers.shape_types)), np.diff(vertex_offsets))
+        counts = np.bincount(record_of_vertex, minlength=len(buffers.shape_types))
+        sums_x = np.bincount(record_of_vertex, buffers.coords[:, 0], minlength=len(counts))
+        sums_y = np.bincount(record_of_vertex, buffers.coords[:, 1], minlength=len(counts))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sums_x / counts, sums_y / counts
+
+def read_shapefile(path, fields=None, geometry=True, encoding=None):
+    """
+    Read attributes (and geometry buffers) of a shapefile in one call
+
+    Args:
+        path (str): .shp path
+        fields (list): Attribute fields to decode (default: all supported)
+        geometry (bool): Also return the flat geometry buffers
+        encoding (str): Text encoding (default: .cpg, else the .dbf
+            language driver, else latin-1)
+
+    Returns:
+        tuple: (dict field -> array, GeometryBuffers or None)
+    """
+    reader = ShapefileReader(path, encoding)
+    columns = reader.read_columns(fields) if reader.table is not None else {}
+    return columns, (reader.geometry() if geometry else None)
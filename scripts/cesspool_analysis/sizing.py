@@ -0,0 +1,106 @@
+# SIZING RULES - Design Flow, Septic Tank and Disposal Area
+# Hawaii Administrative Rules, Title 11, Chapter 62 - Wastewater Systems
+# Pure Python (no arcpy, no NumPy) so it imports in milliseconds
+
+from .har_standards import DESIGN_FLOW_RATES, classify_percolation_har
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+SQ_FT_PER_ACRE = 43560
+
+# Septic tank sizing (HAR 11-62-33.1): 1000 gal up to 4 bedrooms, 1250 gal
+# for 5, then 1000 + (Q - 800) x 1.25 where Q is the design flow
+SEPTIC_TANK_RULES = {
+    'MIN_GALLONS': 1000,
+    'FIVE_BEDROOM_GALLONS': 1250,
+    'FLOW_OFFSET_GPD': 800,
+    'FLOW_MULTIPLIER': 1.25,
+}
+
+# Lot-size categories used for Matrix screening and priority scoring
+LOT_SIZE_BREAKS_SF = (10000, 21000)
+LOT_SIZE_CATEGORIES = ['<10k sf', '10k-21k sf', '>21k sf']
+
+# Disposal area factors (sq ft per 100 gpd) by percolation class
+# (These are approximate - actual HAR 11-62 Appendix D Table III should be used)
+DISPOSAL_AREA_FACTORS = {
+    '<1 min/inch': 70,      # Very fast - needs larger area
+    '1-10 min/inch': 85,    # Good percolation
+    '10-60 min/inch': 125,  # Slower percolation - needs more area
+    '>60 min/inch': None    # Too slow - not suitable
+}
+
+# ============================================================================
+# SIZING FUNCTIONS
+# ============================================================================
+
+def design_flow(bedrooms, gallons_per_bedroom=DESIGN_FLOW_RATES['GALLONS_PER_BEDROOM_PER_DAY']):
+    """Daily design flow in gallons (missing bedrooms count as 0)"""
+    return (bedrooms or 0) * gallons_per_bedroom
+
+def septic_tank_size(bedrooms, daily_flow=None):
+    """
+    Required septic tank volume per HAR 11-62
+
+    Args:
+        bedrooms (int): Number of bedrooms
+        daily_flow (float): Design flow in gpd (default: from bedrooms)
+
+    Returns:
+        int: Tank volume in gallons
+    """
+    bedrooms = bedrooms or 0
+    if daily_flow is None:
+        daily_flow = design_flow(bedrooms)
+    if bedrooms <= 4:
+        return SEPTIC_TANK_RULES['MIN_GALLONS']
+    if bedrooms == 5:
+        return SEPTIC_TANK_RULES['FIVE_BEDROOM_GALLONS']
+    return int(SEPTIC_TANK_RULES['MIN_GALLONS']
+               + (daily_flow - SEPTIC_TANK_RULES['FLOW_OFFSET_GPD']) * SEPTIC_TANK_RULES['FLOW_MULTIPLIER'])
+
+def lot_size_sf(acres):
+    """Lot size in square feet (0 when acreage is missing)"""
+    return acres * SQ_FT_PER_ACRE if acres else 0
+
+def categorize_lot_size(lot_sf):
+    """Lot-size category label for technology matching"""
+    if lot_sf < LOT_SIZE_BREAKS_SF[0]:
+        return LOT_SIZE_CATEGORIES[0]
+    elif lot_sf <= LOT_SIZE_BREAKS_SF[1]:
+        return LOT_SIZE_CATEGORIES[1]
+    return LOT_SIZE_CATEGORIES[2]
+
+def calculate_disposal_area_requirements(num_bedrooms, perc_rate, soil_type='standard'):
+    """
+    Calculate minimum disposal area per HAR 11-62 requirements
+
+    Args:
+        num_bedrooms (int): Number of bedrooms
+        perc_rate (float): Percolation rate in minutes per inch
+        soil_type (str): Soil type classification
+
+    Returns:
+        dict: Disposal area requirements, or None when the site is unsuitable
+    """
+    if not num_bedrooms or num_bedrooms <= 0:
+        return None
+
+    base_flow = design_flow(num_bedrooms)
+    perc_class = classify_percolation_har(perc_rate)
+    area_factor = DISPOSAL_AREA_FACTORS.get(perc_class)
+
+    if area_factor is None:
+        return None
+
+    disposal_area_sqft = (base_flow / 100) * area_factor  # Simplified calculation
+
+    return {
+        'bedrooms': num_bedrooms,
+        'design_flow_gpd': base_flow,
+        'percolation_class': perc_class,
+        'disposal_area_sqft': round(disposal_area_sqft, 0),
+        'area_factor': area_factor
+    }
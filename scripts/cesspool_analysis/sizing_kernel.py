@@ -0,0 +1,116 @@
+"""
+Vectorized HAR 11-62 Sizing Kernel
+University of Hawaii Water Resources Research Center
+
+Sizes every parcel's system in one call from bedroom, percolation and lot
+arrays: design flow, septic tank volume, disposal area and lot-size
+category. The branches of the scalar rules in sizing.py (which stay the
+reference) become np.select / lookup-table operations, so scenario runs
+over the statewide parcel set take milliseconds instead of a cursor pass.
+"""
+
+import numpy as np
+
+from .har_classification import PERCOLATION_CLASSES, encode_percolation_classes
+from .har_standards import DESIGN_FLOW_RATES
+from .sizing import (
+    SQ_FT_PER_ACRE, SEPTIC_TANK_RULES, LOT_SIZE_BREAKS_SF, LOT_SIZE_CATEGORIES,
+    DISPOSAL_AREA_FACTORS
+)
+
+# ============================================================================
+# LOOKUP TABLES
+# ============================================================================
+
+# Disposal area factor (sq ft per 100 gpd) per PERCOLATION_CLASSES code;
+# NaN marks unsuitable (>60 min/inch) and unknown soils
+AREA_FACTOR_BY_CLASS = np.array([np.nan if DISPOSAL_AREA_FACTORS.get(label) is None
+                                 else DISPOSAL_AREA_FACTORS[label] for label in PERCOLATION_CLASSES])
+
+# Output fields (name, arcpy type) in the analysis table
+SIZING_FIELDS = [
+    ("DAILY_FLOW_GAL", "LONG"),
+    ("SEPTIC_SIZE_GAL", "LONG"),
+    ("LOT_SIZE_SF", "LONG"),
+    ("LOT_SIZE_CAT", "TEXT"),
+    ("DISPOSAL_AREA_SF", "DOUBLE"),
+]
+
+# ============================================================================
+# KERNELS
+# ============================================================================
+
+def _filled(values, fill=0.0):
+    """float64 copy with NaN replaced by fill"""
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isnan(values), fill, values)
+
+def design_flows(bedrooms, gallons_per_bedroom=DESIGN_FLOW_RATES['GALLONS_PER_BEDROOM_PER_DAY']):
+    """Daily design flow in gallons (missing bedrooms count as 0)"""
+    return _filled(bedrooms) * gallons_per_bedroom
+
+def septic_tank_sizes(bedrooms, daily_flow=None):
+    """Septic tank volume in gallons (int64), the sizing.septic_tank_size rule"""
+    bedrooms = _filled(bedrooms)
+    daily_flow = design_flows(bedrooms) if daily_flow is None else _filled(daily_flow)
+    large = (SEPTIC_TANK_RULES['MIN_GALLONS']
+             + (daily_flow - SEPTIC_TANK_RULES['FLOW_OFFSET_GPD']) * SEPTIC_TANK_RULES['FLOW_MULTIPLIER'])
+    return np.select([bedrooms <= 4, bedrooms == 5],
+                     [SEPTIC_TANK_RULES['MIN_GALLONS'], SEPTIC_TANK_RULES['FIVE_BEDROOM_GALLONS']],
+                     np.trunc(large)).astype(np.int64)
+
+def lot_sizes_sf(acres):
+    """Lot size in square feet (0 when acreage is missing)"""
+    return _filled(acres) * SQ_FT_PER_ACRE
+
+def lot_size_codes(lot_sf):
+    """Index into LOT_SIZE_CATEGORIES (< first break, <= second break, above)"""
+    lot_sf = np.asarray(lot_sf, dtype=float)
+    return ((lot_sf >= LOT_SIZE_BREAKS_SF[0]).astype(np.int8) + (lot_sf > LOT_SIZE_BREAKS_SF[1]))
+
+def categorize_lot_sizes(lot_sf):
+    """Lot-size category labels for technology matching"""
+    return np.array(LOT_SIZE_CATEGORIES, dtype='U10')[lot_size_codes(lot_sf)]
+
+def disposal_areas(bedrooms, perc_rate, daily_flow=None):
+    """
+    Minimum disposal area in sq ft (calculate_disposal_area_requirements)
+
+    Returns:
+        numpy.ndarray: Area rounded to whole sq ft; NaN where bedrooms are
+        missing or <= 0, or the soil is unsuitable or unrated
+    """
+    bedrooms = _filled(bedrooms)
+    daily_flow = design_flows(bedrooms) if daily_flow is None else _filled(daily_flow)
+    factor = AREA_FACTOR_BY_CLASS[encode_percolation_classes(perc_rate)]
+    return np.where(bedrooms > 0, np.round(daily_flow / 100 * factor), np.nan)
+
+def size_systems(bedrooms, perc_rate=None, acres=None, lot_sf=None,
+                 gallons_per_bedroom=DESIGN_FLOW_RATES['GALLONS_PER_BEDROOM_PER_DAY']):
+    """
+    Size every parcel's wastewater system in one call
+
+    Args:
+        bedrooms (array-like): Bedrooms per parcel (NaN = missing)
+        perc_rate (array-like): Percolation rate in min/inch (optional;
+            DISPOSAL_AREA_SF is only returned when given)
+        acres (array-like): Lot acreage (used when lot_sf is not given)
+        lot_sf (array-like): Lot size in square feet (optional)
+        gallons_per_bedroom (float): Design flow per bedroom
+
+    Returns:
+        dict: SIZING_FIELDS name -> array
+    """
+    flow = design_flows(bedrooms, gallons_per_bedroom)
+    result = {
+        "DAILY_FLOW_GAL": flow,
+        "SEPTIC_SIZE_GAL": septic_tank_sizes(bedrooms, flow),
+    }
+    if lot_sf is None and acres is not None:
+        lot_sf = lot_sizes_sf(acres)
+    if lot_sf is not None:
+        result["LOT_SIZE_SF"] = _filled(lot_sf)
+        result["LOT_SIZE_CAT"] = categorize_lot_sizes(result["LOT_SIZE_SF"])
+    if perc_rate is not None:
+        result["DISPOSAL_AREA_SF"] = disposal_areas(bedrooms, perc_rate, flow)
+    return result
@@ -0,0 +1,206 @@
+"""
+Area-Weighted Soil-Parcel Overlay Engine
+University of Hawaii Water Resources Research Center
+
+Attributes soils to parcels by overlaying polygons instead of taking the
+soil unit under a single cesspool point:
+
+    1. One STR-tree over the classified NRCS soil polygons; parcels are
+       queried in bulk, island by island (chunks of at most chunk_size)
+    2. Parcel x soil intersections are computed element-wise with shapely 2
+       in a process pool, one task per chunk
+    3. Intersection areas are reduced per parcel with bincount: area-
+       weighted percolation rate, area share of each HAR percolation class,
+       the dominant class and the dominant map unit (MUKEY)
+
+Outputs go straight into SOIL_PERC_RATE and SOIL_HAR_CLASS (the dominant
+HAR 11-62 percolation class), plus SOIL_COVERAGE (share of the parcel
+inside soil polygons) and one SOIL_PCT_* share field per class.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    import shapely
+except ImportError:  # pragma: no cover - raised with a hint on first use
+    shapely = None
+
+from .har_classification import PERCOLATION_CLASSES, encode_percolation_classes
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+DEFAULT_CHUNK_SIZE = 25000    # Parcels per worker task (within one island)
+
+# Share field per HAR percolation class, in PERCOLATION_CLASSES order
+CLASS_SHARE_FIELDS = ['SOIL_PCT_LT1', 'SOIL_PCT_1_10', 'SOIL_PCT_10_60', 'SOIL_PCT_GT60', 'SOIL_PCT_UNKNOWN']
+
+# (field name, ArcGIS type, length) written to the parcel layer
+SOIL_OVERLAY_FIELDS = [
+    ("SOIL_PERC_RATE", "DOUBLE", None),     # Area-weighted percolation rate (min/inch)
+    ("SOIL_HAR_CLASS", "TEXT", 20),         # Dominant HAR percolation class by area
+    ("SOIL_MUKEY", "TEXT", 30),             # Dominant soil map unit by area
+    ("SOIL_COVERAGE", "DOUBLE", None),      # Share of the parcel with soil polygons
+] + [(field, "DOUBLE", None) for field in CLASS_SHARE_FIELDS]
+
+# ============================================================================
+# OVERLAY
+# ============================================================================
+
+def _require_shapely():
+    if shapely is None:
+        raise ImportError("shapely>=2.0 is required for the soil overlay engine. "
+                          "Install with: pip install shapely")
+
+def _valid(geometries):
+    """Repair invalid polygons so intersections cannot fail"""
+    geometries = np.array(geometries, dtype=object)
+    invalid = ~shapely.is_valid(geometries)
+    if invalid.any():
+        geometries[invalid] = shapely.make_valid(geometries[invalid])
+    return geometries
+
+def _overlay_chunk(task):
+    """
+    Intersection areas for one chunk of parcel x soil pairs (runs in a worker)
+
+    Each task carries the chunk's distinct (already valid) soil polygons
+    once, with pairs pointing into them.
+
+    Returns:
+        tuple: (parcel area per chunk parcel, intersection area per pair)
+    """
+    parcels, pair_parcel, chunk_soils, pair_soil = task
+    parcels = _valid(parcels)
+    pieces = shapely.intersection(parcels[pair_parcel], chunk_soils[pair_soil])
+    return shapely.area(parcels), shapely.area(pieces)
+
+def overlay_soils(parcels, soils, perc_rate, groups=None, mukeys=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                  max_workers=None):
+    """
+    Area-weighted soil attributes for every parcel
+
+    Args:
+        parcels (numpy.ndarray): shapely parcel (or buildable-area) polygons
+        soils (numpy.ndarray): shapely soil polygons
+        perc_rate (array-like): Percolation rate (min/inch) per soil polygon
+            (PERC_RATE_EST from the HAR classification; NaN = not rated)
+        groups (array-like): Chunking key per parcel, e.g. island (default: one group)
+        mukeys (array-like): Map unit key per soil polygon (optional)
+        chunk_size (int): Maximum parcels per worker task
+        max_workers (int): Worker processes (default: CPU count; 1 = in process)
+
+    Returns:
+        dict: SOIL_OVERLAY_FIELDS name -> array, one value per parcel
+    """
+    _require_shapely()
+    parcels = np.asarray(parcels, dtype=object)
+    soils = np.asarray(soils, dtype=object)
+    perc_rate = np.asarray(perc_rate, dtype=float)
+    n_parcels = len(parcels)
+    soil_class = encode_percolation_classes(perc_rate)
+
+    # Chunks never span islands, so each task touches one island's soils
+    if groups is None:
+        groups = np.zeros(n_parcels, dtype=np.int64)
+    group_codes = pd.factorize(pd.Series(groups))[0]
+    order = np.argsort(group_codes, kind='stable')
+    boundaries = np.flatnonzero(np.diff(group_codes[order])) + 1
+    chunks = [chunk for island in np.split(order, boundaries) if len(island)
+              for chunk in np.array_split(island, -(-len(island) // chunk_size))]
+
+    # Soils are repaired once here, and each chunk ships its distinct soils once
+    soils = _valid(soils)
+    tree = shapely.STRtree(soils)
+    pairs = []
+    for chunk in chunks:
+        pair_parcel, pair_soil = tree.query(parcels[chunk], predicate='intersects')
+        pairs.append((pair_parcel.astype(np.int64), pair_soil.astype(np.int64)))
+
+    def chunk_task(chunk, pair_parcel, pair_soil):
+        chunk_soils, local_soil = np.unique(pair_soil, return_inverse=True)
+        return parcels[chunk], pair_parcel, soils[chunk_soils], local_soil.ravel()
+
+    tasks = (chunk_task(chunk, pair_parcel, pair_soil) for chunk, (pair_parcel, pair_soil) in zip(chunks, pairs))
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers <= 1 or len(chunks) <= 1:
+        results = [_overlay_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_overlay_chunk, tasks))
+
+    parcel_area = np.zeros(n_parcels)
+    all_parcels, all_soils, all_areas = [], [], []
+    for chunk, (pair_parcel, pair_soil), (chunk_area, piece_area) in zip(chunks, pairs, results):
+        parcel_area[chunk] = chunk_area
+        all_parcels.append(chunk[pair_parcel])
+        all_soils.append(pair_soil)
+        all_areas.append(piece_area)
+    pair_parcel = np.concatenate(all_parcels) if all_parcels else np.empty(0, dtype=np.int64)
+    pair_soil = np.concatenate(all_soils) if all_soils else np.empty(0, dtype=np.int64)
+    piece_area = np.concatenate(all_areas) if all_areas else np.empty(0)
+
+    return summarize_overlay(pair_parcel, pair_soil, piece_area, parcel_area, perc_rate, soil_class, mukeys)
+
+def summarize_overlay(pair_parcel, pair_soil, piece_area, parcel_area, perc_rate, soil_class, mukeys=None):
+    """
+    Reduce parcel x soil intersection areas to per-parcel soil attributes
+
+    Args:
+        pair_parcel, pair_soil (numpy.ndarray): Parcel and soil index per piece
+        piece_area (numpy.ndarray): Intersection area per piece
+        parcel_area (numpy.ndarray): Area per parcel
+        perc_rate (numpy.ndarray): Percolation rate per soil polygon
+        soil_class (numpy.ndarray): PERCOLATION_CLASSES index per soil polygon
+        mukeys (array-like): Map unit key per soil polygon (optional)
+
+    Returns:
+        dict: SOIL_OVERLAY_FIELDS name -> array
+    """
+    n_parcels, n_classes = len(parcel_area), len(PERCOLATION_CLASSES)
+    keep = piece_area > 0
+    pair_parcel, pair_soil, piece_area = pair_parcel[keep], pair_soil[keep], piece_area[keep]
+
+    # Area per (parcel, class) in one bincount
+    class_area = np.bincount(pair_parcel * n_classes + soil_class[pair_soil], weights=piece_area,
+                             minlength=n_parcels * n_classes).reshape(n_parcels, n_classes)
+    covered = class_area.sum(axis=1)
+    safe_area = np.where(parcel_area > 0, parcel_area, np.nan)
+
+    # Area-weighted rate over the rated part of the parcel
+    rated = ~np.isnan(perc_rate[pair_soil])
+    rated_area = np.bincount(pair_parcel[rated], weights=piece_area[rated], minlength=n_parcels)
+    rate_sum = np.bincount(pair_parcel[rated], weights=piece_area[rated] * perc_rate[pair_soil[rated]],
+                           minlength=n_parcels)
+    weighted_rate = np.divide(rate_sum, rated_area, out=np.full(n_parcels, np.nan), where=rated_area > 0)
+
+    # Dominant class by area; parcels without soil polygons are Unknown
+    dominant = np.where(covered > 0, class_area.argmax(axis=1), PERCOLATION_CLASSES.index('Unknown'))
+
+    result = {
+        "SOIL_PERC_RATE": weighted_rate,
+        "SOIL_HAR_CLASS": np.array(PERCOLATION_CLASSES, dtype='U20')[dominant],
+        "SOIL_MUKEY": dominant_keys(pair_parcel, pair_soil, piece_area, n_parcels, mukeys),
+        "SOIL_COVERAGE": np.clip(covered / safe_area, 0.0, 1.0),
+    }
+    shares = class_area / safe_area[:, None]
+    for code, field in enumerate(CLASS_SHARE_FIELDS):
+        result[field] = shares[:, code]
+    return result
+
+def dominant_keys(pair_parcel, pair_soil, piece_area, n_parcels, keys=None):
+    """Key with the largest total area per parcel ('' when none)"""
+    dominant = np.full(n_parcels, '', dtype=object)
+    if keys is None or not len(pair_parcel):
+        return dominant.astype(str)
+    pieces = pd.DataFrame({'parcel': pair_parcel, 'key': np.asarray(keys)[pair_soil], 'area': piece_area})
+    totals = pieces.groupby(['parcel', 'key'], sort=False)['area'].sum().reset_index()
+    best = totals.loc[totals.groupby('parcel')['area'].idxmax()]
+    dominant[best['parcel'].to_numpy()] = best['key'].astype(str).to_numpy()
+    return dominant.astype(str)
@@ -0,0 +1,252 @@
+"""
+Content-Hash Step Cache
+University of Hawaii Water Resources Research Center
+
+Lets a multi-phase workflow skip phases whose inputs have not changed.
+Each step declares:
+
+    inputs      files or datasets it reads (fingerprinted)
+    params      configuration values it uses (e.g. Config constants)
+    code        functions that implement it (their code is hashed)
+    depends_on  earlier steps whose results it builds on
+    outputs     files or datasets it writes
+
+A step's key is a SHA-256 over all of the above plus the keys of the steps
+it depends on, so changing the priority-score rule re-runs only the steps
+downstream of it. Keys and output fingerprints are kept in a small JSON
+manifest; a step is reused when its key matches and every output still
+exists with the fingerprint recorded when it was written.
+
+Files are fingerprinted by size, mtime and hashes of sampled blocks (start,
+middle, end), so multi-GB inputs are not read in full. Datasets that are not
+plain files (geodatabase feature classes) are fingerprinted by a callable
+supplied by the caller.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import time
+from datetime import datetime
+
+# ============================================================================
+# FINGERPRINTS
+# ============================================================================
+
+SAMPLE_BLOCK_SIZE = 1024 * 1024   # Bytes hashed per sampled block
+SAMPLE_BLOCKS = 3                 # Blocks spread over the file
+
+def _digest(value):
+    text = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def fingerprint_file(path, block_size=SAMPLE_BLOCK_SIZE, blocks=SAMPLE_BLOCKS):
+    """
+    Fingerprint a file by size, mtime and sampled content hashes
+
+    Args:
+        path (str): File path
+        block_size (int): Bytes per sampled block
+        blocks (int): Number of blocks (evenly spaced, first and last included)
+
+    Returns:
+        str: Hex digest, or None when the file does not exist
+    """
+    if not os.path.isfile(path):
+        return None
+    stat = os.stat(path)
+    sha = hashlib.sha256(f"{stat.st_size}|{stat.st_mtime_ns}".encode('utf-8'))
+    with open(path, 'rb') as f:
+        if stat.st_size <= block_size * blocks:
+            sha.update(f.read())
+        else:
+            last_start = stat.st_size - block_size
+            for i in range(blocks):
+                f.seek(last_start * i // (blocks - 1) if blocks > 1 else 0)
+                sha.update(f.read(block_size))
+    return sha.hexdigest()
+
+def fingerprint_folder(path, block_size=SAMPLE_BLOCK_SIZE, blocks=SAMPLE_BLOCKS):
+    """Fingerprint every file under a folder (sorted relative paths)"""
+    if not os.path.isdir(path):
+        return None
+    parts = []
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            full_path = os.path.join(root, name)
+            parts.append((os.path.relpath(full_path, path), fingerprint_file(full_path, block_size, blocks)))
+    return _digest(parts)
+
+def fingerprint_path(path):
+    """Fingerprint a file or folder path (None when it does not exist)"""
+    if os.path.isdir(path):
+        return fingerprint_folder(path)
+    return fingerprint_file(path)
+
+def fingerprint_code(functions):
+    """
+    Hash the implementation of one or more functions
+
+    Uses the source text when available and falls back to the compiled code
+    object (scripts pasted into the ArcGIS Python window have no source file).
+    """
+    parts = []
+    for function in functions:
+        try:
+            parts.append(inspect.getsource(function))
+        except (OSError, TypeError):
+            code = function.__code__
+            parts.append([code.co_code.hex(), repr(code.co_consts), code.co_names])
+    return _digest(parts)
+
+# ============================================================================
+# STEP DEFINITION
+# ============================================================================
+
+class Step:
+    """One cacheable workflow phase"""
+
+    def __init__(self, name, run, inputs=None, params=None, code=None,
+                 depends_on=None, outputs=None):
+        """
+        Args:
+            name (str): Unique step name
+            run (callable): Zero-argument function that performs the step;
+                it must raise on failure (a step that returns is cached)
+            inputs (list): Input file/folder paths or dataset names
+            params (dict): Configuration values the step uses
+            code (list): Functions whose code defines the step (default: run)
+            depends_on (list): Names of steps whose outputs this step uses
+            outputs (list): Output file/folder paths or dataset names
+        """
+        self.name = name
+        self.run = run
+        self.inputs = list(inputs or [])
+        self.params = dict(params or {})
+        self.code = list(code or [run])
+        self.depends_on = list(depends_on or [])
+        self.outputs = list(outputs or [])
+
+# ============================================================================
+# STEP CACHE
+# ============================================================================
+
+class StepCache:
+    """JSON manifest of step keys and output fingerprints"""
+
+    def __init__(self, manifest_path, fingerprint=None):
+        """
+        Args:
+            manifest_path (str): JSON file holding the cache state
+            fingerprint (callable): path/dataset -> str or None. Defaults to
+                fingerprint_path; pass a function that also understands
+                geodatabase datasets for arcpy workflows
+        """
+        self.manifest_path = str(manifest_path)
+        self.fingerprint = fingerprint or fingerprint_path
+        self.entries = {}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r') as f:
+                    self.entries = json.load(f).get('steps', {})
+            except (ValueError, OSError):
+                self.entries = {}   # Unreadable manifest: behave as a cold cache
+        self.keys = {}
+        self.ran = set()
+
+    def step_key(self, step):
+        """SHA-256 over a step's inputs, params, code and upstream keys"""
+        missing = [name for name in step.depends_on if name not in self.keys]
+        if missing:
+            raise ValueError(f"Step '{step.name}' depends on steps not run yet: {missing}")
+        return _digest({
+            'inputs': [(str(item), self.fingerprint(item)) for item in step.inputs],
+            'params': step.params,
+            'code': fingerprint_code(step.code),
+            'upstream': [(name, self.keys[name]) for name in step.depends_on],
+        })
+
+    def is_current(self, step, key):
+        """True when the step ran with this key and its outputs are unchanged"""
+        entry = self.entries.get(step.name)
+        if not entry or entry.get('key') != key:
+            return False
+        recorded = entry.get('outputs', {})
+        for output in step.outputs:
+            current = self.fingerprint(output)
+            if current is None or recorded.get(str(output)) != current:
+                return False
+        return True
+
+    def record(self, step, key, seconds):
+        outputs = {str(output): self.fingerprint(output) for output in step.outputs}
+        self.entries[step.name] = {
+            'key': key,
+            'outputs': outputs,
+            'seconds': round(seconds, 2),
+            'completed': datetime.now().isoformat(timespec='seconds'),
+        }
+        # A step may update an earlier step's output in place (adding fields);
+        # that is a known change, so the earlier entry stays valid
+        for name, entry in self.entries.items():
+            for output, current in outputs.items():
+                if name != step.name and output in entry.get('outputs', {}):
+                    entry['outputs'][output] = current
+        self._save()
+
+    def invalidate(self, step_name=None):
+        """Forget one step (or every step) so it runs next time"""
+        if step_name is None:
+            self.entries = {}
+        else:
+            self.entries.pop(step_name, None)
+        self._save()
+
+    def _save(self):
+        folder = os.path.dirname(os.path.abspath(self.manifest_path))
+        os.makedirs(folder, exist_ok=True)
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({'steps': self.entries}, f, indent=2)
+        os.replace(temp_path, self.manifest_path)
+
+    def run(self, step, force=False):
+        """
+        Run a step unless its cached outputs are still valid
+
+        A step is recorded only when its run function returns; an exception
+        propagates and leaves the step to run again next time.
+
+        Returns:
+            bool: True if the step ran, False if it was skipped
+        """
+        key = self.step_key(step)
+        self.keys[step.name] = key
+        # Rebuilt upstream outputs invalidate this step even with the same key
+        force = force or any(name in self.ran for name in step.depends_on)
+        if not force and self.is_current(step, key):
+            seconds = self.entries[step.name].get('seconds', 0)
+            print(f"⏭️ {step.name}: unchanged, reusing cached outputs (saved {seconds:.0f} s)")
+            return False
+
+        started = time.perf_counter()
+        step.run()
+        self.record(step, key, time.perf_counter() - started)
+        self.ran.add(step.name)
+        return True
+
+    def run_all(self, steps, force=None):
+        """
+        Run steps in order, skipping the ones whose inputs are unchanged
+
+        Args:
+            steps (list): Step objects in dependency order
+            force (list): Step names to re-run regardless of the cache
+
+        Returns:
+            dict: Step name -> True (ran) / False (reused)
+        """
+        force = set(force or [])
+        return {step.name: self.run(step, force=step.name in force) for step in steps}
@@ -0,0 +1,429 @@
+"""
+Streaming Result Exporter
+University of Hawaii Water Resources Research Center
+
+Writes cursor rows to CSV, Parquet or GeoPackage in fixed-size batches, so
+exporting the statewide cesspool analysis holds one batch in memory instead
+of the whole result (previously: a list of rows, a DataFrame, and the CSV
+buffer). Any iterable of row tuples works, e.g. an arcpy.da.SearchCursor.
+
+    CSV         optional gzip (stdlib) or zstd (zstandard package) stream
+    Parquet     one row group per batch; gzip/zstd as the Parquet codec;
+                schema from the source field types (field_types)
+    GeoPackage  SQLite via the standard library; pass a SHAPE@WKB field as
+                the geometry field to write features, otherwise an
+                attribute table is written
+
+Each export reports rows, elapsed time and rows per second.
+"""
+
+import csv
+import gzip
+import io
+import itertools
+import os
+import sqlite3
+import struct
+import time
+from datetime import date, datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - reported when Parquet is requested
+    pa = None
+    pq = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - reported when zstd is requested
+    zstandard = None
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+BATCH_SIZE = 50000
+FORMATS = ('csv', 'parquet', 'gpkg')
+COMPRESSIONS = (None, 'gzip', 'zstd')
+
+# File extensions used to infer the format (compression suffix stripped first)
+FORMAT_EXTENSIONS = {
+    '.csv': 'csv',
+    '.txt': 'csv',
+    '.parquet': 'parquet',
+    '.gpkg': 'gpkg',
+}
+COMPRESSION_EXTENSIONS = {'.gz': 'gzip', '.zst': 'zstd'}
+
+# GeoPackage 1.2 identifiers
+GPKG_APPLICATION_ID = 0x47504B47   # 'GPKG'
+GPKG_USER_VERSION = 10200
+
+# Parquet column types for arcpy field types (arcpy.ListFields().type)
+ARROW_FIELD_TYPES = {
+    'OID': lambda: pa.int64(),
+    'SmallInteger': lambda: pa.int16(),
+    'Integer': lambda: pa.int32(),
+    'BigInteger': lambda: pa.int64(),
+    'Single': lambda: pa.float32(),
+    'Double': lambda: pa.float64(),
+    'String': lambda: pa.string(),
+    'GUID': lambda: pa.string(),
+    'GlobalID': lambda: pa.string(),
+    'Date': lambda: pa.timestamp('us'),
+    'DateOnly': lambda: pa.date32(),
+    'Blob': lambda: pa.binary(),
+    'Geometry': lambda: pa.binary(),
+}
+
+def infer_format(path):
+    """Return (format, compression) from an output path such as results.csv.gz"""
+    root, ext = os.path.splitext(str(path).lower())
+    compression = COMPRESSION_EXTENSIONS.get(ext)
+    if compression:
+        root, ext = os.path.splitext(root)
+    return FORMAT_EXTENSIONS.get(ext, 'csv'), compression
+
+# ============================================================================
+# EXPORT STATISTICS
+# ============================================================================
+
+class ExportStats:
+    """Row count and throughput for one export"""
+
+    def __init__(self, path, file_format, compression):
+        self.path = str(path)
+        self.format = file_format
+        self.compression = compression
+        self.rows = 0
+        self.batches = 0
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    @property
+    def file_size(self):
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def as_dict(self):
+        return {
+            'path': self.path,
+            'format': self.format,
+            'compression': self.compression,
+            'rows': self.rows,
+            'batches': self.batches,
+            'seconds': round(self.seconds, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+            'bytes': self.file_size
+        }
+
+    def report(self):
+        """Print a short export report"""
+        size_mb = self.file_size / (1024 * 1024)
+        label = self.format + (f" + {self.compression}" if self.compression else "")
+        print(f"  Rows: {self.rows:,} in {self.batches:,} batches ({label}, {size_mb:.1f} MB)")
+        print(f"  Time: {self.seconds:.1f} s ({self.rows_per_second:,.0f} rows/s)")
+
+# ============================================================================
+# FORMAT WRITERS
+# ============================================================================
+
+class _CSVWriter:
+
+    def __init__(self, path, fields, compression):
+        if compression == 'gzip':
+            self.stream = gzip.open(path, 'wt', compresslevel=6, newline='', encoding='utf-8')
+        elif compression == 'zstd':
+            if zstandard is None:
+                raise ImportError("zstd compression requires zstandard: pip install zstandard")
+            self.raw = open(path, 'wb')
+            binary = zstandard.ZstdCompressor().stream_writer(self.raw)
+            self.stream = io.TextIOWrapper(binary, encoding='utf-8', newline='')
+        else:
+            self.stream = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.stream)
+        self.writer.writerow(fields)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.stream.close()
+
+def _arrow_type(field_type):
+    """pyarrow type for an arcpy field type name (or a pyarrow type as is)"""
+    if field_type is None or isinstance(field_type, pa.DataType):
+        return field_type
+    if field_type not in ARROW_FIELD_TYPES:
+        raise ValueError(f"Unsupported field type '{field_type}' for Parquet export")
+    return ARROW_FIELD_TYPES[field_type]()
+
+def _column_array(name, column, field_type):
+    """
+    Build one column with its schema type, refusing lossy conversions
+
+    Integers may go into a floating point column and values may be widened
+    or narrowed when nothing is lost (pyarrow's safe cast); any other change
+    of type between batches raises instead of being cast away.
+    """
+    array = pa.array(column)
+    if array.type == field_type:
+        return array
+    if array.type == pa.null():
+        return pa.nulls(len(array), type=field_type)
+
+    def kind(data_type):
+        if pa.types.is_integer(data_type):
+            return 'integer'
+        if pa.types.is_floating(data_type):
+            return 'float'
+        if pa.types.is_temporal(data_type):
+            return 'temporal'
+        if pa.types.is_string(data_type) or pa.types.is_large_string(data_type):
+            return 'string'
+        if pa.types.is_binary(data_type) or pa.types.is_large_binary(data_type):
+            return 'binary'
+        return str(data_type)
+
+    source, target = kind(array.type), kind(field_type)
+    if source == target or (source == 'integer' and target == 'float'):
+        try:
+            return array.cast(field_type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            raise TypeError(f"Column '{name}': {e}") from e
+    raise TypeError(f"Column '{name}' changed type from {field_type} to {array.type}; "
+                    f"pass field_types to fix the Parquet schema up front")
+
+class _ParquetWriter:
+
+    def __init__(self, path, fields, compression, field_types=None):
+        if pa is None:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow")
+        self.path = path
+        self.fields = list(fields)
+        self.compression = compression or 'snappy'
+        self.field_types = {name: _arrow_type(field_type)
+                            for name, field_type in (field_types or {}).items()}
+        self.writer = None
+        self.schema = None
+
+    def _create_schema(self, columns):
+        # Declared (source) field types win; other columns are inferred from
+        # the first batch, with all-null columns stored as text
+        schema_fields = []
+        for name, column in zip(self.fields, columns):
+            field_type = self.field_types.get(name)
+            if field_type is None:
+                field_type = pa.array(column).type
+                if field_type == pa.null():
+                    field_type = pa.string()
+            schema_fields.append(pa.field(name, field_type))
+        return pa.schema(schema_fields)
+
+    def write(self, rows):
+        columns = list(zip(*rows)) if rows else [[] for _ in self.fields]
+        if self.writer is None:
+            self.schema = self._create_schema(columns)
+            self.writer = pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+        arrays = [_column_array(field.name, column, field.type)
+                  for column, field in zip(columns, self.schema)]
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        if self.writer is None:
+            self.write([])
+        self.writer.close()
+
+def _sqlite_type(value):
+    if isinstance(value, bool) or isinstance(value, int):
+        return 'INTEGER'
+    if isinstance(value, float):
+        return 'REAL'
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return 'BLOB'
+    if isinstance(value, datetime):
+        return 'DATETIME'
+    if isinstance(value, date):
+        return 'DATE'
+    return 'TEXT'
+
+class _GeoPackageWriter:
+    """Minimal GeoPackage writer (attributes or features with WKB geometry)"""
+
+    def __init__(self, path, fields, table_name=None, geometry_field=None,
+                 geometry_type='GEOMETRY', srs_id=0, srs_wkt=None, srs_name=None):
+        if os.path.exists(path):
+            os.remove(path)
+        self.fields = list(fields)
+        self.table = table_name or os.path.splitext(os.path.basename(path))[0]
+        self.geometry_field = geometry_field
+        self.geometry_index = self.fields.index(geometry_field) if geometry_field else None
+        self.geometry_type = geometry_type
+        self.srs_id = srs_id
+        self.srs_wkt = srs_wkt
+        self.srs_name = srs_name or f"EPSG:{srs_id}"
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(f"PRAGMA application_id = {GPKG_APPLICATION_ID}")
+        self.connection.execute(f"PRAGMA user_version = {GPKG_USER_VERSION}")
+        self.created = False
+
+    def _create_tables(self, first_row):
+        cursor = self.connection.cursor()
+        cursor.execute("""CREATE TABLE gpkg_spatial_ref_sys (
+            srs_name TEXT NOT NULL, srs_id INTEGER PRIMARY KEY, organization TEXT NOT NULL,
+            organization_coordsys_id INTEGER NOT NULL, definition TEXT NOT NULL, description TEXT)""")
+        cursor.executemany("INSERT INTO gpkg_spatial_ref_sys VALUES (?, ?, ?, ?, ?, ?)", [
+            ('Undefined cartesian SRS', -1, 'NONE', -1, 'undefined', None),
+            ('Undefined geographic SRS', 0, 'NONE', 0, 'undefined', None),
+        ])
+        if self.srs_id not in (-1, 0):
+            cursor.execute("INSERT INTO gpkg_spatial_ref_sys VALUES (?, ?, ?, ?, ?, ?)",
+                           (self.srs_name, self.srs_id, 'EPSG', self.srs_id,
+                            self.srs_wkt or 'undefined', None))
+        cursor.execute("""CREATE TABLE gpkg_contents (
+            table_name TEXT NOT NULL PRIMARY KEY, data_type TEXT NOT NULL, identifier TEXT UNIQUE,
+            description TEXT DEFAULT '', last_change DATETIME NOT NULL DEFAULT
+            (strftime('%Y-%m-%dT%H:%M:%fZ','now')), min_x DOUBLE, min_y DOUBLE, max_x DOUBLE,
+            max_y DOUBLE, srs_id INTEGER)""")
+        cursor.execute("""CREATE TABLE gpkg_geometry_columns (
+            table_name TEXT NOT NULL, column_name TEXT NOT NULL, geometry_type_name TEXT NOT NULL,
+            srs_id INTEGER NOT NULL, z TINYINT NOT NULL, m TINYINT NOT NULL,
+            CONSTRAINT pk_geom_cols PRIMARY KEY (table_name, column_name))""")
+
+        columns = ['fid INTEGER PRIMARY KEY AUTOINCREMENT']
+        for index, (name, value) in enumerate(zip(self.fields, first_row)):
+            sql_type = self.geometry_type if index == self.geometry_index else _sqlite_type(value)
+            columns.append(f'"{name}" {sql_type}')
+        cursor.execute(f'CREATE TABLE "{self.table}" ({", ".join(columns)})')
+
+        if self.geometry_field:
+            cursor.execute("INSERT INTO gpkg_contents (table_name, data_type, identifier, srs_id) "
+                           "VALUES (?, 'features', ?, ?)", (self.table, self.table, self.srs_id))
+            cursor.execute("INSERT INTO gpkg_geometry_columns VALUES (?, ?, ?, ?, 0, 0)",
+                           (self.table, self.geometry_field, self.geometry_type, self.srs_id))
+        else:
+            cursor.execute("INSERT INTO gpkg_contents (table_name, data_type, identifier) "
+                           "VALUES (?, 'attributes', ?)", (self.table, self.table))
+
+        placeholders = ", ".join("?" for _ in self.fields)
+        quoted = ", ".join(f'"{name}"' for name in self.fields)
+        self.insert_sql = f'INSERT INTO "{self.table}" ({quoted}) VALUES ({placeholders})'
+        self.created = True
+
+    def _geometry_blob(self, wkb):
+        # GeoPackage binary header: magic, version 0, flags (little endian,
+        # no envelope), srs_id; followed by the standard WKB
+        if wkb is None:
+            return None
+        return b'GP' + struct.pack('<BBi', 0, 0x01, self.srs_id) + bytes(wkb)
+
+    def write(self, rows):
+        if not rows:
+            return
+        if not self.created:
+            self._create_tables(rows[0])
+        if self.geometry_index is not None:
+            g = self.geometry_index
+            rows = [row[:g] + (self._geometry_blob(row[g]),) + row[g + 1:] for row in map(tuple, rows)]
+        self.connection.executemany(self.insert_sql, rows)
+        self.connection.commit()
+
+    def close(self):
+        if not self.created:
+            self._create_tables([None] * len(self.fields))
+            self.connection.commit()
+        self.connection.close()
+
+# ============================================================================
+# STREAMING EXPORTER
+# ============================================================================
+
+class StreamingExporter:
+    """Incremental writer for batches of row tuples"""
+
+    def __init__(self, path, fields, file_format=None, compression=None, field_types=None,
+                 **gpkg_options):
+        """
+        Args:
+            path (str): Output file
+            fields (list): Column names, in row tuple order
+            file_format (str): 'csv', 'parquet' or 'gpkg' (default: from extension)
+            compression (str): None, 'gzip' or 'zstd' (default: from extension)
+            field_types (dict): Field name -> arcpy field type (or pyarrow
+                type) fixing the Parquet schema; undeclared columns are
+                inferred from the first batch
+            **gpkg_options: table_name, geometry_field, geometry_type, srs_id,
+                srs_wkt, srs_name for GeoPackage output
+        """
+        inferred_format, inferred_compression = infer_format(path)
+        file_format = (file_format or inferred_format).lower()
+        compression = compression or inferred_compression
+        if file_format not in FORMATS:
+            raise ValueError(f"Unsupported export format '{file_format}' (use one of {FORMATS})")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported compression '{compression}' (use gzip or zstd)")
+        if file_format == 'gpkg' and compression:
+            raise ValueError("GeoPackage output cannot be stream-compressed")
+
+        self.fields = list(fields)
+        self.stats = ExportStats(path, file_format, compression)
+        if file_format == 'csv':
+            self.writer = _CSVWriter(path, self.fields, compression)
+        elif file_format == 'parquet':
+            self.writer = _ParquetWriter(path, self.fields, compression, field_types)
+        else:
+            self.writer = _GeoPackageWriter(path, self.fields, **gpkg_options)
+
+    def write_batch(self, rows):
+        """Write one batch (a list of row tuples)"""
+        self.writer.write(rows)
+        self.stats.rows += len(rows)
+        self.stats.batches += 1
+
+    def close(self):
+        """Finish the file and return the ExportStats"""
+        self.writer.close()
+        self.stats.seconds = time.perf_counter() - self.stats.started
+        return self.stats
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def iter_batches(rows, batch_size=BATCH_SIZE):
+    """Yield lists of at most batch_size rows from any row iterable"""
+    iterator = iter(rows)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def export_rows(rows, path, fields, batch_size=BATCH_SIZE, file_format=None,
+                compression=None, field_types=None, **gpkg_options):
+    """
+    Stream rows to a file in fixed-size batches
+
+    Args:
+        rows (iterable): Row tuples, e.g. an open arcpy.da.SearchCursor
+        path (str): Output file (format/compression inferred from the extension)
+        fields (list): Column names
+        batch_size (int): Rows held in memory at once
+        file_format, compression, field_types, **gpkg_options: See StreamingExporter
+
+    Returns:
+        ExportStats: Rows written, elapsed seconds and rows per second
+    """
+    exporter = StreamingExporter(path, fields, file_format, compression, field_types,
+                                 **gpkg_options)
+    with exporter:
+        for batch in iter_batches(rows, batch_size):
+            exporter.write_batch(batch)
+    return exporter.stats
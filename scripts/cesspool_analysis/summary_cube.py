@@ -0,0 +1,226 @@
+"""
+Summary Cube for Phase 5 Reporting
+University of Hawaii Water Resources Research Center
+
+Aggregates the cesspool analysis table once into a dense cube over
+
+    ISLAND x BED_ROOMS x PRIORITY_SCORE x LOT_SIZE_CAT
+
+holding parcel counts, total design flow (DAILY_FLOW_GAL) and total septic
+volume (SEPTIC_SIZE_GAL) per cell. Every report roll-up (by island, by
+bedrooms, island x priority, ...) is a sum over cube axes, so nothing
+rescans the table. The cube has at most a few thousand cells statewide.
+
+Each dimension is factorized to dense integer codes and all cells are
+filled with one np.bincount per measure.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .mpat_store import island_from_tmk
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+CUBE_DIMENSIONS = ['ISLAND', 'BED_ROOMS', 'PRIORITY_SCORE', 'LOT_SIZE_CAT']
+COUNT_MEASURE = 'PARCELS'
+SUM_MEASURES = ['DAILY_FLOW_GAL', 'SEPTIC_SIZE_GAL']
+
+# Values used for nulls, matching the original cursor summaries
+DIMENSION_DEFAULTS = {
+    'ISLAND': 'Unknown',
+    'BED_ROOMS': 0,
+    'PRIORITY_SCORE': 5,
+    'LOT_SIZE_CAT': 'Unknown',
+}
+
+# Fields to read from the analysis table (ISLAND is derived from TMK)
+SOURCE_FIELDS = ['TMK', 'BED_ROOMS', 'PRIORITY_SCORE', 'LOT_SIZE_CAT'] + SUM_MEASURES
+
+# ============================================================================
+# CUBE
+# ============================================================================
+
+def _column(table, field):
+    if isinstance(table, np.ndarray) and table.dtype.names:
+        return table[field]
+    return np.asarray(table[field])
+
+def _field_names(table):
+    if isinstance(table, np.ndarray) and table.dtype.names:
+        return list(table.dtype.names)
+    return list(table.keys()) if isinstance(table, dict) else list(table.columns)
+
+def _fill_nulls(values, default):
+    values = pd.Series(values)
+    if not pd.api.types.is_numeric_dtype(values):
+        blank = values.isna() | (values.astype(str).str.strip() == '')
+        return values.astype(object).where(~blank, default).to_numpy()
+    # NaN, arcpy's integer null placeholder (-1) and the cursor's falsy 0 all
+    # meant "missing" in the original summaries
+    return values.where(values > 0, default).to_numpy()
+
+class SummaryCube:
+    """Dense count/sum cube over the Phase 5 reporting dimensions"""
+
+    def __init__(self, dimensions, labels, values):
+        """
+        Args:
+            dimensions (list): Dimension names, one per cube axis
+            labels (dict): Dimension -> sorted numpy array of axis labels
+            values (dict): Measure -> ndarray shaped like the cube
+        """
+        self.dimensions = list(dimensions)
+        self.labels = labels
+        self.values = values
+
+    @property
+    def shape(self):
+        return tuple(len(self.labels[d]) for d in self.dimensions)
+
+    @property
+    def measures(self):
+        return list(self.values)
+
+    def __repr__(self):
+        axes = " x ".join(f"{d}[{len(self.labels[d])}]" for d in self.dimensions)
+        return f"SummaryCube({axes}, {int(self.values[COUNT_MEASURE].sum()):,} parcels)"
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_columns(cls, columns, dimensions=None, measures=None, weights=None):
+        """
+        Build the cube in one pass over column arrays
+
+        Args:
+            columns: dict of arrays, DataFrame or structured array holding the
+                dimension and measure columns
+            dimensions (list): Dimension columns (default CUBE_DIMENSIONS)
+            measures (list): Columns to sum (default SUM_MEASURES)
+            weights (array-like): Optional row multiplicity (e.g. cell counts
+                when rebuilding from a saved cube); default 1 per row
+
+        Returns:
+            SummaryCube
+        """
+        dimensions = list(dimensions or CUBE_DIMENSIONS)
+        measures = list(SUM_MEASURES if measures is None else measures)
+
+        labels, codes = {}, []
+        for dimension in dimensions:
+            values = _fill_nulls(_column(columns, dimension), DIMENSION_DEFAULTS.get(dimension, 'Unknown'))
+            dimension_codes, uniques = pd.factorize(values, sort=True)
+            labels[dimension] = np.asarray(uniques)
+            codes.append(dimension_codes)
+
+        shape = tuple(len(labels[d]) for d in dimensions)
+        size = int(np.prod(shape))
+        flat = np.ravel_multi_index(codes, shape) if codes and len(codes[0]) else np.zeros(0, dtype=np.int64)
+
+        counts = np.ones(len(flat)) if weights is None else np.asarray(weights, dtype=float)
+        values = {COUNT_MEASURE: np.bincount(flat, weights=counts, minlength=size)
+                  .round().astype(np.int64).reshape(shape)}
+        for measure in measures:
+            amounts = np.nan_to_num(np.asarray(_column(columns, measure), dtype=float))
+            values[measure] = np.bincount(flat, weights=amounts, minlength=size).reshape(shape)
+        return cls(dimensions, labels, values)
+
+    @classmethod
+    def from_analysis_table(cls, table, tmk_field='TMK'):
+        """Build the standard cube from analysis rows (ISLAND derived from the TMK)"""
+        columns = {field: _column(table, field) for field in SOURCE_FIELDS
+                   if field != 'TMK' and field in _field_names(table)}
+        columns['ISLAND'] = island_from_tmk(_column(table, tmk_field))
+        return cls.from_columns(columns, measures=[m for m in SUM_MEASURES if m in columns])
+
+    @classmethod
+    def from_frame(cls, frame, dimensions=None):
+        """
+        Rebuild a cube from to_frame() output (e.g. a saved CSV)
+
+        Frames from several partitions can be concatenated first; equal
+        cells are summed.
+        """
+        dimensions = list(dimensions or [c for c in CUBE_DIMENSIONS if c in frame.columns])
+        measures = [c for c in frame.columns if c not in dimensions and c != COUNT_MEASURE]
+        return cls.from_columns(frame, dimensions, measures, weights=frame[COUNT_MEASURE].to_numpy())
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _selection(self, filters):
+        """Per-axis index arrays for dimension=value or dimension=[values] filters"""
+        unknown = set(filters) - set(self.dimensions)
+        if unknown:
+            raise KeyError(f"Not cube dimensions: {sorted(unknown)}")
+        selection = []
+        for dimension in self.dimensions:
+            if dimension in filters:
+                wanted = filters[dimension]
+                wanted = wanted if isinstance(wanted, (list, tuple, set, np.ndarray)) else [wanted]
+                selection.append(np.flatnonzero(np.isin(self.labels[dimension], list(wanted))))
+            else:
+                selection.append(np.arange(len(self.labels[dimension])))
+        return selection
+
+    def slice(self, **filters):
+        """Sub-cube restricted to the given dimension values"""
+        selection = self._selection(filters)
+        grid = np.ix_(*selection)
+        labels = {d: self.labels[d][index] for d, index in zip(self.dimensions, selection)}
+        return SummaryCube(self.dimensions, labels, {m: v[grid] for m, v in self.values.items()})
+
+    def total(self, measure=COUNT_MEASURE, **filters):
+        """Sum of one measure over the whole cube or a filtered slice"""
+        cube = self.slice(**filters) if filters else self
+        total = cube.values[measure].sum()
+        return int(total) if measure == COUNT_MEASURE else float(total)
+
+    def rollup(self, *dimensions, **filters):
+        """
+        Aggregate to the given dimensions (summing over all others)
+
+        Args:
+            *dimensions: Dimensions to keep, in output order
+            **filters: dimension=value or dimension=[values] restrictions
+
+        Returns:
+            pandas.DataFrame: One row per non-empty combination, indexed by the
+            kept dimensions, with PARCELS and the summed measures
+        """
+        cube = self.slice(**filters) if filters else self
+        keep = [cube.dimensions.index(d) for d in dimensions]
+        drop = tuple(i for i in range(len(cube.dimensions)) if i not in keep)
+        # Summed axes disappear; put the kept ones in the requested order
+        order = [sorted(keep).index(i) for i in keep]
+        columns = {measure: values.sum(axis=drop).transpose(order).ravel()
+                   for measure, values in cube.values.items()}
+
+        if len(dimensions) > 1:
+            index = pd.MultiIndex.from_product([cube.labels[d] for d in dimensions],
+                                               names=list(dimensions))
+        elif dimensions:
+            index = pd.Index(cube.labels[dimensions[0]], name=dimensions[0])
+        else:
+            index = pd.RangeIndex(1)
+        frame = pd.DataFrame(columns, index=index)
+        return frame[frame[COUNT_MEASURE] > 0]
+
+    def to_frame(self):
+        """Long table of every non-empty cell (dimensions + measures)"""
+        return self.rollup(*self.dimensions).reset_index()
+
+    def save(self, path):
+        """Write the non-empty cells to CSV"""
+        self.to_frame().to_csv(path, index=False)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        return cls.from_frame(pd.read_csv(path))
@@ -0,0 +1,285 @@
+"""
+Synthetic Statewide Dataset Generator
+University of Hawaii Water Resources Research Center
+
+Seeded generator of Hawaii-like inputs for timing and regression-testing
+the analysis engines without the (untracked) ParcelAnalysis.gdb:
+
+    parcels     tmk_state-like rectangles with valid 9-digit TMKs per island
+    cesspools   82,141 points at scale 1.0, most inside their parcel
+    wells       municipal and domestic well points
+    soils       NRCS-like map units with slope_r, ksat_r and drainagecl
+    bedrooms    bedrooms CSV keyed by TMK (mixed TMK formats, duplicates)
+
+Coordinates are UTM Zone 4N meters (EPSG:26904) inside rough island
+extents. The same seed and scale always produce the same data.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from .backends import module_available
+from .har_standards import DRAINAGE_CLASSIFICATION_MAP
+from .tmk_codec import TMK_COUNTY_CODES
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+STATEWIDE_PARCELS = 384262
+STATEWIDE_CESSPOOLS = 82141
+STATEWIDE_MUNICIPAL_WELLS = 650
+STATEWIDE_DOMESTIC_WELLS = 3200
+STATEWIDE_SOIL_UNITS = 24000
+DEFAULT_SEED = 20251002
+
+# County code -> (xmin, ymin, xmax, ymax) in UTM 4N meters, parcel share, cesspool share
+ISLAND_LAYOUT = {
+    '1': ((820000, 2100000, 940000, 2240000), 0.30, 0.60),   # Hawaii
+    '2': ((740000, 2270000, 800000, 2330000), 0.17, 0.16),   # Maui
+    '3': ((590000, 2355000, 630000, 2400000), 0.43, 0.09),   # Honolulu
+    '4': ((420000, 2410000, 470000, 2460000), 0.10, 0.15),   # Kauai
+}
+
+DRAINAGE_CLASSES = sorted(DRAINAGE_CLASSIFICATION_MAP)
+
+# ============================================================================
+# DATASET
+# ============================================================================
+
+class SyntheticDataset:
+    """Container for one generated statewide dataset"""
+
+    def __init__(self, seed, scale, parcels, parcel_coords, parcel_ring_offsets,
+                 cesspools, municipal_wells, domestic_wells, soils, bedrooms):
+        self.seed = seed
+        self.scale = scale
+        self.parcels = parcels                          # DataFrame, one row per polygon
+        self.parcel_coords = parcel_coords              # (V, 2) ring vertices
+        self.parcel_ring_offsets = parcel_ring_offsets  # one ring per parcel
+        self.cesspools = cesspools                      # DataFrame X, Y, TMK
+        self.municipal_wells = municipal_wells          # DataFrame WELL_ID, X, Y
+        self.domestic_wells = domestic_wells
+        self.soils = soils                              # DataFrame per map unit
+        self.bedrooms = bedrooms                        # DataFrame TMK, BED_ROOMS
+
+    @property
+    def parcel_polygon_ring_offsets(self):
+        """Polygon -> ring offsets (every synthetic parcel has one ring)"""
+        return np.arange(len(self.parcels) + 1, dtype=np.int64)
+
+    def summary(self):
+        return {
+            'seed': self.seed,
+            'scale': self.scale,
+            'parcels': len(self.parcels),
+            'cesspools': len(self.cesspools),
+            'municipal_wells': len(self.municipal_wells),
+            'domestic_wells': len(self.domestic_wells),
+            'soil_units': len(self.soils),
+            'bedroom_records': len(self.bedrooms),
+        }
+
+    def write(self, folder):
+        """
+        Write the tables to a folder (Parquet when pyarrow is installed, else CSV)
+
+        The bedrooms table is always written as bedrooms_out.csv, the file name
+        hawaii_cesspool_analysis.Config expects.
+        """
+        os.makedirs(folder, exist_ok=True)
+        if module_available('pyarrow'):
+            extension, writer = '.parquet', 'to_parquet'
+        else:
+            extension, writer = '.csv', 'to_csv'
+
+        for name in ['parcels', 'cesspools', 'municipal_wells', 'domestic_wells', 'soils']:
+            getattr(getattr(self, name), writer)(os.path.join(folder, name + extension), index=False)
+        self.bedrooms.to_csv(os.path.join(folder, "bedrooms_out.csv"), index=False)
+        np.savez(os.path.join(folder, "parcel_rings.npz"),
+                 coords=self.parcel_coords, ring_offsets=self.parcel_ring_offsets)
+        return folder
+
+# ============================================================================
+# GENERATORS
+# ============================================================================
+
+def _split_counts(total, shares):
+    """Integer counts per share that add up to total"""
+    counts = np.floor(np.asarray(shares) / np.sum(shares) * total).astype(int)
+    counts[np.argmax(shares)] += total - counts.sum()
+    return counts
+
+def _island_parcels(rng, county_code, extent, n):
+    """Grid of rectangular lots over an island extent with TMKs by position"""
+    xmin, ymin, xmax, ymax = extent
+    columns = int(np.ceil(np.sqrt(n * (xmax - xmin) / (ymax - ymin))))
+    rows = int(np.ceil(n / columns))
+    cell_w = (xmax - xmin) / columns
+    cell_h = (ymax - ymin) / rows
+
+    # Keep n cells, spread over the grid
+    cells = np.sort(rng.choice(columns * rows, size=n, replace=False))
+    col, row = cells % columns, cells // columns
+
+    # Lot areas are log-normal around a ~7,500 sq ft house lot (so all three
+    # lot-size categories occur at any scale), capped at 95% of the cell
+    area = np.exp(rng.normal(np.log(700.0), 0.9, n))
+    aspect = rng.uniform(0.6, 1.6, n)
+    width = np.minimum(np.sqrt(area * aspect), cell_w * 0.95)
+    height = np.minimum(area / width, cell_h * 0.95)
+    x0 = xmin + col * cell_w + rng.uniform(0, 1, n) * (cell_w - width)
+    y0 = ymin + row * cell_h + rng.uniform(0, 1, n) * (cell_h - height)
+
+    # TMK digits follow position: zone/section by grid block, plat by
+    # row band, parcel number sequential within a plat (all in 1-999)
+    zone = 1 + (col * 9 // columns)
+    section = 1 + (row * 9 // rows)
+    plat_key = (zone * 10 + section) * 100000 + row
+    _, plat_index = np.unique(plat_key, return_inverse=True)
+    plat = 1 + plat_index % 999
+    order = np.lexsort((col, plat_key))
+    parcel = np.empty(n, dtype=np.int64)
+    group_start = np.r_[0, np.flatnonzero(np.diff(plat_key[order])) + 1]
+    group_id = np.repeat(np.arange(len(group_start)), np.diff(np.r_[group_start, n]))
+    parcel[order] = 1 + (np.arange(n) - group_start[group_id]) % 999
+
+    tmk = (int(county_code) * 10**8 + zone * 10**7 + section * 10**6 + plat * 1000 + parcel)
+    area_m2 = width * height
+
+    frame = pd.DataFrame({
+        'TMK': tmk.astype(np.int64),
+        'COUNTY': TMK_COUNTY_CODES[county_code],
+        'ACRES': np.round(area_m2 / 4046.8564224, 4),
+        'XMIN': x0, 'YMIN': y0, 'XMAX': x0 + width, 'YMAX': y0 + height,
+    })
+    return frame
+
+def _rectangle_rings(frame):
+    """Closed 5-vertex rings for each parcel rectangle"""
+    xmin, ymin = frame['XMIN'].to_numpy(), frame['YMIN'].to_numpy()
+    xmax, ymax = frame['XMAX'].to_numpy(), frame['YMAX'].to_numpy()
+    xs = np.column_stack([xmin, xmax, xmax, xmin, xmin])
+    ys = np.column_stack([ymin, ymin, ymax, ymax, ymin])
+    coords = np.column_stack([xs.ravel(), ys.ravel()])
+    ring_offsets = np.arange(0, len(frame) * 5 + 1, 5, dtype=np.int64)
+    return coords, ring_offsets
+
+def _points_in_extents(rng, n, shares):
+    """Uniform points across islands, n split by share"""
+    counts = _split_counts(n, shares)
+    frames = []
+    for (code, (extent, _, _)), count in zip(ISLAND_LAYOUT.items(), counts):
+        xmin, ymin, xmax, ymax = extent
+        frames.append(pd.DataFrame({
+            'X': rng.uniform(xmin, xmax, count),
+            'Y': rng.uniform(ymin, ymax, count),
+            'COUNTY': TMK_COUNTY_CODES[code],
+        }))
+    points = pd.concat(frames, ignore_index=True)
+    points.insert(0, 'WELL_ID', np.arange(1, len(points) + 1))
+    return points
+
+def _soil_units(rng, n):
+    """NRCS-like map units on a coarse grid with slope_r, ksat_r, drainagecl"""
+    parcel_shares = [layout[1] for layout in ISLAND_LAYOUT.values()]
+    counts = _split_counts(n, parcel_shares)
+    frames = []
+    for (code, (extent, _, _)), count in zip(ISLAND_LAYOUT.items(), counts):
+        xmin, ymin, xmax, ymax = extent
+        side = int(np.ceil(np.sqrt(count)))
+        cell = np.arange(count)
+        w, h = (xmax - xmin) / side, (ymax - ymin) / side
+        frames.append(pd.DataFrame({
+            'MUKEY': int(code) * 10**6 + cell,
+            'XMIN': xmin + (cell % side) * w, 'YMIN': ymin + (cell // side) * h,
+            'XMAX': xmin + (cell % side + 1) * w, 'YMAX': ymin + (cell // side + 1) * h,
+        }))
+    soils = pd.concat(frames, ignore_index=True)
+
+    n_units = len(soils)
+    soils['slope_r'] = np.round(rng.gamma(1.4, 6.0, n_units), 1)
+    soils['ksat_r'] = np.round(np.exp(rng.normal(2.3, 1.2, n_units)), 3)   # micrometers/second
+    soils['drainagecl'] = rng.choice(DRAINAGE_CLASSES, n_units)
+    # NRCS tables have gaps: ~3% missing slope, ~5% missing ksat, ~2% missing drainage
+    soils.loc[rng.random(n_units) < 0.03, 'slope_r'] = np.nan
+    soils.loc[rng.random(n_units) < 0.05, 'ksat_r'] = np.nan
+    soils.loc[rng.random(n_units) < 0.02, 'drainagecl'] = None
+    return soils
+
+def _bedrooms(rng, parcels):
+    """Bedroom records for ~80% of parcels in the TMK formats seen in the source CSVs"""
+    has_record = rng.random(len(parcels)) < 0.8
+    tmk = parcels['TMK'].to_numpy()[has_record]
+    bedrooms = rng.choice(np.arange(0, 9), size=len(tmk),
+                          p=[0.04, 0.08, 0.22, 0.32, 0.18, 0.08, 0.04, 0.02, 0.02]).astype(float)
+    bedrooms[rng.random(len(tmk)) < 0.03] = np.nan
+
+    text = tmk.astype(str).astype(object)
+    style = rng.random(len(tmk))
+    dashed = style < 0.10          # '1-8-6-006-001'
+    with_cpr = (style >= 0.10) & (style < 0.25)   # 13-digit TMK with CPR suffix
+    text[dashed] = [f"{t[0]}-{t[1]}-{t[2]}-{t[3:6]}-{t[6:]}" for t in text[dashed]]
+    text[with_cpr] = [t + "0000" for t in text[with_cpr]]
+
+    frame = pd.DataFrame({'TMK': text, 'BED_ROOMS': bedrooms})
+    # Multi-dwelling parcels repeat their TMK (first record wins in joins)
+    duplicates = frame.sample(frac=0.05, random_state=int(rng.integers(2**31)))
+    return pd.concat([frame, duplicates], ignore_index=True)
+
+def generate_dataset(scale=1.0, seed=DEFAULT_SEED):
+    """
+    Generate a seeded Hawaii-like statewide dataset
+
+    Args:
+        scale (float): 1.0 = statewide counts (384,262 parcels, 82,141 cesspools)
+        seed (int): Random seed
+
+    Returns:
+        SyntheticDataset: Generated tables and parcel ring buffers
+    """
+    rng = np.random.default_rng(seed)
+    n_parcels = max(100, int(round(STATEWIDE_PARCELS * scale)))
+    n_cesspools = max(10, int(round(STATEWIDE_CESSPOOLS * scale)))
+
+    # Parcels per island
+    parcel_counts = _split_counts(n_parcels, [layout[1] for layout in ISLAND_LAYOUT.values()])
+    parcels = pd.concat([
+        _island_parcels(rng, code, extent, count)
+        for (code, (extent, _, _)), count in zip(ISLAND_LAYOUT.items(), parcel_counts)
+    ], ignore_index=True)
+    coords, ring_offsets = _rectangle_rings(parcels)
+
+    # Cesspool points inside parcels, weighted to the neighbor islands; ~2%
+    # fall in the gaps between lots and ~1% carry a mistyped TMK
+    cesspool_counts = _split_counts(n_cesspools, [layout[2] for layout in ISLAND_LAYOUT.values()])
+    county_codes = parcels['TMK'].to_numpy() // 10**8
+    chosen = []
+    for code, count in zip(ISLAND_LAYOUT, cesspool_counts):
+        candidates = np.flatnonzero(county_codes == int(code))
+        chosen.append(rng.choice(candidates, size=min(count, len(candidates)), replace=False))
+    chosen = np.sort(np.concatenate(chosen))
+    lots = parcels.iloc[chosen]
+    fx, fy = rng.uniform(0.05, 0.95, len(lots)), rng.uniform(0.05, 0.95, len(lots))
+    outside = rng.random(len(lots)) < 0.02
+    fx[outside] = 1.02   # just past the lot edge
+    cesspools = pd.DataFrame({
+        'CP_ID': np.arange(1, len(lots) + 1),
+        'X': lots['XMIN'].to_numpy() + fx * (lots['XMAX'] - lots['XMIN']).to_numpy(),
+        'Y': lots['YMIN'].to_numpy() + fy * (lots['YMAX'] - lots['YMIN']).to_numpy(),
+        'TMK': lots['TMK'].to_numpy(),
+        'COUNTY': lots['COUNTY'].to_numpy(),
+    })
+    mistyped = rng.random(len(cesspools)) < 0.01
+    cesspools.loc[mistyped, 'TMK'] += rng.integers(1, 50, mistyped.sum())
+
+    well_shares = [layout[1] for layout in ISLAND_LAYOUT.values()]
+    municipal_wells = _points_in_extents(rng, max(4, int(round(STATEWIDE_MUNICIPAL_WELLS * scale))), well_shares)
+    domestic_wells = _points_in_extents(rng, max(4, int(round(STATEWIDE_DOMESTIC_WELLS * scale))), well_shares)
+    soils = _soil_units(rng, max(16, int(round(STATEWIDE_SOIL_UNITS * scale))))
+    bedrooms = _bedrooms(rng, parcels)
+
+    return SyntheticDataset(seed, scale, parcels, coords, ring_offsets, cesspools,
+                            municipal_wells, domestic_wells, soils, bedrooms)
@@ -0,0 +1,399 @@
+"""
+Batch Technology Ranking and Cost Engine
+University of Hawaii Water Resources Research Center
+
+Implements the Step 3 ranking of the Matrix technical specification for the
+whole parcel set at once. The technology database (base cost, size
+multiplier, site difficulty factor, annual maintenance, lifespan) is loaded
+once into arrays aligned with the compiled Matrix, and cost, maintenance and
+composite scores are computed for the parcel x technology grid with
+broadcasting:
+
+    capital  = base_cost x size_multiplier ^ (bedrooms - 3) x difficulty factor
+    annual   = capital / lifespan + annual maintenance
+    score    = weighted cost, maintenance, regulatory and reliability scores
+
+Technologies that failed the sieve are masked out, each parcel keeps its
+top-N technologies (np.argpartition), and island roll-ups use np.bincount
+instead of per-parcel dicts.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import yaml
+except ImportError:  # pragma: no cover - raised with a hint on first use
+    yaml = None
+
+from .matrix_sieve import CHUNK_SIZE, suitability_matrix
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+DEFAULT_CONFIG_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "configs", "hawaii_iws_config.yaml"
+)
+CONFIG_SECTION = "approved_technologies"
+
+BASE_BEDROOMS = 3      # Bedrooms covered by base_cost; size_multiplier applies per bedroom above
+DEFAULT_TOP_N = 3
+NO_TECHNOLOGY = -1     # Technology index for empty top-N slots
+
+# Composite score weights (specification Step 3 components)
+DEFAULT_WEIGHTS = {
+    'cost': 0.4,
+    'maintenance': 0.2,
+    'regulatory': 0.2,
+    'reliability': 0.2,
+}
+
+# Matrix approval columns -> regulatory certainty score
+APPROVAL_SCORES = {
+    'DOH Approved': 1.0,
+    'DOH Conditional Approval': 0.6,
+    'DOH Experimental/Limited': 0.3,
+}
+
+# ============================================================================
+# TECHNOLOGY DATABASE
+# ============================================================================
+
+class TechnologyDatabase:
+    """Cost and maintenance arrays, one entry per technology"""
+
+    def __init__(self, technologies, base_cost, size_multiplier, difficulty_min, difficulty_max,
+                 annual_maintenance, lifespan_years):
+        self.technologies = np.asarray(technologies, dtype=object)
+        self.base_cost = np.asarray(base_cost, dtype=float)
+        self.size_multiplier = np.asarray(size_multiplier, dtype=float)
+        self.difficulty_min = np.asarray(difficulty_min, dtype=float)
+        self.difficulty_max = np.asarray(difficulty_max, dtype=float)
+        self.annual_maintenance = np.asarray(annual_maintenance, dtype=float)
+        self.lifespan_years = np.asarray(lifespan_years, dtype=float)
+
+    @property
+    def priced(self):
+        """True for technologies with a base cost"""
+        return ~np.isnan(self.base_cost)
+
+    def aligned(self, technologies):
+        """
+        Database reordered to the given technology names (e.g. matrix.technologies)
+
+        Technologies without an entry get NaN costs (unpriced).
+        """
+        positions = pd.Index(self.technologies).get_indexer(list(technologies))
+        found = positions >= 0
+
+        def take(values, fill=np.nan):
+            picked = values[np.maximum(positions, 0)] if len(values) else fill
+            return np.where(found, picked, fill)
+
+        return TechnologyDatabase(technologies, take(self.base_cost), take(self.size_multiplier, 1.0),
+                                  take(self.difficulty_min, 1.0), take(self.difficulty_max, 1.0),
+                                  take(self.annual_maintenance), take(self.lifespan_years))
+
+    def __repr__(self):
+        return f"TechnologyDatabase({len(self.technologies)} technologies, {int(self.priced.sum())} priced)"
+
+def _require_yaml():
+    if yaml is None:
+        raise ImportError("Loading the technology database requires PyYAML: pip install pyyaml")
+
+def technology_database(entries):
+    """
+    Build the database from technology entries
+
+    Args:
+        entries (dict): Technology name -> dict with base_cost and optional
+            size_multiplier (1.0), site_difficulty_factor ([min, max],
+            [1.0, 1.0]), annual_maintenance (0) and expected_lifespan_years
+
+    Returns:
+        TechnologyDatabase
+    """
+    names = list(entries)
+    costs = [entries[name] for name in names]
+    difficulty = [cost.get('site_difficulty_factor') or [1.0, 1.0] for cost in costs]
+    return TechnologyDatabase(
+        names,
+        [cost.get('base_cost', np.nan) for cost in costs],
+        [cost.get('size_multiplier', 1.0) for cost in costs],
+        [factor[0] for factor in difficulty],
+        [factor[-1] for factor in difficulty],
+        [cost.get('annual_maintenance', 0.0) for cost in costs],
+        [cost.get('expected_lifespan_years', np.nan) for cost in costs],
+    )
+
+def load_technology_database(config_file=None, section=CONFIG_SECTION):
+    """
+    Technology database from the IWS config (entries with matrix_name and costs)
+
+    Args:
+        config_file (str): YAML file (default: configs/hawaii_iws_config.yaml)
+        section (str): Top-level key listing the technologies
+
+    Returns:
+        TechnologyDatabase keyed by Matrix technology name
+    """
+    _require_yaml()
+    with open(config_file or DEFAULT_CONFIG_FILE, encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+    entries = {tech['matrix_name']: tech['costs'] for tech in (config.get(section) or {}).values()
+               if isinstance(tech, dict) and tech.get('matrix_name') and tech.get('costs')}
+    return technology_database(entries)
+
+def regulatory_scores(matrix):
+    """Regulatory certainty per technology from the Matrix approval columns (0 when none)"""
+    scores = np.zeros(matrix.n_technologies)
+    for criterion, score in APPROVAL_SCORES.items():
+        column = matrix.criterion_index.get(criterion)
+        if column is not None:
+            scores = np.where(matrix.allowed[:, column], np.maximum(scores, score), scores)
+    return scores
+
+# ============================================================================
+# SITE DIFFICULTY
+# ============================================================================
+
+def site_difficulty(n_parcels, slope_percent=None, lot_size_sf=None, perc_rate=None):
+    """
+    Site difficulty index from 0 (easy) to 1 (difficult)
+
+    Mean of the attributes given: slope (0-20%+), lot size (>21k, 10k-21k,
+    <10k sf) and percolation rate (1-10, 10-60, other min/inch). Missing
+    values do not count.
+    """
+    parts = []
+    if slope_percent is not None:
+        parts.append(np.clip(np.asarray(slope_percent, dtype=float) / 20, 0, 1))
+    if lot_size_sf is not None:
+        lot = np.asarray(lot_size_sf, dtype=float)
+        parts.append(np.where(np.isnan(lot), np.nan, np.select([lot < 10000, lot <= 21000], [1.0, 0.5], 0.0)))
+    if perc_rate is not None:
+        perc = np.asarray(perc_rate, dtype=float)
+        parts.append(np.where(np.isnan(perc), np.nan,
+                              np.select([(perc >= 1) & (perc <= 10), (perc > 10) & (perc <= 60)], [0.0, 0.5], 1.0)))
+    if not parts:
+        return np.zeros(n_parcels)
+    stacked = np.vstack(parts)
+    counts = (~np.isnan(stacked)).sum(axis=0)
+    return np.where(counts > 0, np.nansum(stacked, axis=0) / np.maximum(counts, 1), 0.0)
+
+# ============================================================================
+# COSTS AND SCORES
+# ============================================================================
+
+def capital_costs(database, bedrooms, difficulty=None):
+    """
+    Installed cost for every parcel x technology
+
+    Args:
+        database (TechnologyDatabase): Aligned with the technologies
+        bedrooms (array-like): Bedrooms per parcel (NaN = BASE_BEDROOMS)
+        difficulty (array-like): Site difficulty 0-1 per parcel (default 0)
+
+    Returns:
+        numpy.ndarray: (parcels, technologies) float64, NaN for unpriced
+    """
+    bedrooms = np.asarray(bedrooms, dtype=float)
+    extra = np.maximum(np.nan_to_num(bedrooms, nan=BASE_BEDROOMS) - BASE_BEDROOMS, 0)[:, None]
+    difficulty = np.zeros(len(bedrooms)) if difficulty is None else np.asarray(difficulty, dtype=float)
+    factor = (database.difficulty_min[None, :]
+              + difficulty[:, None] * (database.difficulty_max - database.difficulty_min)[None, :])
+    return database.base_cost[None, :] * database.size_multiplier[None, :] ** extra * factor
+
+def annual_costs(database, capital):
+    """Annualized cost: capital over the lifespan plus annual maintenance"""
+    lifespan = np.where(database.lifespan_years > 0, database.lifespan_years, np.nan)
+    return capital / lifespan[None, :] + database.annual_maintenance[None, :]
+
+def _relative_low(values, mask):
+    """1 for the lowest value among masked entries in each row, 0 for the highest"""
+    valid = mask & ~np.isnan(values)
+    low = np.min(np.where(valid, values, np.inf), axis=1, keepdims=True)
+    high = np.max(np.where(valid, values, -np.inf), axis=1, keepdims=True)
+    spread = high - low
+    relative = np.divide(high - values, spread, out=np.ones_like(values), where=spread > 0)
+    return np.where(valid, relative, 0.0)
+
+def composite_scores(database, capital, suitable, regulatory, weights=None):
+    """
+    Weighted score for every parcel x technology (higher is better)
+
+    Cost (annualized) and maintenance are scored relative to the other
+    suitable technologies on the same parcel, reliability by lifespan, and
+    regulatory certainty by DOH approval status. Unpriced technologies
+    score 0 on the cost components; unsuitable ones are -inf.
+
+    Returns:
+        tuple: (scores, annualized costs), both (parcels, technologies)
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    annual = annual_costs(database, capital)
+    maintenance = np.broadcast_to(database.annual_maintenance, capital.shape)
+    lifespan = np.nan_to_num(database.lifespan_years, nan=0.0)
+    reliability = lifespan / lifespan.max() if lifespan.max() > 0 else lifespan
+
+    score = (weights['cost'] * _relative_low(annual, suitable)
+             + weights['maintenance'] * _relative_low(np.where(database.priced, maintenance, np.nan), suitable)
+             + weights['regulatory'] * regulatory[None, :]
+             + weights['reliability'] * reliability[None, :])
+    return np.where(suitable, score, -np.inf), annual
+
+# ============================================================================
+# RANKING
+# ============================================================================
+
+class TechnologyRanking:
+    """Top-N technologies per parcel with their costs and scores"""
+
+    def __init__(self, technologies, index, capital, annual, score):
+        self.technologies = np.asarray(technologies, dtype=object)
+        self.index = index          # (parcels, N) technology index, NO_TECHNOLOGY when empty
+        self.capital = capital      # (parcels, N) installed cost, NaN when empty or unpriced
+        self.annual = annual        # (parcels, N) annualized cost
+        self.score = score          # (parcels, N) composite score
+
+    @property
+    def top_n(self):
+        return self.index.shape[1]
+
+    def names(self, rank=1):
+        """Technology name at a rank (1 = best) for every parcel ('' when none)"""
+        names = np.append(self.technologies, '').astype(object)
+        return names[self.index[:, rank - 1]]
+
+    def columns(self, prefix='TECH'):
+        """Output fields TECH_1, TECH_1_COST, TECH_1_ANNUAL, TECH_1_SCORE, ... for ExtendTable"""
+        columns = {}
+        for rank in range(1, self.top_n + 1):
+            field = f"{prefix}_{rank}"
+            columns[field] = self.names(rank).astype('U100')
+            columns[f"{field}_COST"] = np.round(self.capital[:, rank - 1])
+            columns[f"{field}_ANNUAL"] = np.round(self.annual[:, rank - 1])
+            columns[f"{field}_SCORE"] = np.round(np.where(np.isinf(self.score[:, rank - 1]), np.nan,
+                                                          self.score[:, rank - 1]), 4)
+        return columns
+
+    def __repr__(self):
+        return f"TechnologyRanking({len(self.index):,} parcels, top {self.top_n})"
+
+def _top_n(scores, n):
+    """
+    Column positions of the n highest scores per row, best first
+
+    np.partition finds each row's n-th score; ties at that cut-off go to
+    the lower column, so the choice does not depend on partition order.
+    """
+    n = min(n, scores.shape[1])
+    if n == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    cutoff = -np.partition(-scores, n - 1, axis=1)[:, n - 1:n]
+    above = scores > cutoff
+    tied = scores == cutoff
+    keep = above | (tied & (np.cumsum(tied, axis=1) <= n - above.sum(axis=1, keepdims=True)))
+    candidates = np.nonzero(keep)[1].reshape(scores.shape[0], n)   # ascending columns per row
+    chosen = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-chosen, axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1)
+
+def rank_technologies(matrix, suitable_bits, database, bedrooms, difficulty=None,
+                      top_n=DEFAULT_TOP_N, weights=None, chunk_size=CHUNK_SIZE):
+    """
+    Rank the sieve-suitable technologies of every parcel
+
+    Args:
+        matrix (CompiledMatrix): Compiled technology matrix
+        suitable_bits (numpy.ndarray): Sieve output (parcels, words)
+        database (TechnologyDatabase): Technology costs (any order; aligned
+            to matrix.technologies here)
+        bedrooms (array-like): Bedrooms per parcel
+        difficulty (array-like): Site difficulty 0-1 per parcel (see site_difficulty)
+        top_n (int): Technologies kept per parcel
+        weights (dict): Composite score weights (default: DEFAULT_WEIGHTS)
+        chunk_size (int): Parcels per vectorized block (bounds peak memory)
+
+    Returns:
+        TechnologyRanking
+    """
+    database = database.aligned(matrix.technologies)
+    regulatory = regulatory_scores(matrix)
+    bedrooms = np.asarray(bedrooms, dtype=float)
+    n_parcels = len(bedrooms)
+    difficulty = np.zeros(n_parcels) if difficulty is None else np.asarray(difficulty, dtype=float)
+    top_n = min(top_n, matrix.n_technologies)
+
+    index = np.full((n_parcels, top_n), NO_TECHNOLOGY, dtype=np.int16)
+    capital = np.full((n_parcels, top_n), np.nan)
+    annual = np.full((n_parcels, top_n), np.nan)
+    score = np.full((n_parcels, top_n), -np.inf)
+
+    for start in range(0, n_parcels, chunk_size):
+        rows = slice(start, start + chunk_size)
+        suitable = suitability_matrix(matrix, suitable_bits[rows])
+        block_capital = capital_costs(database, bedrooms[rows], difficulty[rows])
+        block_score, block_annual = composite_scores(database, block_capital, suitable, regulatory, weights)
+
+        best = _top_n(block_score, top_n)
+        best_score = np.take_along_axis(block_score, best, axis=1)
+        found = np.isfinite(best_score)
+        index[rows] = np.where(found, best, NO_TECHNOLOGY)
+        capital[rows] = np.where(found, np.take_along_axis(block_capital, best, axis=1), np.nan)
+        annual[rows] = np.where(found, np.take_along_axis(block_annual, best, axis=1), np.nan)
+        score[rows] = best_score
+    return TechnologyRanking(matrix.technologies, index, capital, annual, score)
+
+# ============================================================================
+# ROLL-UPS
+# ============================================================================
+
+def cost_rollup(ranking, groups, rank=1, group_field='ISLAND'):
+    """
+    Cost totals per group (island) for the technology at a rank
+
+    Args:
+        ranking (TechnologyRanking): rank_technologies result
+        groups (array-like): Group label per parcel
+        rank (int): Which recommendation to roll up (1 = best)
+
+    Returns:
+        pandas.DataFrame: PARCELS, WITH_OPTION, PRICED, CAPITAL_TOTAL,
+        CAPITAL_MEAN and ANNUAL_TOTAL per group
+    """
+    codes, labels = pd.factorize(pd.Series(groups), sort=True)
+    valid = codes >= 0
+    codes, n_groups = codes[valid], len(labels)
+    capital = ranking.capital[valid, rank - 1]
+    annual = ranking.annual[valid, rank - 1]
+    has_option = ranking.index[valid, rank - 1] != NO_TECHNOLOGY
+    priced = ~np.isnan(capital)
+
+    parcels = np.bincount(codes, minlength=n_groups)
+    priced_count = np.bincount(codes, weights=priced, minlength=n_groups)
+    capital_total = np.bincount(codes, weights=np.nan_to_num(capital), minlength=n_groups)
+    table = pd.DataFrame({
+        'PARCELS': parcels,
+        'WITH_OPTION': np.bincount(codes, weights=has_option, minlength=n_groups).astype(np.int64),
+        'PRICED': priced_count.astype(np.int64),
+        'CAPITAL_TOTAL': capital_total,
+        'CAPITAL_MEAN': np.divide(capital_total, priced_count, out=np.full(n_groups, np.nan),
+                                  where=priced_count > 0),
+        'ANNUAL_TOTAL': np.bincount(codes, weights=np.nan_to_num(annual), minlength=n_groups),
+    }, index=pd.Index(labels, name=group_field))
+    return table
+
+def technology_counts(ranking, groups, rank=1, group_field='ISLAND'):
+    """Parcels per (group, technology at rank) as a group x technology table"""
+    codes, labels = pd.factorize(pd.Series(groups), sort=True)
+    tech = ranking.index[:, rank - 1].astype(np.int64)
+    valid = (codes >= 0) & (tech != NO_TECHNOLOGY)
+    n_tech = len(ranking.technologies)
+    counts = np.bincount(codes[valid] * n_tech + tech[valid], minlength=len(labels) * n_tech)
+    table = pd.DataFrame(counts.reshape(len(labels), n_tech), columns=ranking.technologies,
+                         index=pd.Index(labels, name=group_field))
+    return table.loc[:, table.sum(axis=0) > 0]
@@ -0,0 +1,250 @@
+"""
+TMK Codec
+University of Hawaii Water Resources Research Center
+
+One place that turns any Tax Map Key representation into the project's
+canonical key and back. A Hawaii TMK is
+
+    island  zone  section  plat  parcel  [CPR]
+       1     1       1       3     3      4     digits
+       2     1       1      006   001   0000  -> 2-1-1-006-001 (CPR 0000)
+
+The canonical key is the 9-digit parcel-level TMK as a packed decimal int64
+(island * 10^8 + zone * 10^7 + section * 10^6 + plat * 10^3 + parcel), so
+sorting by key sorts by island, zone, section, plat and parcel, and every
+component is recovered with integer division. 13-digit keys carry the CPR
+unit in four more digits. parse_tmk accepts 9/13-digit integers, floats
+read from dBASE, and text with or without separators; everything
+downstream (joins, group-bys, partitions) works on the int64 keys, never on
+strings.
+"""
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+INVALID_TMK = -1
+
+# First TMK digit is the county code (1=Hawaii, 2=Maui, 3=Honolulu, 4=Kauai)
+TMK_COUNTY_CODES = {
+    '1': 'Hawaii',
+    '2': 'Maui',
+    '3': 'Honolulu',
+    '4': 'Kauai',
+}
+
+# Island name by county code (index 0 = invalid / unknown)
+ISLAND_NAMES = np.array(['Unknown'] + [TMK_COUNTY_CODES[code] for code in sorted(TMK_COUNTY_CODES)],
+                        dtype=object)
+
+# Component -> (divisor in the 9-digit key, modulus, valid minimum, valid maximum)
+TMK_COMPONENTS = {
+    'ISLAND': (10**8, 10, 1, 4),
+    'ZONE': (10**7, 10, 1, 9),
+    'SECTION': (10**6, 10, 1, 9),
+    'PLAT': (10**3, 1000, 1, 999),
+    'PARCEL': (1, 1000, 1, 999),
+}
+
+CPR_FACTOR = 10**4          # 13-digit key = 9-digit key * CPR_FACTOR + CPR
+PARCEL_KEY_MIN = 10**8      # Smallest 9-digit key
+PARCEL_KEY_MAX = 10**9 - 1
+
+# ============================================================================
+# PARSING AND ENCODING
+# ============================================================================
+
+def _digits_to_int64(values):
+    """int64 from any TMK representation; INVALID_TMK where unparsable"""
+    series = pd.Series(values)
+    if pd.api.types.is_integer_dtype(series.dtype):
+        # Nullable Int64 columns hold NA, which has no int64 value
+        return series.to_numpy(dtype=np.int64, na_value=INVALID_TMK)
+    if pd.api.types.is_float_dtype(series.dtype):
+        numeric = series.to_numpy(dtype=float, na_value=np.nan)
+        return np.where(np.isfinite(numeric), numeric, INVALID_TMK).astype(np.int64)
+
+    # Text TMKs: keep digits only (only the distinct strings are parsed)
+    inverse, unique_text = pd.factorize(series.astype(str))
+    digits = pd.Series(unique_text).str.replace(r'\.0+$', '', regex=True).str.replace(r'\D', '', regex=True)
+    parsed = pd.to_numeric(digits.where(digits.str.len().between(1, 18)), errors='coerce')
+    unique_keys = parsed.fillna(INVALID_TMK).to_numpy(dtype=np.int64)
+    unique_keys = np.append(unique_keys, INVALID_TMK)  # factorize codes nulls as -1
+    return unique_keys[inverse]
+
+def parse_tmk(values, keep_cpr=False):
+    """
+    Parse TMKs in any of the project's formats to canonical int64 keys
+
+    Handles 9-digit integers (186006001), floats read from dBASE
+    (186006001.0), text with dashes or spaces ('1-8-6-006-001'), and
+    13-digit TMKs with a CPR suffix (1860060010000).
+
+    Args:
+        values (array-like): TMK values
+        keep_cpr (bool): Return 13-digit keys (9-digit TMKs get CPR 0000)
+            instead of parcel-level 9-digit keys
+
+    Returns:
+        numpy.ndarray: int64 keys, INVALID_TMK where the value cannot be parsed
+    """
+    keys = _digits_to_int64(values)
+    has_cpr = keys >= PARCEL_KEY_MIN * CPR_FACTOR
+    parcel = np.where(has_cpr, keys // CPR_FACTOR, keys)
+    valid = (parcel >= PARCEL_KEY_MIN) & (parcel <= PARCEL_KEY_MAX) & (keys < 10**13)
+    if keep_cpr:
+        keys = np.where(has_cpr, keys, keys * CPR_FACTOR)
+        return np.where(valid, keys, INVALID_TMK)
+    return np.where(valid, parcel, INVALID_TMK)
+
+def encode_tmk(island, zone, section, plat, parcel, cpr=None):
+    """
+    Pack TMK components into canonical int64 keys
+
+    Args:
+        island, zone, section, plat, parcel (array-like): Components
+        cpr (array-like): CPR unit numbers (optional; returns 13-digit keys)
+
+    Returns:
+        numpy.ndarray: int64 keys
+    """
+    parts = {'ISLAND': island, 'ZONE': zone, 'SECTION': section, 'PLAT': plat, 'PARCEL': parcel}
+    keys = np.zeros(np.broadcast(*parts.values()).shape, dtype=np.int64)
+    for name, values in parts.items():
+        keys += np.asarray(values, dtype=np.int64) * TMK_COMPONENTS[name][0]
+    if cpr is not None:
+        keys = keys * CPR_FACTOR + np.asarray(cpr, dtype=np.int64)
+    return keys
+
+def parcel_keys(keys):
+    """9-digit parcel keys from 9- or 13-digit keys (INVALID_TMK kept)"""
+    keys = np.asarray(keys, dtype=np.int64)
+    return np.where(keys >= PARCEL_KEY_MIN * CPR_FACTOR, keys // CPR_FACTOR, keys)
+
+# ============================================================================
+# DECODING AND VALIDATION
+# ============================================================================
+
+def decode_tmk(keys):
+    """
+    Split canonical keys into their components
+
+    Args:
+        keys (array-like): 9- or 13-digit int64 keys
+
+    Returns:
+        dict: ISLAND, ZONE, SECTION (int8), PLAT, PARCEL, CPR (int16)
+        arrays; every component is 0 for INVALID_TMK
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    has_cpr = keys >= PARCEL_KEY_MIN * CPR_FACTOR
+    parcel = np.where(has_cpr, keys // CPR_FACTOR, keys)
+    parcel = np.where(parcel > 0, parcel, 0)
+    result = {}
+    for name, (divisor, modulus, _, _) in TMK_COMPONENTS.items():
+        dtype = np.int8 if modulus == 10 else np.int16
+        result[name] = (parcel // divisor % modulus).astype(dtype)
+    result['CPR'] = np.where(has_cpr, keys % CPR_FACTOR, 0).astype(np.int16)
+    return result
+
+def validate_tmk(keys):
+    """
+    True where a key is a well-formed Hawaii TMK
+
+    Island 1-4, zone and section 1-9, plat and parcel 1-999.
+
+    Args:
+        keys (array-like): 9- or 13-digit int64 keys
+
+    Returns:
+        numpy.ndarray: bool mask
+    """
+    parts = decode_tmk(keys)
+    valid = np.asarray(keys) != INVALID_TMK
+    for name, (_, _, minimum, maximum) in TMK_COMPONENTS.items():
+        valid &= (parts[name] >= minimum) & (parts[name] <= maximum)
+    return valid
+
+def island_codes(keys):
+    """County code (1-4) per key; 0 where the key is invalid"""
+    keys = parcel_keys(keys)
+    codes = np.where(keys >= PARCEL_KEY_MIN, keys // 10**8, 0)
+    return np.where(codes <= 4, codes, 0).astype(np.int8)
+
+def island_names(keys):
+    """Island name per key ('Unknown' where the key is invalid)"""
+    return ISLAND_NAMES[island_codes(keys)]
+
+def format_tmk(keys, separator='-'):
+    """
+    Display TMKs as 'I-Z-S-PPP-PPP' (with '-CCCC' for 13-digit keys)
+
+    Returns:
+        numpy.ndarray: Strings ('' for INVALID_TMK)
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    parts = decode_tmk(keys)
+    frame = pd.DataFrame({name: values for name, values in parts.items()})
+    text = (frame['ISLAND'].astype(str) + separator + frame['ZONE'].astype(str) + separator
+            + frame['SECTION'].astype(str) + separator + frame['PLAT'].astype(str).str.zfill(3)
+            + separator + frame['PARCEL'].astype(str).str.zfill(3))
+    has_cpr = keys >= PARCEL_KEY_MIN * CPR_FACTOR
+    text = text.where(~has_cpr, text + separator + frame['CPR'].astype(str).str.zfill(4))
+    return text.where(keys != INVALID_TMK, '').to_numpy(dtype=object)
+
+# ============================================================================
+# DIAGNOSTICS
+# ============================================================================
+
+def tmk_issues(values):
+    """
+    Count TMK quality problems in a raw column
+
+    Replaces ad hoc integer-vs-text checks: every value goes through the
+    same parser, so the counts say how many rows will join.
+
+    Args:
+        values (array-like): Raw TMK values
+
+    Returns:
+        dict: 'records', 'valid', 'unparsed', 'with_cpr', 'duplicates' and
+        one 'bad_<component>' count per component
+    """
+    keys = parse_tmk(values, keep_cpr=True)
+    parsed = keys != INVALID_TMK
+    parts = decode_tmk(keys)
+    issues = {
+        'records': int(len(keys)),
+        'valid': int(validate_tmk(keys).sum()),
+        'unparsed': int((~parsed).sum()),
+        'with_cpr': int((parsed & (parts['CPR'] > 0)).sum()),
+        'duplicates': int(pd.Series(parcel_keys(keys[parsed])).duplicated().sum()),
+    }
+    for name, (_, _, minimum, maximum) in TMK_COMPONENTS.items():
+        out_of_range = (parts[name] < minimum) | (parts[name] > maximum)
+        issues[f'bad_{name.lower()}'] = int((parsed & out_of_range).sum())
+    return issues
+
+def best_tmk_field(columns, candidates=None):
+    """
+    Pick the column that holds the most valid TMKs
+
+    Args:
+        columns (dict): Field name -> raw values (e.g. a sample of rows)
+        candidates (list): Fields to consider, in tie-break order
+            (default: every column)
+
+    Returns:
+        tuple: (field name, share of valid TMKs), or (None, 0.0)
+    """
+    best, best_share = None, 0.0
+    for field in candidates or list(columns):
+        if field not in columns or not len(columns[field]):
+            continue
+        share = float(validate_tmk(parse_tmk(columns[field])).mean())
+        if share > best_share:
+            best, best_share = field, share
+    return best, best_share
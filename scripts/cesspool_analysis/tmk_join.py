@@ -0,0 +1,299 @@
+"""
+In-Memory TMK Join Engine
+University of Hawaii Water Resources Research Center
+
+Replaces arcpy.management.JoinField round-trips (slow on large tables and
+failing with "table is not editable" in the GpMessages logs) with a
+sort-merge join on normalized TMK arrays:
+
+    1. Parse both key columns (TMK, TMK9, TMK_txt, int or text) to canonical
+       int64 keys with the TMK codec
+    2. Sort the join-table keys once
+    3. Locate every target key with one searchsorted call
+    4. Gather the value columns with fancy indexing
+
+The result is a structured array ready for arcpy.da.ExtendTable plus
+match/miss statistics. Several sources (municipal wells, domestic wells,
+bedrooms, soils) can be joined to the same base keys in one pass.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .tmk_codec import INVALID_TMK, best_tmk_field, parse_tmk
+
+# ============================================================================
+# TMK NORMALIZATION
+# ============================================================================
+
+# Field names seen for the TMK key across project datasets, in priority order
+TMK_FIELD_CANDIDATES = ['TMK', 'TMK9', 'TMK_txt', 'tmk', 'tmk9', 'TMK13']
+
+# TableToNumPyArray null_value by arcpy field type (integer nulls become -1)
+ARCPY_NULL_VALUES = {
+    'String': '',
+    'Double': np.nan,
+    'Single': np.nan,
+    'Integer': INVALID_TMK,
+    'SmallInteger': INVALID_TMK,
+    'Date': np.datetime64('NaT'),
+}
+
+def null_value_map(fields):
+    """
+    Build a TableToNumPyArray null_value dict
+
+    Args:
+        fields (list): (name, arcpy field type) pairs, e.g. from ListFields
+
+    Returns:
+        dict: Field name -> fill value for null cells
+    """
+    return {name: ARCPY_NULL_VALUES[field_type] for name, field_type in fields
+            if field_type in ARCPY_NULL_VALUES}
+
+def find_tmk_field(field_names, candidates=None):
+    """Return the first TMK candidate present in field_names, or None"""
+    for candidate in candidates or TMK_FIELD_CANDIDATES:
+        if candidate in field_names:
+            return candidate
+    return None
+
+def pick_tmk_field(table, candidates=None, sample_size=10000):
+    """
+    TMK candidate field holding the most valid TMKs
+
+    Unlike find_tmk_field, a text TMK_txt column beats an all-null or
+    zero-filled TMK column.
+
+    Args:
+        table: Structured array, DataFrame or dict of columns
+        candidates (list): Field names to consider (default: TMK_FIELD_CANDIDATES)
+        sample_size (int): Rows checked per field
+
+    Returns:
+        str: Field name, or None when no candidate holds a valid TMK
+    """
+    names = _field_names(table)
+    present = [field for field in candidates or TMK_FIELD_CANDIDATES if field in names]
+    columns = {field: _column_values(table, field)[:sample_size] for field in present}
+    return best_tmk_field(columns, present)[0]
+
+def normalize_tmk(values):
+    """
+    Normalize TMK values to parcel-level 9-digit int64 keys
+
+    See tmk_codec.parse_tmk for the accepted formats.
+
+    Returns:
+        numpy.ndarray: int64 keys, INVALID_TMK where the value cannot be parsed
+    """
+    return parse_tmk(values)
+
+# ============================================================================
+# JOIN STATISTICS
+# ============================================================================
+
+class JoinStats:
+    """Match/miss statistics for one join"""
+
+    def __init__(self, name, target_rows, source_rows, matched, invalid_target,
+                 invalid_source, duplicate_source, unused_source):
+        self.name = name
+        self.target_rows = target_rows
+        self.source_rows = source_rows
+        self.matched = matched
+        self.unmatched = target_rows - matched
+        self.invalid_target = invalid_target
+        self.invalid_source = invalid_source
+        self.duplicate_source = duplicate_source
+        self.unused_source = unused_source
+
+    @property
+    def match_rate(self):
+        return (self.matched / self.target_rows) * 100 if self.target_rows else 0
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'target_rows': self.target_rows,
+            'source_rows': self.source_rows,
+            'matched': self.matched,
+            'unmatched': self.unmatched,
+            'match_rate': round(self.match_rate, 2),
+            'invalid_target_tmk': self.invalid_target,
+            'invalid_source_tmk': self.invalid_source,
+            'duplicate_source_tmk': self.duplicate_source,
+            'unused_source_rows': self.unused_source
+        }
+
+    def report(self):
+        """Print a short match report"""
+        print(f"  {self.name}: {self.matched:,}/{self.target_rows:,} matched ({self.match_rate:.1f}%)")
+        if self.unmatched:
+            print(f"    Unmatched target rows: {self.unmatched:,} ({self.invalid_target:,} with invalid TMK)")
+        if self.duplicate_source:
+            print(f"    Duplicate source TMKs (first record used): {self.duplicate_source:,}")
+        if self.unused_source:
+            print(f"    Source rows with no target parcel: {self.unused_source:,}")
+
+# ============================================================================
+# JOIN ENGINE
+# ============================================================================
+
+def match_keys(target_keys, source_keys, name="join"):
+    """
+    Sort-merge match of target keys against source keys
+
+    Like JoinField, the first source record wins when a TMK repeats.
+
+    Args:
+        target_keys (array-like): Normalized int64 keys of the table being extended
+        source_keys (array-like): Normalized int64 keys of the join table
+        name (str): Label for the statistics
+
+    Returns:
+        tuple: (int64 source row index per target row, -1 where unmatched; JoinStats)
+    """
+    target_keys = np.asarray(target_keys, dtype=np.int64)
+    source_keys = np.asarray(source_keys, dtype=np.int64)
+
+    # Stable sort keeps the first occurrence of each duplicate key first
+    order = np.argsort(source_keys, kind='stable')
+    sorted_keys = source_keys[order]
+    first = np.ones(len(sorted_keys), dtype=bool)
+    first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    unique_keys = sorted_keys[first]
+    unique_rows = order[first]
+
+    used = np.zeros(len(unique_keys), dtype=bool)
+    if len(unique_keys):
+        position = np.minimum(np.searchsorted(unique_keys, target_keys), len(unique_keys) - 1)
+        found = (unique_keys[position] == target_keys) & (target_keys != INVALID_TMK)
+        row_index = np.where(found, unique_rows[position], -1)
+        used[position[found]] = True
+    else:
+        found = np.zeros(len(target_keys), dtype=bool)
+        row_index = np.full(len(target_keys), -1, dtype=np.int64)
+
+    stats = JoinStats(
+        name,
+        target_rows=len(target_keys),
+        source_rows=len(source_keys),
+        matched=int(found.sum()),
+        invalid_target=int((target_keys == INVALID_TMK).sum()),
+        invalid_source=int((source_keys == INVALID_TMK).sum()),
+        duplicate_source=int((~first & (sorted_keys != INVALID_TMK)).sum()),
+        unused_source=int(((unique_keys != INVALID_TMK) & ~used).sum())
+    )
+    return row_index, stats
+
+def take_with_nulls(values, row_index, fill_value=None):
+    """Gather values[row_index], filling unmatched (-1) rows with nulls"""
+    values = np.asarray(values)
+    matched = row_index >= 0
+    if not len(values):
+        return np.full(len(row_index), np.nan if fill_value is None else fill_value)
+
+    out = values[np.where(matched, row_index, 0)]
+    if matched.all():
+        return out
+
+    if fill_value is None:
+        if values.dtype.kind in 'iuf':
+            out = out.astype(float)   # Integer columns need NaN for misses
+            fill_value = np.nan
+        elif values.dtype.kind == 'U':
+            fill_value = ''
+    out[~matched] = fill_value
+    return out
+
+def _column_values(table, field):
+    if isinstance(table, np.ndarray) and table.dtype.names:
+        return table[field]
+    if isinstance(table, pd.DataFrame):
+        return table[field].to_numpy()
+    return np.asarray(table[field])
+
+def _field_names(table):
+    if isinstance(table, np.ndarray) and table.dtype.names:
+        return list(table.dtype.names)
+    return list(table.keys()) if isinstance(table, dict) else list(table.columns)
+
+def multi_join(target_keys, sources, existing_fields=None):
+    """
+    Join several sources onto one set of target keys in a single pass
+
+    Args:
+        target_keys (array-like): Raw TMK values of the table being extended
+        sources (list): Tuples of (name, table, key_field, fields) where table is
+            a structured array, DataFrame or dict of columns and fields is the
+            list of value fields to bring over (None = all but the key)
+        existing_fields (list): Field names already on the target; clashing
+            names get a _1, _2 ... suffix like JoinField
+
+    Returns:
+        tuple: (dict of output field -> array, list of JoinStats)
+    """
+    base_keys = normalize_tmk(target_keys)
+    taken_names = set(existing_fields or [])
+    columns = {}
+    all_stats = []
+
+    for name, table, key_field, fields in sources:
+        source_keys = normalize_tmk(_column_values(table, key_field))
+        row_index, stats = match_keys(base_keys, source_keys, name)
+        all_stats.append(stats)
+
+        if fields is None:
+            fields = [f for f in _field_names(table) if f != key_field]
+        for field in fields:
+            out_name = field
+            suffix = 1
+            while out_name in taken_names:
+                out_name = f"{field}_{suffix}"
+                suffix += 1
+            taken_names.add(out_name)
+            columns[out_name] = take_with_nulls(_column_values(table, field), row_index)
+
+    return columns, all_stats
+
+def join_frame(target, target_key, source, source_key, fields=None, name="join"):
+    """
+    Left-join source columns onto a DataFrame by normalized TMK
+
+    Returns:
+        tuple: (joined DataFrame copy, JoinStats)
+    """
+    columns, stats = multi_join(target[target_key].to_numpy(),
+                                [(name, source, source_key, fields)],
+                                existing_fields=list(target.columns))
+    joined = target.copy()
+    for field, values in columns.items():
+        joined[field] = values
+    return joined, stats[0]
+
+def to_extend_array(oids, columns, oid_field="JOIN_OID"):
+    """
+    Pack joined columns with target ObjectIDs for arcpy.da.ExtendTable
+
+    Text columns are sized to their longest value (at least 1 character).
+    """
+    dtype = [(oid_field, '<i4')]
+    for field, values in columns.items():
+        values = np.asarray(values)
+        if values.dtype.kind in 'OU':
+            lengths = pd.Series(values, dtype=object).fillna('').astype(str).str.len()
+            width = max(1, int(lengths.max())) if len(lengths) else 1
+            dtype.append((field, f'<U{width}'))
+        else:
+            dtype.append((field, values.dtype.str))
+
+    packed = np.empty(len(oids), dtype=dtype)
+    if len(oids) == 0:
+        return packed
+    packed[oid_field] = oids
+    for field, values in columns.items():
+        values = np.asarray(values)
+        packed[field] = np.where(pd.isnull(values), '', values).astype(str) if values.dtype.kind == 'O' else values
+    return packed
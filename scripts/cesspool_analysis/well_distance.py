@@ -0,0 +1,166 @@
+"""
+Nearest-Well Distance Engine
+University of Hawaii Water Resources Research Center
+
+Computes parcel-to-well distances directly from the well inventory instead
+of relying on the precomputed CPs_Distance_to_*_Wells shapefiles. A KD-tree
+is built over each well layer (municipal, domestic) and every parcel is
+queried in bulk for its nearest-k wells. The same pass fills the setback
+flags used by the Matrix:
+
+    WELL_PUB_150FT   public (municipal) well within 150 ft   (HAR 11-62)
+    WELL_PVT_100FT   private (domestic) well within 100 ft   (HAR 11-62)
+    WELLS_1000FT     any well within 1000 ft                 (Matrix screening)
+
+Uses scipy's cKDTree when scipy is installed and falls back to a chunked
+brute-force search otherwise (the well layers are small, so both are fast).
+"""
+
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # pragma: no cover - brute-force fallback below
+    cKDTree = None
+
+from .har_standards import SETBACK_DISTANCES
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+FEET_PER_METER = 1 / 0.3048
+WELL_SCREENING_RADIUS_FT = 1000    # Matrix "Well 1000 ft" criterion
+QUERY_CHUNK_SIZE = 65536           # Parcels per query block
+BRUTE_FORCE_BLOCK = 4_000_000      # (parcel, well) pairs per fallback block
+
+# Output field names, matching the names 01b's cleanup_field_names produces
+WELL_LAYERS = {
+    'municipal': 'Dist_Municipal_Wells_ft',
+    'domestic': 'Dist_Domestic_Wells_ft',
+}
+
+# (flag field, well layers, radius in feet)
+WELL_SETBACK_FLAGS = [
+    ('WELL_PUB_150FT', ('municipal',), SETBACK_DISTANCES['PUBLIC_WELLS']),
+    ('WELL_PVT_100FT', ('domestic',), SETBACK_DISTANCES['PRIVATE_WELLS']),
+    ('WELLS_1000FT', ('municipal', 'domestic'), WELL_SCREENING_RADIUS_FT),
+]
+
+# ============================================================================
+# WELL INDEX
+# ============================================================================
+
+class WellIndex:
+    """KD-tree (or brute-force fallback) over one well layer"""
+
+    def __init__(self, x, y, well_ids=None):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        valid = np.isfinite(x) & np.isfinite(y)
+        self.points = np.column_stack([x[valid], y[valid]])
+        self.well_ids = (np.flatnonzero(valid) if well_ids is None
+                         else np.asarray(well_ids)[valid])
+        self.tree = cKDTree(self.points) if cKDTree is not None and len(self.points) else None
+
+    def __len__(self):
+        return len(self.points)
+
+    def nearest(self, x, y, k=1, chunk_size=QUERY_CHUNK_SIZE):
+        """
+        Nearest-k wells for every query point
+
+        Args:
+            x, y (array-like): Query coordinates (same units as the wells)
+            k (int): Number of neighbours
+
+        Returns:
+            tuple: (distances (n, k), well positions (n, k)); inf / -1 when the
+            layer has fewer than k wells
+        """
+        queries = np.column_stack([np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)])
+        n = len(queries)
+        distances = np.full((n, k), np.inf)
+        positions = np.full((n, k), -1, dtype=np.int64)
+        if not len(self.points) or n == 0:
+            return distances, positions
+
+        valid = np.isfinite(queries).all(axis=1)
+        k_found = min(k, len(self.points))
+        for start in range(0, n, chunk_size):
+            block = slice(start, start + chunk_size)
+            rows = np.flatnonzero(valid[block]) + start
+            if not len(rows):
+                continue
+            if self.tree is not None:
+                dist, pos = self.tree.query(queries[rows], k=k_found)
+                dist, pos = dist.reshape(len(rows), k_found), pos.reshape(len(rows), k_found)
+            else:
+                dist, pos = self._brute_force(queries[rows], k_found)
+            distances[rows, :k_found] = dist
+            positions[rows, :k_found] = pos
+        return distances, positions
+
+    def _brute_force(self, queries, k):
+        """Exact nearest-k by blocked distance matrices (no scipy)"""
+        block_rows = max(1, BRUTE_FORCE_BLOCK // len(self.points))
+        distances = np.empty((len(queries), k))
+        positions = np.empty((len(queries), k), dtype=np.int64)
+        for start in range(0, len(queries), block_rows):
+            q = queries[start:start + block_rows]
+            d2 = ((q[:, None, :] - self.points[None, :, :]) ** 2).sum(axis=2)
+            if k < len(self.points):
+                nearest = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            else:
+                nearest = np.broadcast_to(np.arange(len(self.points)), d2.shape)
+            nearest_d2 = np.take_along_axis(d2, nearest, axis=1)
+            order = np.argsort(nearest_d2, axis=1, kind='stable')
+            positions[start:start + len(q)] = np.take_along_axis(nearest, order, axis=1)
+            distances[start:start + len(q)] = np.sqrt(np.take_along_axis(nearest_d2, order, axis=1))
+        return distances, positions
+
+# ============================================================================
+# PARCEL DISTANCES AND SETBACK FLAGS
+# ============================================================================
+
+def compute_well_distances(parcel_x, parcel_y, wells, k=1, feet_per_unit=1.0):
+    """
+    Nearest-well distances and setback flags for every parcel in one pass
+
+    Args:
+        parcel_x, parcel_y (array-like): Parcel (or cesspool point) coordinates
+        wells (dict): Layer name ('municipal', 'domestic') -> WellIndex
+        k (int): Nearest wells to report per layer
+        feet_per_unit (float): Feet per coordinate unit (3.28084 for UTM meters)
+
+    Returns:
+        dict: Output field -> array. Distance fields are in feet (NaN when
+        the layer is empty); with k > 1 the 2nd..kth distances are added as
+        Dist_*_k2_ft ...; flag fields are 'Y'/'N' like the MPAT WELLS_1000FT field
+    """
+    columns = {}
+    nearest_ft = {}
+    for layer, index in wells.items():
+        distances, _ = index.nearest(parcel_x, parcel_y, k=k)
+        distances = distances * feet_per_unit
+        distances[np.isinf(distances)] = np.nan
+        nearest_ft[layer] = distances[:, 0]
+
+        field = WELL_LAYERS.get(layer, f"Dist_{layer}_ft")
+        columns[field] = distances[:, 0]
+        for rank in range(2, k + 1):
+            columns[field.replace('_ft', f'_k{rank}_ft')] = distances[:, rank - 1]
+
+    n = len(np.asarray(parcel_x))
+    for flag_field, layers, radius_ft in WELL_SETBACK_FLAGS:
+        within = np.zeros(n, dtype=bool)
+        for layer in layers:
+            if layer in nearest_ft:
+                within |= nearest_ft[layer] <= radius_ft   # NaN compares False
+        columns[flag_field] = np.where(within, 'Y', 'N')
+    return columns
+
+def setback_summary(columns):
+    """Count of 'Y' per setback flag"""
+    return {flag_field: int((columns[flag_field] == 'Y').sum())
+            for flag_field, _, _ in WELL_SETBACK_FLAGS if flag_field in columns}
@@ -0,0 +1,337 @@
+"""
+Rasterized-Label Zonal Statistics Engine
+University of Hawaii Water Resources Research Center
+
+Summarizes any raster over the parcel polygons with one streaming pass:
+
+    1. The parcel layer (tmk_state) is rasterized once onto the raster grid
+       as a label grid (0 = no parcel, k + 1 = parcel k) and cached as a
+       memory-mapped .npy next to an .npz of per-parcel metadata
+    2. Each raster aligned with that grid is streamed tile by tile beside
+       the label tiles; pixels are reduced per parcel with bincount
+       (count, sum, mean, min, max) and one grouped sort (percentiles)
+    3. Parcels wholly inside a tile are finished in that tile; parcels
+       crossing tile borders carry their pixel values to the end
+
+Adding another raster attribute to the MPAT (groundwater depth, elevation,
+slope through a tile function) costs one pass over that raster and no new
+rasterization. Each pixel belongs to one parcel (the last drawn where
+parcels overlap); parcels too small to hold a cell center use the cell
+under their bounding-box center.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .raster_io import DEFAULT_TILE_SIZE, RasterGrid, iter_tiles
+from .rasterize import group_statistics, polygon_bounds, polygon_spans, span_pixels, subset_polygons
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+CACHE_VERSION = 1
+DEFAULT_STATISTICS = ('count', 'mean', 'min', 'max')
+
+# ============================================================================
+# LABEL GRID
+# ============================================================================
+
+class LabelGrid:
+    """Parcel label raster plus per-parcel pixel ranges for tiled reductions"""
+
+    def __init__(self, grid, labels_path, polygon_ids, pixel_ranges, center_pixels):
+        """
+        Args:
+            grid (RasterGrid): Grid the parcels were rasterized on
+            labels_path (str): int32 .npy label raster (0 = no parcel)
+            polygon_ids (numpy.ndarray): Source ID (ObjectID/TMK) per parcel
+            pixel_ranges (numpy.ndarray): (P, 4) row_start, row_stop,
+                col_start, col_stop of each parcel's bounding box
+            center_pixels (numpy.ndarray): Flat pixel index under each
+                bounding-box center (-1 outside the grid)
+        """
+        self.grid = grid
+        self.labels_path = str(labels_path)
+        self.polygon_ids = np.asarray(polygon_ids)
+        self.pixel_ranges = np.asarray(pixel_ranges, dtype=np.int64)
+        self.center_pixels = np.asarray(center_pixels, dtype=np.int64)
+        self._labels = None
+
+    @property
+    def n_polygons(self):
+        return len(self.polygon_ids)
+
+    @property
+    def labels(self):
+        """The memory-mapped label raster (opened on first use)"""
+        if self._labels is None:
+            self._labels = np.load(self.labels_path, mmap_mode='r')
+        return self._labels
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_labels'] = None   # Workers reopen the map
+        return state
+
+    # ------------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, grid, coords, ring_offsets, polygon_ring_offsets, polygon_ids, labels_path,
+              tile_size=DEFAULT_TILE_SIZE):
+        """
+        Rasterize polygons onto a grid, one tile at a time
+
+        Args:
+            grid (RasterGrid): Target grid (normally the DEM grid)
+            coords, ring_offsets, polygon_ring_offsets: Parcel vertex buffers
+                (see parcel_index.polygons_from_geo_interface)
+            polygon_ids (array-like): Source ID per polygon
+            labels_path (str): Output .npy label raster
+            tile_size (int): Rows/columns per tile
+
+        Returns:
+            LabelGrid: The label grid (labels written to labels_path)
+        """
+        n_polygons = len(polygon_ring_offsets) - 1
+        if n_polygons >= np.iinfo(np.int32).max:
+            raise ValueError(f"Too many polygons for an int32 label grid: {n_polygons:,}")
+
+        bounds = polygon_bounds(coords, ring_offsets, polygon_ring_offsets)
+        valid = ~np.isnan(bounds[:, 0])
+        filled = np.where(valid[:, None], bounds, 0.0)
+        row_start, row_stop, col_start, col_stop = grid.pixel_ranges(*filled.T)
+        row_stop = np.where(valid, row_stop, row_start)
+        pixel_ranges = np.column_stack([row_start, row_stop, col_start, col_stop])
+
+        center_col = np.floor(((filled[:, 0] + filled[:, 2]) / 2 - grid.x_min) / grid.cell_size)
+        center_row = np.floor((grid.y_max - (filled[:, 1] + filled[:, 3]) / 2) / grid.cell_size)
+        inside = valid & (center_col >= 0) & (center_col < grid.n_cols) & (center_row >= 0) & (center_row < grid.n_rows)
+        center_pixels = np.where(inside, center_row * grid.n_cols + center_col, -1).astype(np.int64)
+
+        os.makedirs(os.path.dirname(os.path.abspath(labels_path)), exist_ok=True)
+        temp_path = labels_path + ".tmp.npy"
+        labels = np.lib.format.open_memmap(temp_path, mode='w+', dtype=np.int32, shape=grid.shape)
+        for row0, col0, n_rows, n_cols in iter_tiles(grid, tile_size):
+            selected = np.flatnonzero((row_start < row0 + n_rows) & (row_stop > row0)
+                                      & (col_start < col0 + n_cols) & (col_stop > col0))
+            if not len(selected):
+                continue
+            buffers = subset_polygons(coords, ring_offsets, polygon_ring_offsets, selected)
+            x_min, y_max = grid.window_origin(row0, col0)
+            local, pixels = span_pixels(*polygon_spans(*buffers, x_min, y_max, grid.cell_size, n_rows, n_cols),
+                                        n_cols)
+            tile = np.zeros(n_rows * n_cols, dtype=np.int32)
+            tile[pixels] = selected[local] + 1
+            labels[row0:row0 + n_rows, col0:col0 + n_cols] = tile.reshape(n_rows, n_cols)
+        labels.flush()
+        del labels
+        os.replace(temp_path, labels_path)
+
+        return cls(grid, labels_path, polygon_ids, pixel_ranges, center_pixels)
+
+    # ------------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------------
+
+    @staticmethod
+    def labels_path_for(cache_path):
+        return os.path.splitext(str(cache_path))[0] + "_labels.npy"
+
+    def save(self, cache_path, signature=""):
+        """Save parcel metadata to an .npz beside the label raster"""
+        polygon_ids = self.polygon_ids.astype(str) if self.polygon_ids.dtype == object else self.polygon_ids
+        temp_path = cache_path + ".tmp.npz"
+        np.savez(temp_path, version=np.array(CACHE_VERSION), signature=np.array(signature),
+                 grid=np.array(json.dumps(self.grid.as_dict())), polygon_ids=polygon_ids,
+                 pixel_ranges=self.pixel_ranges, center_pixels=self.center_pixels)
+        os.replace(temp_path, cache_path)
+
+    @classmethod
+    def load(cls, cache_path, signature=None, grid=None):
+        """
+        Load a cached label grid
+
+        Returns:
+            LabelGrid: The label grid, or None when the cache is missing, from
+            another cache version, another source signature or another grid
+        """
+        labels_path = cls.labels_path_for(cache_path)
+        if not (os.path.exists(cache_path) and os.path.exists(labels_path)):
+            return None
+        with np.load(cache_path, allow_pickle=False) as data:
+            if int(data['version']) != CACHE_VERSION:
+                return None
+            if signature is not None and str(data['signature']) != signature:
+                return None
+            cached_grid = RasterGrid.from_dict(json.loads(str(data['grid'])))
+            if grid is not None and not same_cells(cached_grid, grid):
+                return None
+            return cls(cached_grid, labels_path, data['polygon_ids'], data['pixel_ranges'], data['center_pixels'])
+
+    @classmethod
+    def load_or_build(cls, cache_path, signature, grid, geometry_loader, tile_size=DEFAULT_TILE_SIZE):
+        """
+        Load the cached label grid for this parcel source and grid, or build it
+
+        Args:
+            cache_path (str): .npz metadata cache (labels go to *_labels.npy)
+            signature (str): Parcel source fingerprint
+            grid (RasterGrid): Raster grid the labels must match
+            geometry_loader (callable): Returns (geometries, polygon_ids) on a miss
+
+        Returns:
+            tuple: (LabelGrid, True if it came from the cache)
+        """
+        from .parcel_index import polygons_from_geo_interface
+
+        label_grid = cls.load(cache_path, signature, grid)
+        if label_grid is not None:
+            return label_grid, True
+        geometries, polygon_ids = geometry_loader()
+        coords, ring_offsets, polygon_ring_offsets = polygons_from_geo_interface(geometries)
+        label_grid = cls.build(grid, coords, ring_offsets, polygon_ring_offsets, polygon_ids,
+                               cls.labels_path_for(cache_path), tile_size)
+        label_grid.save(cache_path, signature)
+        return label_grid, False
+
+    def __repr__(self):
+        return f"LabelGrid({self.n_polygons:,} parcels on {self.grid})"
+
+def same_cells(grid, other):
+    """True when two grids have the same size, origin and cell size"""
+    tolerance = 1e-6 * grid.cell_size
+    return (grid.shape == other.shape
+            and abs(grid.cell_size - other.cell_size) <= tolerance
+            and abs(grid.x_min - other.x_min) <= tolerance
+            and abs(grid.y_max - other.y_max) <= tolerance)
+
+# ============================================================================
+# ZONAL STATISTICS
+# ============================================================================
+
+def _zonal_tile(task):
+    """
+    Reduce one raster tile per parcel (runs in a worker)
+
+    Returns:
+        dict: 'interior' (ids, stats) for parcels wholly inside the tile,
+        'edge' (ids, values) pixel values for parcels crossing its border,
+        and 'center' (ids, values) center-cell samples
+    """
+    label_grid, raster, (row0, col0, n_rows, n_cols), statistics, percentiles, tile_function, halo = task
+    values = raster.read_window(row0, col0, n_rows, n_cols, halo=halo)
+    if tile_function is not None:
+        values = tile_function(values)
+    elif halo:
+        values = values[halo:-halo, halo:-halo]
+    values = values.ravel()
+    labels = np.asarray(label_grid.labels[row0:row0 + n_rows, col0:col0 + n_cols]).ravel()
+
+    in_parcel = np.flatnonzero(labels > 0)
+    polygon_ids, local = np.unique(labels[in_parcel] - 1, return_inverse=True)
+    pixel_values = values[in_parcel]
+    stats = group_statistics(local, pixel_values, len(polygon_ids), percentiles=percentiles,
+                             statistics=statistics)
+
+    row_start, row_stop, col_start, col_stop = label_grid.pixel_ranges[polygon_ids].T
+    interior = ((row_start >= row0) & (row_stop <= row0 + n_rows)
+                & (col_start >= col0) & (col_stop <= col0 + n_cols))
+    on_edge = ~interior[local]
+
+    # Center-cell samples for parcels whose bounding-box center is in this tile
+    center = label_grid.center_pixels
+    center_row, center_col = center // label_grid.grid.n_cols, center % label_grid.grid.n_cols
+    in_tile = np.flatnonzero((center >= 0) & (center_row >= row0) & (center_row < row0 + n_rows)
+                             & (center_col >= col0) & (center_col < col0 + n_cols))
+    center_values = values[(center_row[in_tile] - row0) * n_cols + center_col[in_tile] - col0]
+
+    return {
+        'interior': (polygon_ids[interior], {name: column[interior] for name, column in stats.items()}),
+        'edge': (polygon_ids[local[on_edge]], pixel_values[on_edge].astype(np.float32)),
+        'center': (in_tile, center_values),
+    }
+
+def _tile_tasks(label_grid, raster, tile_size, statistics, percentiles, tile_function, halo):
+    """One task per tile that has parcels (tiles over the ocean are skipped)"""
+    row_start, row_stop, col_start, col_stop = label_grid.pixel_ranges.T
+    for tile in iter_tiles(label_grid.grid, tile_size):
+        row0, col0, n_rows, n_cols = tile
+        if np.any((row_start < row0 + n_rows) & (row_stop > row0)
+                  & (col_start < col0 + n_cols) & (col_stop > col0)):
+            yield (label_grid, raster, tile, statistics, percentiles, tile_function, halo)
+
+def zonal_statistics(label_grid, raster, statistics=DEFAULT_STATISTICS, percentiles=(),
+                     tile_size=DEFAULT_TILE_SIZE, tile_function=None, halo=0, max_workers=1):
+    """
+    Per-parcel statistics of a raster aligned with the label grid
+
+    Args:
+        label_grid (LabelGrid): Cached parcel labels
+        raster (MemmapRaster): Values on the same grid (nodata ignored)
+        statistics (iterable): Any of 'count', 'sum', 'mean', 'min', 'max'
+        percentiles (iterable): Percentiles to add, e.g. (90,) -> 'p90'
+        tile_size (int): Rows/columns per tile
+        tile_function (callable): Optional per-tile transform applied to the
+            window read with the halo; must return the core cells (e.g.
+            functools.partial(dem_slope.horn_slope, cell_size=10) with halo=1)
+        halo (int): Extra cells read around each tile for tile_function
+        max_workers (int): Worker processes (None = CPU count, 1 = in process)
+
+    Returns:
+        dict: Statistic name -> array with one value per parcel ('count' is
+        always included; parcels without pixels have count 0 and the value
+        of their center cell for the other statistics)
+    """
+    if not same_cells(label_grid.grid, raster.grid):
+        raise ValueError(f"Raster {raster.grid} is not aligned with the label grid {label_grid.grid}; "
+                         "snap/resample it to the label grid first")
+
+    statistics = tuple(dict.fromkeys(('count',) + tuple(statistics)))
+    percentiles = tuple(percentiles)
+    n_polygons = label_grid.n_polygons
+    result = {name: np.zeros(n_polygons, dtype=np.int64) if name == 'count' else np.full(n_polygons, np.nan)
+              for name in statistics}
+    result.update({f"p{q:g}": np.full(n_polygons, np.nan) for q in percentiles})
+    center = np.full(n_polygons, np.nan)
+    edge_ids, edge_values = [], []
+
+    def collect(tile_result):
+        ids, stats = tile_result['interior']
+        for name, column in stats.items():
+            result[name][ids] = column
+        edge_ids.append(tile_result['edge'][0])
+        edge_values.append(tile_result['edge'][1])
+        center[tile_result['center'][0]] = tile_result['center'][1]
+
+    tasks = _tile_tasks(label_grid, raster, tile_size, statistics, percentiles, tile_function, halo)
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers <= 1:
+        for task in tasks:
+            collect(_zonal_tile(task))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            for tile_result in pool.map(_zonal_tile, tasks):
+                collect(tile_result)
+
+    # Parcels crossing tile borders: reduce their pixels from every tile together
+    ids = np.concatenate(edge_ids) if edge_ids else np.empty(0, dtype=np.int64)
+    if len(ids):
+        unique_ids, groups = np.unique(ids, return_inverse=True)
+        stats = group_statistics(groups, np.concatenate(edge_values), len(unique_ids),
+                                 percentiles=percentiles, statistics=statistics)
+        for name, column in stats.items():
+            result[name][unique_ids] = column
+
+    # Parcels smaller than a cell: value under the bounding-box center
+    no_pixels = result['count'] == 0
+    for name, column in result.items():
+        if name == 'count':
+            continue
+        column[no_pixels] = 0.0 if name == 'sum' else center[no_pixels]
+    return result
@@ -42,6 +42,7 @@ SOIL_ANALYSIS_DIR = os.path.join(OUTPUTS_DIR, "soil_analysis")
 FOUNDATION_DIR = os.path.join(OUTPUTS_DIR, "foundation")
 VALIDATION_DIR = os.path.join(OUTPUTS_DIR, "validation")
 MAPS_DIR = os.path.join(OUTPUTS_DIR, "maps")
+MPAT_STORE_DIR = os.path.join(OUTPUTS_DIR, "MPAT_Store")  # Columnar (Parquet) MPAT
 
 # ============================================================================
 # GEODATABASE FEATURE CLASSES
@@ -66,6 +67,14 @@ HONOLULU_BUILDINGS = os.path.join(GDB_PATH, "Honolulu_Building_Footprints")
 MAUI_BUILDINGS = os.path.join(GDB_PATH, "Maui_Building_Footprints")
 HAWAII_BUILDINGS = os.path.join(GDB_PATH, "Hawaii_Building_Footprints")
 KAUAI_BUILDINGS = os.path.join(GDB_PATH, "Kauai_Building_Footprints")
+COUNTY_BUILDING_FOOTPRINTS = [HAWAII_BUILDINGS, MAUI_BUILDINGS, HONOLULU_BUILDINGS, KAUAI_BUILDINGS]
+
+# Setback constraint layers (HAR 11-62-32)
+SHORELINE = os.path.join(GDB_PATH, "Shoreline")
+SURFACE_WATER = os.path.join(GDB_PATH, "Surface_Water")
+
+# Regulatory overlays
+FLOOD_ZONES = os.path.join(GDB_PATH, "FEMA_Flood_Zones")   # NFHL S_FLD_HAZ_AR
 
 # ============================================================================
 # UTILITY FUNCTIONS
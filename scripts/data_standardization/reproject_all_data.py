@@ -1,25 +1,42 @@
 """
 Data Standardization Script for Hawaii Matrix Project
 Reprojects all downloaded GIS data to HCPT standard: NAD 83 HARN UTM Zone 4N (EPSG:26904)
+
+A manifest in the standardized folder records each source's fingerprint and
+CRS, so re-runs only reproject new or changed downloads, in parallel.
+Without ArcGIS the pyproj backend (cesspool_analysis.coordinate_transform)
+does the reprojection.
 """
 
-import arcpy
 import os
 import sys
+import time
 from datetime import datetime
 
+SCRIPTS_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_FOLDER not in sys.path:
+    sys.path.append(SCRIPTS_FOLDER)
+
+from cesspool_analysis.backends import lazy_import, module_available
+from cesspool_analysis.coordinate_transform import HCPT_TARGET_EPSG, accepted_epsg
+from cesspool_analysis.partitioned import use_python_for_workers
+from cesspool_analysis.reprojection import MANIFEST_NAME, pyproj_worker, run_reprojection
+
+arcpy = lazy_import("arcpy", "run inside ArcGIS Pro, or use the pyproj backend (backend='pyproj')")
+
 # Set up logging
 def log_message(message, level="INFO"):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] {level}: {message}")
 
-def reproject_to_hcpt_standard(input_dataset, output_dataset):
+def reproject_to_hcpt_standard(input_dataset, output_dataset, target_epsg=HCPT_TARGET_EPSG):
     """
     Reproject any dataset to HCPT standard: NAD 83 HARN UTM Zone 4N (EPSG:26904)
     
     Parameters:
     input_dataset (str): Path to source dataset
     output_dataset (str): Path for reprojected output
+    target_epsg (int): Target coordinate system (default: HCPT standard)
     
     Returns:
     bool: True if successful, False if failed
@@ -32,7 +49,7 @@ def reproject_to_hcpt_standard(input_dataset, output_dataset):
             log_message(f"Created directory: {output_dir}")
         
         # Target coordinate system: NAD 83 HARN UTM Zone 4N
-        target_crs = arcpy.SpatialReference(26904)
+        target_crs = arcpy.SpatialReference(target_epsg)
         
         # Get source projection info
         desc = arcpy.Describe(input_dataset)
@@ -41,8 +58,8 @@ def reproject_to_hcpt_standard(input_dataset, output_dataset):
         log_message(f"Source: {source_crs.name} (EPSG:{source_crs.factoryCode})")
         log_message(f"Target: {target_crs.name} (EPSG:{target_crs.factoryCode})")
         
-        # Check if reprojection is needed
-        if source_crs.factoryCode == 26904:
+        # Check if reprojection is needed (the HARN realization counts as the target)
+        if source_crs.factoryCode in accepted_epsg(target_epsg):
             log_message("Dataset already in target projection, copying...")
             arcpy.management.Copy(input_dataset, output_dataset)
         else:
@@ -61,7 +78,7 @@ def reproject_to_hcpt_standard(input_dataset, output_dataset):
         
         # Verify output projection
         output_desc = arcpy.Describe(output_dataset)
-        if output_desc.spatialReference.factoryCode == 26904:
+        if output_desc.spatialReference.factoryCode in accepted_epsg(target_epsg):
             log_message(f"✅ Successfully reprojected: {os.path.basename(output_dataset)}")
             return True
         else:
@@ -72,57 +89,135 @@ def reproject_to_hcpt_standard(input_dataset, output_dataset):
         log_message(f"❌ Error reprojecting {input_dataset}: {str(e)}", "ERROR")
         return False
 
-def batch_reproject_folder(input_folder, output_folder, file_extensions=None):
+def reproject_geodatabase(input_gdb, output_gdb, target_epsg=HCPT_TARGET_EPSG):
+    """
+    Reproject every feature class of a file geodatabase into output_gdb
+    
+    Describe/Project work on feature classes, not on the geodatabase folder,
+    so the feature classes are walked (including those inside feature
+    datasets) and each is projected into a fresh output geodatabase.
+    Feature class names are unique within a geodatabase, so they are
+    written to its root.
+    
+    Parameters:
+    input_gdb (str): Path to source file geodatabase
+    output_gdb (str): Path for the reprojected geodatabase
+    target_epsg (int): Target coordinate system (default: HCPT standard)
+    
+    Returns:
+    tuple: (True if every feature class was reprojected and verified,
+    source coordinate systems)
+    """
+    feature_classes = []
+    for dirpath, dirnames, filenames in arcpy.da.Walk(input_gdb, datatype="FeatureClass"):
+        feature_classes.extend(os.path.join(dirpath, name) for name in filenames)
+    if not feature_classes:
+        log_message(f"❌ No feature classes in {input_gdb}", "ERROR")
+        return False, None
+    
+    # Recreate the output so layers removed from the source do not linger
+    if arcpy.Exists(output_gdb):
+        arcpy.management.Delete(output_gdb)
+    output_dir = os.path.dirname(output_gdb)
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    arcpy.management.CreateFileGDB(output_dir, os.path.basename(output_gdb))
+    
+    source_crs = []
+    ok = True
+    for feature_class in feature_classes:
+        spatial_reference = arcpy.Describe(feature_class).spatialReference
+        name = f"{spatial_reference.name} (EPSG:{spatial_reference.factoryCode})"
+        if name not in source_crs:
+            source_crs.append(name)
+        output_fc = os.path.join(output_gdb, os.path.basename(feature_class))
+        ok = reproject_to_hcpt_standard(feature_class, output_fc, target_epsg) and ok
+    return ok, "; ".join(source_crs)
+
+def reproject_worker(input_path, output_path, target_epsg=HCPT_TARGET_EPSG):
+    """
+    Reproject one dataset in a worker process and report for the manifest
+    
+    Shapefiles are projected directly; file geodatabases feature class by
+    feature class (see reproject_geodatabase).
+    
+    Returns:
+    dict: ok (output verified in the target CRS), source_crs, seconds
+    """
+    started = time.perf_counter()
+    arcpy.env.overwriteOutput = True   # Re-runs replace outputs whose source changed
+    if input_path.lower().endswith('.gdb'):
+        ok, source_crs = reproject_geodatabase(input_path, output_path, target_epsg)
+    else:
+        spatial_reference = arcpy.Describe(input_path).spatialReference
+        source_crs = f"{spatial_reference.name} (EPSG:{spatial_reference.factoryCode})"
+        ok = reproject_to_hcpt_standard(input_path, output_path, target_epsg)
+    return {
+        'ok': ok,
+        'source_crs': source_crs,
+        'seconds': time.perf_counter() - started,
+    }
+
+def batch_reproject_folder(input_folder, output_folder, file_extensions=None, max_workers=None, force=False,
+                           backend=None):
     """
     Batch reproject all GIS files in a folder structure
     
+    Datasets whose source, target and output are unchanged since the last
+    run (per the manifest in output_folder) are skipped; the rest run in a
+    process pool and each output is verified as it is written.
+    
     Parameters:
     input_folder (str): Root folder containing raw downloads
     output_folder (str): Root folder for standardized outputs
     file_extensions (list): File extensions to process (default: ['.shp', '.gdb'])
+    max_workers (int): Worker processes (default: CPU count; 1 = sequential)
+    force (bool): Reproject everything, ignoring the manifest
+    backend (str): 'arcpy' or 'pyproj' (default: arcpy when available)
     """
     if file_extensions is None:
         file_extensions = ['.shp', '.gdb']
+    if backend is None:
+        backend = 'arcpy' if module_available('arcpy') else 'pyproj'
+    worker = reproject_worker if backend == 'arcpy' else pyproj_worker
     
     log_message(f"Starting batch reprojection:")
     log_message(f"Input folder: {input_folder}")
     log_message(f"Output folder: {output_folder}")
+    log_message(f"Manifest: {os.path.join(output_folder, MANIFEST_NAME)}")
+    log_message(f"Backend: {backend}")
     
-    success_count = 0
-    error_count = 0
+    use_python_for_workers()
     
-    # Walk through input folder structure
-    for root, dirs, files in os.walk(input_folder):
-        for file in files:
-            # Check if file has target extension
-            file_name, file_ext = os.path.splitext(file)
-            if file_ext.lower() in file_extensions:
-                
-                # Build paths
-                input_path = os.path.join(root, file)
-                
-                # Create corresponding output path structure
-                rel_path = os.path.relpath(root, input_folder)
-                output_root = os.path.join(output_folder, rel_path)
-                output_path = os.path.join(output_root, file)
-                
-                log_message(f"Processing: {file}")
-                
-                # Reproject
-                if reproject_to_hcpt_standard(input_path, output_path):
-                    success_count += 1
-                else:
-                    error_count += 1
+    def report(task, result):
+        if result.get('ok'):
+            log_message(f"✅ {task['dataset']}: {result.get('source_crs')} -> EPSG:{HCPT_TARGET_EPSG} "
+                        f"({result.get('seconds', 0):.1f} s)")
+        else:
+            log_message(f"❌ {task['dataset']}: {result.get('message') or 'output not in target projection'}",
+                        "ERROR")
+    
+    summary = run_reprojection(input_folder, output_folder, worker,
+                               target_epsg=HCPT_TARGET_EPSG, extensions=tuple(file_extensions),
+                               max_workers=max_workers, force=force, on_result=report)
+    success_count = len(summary['reprojected'])
+    error_count = len(summary['failed'])
     
     log_message(f"Batch processing complete:")
+    log_message(f"⏭️ Up to date (skipped): {len(summary['current'])} files")
     log_message(f"✅ Successfully processed: {success_count} files")
     log_message(f"❌ Errors: {error_count} files")
+    if summary['removed']:
+        log_message(f"Sources no longer present: {', '.join(summary['removed'])}", "WARNING")
     
     return success_count, error_count
 
 def verify_projection_batch(folder_path):
     """
     Verify that all datasets in folder are in correct projection
+    
+    batch_reproject_folder already verifies each output as it is written;
+    use this for a full audit of a folder.
     """
     log_message("Verifying projections...")
     
@@ -136,7 +231,7 @@ def verify_projection_batch(folder_path):
                 
                 try:
                     desc = arcpy.Describe(file_path)
-                    if desc.spatialReference.factoryCode == 26904:
+                    if desc.spatialReference.factoryCode in accepted_epsg(HCPT_TARGET_EPSG):
                         correct_count += 1
                         log_message(f"✅ {file}: Correct projection")
                     else:
@@ -155,7 +250,9 @@ MATRIX_CONFIG = {
     'project_root': r"C:\Users\rober\OneDrive\Documents\GIS_Projects\ParcelAnalysis",
     'raw_data_folder': r"data\state_gis_downloads\_raw",
     'standardized_folder': r"data\state_gis_downloads\_standardized",
-    'target_epsg': 26904,  # NAD 83 HARN UTM Zone 4N
+    'target_epsg': HCPT_TARGET_EPSG,  # NAD 83 HARN UTM Zone 4N
+    'max_workers': None,  # Parallel reprojections (None = one per CPU)
+    'backend': None,      # 'arcpy' or 'pyproj' (None = arcpy when available)
 }
 
 def main():
@@ -183,13 +280,11 @@ def main():
         os.makedirs(standardized_folder)
         log_message(f"Created standardized data folder: {standardized_folder}")
     
-    # Batch reproject all data
-    success_count, error_count = batch_reproject_folder(raw_folder, standardized_folder)
-    
-    # Verify results
-    if success_count > 0:
-        log_message("Verifying reprojected datasets...")
-        verify_projection_batch(standardized_folder)
+    # Batch reproject new and changed data (outputs are verified as they are written)
+    success_count, error_count = batch_reproject_folder(
+        raw_folder, standardized_folder, max_workers=MATRIX_CONFIG['max_workers'],
+        backend=MATRIX_CONFIG['backend']
+    )
     
     log_message("=" * 60)
     log_message("DATA STANDARDIZATION COMPLETE")
@@ -197,12 +292,8 @@ def main():
     log_message("=" * 60)
 
 if __name__ == "__main__":
-    # Check if ArcGIS is available
-    try:
-        import arcpy
+    if module_available('arcpy'):
         log_message("ArcGIS environment detected")
-        main()
-    except ImportError:
-        print("ERROR: ArcGIS/arcpy not available. This script requires ArcGIS Pro or ArcMap.")
-        print("Alternative: Use GDAL/OGR tools for reprojection.")
-        sys.exit(1)
+    else:
+        log_message("ArcGIS/arcpy not available - reprojecting with pyproj (requires geopandas)", "WARNING")
+    main()
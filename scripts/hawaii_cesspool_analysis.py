@@ -2,14 +2,49 @@
 # Complete ArcPy Workflow for Cesspool Replacement Planning
 # Based on Hawaii Administrative Rule 11-62 Requirements
 
-import arcpy
 import pandas as pd
 import numpy as np
 from pathlib import Path
+import hashlib
+import itertools
 import os
 import sys
 from datetime import datetime
 
+from cesspool_analysis.backends import get_backend, lazy_import
+from cesspool_analysis.matrix_sieve import (
+    load_compiled_matrix, site_condition_flags, flood_zone_condition, encode_conditions,
+    sieve, suitability_matrix, sieve_summary
+)
+from cesspool_analysis.tmk_join import (
+    find_tmk_field, normalize_tmk, null_value_map, multi_join, to_extend_array
+)
+from cesspool_analysis.streaming_export import export_rows
+from cesspool_analysis.step_cache import Step, StepCache, fingerprint_path
+from cesspool_analysis.partitioned import (
+    COUNTY_PARTITIONS, merge_partition_files, run_partitions, use_python_for_workers
+)
+from cesspool_analysis.mpat_store import island_from_tmk
+from cesspool_analysis.sizing_kernel import size_systems
+from cesspool_analysis.technology_ranking import (
+    DEFAULT_CONFIG_FILE as TECHNOLOGY_CONFIG_FILE, load_technology_database, site_difficulty,
+    rank_technologies, cost_rollup
+)
+from cesspool_analysis.priority_kernel import (
+    load_priority_spec, required_fields, priority_scores, ranked_table
+)
+from cesspool_analysis.summary_cube import (
+    SummaryCube, SOURCE_FIELDS as CUBE_SOURCE_FIELDS, SUM_MEASURES as CUBE_SUM_MEASURES
+)
+from cesspool_analysis.projection_inventory import REPORT_NAME, scan_projections, write_report
+from cesspool_analysis.raster_io import MemmapRaster, tile_count
+from cesspool_analysis.dem_slope import compute_parcel_slope
+from cesspool_analysis.zonal_stats import LabelGrid, zonal_statistics
+
+# ArcGIS is imported on first use, so partition workers and tools that only
+# need the rule functions start without paying the arcpy import
+arcpy = lazy_import("arcpy", "run inside ArcGIS Pro")
+
 print("HAWAII STATEWIDE CESSPOOL PRIORITIZATION ANALYSIS")
 print("=" * 60)
 print(f"Analysis started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -48,6 +83,42 @@ class Config:
         self.min_lot_size_acres = 0.1  # Minimum lot size for individual systems
         self.max_bedrooms = 20  # Exclude large hotels/condos
         self.min_bedrooms_residential = 1
+        
+        # Priority scoring: weights and thresholds from the priority_scoring
+        # section of the project YAML; top-k parcels per island are exported
+        self.priority_config_file = None  # Default: scripts/configs/hawaii_config.yaml
+        self.priority_top_k = 500
+        
+        # Technology ranking: costs from the approved_technologies section of
+        # the IWS config; the best technologies per parcel are written back
+        self.technology_config_file = None  # Default: scripts/configs/hawaii_iws_config.yaml
+        self.technology_top_n = 3
+        
+        # Result export (csv, parquet or gpkg; optional gzip/zstd compression)
+        self.export_format = "csv"
+        self.export_compression = None
+        self.export_batch_size = 50000
+        
+        # Step cache: skip phases whose inputs, settings and code are unchanged
+        self.use_step_cache = True
+        self.step_cache_file = os.path.join(self.output_folder, "step_cache.json")
+        self.fingerprint_sample_rows = 1000
+        
+        # County-partitioned mode: one worker per county, own scratch gdb each
+        self.county_field = "COUNTY"
+        self.scratch_folder = os.path.join(self.project_folder, "scratch", "county_partitions")
+        self.max_workers = None  # Default: one per county, capped at CPU count
+        
+        # Raster attributes: memory-mapped tiles run in a process pool
+        self.dem_tile_size = 2048
+        self.dem_z_factor = 1.0  # 0.3048 for elevations in feet on a meter grid
+        self.raster_workers = None  # Default: CPU count
+        self.raster_cache_folder = os.path.join(self.project_folder, "scratch", "rasters")
+        
+        # Projection inventory of the downloads, checked before every run
+        # (incremental: only files changed since the last scan are read)
+        self.check_projections = True
+        self.gis_downloads_folder = os.path.join(self.data_folder, "gis_downloads")
 
 def setup_workspace(config):
     """Initialize workspace and verify file paths"""
@@ -75,6 +146,22 @@ def setup_workspace(config):
     print(f"✅ Bedroom Data: {config.bedroom_csv}")
     print("")
 
+def check_input_projections(config):
+    """Warn about downloaded datasets that are not in the HCPT projection"""
+    if not config.check_projections or not os.path.exists(config.gis_downloads_folder):
+        return None
+    report_path = os.path.join(config.gis_downloads_folder, REPORT_NAME)
+    report = scan_projections(config.gis_downloads_folder, report_path=report_path)
+    write_report(report, report_path, os.path.splitext(report_path)[0] + ".csv")
+    summary = report['summary']
+    if summary['transformable'] or summary['unknown']:
+        print(f"⚠️ Projection check: {summary['transformable']} downloads need reprojection, "
+              f"{summary['unknown']} have an unknown projection (see {report_path})")
+    else:
+        print(f"✅ Projection check: all {summary['total']} downloads in the HCPT projection")
+    print("")
+    return report
+
 # =============================================================================
 # PHASE 1: DATA PREPARATION AND JOINING
 # =============================================================================
@@ -107,71 +194,46 @@ def load_and_examine_data(config):
     return bedroom_df
 
 def join_bedroom_data_to_parcels(config, bedroom_df):
-    """Join bedroom count data to TMK parcels"""
+    """Join bedroom count data to TMK parcels with the in-memory TMK join engine"""
     print("🔗 JOINING BEDROOM DATA TO PARCELS")
     print("-" * 35)
     
     try:
-        # Create temporary table from bedroom CSV
-        temp_table = "bedroom_temp"
-        bedroom_path = os.path.join(config.data_folder, config.bedroom_csv)
+        # Work on a copy so the source TMK feature class is never edited
+        print(f"Creating {config.parcels_with_bedrooms}...")
+        arcpy.CopyFeatures_management(config.tmk_fc, config.parcels_with_bedrooms)
         
-        print(f"Creating temporary table from {config.bedroom_csv}...")
-        arcpy.TableToTable_conversion(bedroom_path, config.gdb_path, temp_table)
+        # Load parcel keys once; TMK may be integer or text in either table
+        oid_field = arcpy.Describe(config.parcels_with_bedrooms).OIDFieldName
+        parcel_fields = [f.name for f in arcpy.ListFields(config.parcels_with_bedrooms)]
+        parcel_tmk = find_tmk_field(parcel_fields)
+        bedroom_tmk = find_tmk_field(list(bedroom_df.columns))
+        tmk_type = arcpy.ListFields(config.parcels_with_bedrooms, parcel_tmk)[0].type
+        parcel_array = arcpy.da.TableToNumPyArray(
+            config.parcels_with_bedrooms, [oid_field, parcel_tmk],
+            null_value=null_value_map([(parcel_tmk, tmk_type)])
+        )
         
-        # Join bedroom data to TMK parcels
-        print(f"Joining bedroom data to {config.tmk_fc}...")
-        arcpy.JoinField_management(
-            in_data=config.tmk_fc,
-            in_field="TMK",  # Adjust field name if different
-            join_table=temp_table,
-            join_field="TMK",
-            fields=["BED_ROOMS"]  # Adjust field name if different
+        # Sort-merge join on normalized TMKs, then write back in one bulk operation
+        print(f"Joining bedroom data on {parcel_tmk} ←→ {bedroom_tmk}...")
+        columns, stats = multi_join(
+            parcel_array[parcel_tmk],
+            [("Bedrooms", bedroom_df, bedroom_tmk, ["BED_ROOMS"])],
+            existing_fields=parcel_fields
         )
+        stats[0].report()
         
-        # Copy to new feature class
-        print(f"Creating {config.parcels_with_bedrooms}...")
-        arcpy.CopyFeatures_management(config.tmk_fc, config.parcels_with_bedrooms)
+        arcpy.da.ExtendTable(config.parcels_with_bedrooms, oid_field,
+                             to_extend_array(parcel_array[oid_field], columns), "JOIN_OID")
         
-        # Get count of parcels with bedroom data
         joined_count = int(arcpy.GetCount_management(config.parcels_with_bedrooms)[0])
         print(f"✅ Created {config.parcels_with_bedrooms}: {joined_count:,} parcels")
-        
-        # Clean up
-        arcpy.Delete_management(temp_table)
         print("")
         
     except Exception as e:
         print(f"❌ Error joining data: {str(e)}")
-        print("Trying alternative join method...")
-        
-        # Alternative method using pandas and field calculation
-        join_bedroom_data_alternative(config, bedroom_df)
-
-def join_bedroom_data_alternative(config, bedroom_df):
-    """Alternative method to join bedroom data using field calculation"""
-    print("Using alternative join method...")
-    
-    # Copy TMK to new feature class
-    arcpy.CopyFeatures_management(config.tmk_fc, config.parcels_with_bedrooms)
-    
-    # Add bedroom field
-    arcpy.AddField_management(config.parcels_with_bedrooms, "BED_ROOMS", "SHORT")
-    
-    # Create TMK to bedroom lookup dictionary
-    bedroom_dict = dict(zip(bedroom_df['TMK'], bedroom_df['BED_ROOMS']))
-    
-    # Update bedroom values using cursor
-    print("Updating bedroom values...")
-    with arcpy.da.UpdateCursor(config.parcels_with_bedrooms, ['TMK', 'BED_ROOMS']) as cursor:
-        for row in cursor:
-            tmk = row[0]
-            if tmk in bedroom_dict:
-                row[1] = bedroom_dict[tmk]
-                cursor.updateRow(row)
-    
-    print("✅ Alternative join method completed")
-    print("")
+        print("Check the TMK and BED_ROOMS field names in both datasets")
+        raise
 
 # =============================================================================
 # PHASE 2: RESIDENTIAL PARCEL FILTERING
@@ -217,6 +279,7 @@ def filter_residential_parcels(config):
     except Exception as e:
         print(f"❌ Error filtering parcels: {str(e)}")
         print("Check your field names and try adjusting the where_clause")
+        raise
 
 # =============================================================================
 # PHASE 3: CESSPOOL ANALYSIS CALCULATIONS
@@ -230,149 +293,92 @@ def calculate_cesspool_requirements(config):
     # Copy residential parcels to analysis feature class
     arcpy.CopyFeatures_management(config.residential_parcels, config.cesspool_analysis)
     
-    # Add new fields for analysis
-    new_fields = [
-        ("DAILY_FLOW_GAL", "LONG", "Daily wastewater flow (gallons)"),
-        ("SEPTIC_SIZE_GAL", "LONG", "Required septic tank size (gallons)"),
-        ("LOT_SIZE_SF", "LONG", "Lot size (square feet)"),
-        ("LOT_SIZE_CAT", "TEXT", "Lot size category"),
-        ("CESSPOOL_REPLACEMENT", "TEXT", "Needs cesspool replacement"),
-        ("PRIORITY_SCORE", "SHORT", "Priority score (1-10)")
-    ]
-    
-    print("Adding analysis fields...")
-    for field_name, field_type, description in new_fields:
-        arcpy.AddField_management(config.cesspool_analysis, field_name, field_type)
-        print(f"  ✅ {field_name}: {description}")
-    
-    print("")
-    
-    # Calculate values using field calculator and cursor
-    calculate_wastewater_flows(config)
-    calculate_septic_tank_sizes(config)
-    calculate_lot_characteristics(config)
+    # Analysis fields are created by the bulk writes: sizing fields (DAILY_FLOW_GAL,
+    # SEPTIC_SIZE_GAL, LOT_SIZE_SF, LOT_SIZE_CAT, CESSPOOL_REPLACEMENT) in
+    # calculate_system_sizing, PRIORITY_SCORE (1-10) in calculate_priority_scores
+    calculate_system_sizing(config)
     calculate_priority_scores(config)
 
-def calculate_wastewater_flows(config):
-    """Calculate daily wastewater flow per Hawaii Rule 11-62"""
-    print("Calculating daily wastewater flows...")
-    
-    # Use field calculator for basic calculation
-    expression = f"!BED_ROOMS! * {config.GALLONS_PER_BEDROOM_PER_DAY}"
-    arcpy.CalculateField_management(
-        config.cesspool_analysis, 
-        "DAILY_FLOW_GAL", 
-        expression, 
-        "PYTHON3"
-    )
-    print("  ✅ Daily flows calculated (200 gal/bedroom/day)")
-
-def calculate_septic_tank_sizes(config):
-    """Calculate required septic tank sizes per Hawaii Rule 11-62"""
-    print("Calculating septic tank size requirements...")
-    
-    # Use cursor for complex calculation
-    with arcpy.da.UpdateCursor(config.cesspool_analysis, 
-                              ['BED_ROOMS', 'DAILY_FLOW_GAL', 'SEPTIC_SIZE_GAL']) as cursor:
-        for row in cursor:
-            bedrooms = row[0] if row[0] else 0
-            daily_flow = row[1] if row[1] else 0
-            
-            # Apply Hawaii Rule 11-62 septic tank sizing
-            if bedrooms <= 4:
-                septic_size = 1000  # Minimum 1000 gallons
-            elif bedrooms == 5:
-                septic_size = 1250  # 1250 gallons for 5 bedrooms
-            else:
-                # Formula: 1000 + (Q-800) × 1.25 where Q = design flow
-                septic_size = 1000 + (daily_flow - 800) * 1.25
-            
-            row[2] = int(septic_size)
-            cursor.updateRow(row)
-    
-    print("  ✅ Septic tank sizes calculated per HR 11-62")
-
-def calculate_lot_characteristics(config):
-    """Calculate lot size characteristics for technology matching"""
-    print("Calculating lot size characteristics...")
+def calculate_system_sizing(config):
+    """Design flow, septic tank size and lot characteristics per Hawaii Rule 11-62"""
+    print("Calculating wastewater flows, septic tank sizes and lot characteristics...")
     
-    # Calculate lot size in square feet
-    arcpy.CalculateField_management(
-        config.cesspool_analysis,
-        "LOT_SIZE_SF",
-        "!ACRES! * 43560 if !ACRES! else 0",
-        "PYTHON3"
+    # Read the sizing inputs for every parcel in one pass
+    sizing_input = arcpy.da.TableToNumPyArray(
+        config.cesspool_analysis, ['OID@', 'BED_ROOMS', 'ACRES'],
+        null_value={'BED_ROOMS': -1, 'ACRES': np.nan}
     )
+    bedrooms = sizing_input['BED_ROOMS'].astype(float)
+    bedrooms[bedrooms < 0] = np.nan
     
-    # Categorize lot sizes for technology suitability
-    lot_size_expression = """
-def categorize_lot_size(lot_sf):
-    if lot_sf < 10000:
-        return '<10k sf'
-    elif lot_sf <= 21000:
-        return '10k-21k sf'
-    else:
-        return '>21k sf'
-
-categorize_lot_size(!LOT_SIZE_SF!)
-"""
+    # One vectorized call replaces the per-row expressions and cursor branches
+    sizing = size_systems(bedrooms, acres=sizing_input['ACRES'],
+                          gallons_per_bedroom=config.GALLONS_PER_BEDROOM_PER_DAY)
+    columns = {
+        "DAILY_FLOW_GAL": sizing["DAILY_FLOW_GAL"].astype(np.int32),
+        "SEPTIC_SIZE_GAL": sizing["SEPTIC_SIZE_GAL"].astype(np.int32),
+        "LOT_SIZE_SF": np.rint(sizing["LOT_SIZE_SF"]).astype(np.int32),
+        "LOT_SIZE_CAT": sizing["LOT_SIZE_CAT"],
+        "CESSPOOL_REPLACEMENT": np.full(len(sizing_input), 'YES'),
+    }
     
-    arcpy.CalculateField_management(
-        config.cesspool_analysis,
-        "LOT_SIZE_CAT",
-        lot_size_expression,
-        "PYTHON3"
-    )
-    
-    # Mark all as needing cesspool replacement
-    arcpy.CalculateField_management(
-        config.cesspool_analysis,
-        "CESSPOOL_REPLACEMENT",
-        "'YES'",
-        "PYTHON3"
-    )
+    # Bulk write-back (fields from earlier runs are replaced)
+    existing = {f.name for f in arcpy.ListFields(config.cesspool_analysis)}
+    stale = [name for name in columns if name in existing]
+    if stale:
+        arcpy.management.DeleteField(config.cesspool_analysis, stale)
+    oid_field = arcpy.Describe(config.cesspool_analysis).OIDFieldName
+    arcpy.da.ExtendTable(config.cesspool_analysis, oid_field,
+                         to_extend_array(sizing_input['OID@'], columns, "SIZING_OID"), "SIZING_OID")
     
+    print(f"  ✅ Daily flows calculated ({config.GALLONS_PER_BEDROOM_PER_DAY} gal/bedroom/day)")
+    print("  ✅ Septic tank sizes calculated per HR 11-62")
     print("  ✅ Lot characteristics calculated")
 
 def calculate_priority_scores(config):
-    """Calculate preliminary priority scores"""
+    """Calculate priority scores and the top-ranked parcels per island"""
     print("Calculating priority scores...")
     
-    # Simple priority scoring based on bedrooms and lot size
-    # Higher bedrooms = higher priority (more wastewater)
-    # Smaller lots = higher priority (more challenging to upgrade)
-    
-    priority_expression = """
-def calculate_priority(bedrooms, lot_sf):
-    score = 5  # Base score
-    
-    # Bedroom factor (more bedrooms = higher priority)
-    if bedrooms >= 6:
-        score += 3
-    elif bedrooms >= 4:
-        score += 2
-    elif bedrooms >= 2:
-        score += 1
-    
-    # Lot size factor (smaller lots = higher priority)
-    if lot_sf < 10000:
-        score += 2
-    elif lot_sf <= 21000:
-        score += 1
-    
-    return min(score, 10)  # Cap at 10
-
-calculate_priority(!BED_ROOMS! if !BED_ROOMS! else 1, !LOT_SIZE_SF!)
-"""
-    
-    arcpy.CalculateField_management(
-        config.cesspool_analysis,
-        "PRIORITY_SCORE",
-        priority_expression,
-        "PYTHON3"
+    # Weights and thresholds come from config; factors whose fields are not
+    # on the table yet (e.g. before Phase 4) are left out with a warning
+    spec = load_priority_spec(config.priority_config_file)
+    table_fields = {f.name: f.type for f in arcpy.ListFields(config.cesspool_analysis)}
+    for name, factor in list(spec['factors'].items()):
+        if factor.get('weight') and factor['field'] not in table_fields:
+            print(f"  ⚠️ {name}: {factor['field']} not found - factor skipped")
+            spec['factors'][name] = {**factor, 'weight': 0}
+    fields = required_fields(spec)
+    
+    read_fields = ['TMK'] + [f for f in fields if f != 'TMK']
+    score_input = arcpy.da.TableToNumPyArray(
+        config.cesspool_analysis, ['OID@'] + read_fields,
+        null_value=null_value_map([(f, table_fields[f]) for f in read_fields])
     )
+    columns = {field: score_input[field] for field in fields}
+    for field in fields:
+        if table_fields[field] in ('SmallInteger', 'Integer'):
+            # Integer nulls were read as the -1 sentinel
+            values = columns[field].astype(float)
+            values[values == -1] = np.nan
+            columns[field] = values
     
-    print("  ✅ Priority scores calculated")
+    # One vectorized expression replaces the per-row CalculateField code block
+    scores = priority_scores(columns, spec)
+    
+    if 'PRIORITY_SCORE' in table_fields:
+        arcpy.DeleteField_management(config.cesspool_analysis, 'PRIORITY_SCORE')
+    oid_field = arcpy.Describe(config.cesspool_analysis).OIDFieldName
+    arcpy.da.ExtendTable(config.cesspool_analysis, oid_field,
+                         to_extend_array(score_input['OID@'], {'PRIORITY_SCORE': scores}, "SCORE_OID"),
+                         "SCORE_OID")
+    print(f"  ✅ Priority scores calculated from {', '.join(fields)}")
+    
+    # Top-k per island by partial sort (no full statewide sort)
+    tmk = normalize_tmk(score_input['TMK'])
+    top = ranked_table(scores, island_from_tmk(tmk), config.priority_top_k, keys=tmk)
+    top_file = os.path.join(config.output_folder, "Priority_Top_Parcels_By_Island.csv")
+    top.rename(columns={'KEY': 'TMK'}).to_csv(top_file, index=False)
+    print(f"  ✅ Top {config.priority_top_k} parcels per island: {top_file}")
     print("")
 
 # =============================================================================
@@ -420,149 +426,223 @@ def generate_analysis_summary(config):
     print("📈 PHASE 5: ANALYSIS SUMMARY AND REPORTING")
     print("-" * 45)
     
-    # Get summary statistics
-    total_parcels = int(arcpy.GetCount_management(config.cesspool_analysis)[0])
+    # One read of the analysis table; every report below comes from the cube
+    try:
+        cube = build_summary_cube(config)
+    except Exception as e:
+        # Still export the results, but fail the phase so it is not cached
+        print(f"  ⚠️ Could not build summary cube: {str(e)}")
+        export_to_csv(config)
+        raise
     
     # Calculate statistics by island and priority
-    print(f"Total parcels analyzed: {total_parcels:,}")
+    print(f"Total parcels analyzed: {cube.total():,}")
     
     # Create summary by county/island
-    summarize_by_island(config)
+    summarize_by_island(cube)
     
     # Create summary by bedroom count
-    summarize_by_bedrooms(config)
+    summarize_by_bedrooms(cube)
     
     # Create summary by priority score
-    summarize_by_priority(config)
+    summarize_by_priority(cube)
+    
+    # Keep the cube for ad-hoc roll-ups (SummaryCube.load)
+    cube_file = summary_cube_path(config)
+    cube.save(cube_file)
+    print(f"\n  ✅ Summary cube saved: {cube_file}")
     
     # Export to CSV for additional analysis
     export_to_csv(config)
+    return cube
 
-def summarize_by_island(config):
-    """Create summary statistics by island"""
+def summary_cube_path(config):
+    """CSV holding the non-empty cells of the Phase 5 summary cube"""
+    return os.path.join(config.output_folder, "Hawaii_Cesspool_Summary_Cube.csv")
+
+def build_summary_cube(config):
+    """
+    Read the analysis table once and aggregate it into the summary cube
+    
+    The ISLAND field (from the first TMK digit) is written back with a
+    single ExtendTable call so it is still part of the exported results.
+    
+    Returns:
+        SummaryCube: island x bedrooms x priority x lot-size category counts,
+        total design flow and total septic volume
+    """
+    oid_field = arcpy.Describe(config.cesspool_analysis).OIDFieldName
+    table_fields = {f.name: f.type for f in arcpy.ListFields(config.cesspool_analysis)}
+    fields = [name for name in CUBE_SOURCE_FIELDS if name in table_fields]
+    
+    array = arcpy.da.TableToNumPyArray(
+        config.cesspool_analysis, [oid_field] + fields,
+        null_value=null_value_map([(name, table_fields[name]) for name in fields])
+    )
+    columns = {name: array[name] for name in fields}
+    columns['ISLAND'] = island_from_tmk(array['TMK'])
+    cube = SummaryCube.from_columns(columns, measures=[m for m in CUBE_SUM_MEASURES if m in columns])
+    
+    if 'ISLAND' in table_fields:
+        arcpy.DeleteField_management(config.cesspool_analysis, 'ISLAND')
+    arcpy.da.ExtendTable(config.cesspool_analysis, oid_field,
+                         to_extend_array(array[oid_field], {'ISLAND': columns['ISLAND']}), "JOIN_OID")
+    return cube
+
+def summarize_by_island(cube):
+    """Print parcel counts by island (first TMK digit: 1=Hawaii, 2=Maui, 3=Honolulu, 4=Kauai)"""
     print("\nSummary by Island:")
     print("-" * 20)
     
-    # Use frequency analysis to get counts by island
-    # Note: Adjust field name based on your TMK structure
-    freq_table = "island_summary"
-    
-    try:
-        # Create frequency table (assuming first digit of TMK indicates island)
-        arcpy.AddField_management(config.cesspool_analysis, "ISLAND", "TEXT")
-        
-        # Calculate island from TMK (first digit: 1=Hawaii, 2=Maui, 3=Honolulu, 4=Kauai)
-        island_expression = """
-def get_island(tmk):
-    if tmk:
-        first_digit = str(tmk)[0]
-        if first_digit == '1':
-            return 'Hawaii'
-        elif first_digit == '2':
-            return 'Maui'
-        elif first_digit == '3':
-            return 'Honolulu'
-        elif first_digit == '4':
-            return 'Kauai'
-    return 'Unknown'
-
-get_island(!TMK!)
-"""
-        
-        arcpy.CalculateField_management(
-            config.cesspool_analysis,
-            "ISLAND",
-            island_expression,
-            "PYTHON3"
-        )
-        
-        # Get counts by island
-        with arcpy.da.SearchCursor(config.cesspool_analysis, ['ISLAND']) as cursor:
-            island_counts = {}
-            for row in cursor:
-                island = row[0]
-                island_counts[island] = island_counts.get(island, 0) + 1
-        
-        for island, count in sorted(island_counts.items()):
-            print(f"  {island}: {count:,} parcels")
-            
-    except Exception as e:
-        print(f"  ⚠️ Could not calculate island summary: {str(e)}")
+    for island, row in cube.rollup('ISLAND').iterrows():
+        print(f"  {island}: {row['PARCELS']:,} parcels")
 
-def summarize_by_bedrooms(config):
-    """Create summary by bedroom count"""
+def summarize_by_bedrooms(cube):
+    """Print parcel counts by bedroom count"""
     print("\nSummary by Bedrooms:")
     print("-" * 22)
     
-    try:
-        with arcpy.da.SearchCursor(config.cesspool_analysis, ['BED_ROOMS']) as cursor:
-            bedroom_counts = {}
-            for row in cursor:
-                bedrooms = row[0] if row[0] else 0
-                bedroom_counts[bedrooms] = bedroom_counts.get(bedrooms, 0) + 1
-        
-        for bedrooms in sorted(bedroom_counts.keys())[:10]:  # Show top 10
-            count = bedroom_counts[bedrooms]
-            print(f"  {bedrooms} bedrooms: {count:,} parcels")
-            
-    except Exception as e:
-        print(f"  ⚠️ Could not calculate bedroom summary: {str(e)}")
+    bedroom_counts = cube.rollup('BED_ROOMS')['PARCELS']
+    for bedrooms, count in bedroom_counts.head(10).items():  # Show top 10
+        print(f"  {bedrooms:g} bedrooms: {count:,} parcels")
 
-def summarize_by_priority(config):
-    """Create summary by priority score"""
+def summarize_by_priority(cube):
+    """Print parcel counts by priority score"""
     print("\nSummary by Priority Score:")
     print("-" * 28)
     
-    try:
-        with arcpy.da.SearchCursor(config.cesspool_analysis, ['PRIORITY_SCORE']) as cursor:
-            priority_counts = {}
-            total_flow = 0
-            count = 0
-            
-            for row in cursor:
-                priority = row[0] if row[0] else 5
-                priority_counts[priority] = priority_counts.get(priority, 0) + 1
-                count += 1
-        
-        for priority in sorted(priority_counts.keys(), reverse=True):
-            count = priority_counts[priority]
-            print(f"  Priority {priority}: {count:,} parcels")
-            
-    except Exception as e:
-        print(f"  ⚠️ Could not calculate priority summary: {str(e)}")
+    priority_counts = cube.rollup('PRIORITY_SCORE')['PARCELS']
+    for priority, count in priority_counts.sort_index(ascending=False).items():
+        print(f"  Priority {priority:g}: {count:,} parcels")
+
+def export_output_path(config):
+    """Results file path for the configured export format and compression"""
+    extension = {'csv': '.csv', 'parquet': '.parquet', 'gpkg': '.gpkg'}[config.export_format]
+    if config.export_compression and config.export_format == 'csv':
+        extension += {'gzip': '.gz', 'zstd': '.zst'}[config.export_compression]
+    return os.path.join(config.output_folder, "Hawaii_Cesspool_Analysis_Results" + extension)
 
 def export_to_csv(config):
-    """Export results to CSV for further analysis"""
-    print(f"\nExporting results to CSV...")
+    """Stream results to CSV (or Parquet/GeoPackage) in fixed-size batches"""
+    print(f"\nExporting results to {config.export_format.upper()}...")
     
     try:
-        # Export to CSV
-        output_csv = os.path.join(config.output_folder, "Hawaii_Cesspool_Analysis_Results.csv")
+        output_file = export_output_path(config)
         
-        # Get field names
-        field_names = [field.name for field in arcpy.ListFields(config.cesspool_analysis) 
-                      if field.name not in ['OBJECTID', 'Shape', 'Shape_Length', 'Shape_Area']]
+        # Get field names; the field types fix the Parquet schema
+        fields = [field for field in arcpy.ListFields(config.cesspool_analysis) 
+                  if field.name not in ['OBJECTID', 'Shape', 'Shape_Length', 'Shape_Area']]
+        field_names = [field.name for field in fields]
         
-        # Export using pandas for better control
-        data = []
+        # Rows go straight from the cursor to the file; only one batch is in memory
         with arcpy.da.SearchCursor(config.cesspool_analysis, field_names) as cursor:
-            for row in cursor:
-                data.append(row)
-        
-        df = pd.DataFrame(data, columns=field_names)
-        df.to_csv(output_csv, index=False)
+            stats = export_rows(cursor, output_file, field_names,
+                                batch_size=config.export_batch_size,
+                                file_format=config.export_format,
+                                compression=config.export_compression,
+                                field_types={field.name: field.type for field in fields})
         
-        print(f"  ✅ Results exported: {output_csv}")
-        print(f"  📊 Records: {len(df):,}")
+        print(f"  ✅ Results exported: {output_file}")
+        print(f"  📊 Records: {stats.rows:,}")
         print(f"  📋 Fields: {len(field_names)}")
+        print(f"  ⏱️ {stats.rows_per_second:,.0f} rows/s")
         
     except Exception as e:
-        print(f"  ⚠️ Could not export CSV: {str(e)}")
+        print(f"  ❌ Could not export results: {str(e)}")
+        raise
 
 # =============================================================================
 # MAIN EXECUTION FUNCTION
 # =============================================================================
 
+def dataset_fingerprint(config, item):
+    """
+    Fingerprint a file or geodatabase dataset for the step cache
+    
+    Files and folders use size, mtime and sampled content hashes. Geodatabase
+    datasets use the record count, field schema, extent and a hash of the
+    first rows (config.fingerprint_sample_rows).
+    """
+    if os.path.exists(item):
+        return fingerprint_path(item)
+    
+    dataset = item if os.path.isabs(item) else os.path.join(config.gdb_path, item)
+    if not arcpy.Exists(dataset):
+        return None
+    
+    desc = arcpy.Describe(dataset)
+    all_fields = arcpy.ListFields(dataset)
+    fields = [f.name for f in all_fields if f.type not in ('Geometry', 'Blob', 'Raster')]
+    sha = hashlib.sha256()
+    sha.update(arcpy.GetCount_management(dataset)[0].encode('utf-8'))
+    sha.update(repr([(f.name, f.type, f.length) for f in all_fields]).encode('utf-8'))
+    if hasattr(desc, 'extent'):
+        extent = desc.extent
+        sha.update(f"{extent.XMin},{extent.YMin},{extent.XMax},{extent.YMax}".encode('utf-8'))
+    with arcpy.da.SearchCursor(dataset, fields) as cursor:
+        for row in itertools.islice(cursor, config.fingerprint_sample_rows):
+            sha.update(repr(row).encode('utf-8'))
+    return sha.hexdigest()
+
+def build_analysis_steps(config, include_matrix=False):
+    """Declare each analysis phase with its inputs, settings and outputs"""
+    bedroom_path = os.path.join(config.data_folder, config.bedroom_csv)
+    
+    steps = [
+        Step("Phase 1: Bedroom join",
+             run=lambda: join_bedroom_data_to_parcels(config, load_and_examine_data(config)),
+             inputs=[config.tmk_fc, bedroom_path],
+             code=[load_and_examine_data, join_bedroom_data_to_parcels],
+             outputs=[config.parcels_with_bedrooms]),
+        Step("Phase 2: Residential filter",
+             run=lambda: filter_residential_parcels(config),
+             params={'min_bedrooms_residential': config.min_bedrooms_residential,
+                     'max_bedrooms': config.max_bedrooms,
+                     'min_lot_size_acres': config.min_lot_size_acres},
+             code=[filter_residential_parcels],
+             depends_on=["Phase 1: Bedroom join"],
+             outputs=[config.residential_parcels]),
+        Step("Phase 3: Cesspool requirements",
+             run=lambda: calculate_cesspool_requirements(config),
+             params={'GALLONS_PER_BEDROOM_PER_DAY': config.GALLONS_PER_BEDROOM_PER_DAY,
+                     'GALLONS_PER_BATHROOM_PER_DAY': config.GALLONS_PER_BATHROOM_PER_DAY,
+                     'MIN_SEPTIC_TANK_SIZE': config.MIN_SEPTIC_TANK_SIZE,
+                     'priority_spec': load_priority_spec(config.priority_config_file),
+                     'priority_top_k': config.priority_top_k},
+             code=[calculate_cesspool_requirements, calculate_system_sizing,
+                   calculate_priority_scores],
+             depends_on=["Phase 2: Residential filter"],
+             outputs=[config.cesspool_analysis]),
+        Step("Phase 4: Environmental fields",
+             run=lambda: add_environmental_factors(config),
+             code=[add_environmental_factors],
+             depends_on=["Phase 3: Cesspool requirements"],
+             outputs=[config.cesspool_analysis]),
+        Step("Phase 5: Summary and export",
+             run=lambda: generate_analysis_summary(config),
+             params={'export_format': config.export_format,
+                     'export_compression': config.export_compression},
+             code=[generate_analysis_summary, build_summary_cube, summarize_by_island,
+                   summarize_by_bedrooms, summarize_by_priority, export_to_csv],
+             depends_on=["Phase 4: Environmental fields"],
+             # ISLAND is written back into the analysis feature class, so it is
+             # a Phase 5 output too and the earlier entries track the change
+             outputs=[config.cesspool_analysis, export_output_path(config),
+                      summary_cube_path(config)]),
+    ]
+    
+    if include_matrix:
+        # Matrix screening reads the Phase 4 fields; the export then includes it
+        steps.insert(4, Step("Matrix screening",
+                             run=lambda: apply_technology_matrix(config),
+                             inputs=[config.technology_config_file or TECHNOLOGY_CONFIG_FILE],
+                             params={'technology_top_n': config.technology_top_n},
+                             code=[apply_technology_matrix],
+                             depends_on=["Phase 4: Environmental fields"],
+                             outputs=[config.cesspool_analysis]))
+        steps[5].depends_on = ["Matrix screening"]
+    return steps
+
 def main():
     """Main execution function"""
     try:
@@ -571,22 +651,17 @@ def main():
         
         # Setup workspace
         setup_workspace(config)
+        check_input_projections(config)
         
-        # Phase 1: Data Loading and Examination
-        bedroom_df = load_and_examine_data(config)
-        join_bedroom_data_to_parcels(config, bedroom_df)
-        
-        # Phase 2: Residential Filtering
-        filter_residential_parcels(config)
-        
-        # Phase 3: Cesspool Analysis
-        calculate_cesspool_requirements(config)
-        
-        # Phase 4: Environmental Factors (placeholder)
-        add_environmental_factors(config)
-        
-        # Phase 5: Summary and Reporting
-        generate_analysis_summary(config)
+        # Phases 1-5, skipping any whose inputs are unchanged since the last run
+        steps = build_analysis_steps(config)
+        if config.use_step_cache:
+            cache = StepCache(config.step_cache_file,
+                              fingerprint=lambda item: dataset_fingerprint(config, item))
+            cache.run_all(steps)
+        else:
+            for step in steps:
+                step.run()
         
         # Final success message
         print("🎉 ANALYSIS COMPLETE!")
@@ -610,54 +685,356 @@ def main():
         import traceback
         traceback.print_exc()
 
+# =============================================================================
+# COUNTY-PARTITIONED EXECUTION
+# =============================================================================
+
+def run_county_partition(county, scratch_dir, parcels_fingerprint=None):
+    """
+    Run the full analysis and Matrix screening for one county
+    
+    Executes in a worker process with its own scratch file geodatabase, so
+    counties never share a workspace or lock. The county subset is
+    re-selected whenever the statewide parcel fingerprint changes. Returns
+    the partition outputs.
+    """
+    statewide = Config()
+    config = Config()
+    config.gdb_path = os.path.join(scratch_dir, "scratch.gdb")
+    config.output_folder = scratch_dir
+    config.step_cache_file = os.path.join(scratch_dir, "step_cache.json")
+    config.export_format = "parquet"
+    config.export_compression = None
+    config.tmk_fc = "tmk_county"
+    
+    if not arcpy.Exists(config.gdb_path):
+        arcpy.management.CreateFileGDB(scratch_dir, "scratch.gdb")
+    arcpy.env.scratchWorkspace = config.gdb_path
+    arcpy.env.overwriteOutput = True
+    
+    # County subset of the statewide parcels, cached on the statewide content
+    statewide_parcels = os.path.join(statewide.gdb_path, statewide.tmk_fc)
+    county_parcels = os.path.join(config.gdb_path, config.tmk_fc)
+    where_clause = f"UPPER({config.county_field}) = '{county.upper()}'"
+    select_step = Step("County subset",
+                       run=lambda: arcpy.Select_analysis(statewide_parcels, county_parcels, where_clause),
+                       params={'where_clause': where_clause,
+                               'statewide_parcels': parcels_fingerprint
+                               or dataset_fingerprint(statewide, statewide_parcels)},
+                       outputs=[county_parcels])
+    
+    steps = build_analysis_steps(config, include_matrix=True)
+    steps[0].depends_on = [select_step.name]
+    if config.use_step_cache:
+        cache = StepCache(config.step_cache_file,
+                          fingerprint=lambda item: dataset_fingerprint(config, item))
+        cache.run(select_step)
+        setup_workspace(config)
+        cache.run_all(steps)
+    else:
+        select_step.run()
+        setup_workspace(config)
+        for step in steps:
+            step.run()
+    
+    return {
+        'results': export_output_path(config),
+        'features': os.path.join(config.gdb_path, config.cesspool_analysis),
+        'summary_cube': summary_cube_path(config),
+    }
+
+def main_partitioned():
+    """Statewide run as four county partitions merged in a fixed order"""
+    config = Config()
+    setup_workspace(config)
+    check_input_projections(config)
+    
+    print("🗺️ COUNTY-PARTITIONED ANALYSIS")
+    print("-" * 35)
+    print(f"Counties: {', '.join(COUNTY_PARTITIONS)}")
+    print(f"Scratch: {config.scratch_folder}")
+    
+    # One full-content hash of the statewide parcels; a county re-selects its
+    # subset whenever this changes
+    statewide_parcels = os.path.join(config.gdb_path, config.tmk_fc)
+    parcels_fingerprint = parcel_geometry_fingerprint(
+        statewide_parcels, find_tmk_field([f.name for f in arcpy.ListFields(statewide_parcels)]),
+        arcpy.Describe(statewide_parcels).spatialReference
+    )
+    
+    use_python_for_workers()
+    
+    results = run_partitions(run_county_partition, config.scratch_folder,
+                             partitions=COUNTY_PARTITIONS, max_workers=config.max_workers,
+                             kwargs={'parcels_fingerprint': parcels_fingerprint})
+    completed = [r for r in results if r.ok]
+    if len(completed) < len(results):
+        print(f"❌ {len(results) - len(completed)} county partition(s) failed - statewide merge skipped")
+        return results
+    
+    # Deterministic merge: county order, then TMK within each county. Merge
+    # keeps input row order, so each county is sorted by TMK first
+    sorted_features = []
+    for r in completed:
+        sorted_fc = r.outputs['features'] + "_by_tmk"
+        arcpy.management.Sort(r.outputs['features'], sorted_fc, [["TMK", "ASCENDING"]])
+        sorted_features.append(sorted_fc)
+    arcpy.env.workspace = config.gdb_path
+    arcpy.Merge_management(sorted_features, config.cesspool_analysis)
+    statewide_results = os.path.join(config.output_folder, "Hawaii_Cesspool_Analysis_Results.parquet")
+    row_count = merge_partition_files(completed, 'results', statewide_results,
+                                      key_field="TMK", partition_field="PARTITION")
+    
+    # County cubes have disjoint cells, so concatenating them gives the statewide cube
+    cube = SummaryCube.from_frame(pd.concat([pd.read_csv(r.outputs['summary_cube']) for r in completed],
+                                            ignore_index=True))
+    cube.save(summary_cube_path(config))
+    
+    print(f"✅ Statewide features: {config.cesspool_analysis}")
+    print(f"✅ Statewide results: {statewide_results} ({row_count:,} rows)")
+    print(f"✅ Statewide summary cube: {summary_cube_path(config)} ({cube.total():,} parcels)")
+    return results
+
 # =============================================================================
 # UTILITY FUNCTIONS FOR FUTURE ENHANCEMENTS
 # =============================================================================
 
-def add_slope_analysis(config, dem_raster):
-    """Add slope analysis from DEM (for future use)"""
-    print("Adding slope analysis from DEM...")
+def export_raster_for_memmap(config, raster):
+    """Float-grid copy of a raster that numpy can memory-map (.flt/.npy used as is)"""
+    if os.path.splitext(str(raster))[1].lower() in ('.flt', '.npy'):
+        return str(raster)
     
-    # Calculate slope
-    slope_raster = os.path.join(config.gdb_path, "slope_raster")
-    arcpy.Slope_3d(dem_raster, slope_raster, "PERCENT_RISE")
+    os.makedirs(config.raster_cache_folder, exist_ok=True)
+    catalog_path = arcpy.Describe(raster).catalogPath
+    name = os.path.splitext(os.path.basename(catalog_path))[0]
+    raster_float = os.path.join(config.raster_cache_folder, f"{name}_memmap.flt")
+    if not os.path.exists(raster_float) or os.path.getmtime(raster_float) < os.path.getmtime(catalog_path):
+        print(f"  Exporting {name} to a float grid (once per raster)...")
+        arcpy.conversion.RasterToFloat(raster, raster_float)
+    return raster_float
+
+def parcel_geometry_fingerprint(dataset, tmk_field, spatial_reference):
+    """
+    Content hash of every parcel's ObjectID, TMK, area, perimeter and centroid
     
-    # Extract slope values to points
-    arcpy.sa.ExtractValuesToPoints(
-        config.cesspool_analysis,
-        slope_raster,
-        "parcels_with_slope"
+    Catches edited, moved, added and removed parcels that leave the record
+    count and extent unchanged, without building geometry objects.
+    """
+    tmk_type = arcpy.ListFields(dataset, tmk_field)[0].type
+    array = arcpy.da.FeatureClassToNumPyArray(
+        dataset, ["OID@", tmk_field, "SHAPE@AREA", "SHAPE@LENGTH", "SHAPE@XY"],
+        spatial_reference=spatial_reference, null_value=null_value_map([(tmk_field, tmk_type)])
     )
+    return hashlib.sha256(array.tobytes()).hexdigest()
 
-def add_groundwater_analysis(config, groundwater_layer):
-    """Add groundwater depth analysis (for future use)"""
-    print("Adding groundwater depth analysis...")
+def parcel_label_grid(config, grid, spatial_reference):
+    """tmk_state parcels rasterized onto a raster grid, cached per parcel content and grid"""
+    parcel_tmk = find_tmk_field([f.name for f in arcpy.ListFields(config.tmk_fc)])
+    desc = arcpy.Describe(config.tmk_fc)
+    content = parcel_geometry_fingerprint(config.tmk_fc, parcel_tmk, spatial_reference)
+    signature = f"{desc.catalogPath}|{parcel_tmk}|{spatial_reference.factoryCode}|{content}"
+    grid_key = hashlib.sha1(repr(sorted(grid.as_dict().items())).encode()).hexdigest()[:12]
+    cache_path = os.path.join(config.raster_cache_folder, f"tmk_labels_{grid_key}.npz")
+    
+    def read_parcels():
+        print("  Rasterizing parcels onto the raster grid (first run only)...")
+        geometries, tmks = [], []
+        with arcpy.da.SearchCursor(config.tmk_fc, [parcel_tmk, "SHAPE@"],
+                                   spatial_reference=spatial_reference) as cursor:
+            for tmk, shape in cursor:
+                geometries.append(shape.__geo_interface__ if shape else None)
+                tmks.append(tmk)
+        return geometries, normalize_tmk(tmks)
+    
+    label_grid, from_cache = LabelGrid.load_or_build(cache_path, signature, grid, read_parcels,
+                                                     tile_size=config.dem_tile_size)
+    print(f"  {label_grid} ({'cache' if from_cache else 'built and cached'})")
+    return label_grid
+
+def add_raster_statistics(config, raster, fields, percentiles=()):
+    """
+    Summarize a raster over every parcel and write the results to the analysis layer
+    
+    One streaming pass over the raster; the parcel label grid is reused
+    from the cache for every raster on the same grid.
+    
+    Args:
+        config (Config): Analysis configuration
+        raster (str): Raster dataset, or a .flt/.npy float grid
+        fields (dict): Output field -> statistic ('count', 'mean', 'min',
+            'max', 'sum' or 'p90'-style percentile)
+        percentiles (iterable): Percentiles referenced in fields, e.g. (90,)
+    
+    Returns:
+        dict: Output field -> array in analysis-layer order
+    """
+    raster_float = export_raster_for_memmap(config, raster)
+    values = MemmapRaster.open(raster_float)
+    spatial_reference = arcpy.Describe(raster).spatialReference
+    label_grid = parcel_label_grid(config, values.grid, spatial_reference)
+    
+    statistics = [stat for stat in fields.values() if not stat.startswith('p')]
+    use_python_for_workers()
+    stats = zonal_statistics(label_grid, values, statistics=statistics, percentiles=percentiles,
+                             tile_size=config.dem_tile_size, max_workers=config.raster_workers)
+    
+    columns, matched = write_parcel_columns(config, label_grid,
+                                            {field: stats[stat] for field, stat in fields.items()},
+                                            "ZONAL_OID")
+    print(f"✅ {', '.join(fields)} added for {int(matched.sum()):,} of {len(matched):,} parcels")
+    return columns
+
+def write_parcel_columns(config, label_grid, columns, key_field):
+    """
+    Write per-parcel columns (label grid order) to the analysis layer by TMK
     
-    # Spatial join or near analysis to get groundwater depths
-    arcpy.SpatialJoin_analysis(
-        config.cesspool_analysis,
-        groundwater_layer,
-        "parcels_with_groundwater"
+    The first parcel wins for duplicate TMKs; analysis records without a
+    parcel get NaN (numeric) or an empty string (text).
+    
+    Returns:
+        tuple: (dict of field -> array in analysis-layer order, boolean
+        array marking the records matched to a parcel)
+    """
+    analysis_fields = [(f.name, f.type) for f in arcpy.ListFields(config.cesspool_analysis)]
+    analysis_tmk = find_tmk_field([name for name, _ in analysis_fields])
+    records = arcpy.da.TableToNumPyArray(
+        config.cesspool_analysis, ["OID@", analysis_tmk],
+        null_value=null_value_map([f for f in analysis_fields if f[0] == analysis_tmk])
     )
+    parcel_row = pd.Series(np.arange(label_grid.n_polygons), index=label_grid.polygon_ids)
+    parcel_row = parcel_row[~parcel_row.index.duplicated()]
+    rows = parcel_row.reindex(normalize_tmk(records[analysis_tmk])).to_numpy()
+    matched = ~np.isnan(rows)
+    rows = np.where(matched, rows, 0).astype(np.int64)
+    
+    record_columns = {}
+    for field, values in columns.items():
+        column = np.asarray(values)[rows]
+        if column.dtype.kind in 'biuf':
+            column = column.astype(float)
+            column[~matched] = np.nan
+        else:
+            column[~matched] = ''
+        record_columns[field] = column
+    
+    # Fields from earlier runs are replaced (ExtendTable only adds new fields)
+    get_backend('arcpy').extend_table(config.cesspool_analysis,
+                                      to_extend_array(records["OID@"], record_columns, key_field), key_field)
+    return record_columns, matched
 
-def apply_technology_matrix(config, technology_matrix_csv):
-    """Apply technology suitability matrix (for future use)"""
+def add_slope_analysis(config, dem_raster):
+    """Per-parcel slope statistics from the DEM over the cached parcel label grid"""
+    print("Adding slope analysis from DEM...")
+    
+    dem_float = export_raster_for_memmap(config, dem_raster)
+    raster = MemmapRaster.open(dem_float)
+    spatial_reference = arcpy.Describe(dem_raster).spatialReference
+    label_grid = parcel_label_grid(config, raster.grid, spatial_reference)
+    
+    # Slope is computed tile by tile and reduced per parcel; no slope raster is written
+    print(f"  {raster.grid} in {tile_count(raster.grid, config.dem_tile_size)} tiles")
+    use_python_for_workers()
+    slope = compute_parcel_slope(label_grid, raster, tile_size=config.dem_tile_size,
+                                 z_factor=config.dem_z_factor, max_workers=config.raster_workers)
+    
+    # Bulk write-back replaces the SLOPE_PERCENT placeholder
+    columns, matched = write_parcel_columns(config, label_grid, slope, "SLOPE_OID")
+    measured = int((columns["SLOPE_PIXELS"] > 0).sum())
+    print(f"✅ Slope added: {measured:,} parcels from DEM cells, "
+          f"{int(matched.sum()) - measured:,} from center cell, {int((~matched).sum()):,} without a parcel")
+    return columns
+
+def add_groundwater_analysis(config, groundwater_raster):
+    """Add depth to groundwater from a depth raster (shallowest depth governs HAR separation)"""
+    print("Adding groundwater depth analysis...")
+    return add_raster_statistics(config, groundwater_raster,
+                                 {"GROUNDWATER_FT": "min", "GROUNDWATER_MEAN_FT": "mean"})
+
+def add_elevation_analysis(config, dem_raster):
+    """Add parcel elevation statistics from the DEM"""
+    print("Adding elevation analysis...")
+    return add_raster_statistics(config, dem_raster,
+                                 {"ELEVATION_MEAN": "mean", "ELEVATION_MIN": "min", "ELEVATION_MAX": "max"})
+
+def apply_technology_matrix(config, technology_matrix_file=None):
+    """Apply technology suitability matrix with the compiled bit-matrix sieve"""
     print("Applying technology suitability matrix...")
     
-    # Load technology matrix
-    tech_df = pd.read_csv(technology_matrix_csv)
+    # Load and compile the screening spreadsheet once
+    matrix = load_compiled_matrix(technology_matrix_file)
+    print(f"  Loaded {matrix.n_technologies} technologies x {len(matrix.criteria)} criteria")
+    
+    # Read the site attributes for every parcel in one pass
+    site_fields = ['OID@', 'TMK', 'BED_ROOMS', 'LOT_SIZE_SF', 'SLOPE_PERCENT', 'GROUNDWATER_FT', 'FLOOD_ZONE']
+    tmk_type = arcpy.ListFields(config.cesspool_analysis, 'TMK')[0].type
+    site_array = arcpy.da.TableToNumPyArray(
+        config.cesspool_analysis, site_fields,
+        null_value={**null_value_map([('TMK', tmk_type)]), 'BED_ROOMS': -1, 'LOT_SIZE_SF': -1,
+                    'SLOPE_PERCENT': np.nan, 'GROUNDWATER_FT': np.nan, 'FLOOD_ZONE': ''}
+    )
+    lot_size = site_array['LOT_SIZE_SF'].astype(float)
+    lot_size[lot_size < 0] = np.nan
+    bedrooms = site_array['BED_ROOMS'].astype(float)
+    bedrooms[bedrooms < 0] = np.nan
     
-    # Apply suitability rules based on parcel characteristics
-    # This will be a complex matching algorithm based on:
-    # - Lot size category
-    # - Slope percentage  
-    # - Groundwater depth
-    # - Soil type
-    # - Distance to sensitive areas
+    # FEMA special flood hazard areas are the A and V zones; parcels with a
+    # blank or undetermined zone get neither flood condition
+    in_flood_zone = flood_zone_condition(site_array['FLOOD_ZONE'])
+    
+    # Encode parcel conditions and run the sieve for all parcels at once
+    flags = site_condition_flags(
+        matrix, len(site_array),
+        lot_size_sf=lot_size,
+        slope_percent=site_array['SLOPE_PERCENT'],
+        groundwater_depth_ft=site_array['GROUNDWATER_FT'],
+        flood_zone=in_flood_zone
+    )
+    suitable_bits = sieve(matrix, encode_conditions(matrix, flags))
+    suitable = suitability_matrix(matrix, suitable_bits)
+    
+    # Write technology count and list back in one bulk operation
+    tech_names = matrix.technologies
+    results = np.empty(len(site_array), dtype=[('PARCEL_OID', '<i4'),
+                                               ('SUITABLE_TECH_COUNT', '<i2'),
+                                               ('SSPSCRT', '<U255')])
+    results['PARCEL_OID'] = site_array['OID@']
+    results['SUITABLE_TECH_COUNT'] = suitable.sum(axis=1)
+    
+    # Only a few hundred distinct suitability patterns exist statewide,
+    # so build each technology list once and map it back to the parcels
+    patterns, inverse = np.unique(suitable_bits, axis=0, return_inverse=True)
+    pattern_text = np.array(['; '.join(tech_names[row])[:255]
+                             for row in suitability_matrix(matrix, patterns)], dtype='U255')
+    results['SSPSCRT'] = pattern_text[inverse.ravel()]
+    
+    # Fields from earlier runs are replaced (ExtendTable only adds new fields)
+    backend = get_backend('arcpy')
+    backend.extend_table(config.cesspool_analysis, results, 'PARCEL_OID')
+    
+    print(f"  ✅ Screened {len(site_array):,} parcels")
+    print(sieve_summary(matrix, suitable_bits).head(10).to_string(index=False))
+    
+    # Rank the suitable technologies by cost, maintenance, approval and lifespan
+    database = load_technology_database(config.technology_config_file)
+    difficulty = site_difficulty(len(site_array), slope_percent=site_array['SLOPE_PERCENT'],
+                                 lot_size_sf=lot_size)
+    ranking = rank_technologies(matrix, suitable_bits, database, bedrooms, difficulty,
+                                top_n=config.technology_top_n)
+    backend.extend_table(config.cesspool_analysis,
+                         to_extend_array(site_array['OID@'], ranking.columns(), "RANK_OID"), "RANK_OID")
+    
+    print(f"  ✅ Top {ranking.top_n} technologies per parcel ranked ({database})")
+    print("\nRecommended technology cost by island:")
+    print(cost_rollup(ranking, island_from_tmk(site_array['TMK'])).round(0).to_string())
+    return suitable_bits
 
 # =============================================================================
 # RUN THE ANALYSIS
 # =============================================================================
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # python hawaii_cesspool_analysis.py --partitioned  runs one process per county
+    if "--partitioned" in sys.argv:
+        main_partitioned()
+    else:
+        main()
\ No newline at end of file